@@ -1,17 +1,14 @@
 
 import json
 import re
-from types import SimpleNamespace
 
-from app.ai_reasoning.signals import extract_signals
 from app.ai_reasoning.rules import apply_rules
 from app.ai_reasoning.role_context import RoleContextBuilder
 from app.ai_reasoning.prompts.followup_prompt import build_followup_prompt
 from app.ai_reasoning.prompts.final_summary_prompt import build_final_summary_prompt
 from app.ai_reasoning.llm import call_llm
-from app.context.alignment_engine import AlignmentEngine
-from app.difficulty.controller import DifficultyController
-from app.analytics.performance_engine import PerformanceAnalyticsEngine
+from app.ai_reasoning import scoring
+from app.ai_reasoning.scoring import TurnScoringInput, get_turn_scoring_pool
 from app.leadership.leadership_engine import LeadershipEngine
 from app.escalation.seniority_engine import SeniorityEscalationEngine
 from app.mce import ClaimExtractor, RecallPlanner
@@ -24,8 +21,6 @@ class AIReasoningEngine:
         self.session_engine = session_engine
         self.session_controller = session_controller
         self.role_context_builder = RoleContextBuilder()
-        self.difficulty_controller = DifficultyController()
-        self.performance_analytics = PerformanceAnalyticsEngine()
         self.leadership_engine = LeadershipEngine()
         self.seniority_escalation_engine = SeniorityEscalationEngine()
         self.claim_extractor = ClaimExtractor()
@@ -79,96 +74,13 @@ class AIReasoningEngine:
         return depth_score
 
     def compute_clarity(self, text: str, hesitation_count: int) -> int:
-        words = text.split()
-        word_count = len(words)
-        if word_count == 0:
-            return 0
-
-        base = 45
-        if 18 <= word_count <= 90:
-            base += 20
-        elif word_count < 12:
-            base -= 15
-
-        unique_ratio = len(set(w.lower() for w in words)) / max(word_count, 1)
-        if unique_ratio > 0.75:
-            base += 10
-
-        base -= min(hesitation_count * 4, 20)
-        return max(0, min(100, int(base)))
+        return scoring.compute_clarity(text, hesitation_count)
 
     def compute_depth(self, signals: dict, text: str) -> int:
-        lower = text.lower()
-        base = int((signals.get("depth_score", 0.0) or 0.0) * 100)
-        if "example" in lower or "for instance" in lower:
-            base += 10
-        if len(text.split()) > 40:
-            base += 8
-
-        architecture_terms = [
-            "designed", "architected", "multi-region", "distributed",
-            "scaled", "pipeline", "ci/cd", "terraform", "kubernetes",
-        ]
-        measurable_terms = [
-            "%", "reduced", "improved", "latency", "throughput", "availability",
-            "downtime", "cost", "time",
-        ]
-
-        has_architecture = any(term in lower for term in architecture_terms)
-        has_measurable = any(term in lower for term in measurable_terms)
-
-        if has_architecture:
-            base += 15
-        if has_measurable:
-            base += 15
-        if has_architecture and has_measurable:
-            base += 10
-
-        return max(0, min(100, base))
+        return scoring.compute_depth(signals, text)
 
     def compute_structure(self, text: str) -> int:
-        lower = text.lower()
-        score = 0
-
-        # ===== STAR KEYWORDS =====
-        if any(k in lower for k in ["situation", "context", "problem"]):
-            score += 20
-
-        if any(k in lower for k in ["task", "goal", "objective"]):
-            score += 20
-
-        if any(k in lower for k in ["action", "implemented", "built", "designed"]):
-            score += 25
-
-        if any(k in lower for k in ["result", "impact", "%", "reduced", "improved"]):
-            score += 15
-
-        # ===== TECHNICAL ACTION VERBS =====
-        technical_actions = [
-            "migrated", "deployed", "optimized",
-            "automated", "refactored", "scaled",
-            "integrated", "configured"
-        ]
-
-        if any(v in lower for v in technical_actions):
-            score += 20
-
-        # ===== MEASURABLE IMPACT SIGNALS =====
-        measurable_terms = [
-            "%", "latency", "performance",
-            "cost", "time", "throughput",
-            "errors", "availability",
-            "downtime"
-        ]
-
-        if any(m in lower for m in measurable_terms):
-            score += 15
-
-        # ===== CAUSAL FLOW DETECTION =====
-        if "because" in lower or "so that" in lower:
-            score += 10
-
-        return max(0, min(100, score))
+        return scoring.compute_structure(text)
 
     def _normalize_seniority_level(self, value) -> int | None:
         if not value:
@@ -281,118 +193,55 @@ class AIReasoningEngine:
     # 🔥 CONFIDENCE METRIC
     # =========================
     def compute_confidence(self, transcript_state):
-        if transcript_state.word_count == 0:
-            return 0.0
-
-        hesitation_penalty = min(transcript_state.pause_count * 0.1, 0.5)
-        brevity_penalty = 0.3 if transcript_state.word_count < 20 else 0.0
-
-        confidence = 1.0 - hesitation_penalty - brevity_penalty
-        return round(max(confidence, 0.0), 2)
+        return scoring.compute_confidence(transcript_state.word_count, transcript_state.pause_count)
 
     # =========================
     # 🔥 ANSWER QUALITY
     # =========================
     def grade_answer(self, text: str):
-        wc = len(text.split())
-
-        if wc < 10:
-            return "too_short"
-        if wc > 120:
-            return "rambling"
-        if "example" in text.lower() or "for instance" in text.lower():
-            return "strong"
-        return "average"
+        return scoring.grade_answer(text)
 
     # =========================
     # LIVE TURN DECISION
     # =========================
     async def decide(self, interview_snapshot):
         last_text = (getattr(interview_snapshot, "last_turn_summary", "") or "").strip()
-        signals = extract_signals(interview_snapshot)
-        decision = apply_rules(signals)
         role = (getattr(self.session_engine, "role", "general") or "general").lower()
         role_ctx = getattr(self.session_engine, "role_context", None)
         if not role_ctx:
             role_ctx = self.role_context_builder.from_ui_role(role)
 
         transcript_state = getattr(interview_snapshot, "transcript_state", None)
-        if transcript_state is None:
-            transcript_state = SimpleNamespace(
-                word_count=len(last_text.split()),
-                pause_count=signals.get("hesitation_count", 0),
-            )
-
-        # 🔥 METRICS
-        decision.confidence = self.compute_confidence(transcript_state)
-        decision.hesitation_count = transcript_state.pause_count
-        decision.answer_quality = self.grade_answer(
-            interview_snapshot.last_turn_summary or ""
-        )
-
-        decision.clarity_score = self.compute_clarity(last_text, decision.hesitation_count)
-        decision.depth_score = self.compute_depth(signals, last_text)
 
-        if role_ctx:
-            keywords = role_ctx.get("skill_keywords", [])
-            boost = 0
-            for skill in keywords:
-                if skill in last_text.lower():
-                    boost += 5
-
-            decision.depth_score = min(100, decision.depth_score + min(boost, 10))
+        # Deterministic scoring runs off the event loop on an immutable copy of the turn.
+        scores = await get_turn_scoring_pool().score(TurnScoringInput.build(
+            summary=getattr(interview_snapshot, "last_turn_summary", "") or "",
+            topic_drift=getattr(interview_snapshot, "topic_drift", 0.0),
+            word_count=getattr(transcript_state, "word_count", None),
+            pause_count=getattr(transcript_state, "pause_count", None),
+            role_ctx=role_ctx,
+            jd_context=getattr(self.session_engine, "jd_context", None),
+            resume_profile=getattr(self.session_engine, "resume_profile", None),
+            analytics_state=getattr(self.session_engine, "analytics_state", {}),
+            difficulty_level=getattr(self.session_engine, "difficulty_level", "L2"),
+            performance_history=getattr(self.session_engine, "performance_history", []),
+        ))
+        signals = scores.signals
+        decision = apply_rules(signals)
 
-        decision.structure_score = self.compute_structure(last_text)
-        alignment_engine = AlignmentEngine()
-        decision.alignment_score = alignment_engine.compute_alignment(
-            last_text,
-            getattr(self.session_engine, "jd_context", None),
-            getattr(self.session_engine, "resume_profile", None),
-        )
+        # 🔥 METRICS
+        decision.confidence = scores.confidence
+        decision.hesitation_count = scores.hesitation_count
+        decision.answer_quality = scores.answer_quality
+        decision.clarity_score = scores.clarity_score
+        decision.depth_score = scores.depth_score
+        decision.structure_score = scores.structure_score
+        decision.alignment_score = scores.alignment_score
         decision.seniority_adjustment = 0
         decision.hesitation_penalty = min(decision.hesitation_count * 8, 30)
+        overall = scores.overall
 
-        # Default weights
-        clarity_w = 0.30
-        depth_w = 0.30
-        structure_w = 0.25
-        confidence_w = 0.15
-
-        if role_ctx and "weights" in role_ctx:
-            clarity_w = role_ctx["weights"].get("clarity", clarity_w)
-            depth_w = role_ctx["weights"].get("depth", depth_w)
-            structure_w = role_ctx["weights"].get("structure", structure_w)
-            confidence_w = role_ctx["weights"].get("confidence", confidence_w)
-
-        total_w = clarity_w + depth_w + structure_w + confidence_w
-        if total_w > 0 and abs(total_w - 1.0) > 1e-9:
-            clarity_w /= total_w
-            depth_w /= total_w
-            structure_w /= total_w
-            confidence_w /= total_w
-
-        overall = (
-            clarity_w * decision.clarity_score
-            + depth_w * decision.depth_score
-            + structure_w * decision.structure_score
-            + confidence_w * (decision.confidence * 100)
-            + 0.20 * decision.alignment_score
-        )
-        overall = max(0, min(100, overall))
-
-        analytics_state, analytics_snapshot = self.performance_analytics.evaluate(
-            state=getattr(self.session_engine, "analytics_state", {}),
-            current_metrics={
-                "overall": overall,
-                "confidence": decision.confidence,
-                "clarity": decision.clarity_score,
-                "depth": decision.depth_score,
-                "structure": decision.structure_score,
-                "alignment": decision.alignment_score,
-            },
-            jd_context=getattr(self.session_engine, "jd_context", None) or {},
-            current_answer=last_text,
-        )
+        analytics_state, analytics_snapshot = scores.analytics_state, scores.analytics_snapshot
         if self.session_engine:
             self.session_engine.set_analytics(analytics_state, analytics_snapshot)
 
@@ -403,11 +252,7 @@ class AIReasoningEngine:
         decision.consistency_score = analytics_snapshot.get("consistency_score", 0.0)
         decision.jd_coverage_pct = analytics_snapshot.get("jd_coverage_pct", 0.0)
 
-        difficulty_result = self.difficulty_controller.evaluate(
-            turn_score=overall,
-            current_level=getattr(self.session_engine, "difficulty_level", "L2"),
-            history=getattr(self.session_engine, "performance_history", []),
-        )
+        difficulty_result = scores.difficulty_result
         decision.difficulty = difficulty_result["difficulty_bucket"]
         if self.session_engine:
             self.session_engine.set_difficulty_state(
@@ -0,0 +1,457 @@
+"""
+Deterministic turn scoring, off the event loop.
+
+``score_turn`` is a pure function from an immutable ``TurnScoringInput``
+to ``TurnScores``. It covers signals, confidence, clarity, depth,
+structure, JD alignment, performance analytics and difficulty. It never
+touches the session, so it can run on a worker thread or in a worker
+process. ``AIReasoningEngine.decide`` applies the result to the session
+back on the loop.
+
+``TurnScoringPool`` runs it on a bounded executor. When the executor
+already has ``max_pending`` turns in flight, or is broken, the turn is
+scored inline instead of waiting in a queue.
+
+Env vars:
+    TURN_SCORING_MODE        – thread | process | inline (default: thread)
+    TURN_SCORING_WORKERS     – executor workers (default: 2)
+    TURN_SCORING_MAX_PENDING – in-flight turns before inline fallback (default: 8)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from types import MappingProxyType, SimpleNamespace
+from typing import Any, Mapping, Optional
+
+from app.ai_reasoning.signals import extract_signals
+from app.analytics.performance_engine import PerformanceAnalyticsEngine
+from app.context.alignment_engine import AlignmentEngine
+from app.context.skill_matcher import get_context_skill_matcher
+from app.difficulty.controller import DifficultyController
+
+logger = logging.getLogger("turn_scoring")
+
+TURN_SCORING_MODE = str(os.getenv("TURN_SCORING_MODE", "thread")).strip().lower()
+TURN_SCORING_WORKERS = max(1, int(os.getenv("TURN_SCORING_WORKERS", "2")))
+TURN_SCORING_MAX_PENDING = max(1, int(os.getenv("TURN_SCORING_MAX_PENDING", "8")))
+
+SCORING_STAGES = ("signals", "clarity", "depth", "structure", "alignment", "analytics", "difficulty")
+
+# Stateless components, one set per process.
+_alignment_engine = AlignmentEngine()
+_performance_analytics = PerformanceAnalyticsEngine()
+_difficulty_controller = DifficultyController()
+
+
+# =========================
+# PURE METRICS
+# =========================
+def compute_confidence(word_count: int, pause_count: int) -> float:
+    if word_count == 0:
+        return 0.0
+
+    hesitation_penalty = min(pause_count * 0.1, 0.5)
+    brevity_penalty = 0.3 if word_count < 20 else 0.0
+
+    confidence = 1.0 - hesitation_penalty - brevity_penalty
+    return round(max(confidence, 0.0), 2)
+
+
+def grade_answer(text: str) -> str:
+    wc = len(text.split())
+
+    if wc < 10:
+        return "too_short"
+    if wc > 120:
+        return "rambling"
+    if "example" in text.lower() or "for instance" in text.lower():
+        return "strong"
+    return "average"
+
+
+def compute_clarity(text: str, hesitation_count: int) -> int:
+    words = text.split()
+    word_count = len(words)
+    if word_count == 0:
+        return 0
+
+    base = 45
+    if 18 <= word_count <= 90:
+        base += 20
+    elif word_count < 12:
+        base -= 15
+
+    unique_ratio = len(set(w.lower() for w in words)) / max(word_count, 1)
+    if unique_ratio > 0.75:
+        base += 10
+
+    base -= min(hesitation_count * 4, 20)
+    return max(0, min(100, int(base)))
+
+
+def compute_depth(signals: Mapping, text: str) -> int:
+    lower = text.lower()
+    base = int((signals.get("depth_score", 0.0) or 0.0) * 100)
+    if "example" in lower or "for instance" in lower:
+        base += 10
+    if len(text.split()) > 40:
+        base += 8
+
+    architecture_terms = [
+        "designed", "architected", "multi-region", "distributed",
+        "scaled", "pipeline", "ci/cd", "terraform", "kubernetes",
+    ]
+    measurable_terms = [
+        "%", "reduced", "improved", "latency", "throughput", "availability",
+        "downtime", "cost", "time",
+    ]
+
+    has_architecture = any(term in lower for term in architecture_terms)
+    has_measurable = any(term in lower for term in measurable_terms)
+
+    if has_architecture:
+        base += 15
+    if has_measurable:
+        base += 15
+    if has_architecture and has_measurable:
+        base += 10
+
+    return max(0, min(100, base))
+
+
+def compute_structure(text: str) -> int:
+    lower = text.lower()
+    score = 0
+
+    # ===== STAR KEYWORDS =====
+    if any(k in lower for k in ["situation", "context", "problem"]):
+        score += 20
+
+    if any(k in lower for k in ["task", "goal", "objective"]):
+        score += 20
+
+    if any(k in lower for k in ["action", "implemented", "built", "designed"]):
+        score += 25
+
+    if any(k in lower for k in ["result", "impact", "%", "reduced", "improved"]):
+        score += 15
+
+    # ===== TECHNICAL ACTION VERBS =====
+    technical_actions = [
+        "migrated", "deployed", "optimized",
+        "automated", "refactored", "scaled",
+        "integrated", "configured"
+    ]
+
+    if any(v in lower for v in technical_actions):
+        score += 20
+
+    # ===== MEASURABLE IMPACT SIGNALS =====
+    measurable_terms = [
+        "%", "latency", "performance",
+        "cost", "time", "throughput",
+        "errors", "availability",
+        "downtime"
+    ]
+
+    if any(m in lower for m in measurable_terms):
+        score += 15
+
+    # ===== CAUSAL FLOW DETECTION =====
+    if "because" in lower or "so that" in lower:
+        score += 10
+
+    return max(0, min(100, score))
+
+
+# =========================
+# TURN SNAPSHOT / RESULT
+# =========================
+def _freeze(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+def _thaw(value: Any) -> Any:
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+@dataclass(frozen=True)
+class TurnScoringInput:
+    """Everything scoring reads, copied out of the session at turn time."""
+
+    summary: str
+    topic_drift: float = 0.0
+    word_count: Optional[int] = None
+    pause_count: Optional[int] = None
+    role_ctx: Any = None
+    jd_context: Any = field(default_factory=dict)
+    resume_profile: Any = field(default_factory=dict)
+    analytics_state: Any = field(default_factory=dict)
+    difficulty_level: str = "L2"
+    performance_history: tuple = ()
+
+    @classmethod
+    def build(cls, **kwargs) -> "TurnScoringInput":
+        for key in ("role_ctx", "jd_context", "resume_profile", "analytics_state", "performance_history"):
+            if key in kwargs:
+                kwargs[key] = _freeze(kwargs[key] or ({} if key != "performance_history" else ()))
+        return cls(**kwargs)
+
+    def __reduce__(self):
+        # MappingProxyType does not pickle; ship plain copies to process workers.
+        state = {name: _thaw(getattr(self, name)) for name in self.__dataclass_fields__}
+        return (_rebuild_input, (state,))
+
+
+def _rebuild_input(state: dict) -> TurnScoringInput:
+    return TurnScoringInput.build(**state)
+
+
+@dataclass(frozen=True)
+class TurnScores:
+    signals: dict
+    confidence: float
+    hesitation_count: int
+    answer_quality: str
+    clarity_score: int
+    depth_score: int
+    structure_score: int
+    alignment_score: int
+    overall: float
+    analytics_state: dict
+    analytics_snapshot: dict
+    difficulty_result: dict
+    stage_ms: dict
+
+
+def score_turn(turn: TurnScoringInput) -> TurnScores:
+    """Pure scoring for one turn; per-stage wall time lands in ``stage_ms``."""
+    stage_ms: dict[str, float] = {}
+    started = mark = time.perf_counter()
+
+    def _lap(stage: str) -> None:
+        nonlocal mark
+        now = time.perf_counter()
+        stage_ms[stage] = (now - mark) * 1000.0
+        mark = now
+
+    summary = turn.summary or ""
+    last_text = summary.strip()
+    signals = extract_signals(SimpleNamespace(last_turn_summary=summary, topic_drift=turn.topic_drift))
+    word_count = turn.word_count if turn.word_count is not None else len(last_text.split())
+    pause_count = turn.pause_count if turn.pause_count is not None else signals.get("hesitation_count", 0)
+    confidence = compute_confidence(word_count, pause_count)
+    answer_quality = grade_answer(summary)
+    _lap("signals")
+
+    clarity_score = compute_clarity(last_text, pause_count)
+    _lap("clarity")
+
+    role_ctx = turn.role_ctx
+    depth_score = compute_depth(signals, last_text)
+    if role_ctx:
+        boost = 0
+        lower_text = last_text.lower()
+        for skill in role_ctx.get("skill_keywords", ()):
+            if skill in lower_text:
+                boost += 5
+        depth_score = min(100, depth_score + min(boost, 10))
+    _lap("depth")
+
+    structure_score = compute_structure(last_text)
+    _lap("structure")
+
+    jd_context = _thaw(turn.jd_context) or None
+    resume_profile = _thaw(turn.resume_profile) or None
+    alignment_score = _alignment_engine.compute_alignment(
+        last_text,
+        jd_context,
+        resume_profile,
+        matcher=get_context_skill_matcher(jd_context, resume_profile),
+    )
+    _lap("alignment")
+
+    # Default weights
+    clarity_w = 0.30
+    depth_w = 0.30
+    structure_w = 0.25
+    confidence_w = 0.15
+
+    if role_ctx and "weights" in role_ctx:
+        clarity_w = role_ctx["weights"].get("clarity", clarity_w)
+        depth_w = role_ctx["weights"].get("depth", depth_w)
+        structure_w = role_ctx["weights"].get("structure", structure_w)
+        confidence_w = role_ctx["weights"].get("confidence", confidence_w)
+
+    total_w = clarity_w + depth_w + structure_w + confidence_w
+    if total_w > 0 and abs(total_w - 1.0) > 1e-9:
+        clarity_w /= total_w
+        depth_w /= total_w
+        structure_w /= total_w
+        confidence_w /= total_w
+
+    overall = (
+        clarity_w * clarity_score
+        + depth_w * depth_score
+        + structure_w * structure_score
+        + confidence_w * (confidence * 100)
+        + 0.20 * alignment_score
+    )
+    overall = max(0, min(100, overall))
+
+    analytics_state, analytics_snapshot = _performance_analytics.evaluate(
+        state=_thaw(turn.analytics_state),
+        current_metrics={
+            "overall": overall,
+            "confidence": confidence,
+            "clarity": clarity_score,
+            "depth": depth_score,
+            "structure": structure_score,
+            "alignment": alignment_score,
+        },
+        jd_context=jd_context or {},
+        current_answer=last_text,
+        skill_matcher=get_context_skill_matcher(jd_context, resume_profile),
+    )
+    _lap("analytics")
+
+    difficulty_result = _difficulty_controller.evaluate(
+        turn_score=overall,
+        current_level=turn.difficulty_level,
+        history=list(turn.performance_history),
+    )
+    _lap("difficulty")
+    stage_ms["total"] = (time.perf_counter() - started) * 1000.0
+
+    return TurnScores(
+        signals=signals,
+        confidence=confidence,
+        hesitation_count=pause_count,
+        answer_quality=answer_quality,
+        clarity_score=clarity_score,
+        depth_score=depth_score,
+        structure_score=structure_score,
+        alignment_score=alignment_score,
+        overall=overall,
+        analytics_state=analytics_state,
+        analytics_snapshot=analytics_snapshot,
+        difficulty_result=difficulty_result,
+        stage_ms=stage_ms,
+    )
+
+
+# =========================
+# BOUNDED EXECUTION
+# =========================
+class TurnScoringPool:
+    """Runs ``score_turn`` on a bounded executor with inline fallback."""
+
+    def __init__(
+        self,
+        mode: str = TURN_SCORING_MODE,
+        workers: int = TURN_SCORING_WORKERS,
+        max_pending: int = TURN_SCORING_MAX_PENDING,
+    ):
+        self.mode = mode if mode in {"thread", "process", "inline"} else "thread"
+        self.workers = max(1, int(workers))
+        self.max_pending = max(1, int(max_pending))
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self._stage_totals_ms = {stage: 0.0 for stage in (*SCORING_STAGES, "total", "queue_wait")}
+        self._stats = {"pooled": 0, "inline": 0, "saturated": 0, "pool_errors": 0, "max_pending_seen": 0}
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="turn-scoring")
+        return self._executor
+
+    def _record(self, scores: TurnScores, queue_wait_ms: float = 0.0) -> None:
+        for stage, value in scores.stage_ms.items():
+            self._stage_totals_ms[stage] = self._stage_totals_ms.get(stage, 0.0) + value
+        self._stage_totals_ms["queue_wait"] += max(0.0, queue_wait_ms)
+
+    def _score_inline(self, turn: TurnScoringInput) -> TurnScores:
+        self._stats["inline"] += 1
+        scores = score_turn(turn)
+        self._record(scores)
+        return scores
+
+    async def score(self, turn: TurnScoringInput) -> TurnScores:
+        executor = self._get_executor()
+        if executor is None:
+            return self._score_inline(turn)
+        if self._pending >= self.max_pending:
+            self._stats["saturated"] += 1
+            return self._score_inline(turn)
+
+        self._pending += 1
+        self._stats["max_pending_seen"] = max(self._stats["max_pending_seen"], self._pending)
+        submitted_at = time.perf_counter()
+        try:
+            scores = await asyncio.get_running_loop().run_in_executor(executor, score_turn, turn)
+        except BrokenExecutor as exc:
+            # A worker died; drop the pool and rebuild lazily next turn.
+            # Errors raised by score_turn itself propagate to the caller.
+            self._stats["pool_errors"] += 1
+            logger.warning("Turn scoring pool failed, scoring inline: %s", exc)
+            if self._executor is executor:
+                self._executor = None
+                executor.shutdown(wait=False)
+            return self._score_inline(turn)
+        finally:
+            self._pending -= 1
+
+        elapsed_ms = (time.perf_counter() - submitted_at) * 1000.0
+        self._stats["pooled"] += 1
+        self._record(scores, elapsed_ms - scores.stage_ms.get("total", 0.0))
+        return scores
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def get_stats(self) -> dict:
+        scored = self._stats["pooled"] + self._stats["inline"]
+        return {
+            **self._stats,
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "pending": self._pending,
+            "avg_stage_ms": {
+                stage: round(total / scored, 3) if scored else 0.0
+                for stage, total in self._stage_totals_ms.items()
+            },
+        }
+
+
+_pool: Optional[TurnScoringPool] = None
+
+
+def get_turn_scoring_pool() -> TurnScoringPool:
+    global _pool
+    if _pool is None:
+        _pool = TurnScoringPool()
+    return _pool
@@ -1,5 +1,6 @@
 from dataclasses import dataclass
-import re
+
+from app.context.skill_matcher import SkillMatcher, get_context_skill_matcher, get_skill_matcher, normalize_skill
 
 
 @dataclass
@@ -51,8 +52,7 @@ class SkillCoverageTracker:
     def _present(self, text: str, skill: str) -> bool:
         if not text or not skill:
             return False
-        pattern = r"(?<!\w)" + re.escape(skill.lower().strip()) + r"(?!\w)"
-        return re.search(pattern, text.lower()) is not None
+        return get_skill_matcher([skill]).present(text, skill)
 
     def coverage(
         self,
@@ -60,6 +60,7 @@ class SkillCoverageTracker:
         current_answer: str,
         current_depth: float,
         prior_evidence: dict | None,
+        matcher: SkillMatcher | None = None,
     ) -> tuple[float, list[str], list[str], dict]:
         if not jd_context:
             return 0.0, [], [], {}
@@ -71,8 +72,9 @@ class SkillCoverageTracker:
         evidence = dict(prior_evidence or {})
         depth_weight = 1.0 if float(current_depth) >= 45 else 0.5
 
+        present = (matcher or get_context_skill_matcher(jd_context)).find_all(current_answer or "")
         for skill in must:
-            if self._present(current_answer or "", skill):
+            if normalize_skill(skill) in present:
                 key = skill.strip().lower()
                 evidence[key] = float(evidence.get(key, 0.0)) + depth_weight
 
@@ -133,6 +135,7 @@ class PerformanceAnalyticsEngine:
         current_metrics: dict,
         jd_context: dict,
         current_answer: str,
+        skill_matcher: SkillMatcher | None = None,
     ) -> tuple[dict, dict]:
         analytics = dict(state or {})
         weighted_performance = (
@@ -166,6 +169,7 @@ class PerformanceAnalyticsEngine:
             current_answer=current_answer,
             current_depth=float(current_metrics.get("depth", 0.0)),
             prior_evidence=analytics.get("skill_evidence", {}),
+            matcher=skill_matcher,
         )
         strongest, weakest = self.summary.strongest_weakest(current_metrics)
         decline_warning = self.trend.decline_warning(weighted_hist)
@@ -1,4 +1,7 @@
 import json
+import os
+import bisect
+from collections import OrderedDict
 from pathlib import Path
 from threading import Lock
 from typing import Any
@@ -6,45 +9,301 @@ from typing import Any
 
 _store_lock = Lock()
 _store_path = Path(__file__).resolve().parents[2] / "data" / "session_analytics_store.json"
-_analytics_by_session_id: dict[str, dict[str, Any]] = {}
+_segment_dir = _store_path.with_name("session_analytics")
 
+SEGMENT_MAX_BYTES = max(64 * 1024, int(os.getenv("SESSION_ANALYTICS_SEGMENT_BYTES", str(8 * 1024 * 1024))))
+HOT_CACHE_SIZE = max(16, int(os.getenv("SESSION_ANALYTICS_HOT_CACHE", "512")))
 
-def _load() -> None:
-    global _analytics_by_session_id
+
+class SessionAnalyticsSegmentStore:
+    """
+    Append-only segmented storage for session analytics records.
+
+    Each save appends one line to the active segment file:
+        <header json>\\t<record json>\\n
+    The header carries session_id / user_id / generated_at, so startup
+    builds the indexes without decoding record bodies. Records are decoded
+    lazily on read and kept in a bounded hot LRU.
+
+    Indexes:
+      - session_id -> (segment, offset, length) of the latest version
+      - user_id -> [(generated_at, session_id)] kept sorted with bisect
+    Re-saving a session appends a new version; the old line becomes dead
+    space that is reclaimed by compaction on load. A torn last line left
+    by a crash mid-append is truncated away on load.
+    """
+
+    def __init__(
+        self,
+        segment_dir: Path,
+        segment_max_bytes: int = SEGMENT_MAX_BYTES,
+        hot_cache_size: int = HOT_CACHE_SIZE,
+    ):
+        self._dir = Path(segment_dir)
+        self._segment_max_bytes = segment_max_bytes
+        self._hot_cache_size = hot_cache_size
+        self._locations: dict[str, tuple[int, int, int]] = {}
+        self._meta: dict[str, tuple[str, float]] = {}
+        self._user_index: dict[str, list[tuple[float, str]]] = {}
+        self._hot: OrderedDict[str, dict[str, Any]] = OrderedDict()
+        self._active_segment = 0
+        self._active_file = None
+        self._active_size = 0
+        self._live_bytes = 0
+        self._total_bytes = 0
+
+    # ─── Segment files ───────────────────────────────────────
+
+    def _segment_path(self, segment: int) -> Path:
+        return self._dir / f"segment-{segment:06d}.log"
+
+    def _segment_numbers(self) -> list[int]:
+        if not self._dir.exists():
+            return []
+        numbers = []
+        for path in self._dir.glob("segment-*.log"):
+            try:
+                numbers.append(int(path.stem.split("-", 1)[1]))
+            except (IndexError, ValueError):
+                continue
+        return sorted(numbers)
+
+    def _open_active(self) -> None:
+        if self._active_file is not None and self._active_size < self._segment_max_bytes:
+            return
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_segment += 1
+        self._dir.mkdir(parents=True, exist_ok=True)
+        path = self._segment_path(self._active_segment)
+        self._active_file = path.open("ab")
+        self._active_size = self._active_file.tell()
+
+    def close(self) -> None:
+        if self._active_file is not None:
+            self._active_file.close()
+            self._active_file = None
+
+    # ─── Index maintenance ───────────────────────────────────
+
+    def _index(self, session_id: str, user_id: str, generated_at: float, location: tuple[int, int, int]) -> None:
+        previous = self._locations.get(session_id)
+        if previous is not None:
+            self._live_bytes -= previous[2]
+            # _meta maps the id to its indexed timestamp, so the old entry is
+            # found by bisection rather than a scan of the user's sessions.
+            old_uid, old_ts = self._meta[session_id]
+            rows = self._user_index.get(old_uid)
+            if rows is not None:
+                pos = bisect.bisect_left(rows, (old_ts, session_id))
+                if pos < len(rows) and rows[pos] == (old_ts, session_id):
+                    del rows[pos]
+                if not rows:
+                    self._user_index.pop(old_uid, None)
+
+        self._locations[session_id] = location
+        self._meta[session_id] = (user_id, generated_at)
+        self._live_bytes += location[2]
+        if user_id:
+            bisect.insort(self._user_index.setdefault(user_id, []), (generated_at, session_id))
+
+    def _remember(self, session_id: str, record: dict[str, Any]) -> None:
+        self._hot[session_id] = record
+        self._hot.move_to_end(session_id)
+        while len(self._hot) > self._hot_cache_size:
+            self._hot.popitem(last=False)
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def load(self) -> None:
+        """Rebuild indexes by scanning segment headers only."""
+        self.close()
+        self._locations.clear()
+        self._meta.clear()
+        self._user_index.clear()
+        self._hot.clear()
+        self._live_bytes = 0
+        self._total_bytes = 0
+
+        numbers = self._segment_numbers()
+        for segment in numbers:
+            path = self._segment_path(segment)
+            offset = 0
+            complete = 0
+            with path.open("rb") as handle:
+                for line in handle:
+                    length = len(line)
+                    if not line.endswith(b"\n"):
+                        break  # torn tail from a crash mid-append
+                    complete = offset + length
+                    header_raw, sep, _ = line.partition(b"\t")
+                    if sep:
+                        try:
+                            header = json.loads(header_raw)
+                            sid = str(header["sid"])
+                            self._index(
+                                sid,
+                                str(header.get("uid") or ""),
+                                float(header.get("ts") or 0.0),
+                                (segment, offset, length),
+                            )
+                        except Exception:
+                            pass  # torn or foreign line; skip
+                    offset += length
+                    self._total_bytes += length
+            if segment == numbers[-1] and complete < path.stat().st_size:
+                # Appends resume here; drop the partial line so the next
+                # record does not get glued onto it.
+                with path.open("r+b") as handle:
+                    handle.truncate(complete)
+        self._active_segment = numbers[-1] if numbers else 0
+
+    def save(self, session_id: str, record: dict[str, Any]) -> None:
+        user_id = str(record.get("user_id") or "").strip()
+        try:
+            generated_at = float(record.get("generated_at") or 0.0)
+        except Exception:
+            generated_at = 0.0
+        header = json.dumps({"sid": session_id, "uid": user_id, "ts": generated_at}, ensure_ascii=False)
+        body = json.dumps(record, ensure_ascii=False)
+        line = f"{header}\t{body}\n".encode("utf-8")
+
+        self._open_active()
+        offset = self._active_size
+        self._active_file.write(line)
+        self._active_file.flush()
+        self._active_size += len(line)
+        self._total_bytes += len(line)
+
+        self._index(session_id, user_id, generated_at, (self._active_segment, offset, len(line)))
+        self._remember(session_id, record)
+
+    def get(self, session_id: str) -> dict[str, Any] | None:
+        record = self._hot.get(session_id)
+        if record is not None:
+            self._hot.move_to_end(session_id)
+            return record
+
+        location = self._locations.get(session_id)
+        if location is None:
+            return None
+        segment, offset, length = location
+        if self._active_file is not None and segment == self._active_segment:
+            self._active_file.flush()
+        try:
+            with self._segment_path(segment).open("rb") as handle:
+                handle.seek(offset)
+                line = handle.read(length)
+            record = json.loads(line.partition(b"\t")[2])
+        except Exception:
+            return None
+        if not isinstance(record, dict):
+            return None
+        self._remember(session_id, record)
+        return record
+
+    def list_user(self, user_id: str, limit: int) -> list[tuple[str, dict[str, Any]]]:
+        """Latest ``limit`` sessions of a user, ascending by generated_at."""
+        rows = self._user_index.get(user_id) or []
+        out = []
+        for _, session_id in rows[-limit:] if limit > 0 else ():
+            record = self.get(session_id)
+            if record is not None:
+                out.append((session_id, record))
+        return out
+
+    def user_ids(self) -> list[str]:
+        return sorted(self._user_index.keys())
+
+    def __len__(self) -> int:
+        return len(self._locations)
+
+    def dead_ratio(self) -> float:
+        if self._total_bytes <= 0:
+            return 0.0
+        return max(0.0, 1.0 - (self._live_bytes / self._total_bytes))
+
+    def compact(self) -> None:
+        """Copy live lines into fresh segments and delete the old ones."""
+        old_numbers = self._segment_numbers()
+        self.close()
+        live = sorted(self._locations.items(), key=lambda item: item[1])
+        meta = dict(self._meta)
+
+        self._locations.clear()
+        self._meta.clear()
+        self._user_index.clear()
+        self._live_bytes = 0
+        self._total_bytes = 0
+        self._active_segment = (old_numbers[-1] + 1) if old_numbers else 0
+
+        handles: dict[int, Any] = {}
+        try:
+            for sid, (segment, offset, length) in live:
+                handle = handles.get(segment)
+                if handle is None:
+                    handle = handles[segment] = self._segment_path(segment).open("rb")
+                handle.seek(offset)
+                line = handle.read(length)
+                self._open_active()
+                new_offset = self._active_size
+                self._active_file.write(line)
+                self._active_size += len(line)
+                self._total_bytes += len(line)
+                user_id, generated_at = meta[sid]
+                self._index(sid, user_id, generated_at, (self._active_segment, new_offset, len(line)))
+        finally:
+            for handle in handles.values():
+                handle.close()
+        if self._active_file is not None:
+            self._active_file.flush()
+            os.fsync(self._active_file.fileno())
+        for number in old_numbers:
+            self._segment_path(number).unlink(missing_ok=True)
+
+
+_store = SessionAnalyticsSegmentStore(_segment_dir)
+
+
+def _migrate_legacy_json() -> None:
+    """One-time import of the old single-file store into segments."""
     if not _store_path.exists():
-        _analytics_by_session_id = {}
         return
     try:
         payload = json.loads(_store_path.read_text(encoding="utf-8"))
-        if isinstance(payload, dict):
-            _analytics_by_session_id = {
-                str(key): value
-                for key, value in payload.items()
-                if isinstance(key, str) and isinstance(value, dict)
-            }
-        else:
-            _analytics_by_session_id = {}
     except Exception:
-        _analytics_by_session_id = {}
+        return
+    if not isinstance(payload, dict):
+        return
+    rows = [
+        (str(key), value)
+        for key, value in payload.items()
+        if isinstance(key, str) and isinstance(value, dict)
+    ]
+    rows.sort(key=lambda item: float(item[1].get("generated_at") or 0.0))
+    for session_id, record in rows:
+        _store.save(session_id, record)
 
 
-def _persist() -> None:
-    _store_path.parent.mkdir(parents=True, exist_ok=True)
-    temp_path = _store_path.with_suffix(".tmp")
-    temp_path.write_text(json.dumps(_analytics_by_session_id, ensure_ascii=False), encoding="utf-8")
-    temp_path.replace(_store_path)
+def _load() -> None:
+    with _store_lock:
+        if not _store._segment_numbers():
+            _migrate_legacy_json()
+            return
+        _store.load()
+        if len(_store) and _store.dead_ratio() > 0.5:
+            _store.compact()
 
 
 def save_session_analytics(session_id: str, payload: dict[str, Any], user_id: str | None = None) -> None:
     sid = str(session_id or "").strip()
     if not sid:
         return
+    record = dict(payload or {})
+    if user_id:
+        record["user_id"] = str(user_id)
     with _store_lock:
-        record = dict(payload or {})
-        if user_id:
-            record["user_id"] = str(user_id)
-        _analytics_by_session_id[sid] = record
-        _persist()
+        _store.save(sid, record)
 
 
 def get_session_analytics(session_id: str) -> dict[str, Any] | None:
@@ -52,7 +311,7 @@ def get_session_analytics(session_id: str) -> dict[str, Any] | None:
     if not sid:
         return None
     with _store_lock:
-        data = _analytics_by_session_id.get(sid)
+        data = _store.get(sid)
         return dict(data) if isinstance(data, dict) else None
 
 
@@ -64,27 +323,16 @@ def list_user_session_analytics(user_id: str, limit: int = 50) -> list[dict[str,
 
     with _store_lock:
         rows = []
-        for session_id, payload in _analytics_by_session_id.items():
-            if not isinstance(payload, dict):
-                continue
-            if str(payload.get("user_id") or "") != uid:
-                continue
+        for session_id, payload in _store.list_user(uid, capped):
             item = dict(payload)
             item.setdefault("session_id", session_id)
             rows.append(item)
-
-    rows.sort(key=lambda item: float(item.get("generated_at") or 0.0))
-    return rows[-capped:]
+    return rows
 
 
 def list_all_user_ids() -> list[str]:
     with _store_lock:
-        user_ids = {
-            str(payload.get("user_id") or "").strip()
-            for payload in _analytics_by_session_id.values()
-            if isinstance(payload, dict) and str(payload.get("user_id") or "").strip()
-        }
-    return sorted(user_ids)
+        return _store.user_ids()
 
 
 _load()
@@ -3,13 +3,32 @@
   WebSocket Admission Control — connection queuing & rate limiting.
 
   Prevents the server from being overwhelmed by too many concurrent
-  WebSocket connections. Excess connections are queued with a timeout
-  rather than being rejected immediately.
+  WebSocket connections. Excess connections wait in a FIFO queue per
+  priority class rather than being rejected immediately:
+
+    reconnect  – session holds a live snapshot (resume beats starting over)
+    paid       – Pro/Enterprise plan (see app.plan_gates)
+    new        – everyone else
+
+  The best class is served first; waiters age one class up every
+  WS_ADMISSION_AGING_SEC so nobody starves. Slots are only handed out while
+  live capacity signals are healthy (event-loop lag, in-flight answer
+  streams), so a spike backs up in the queue with position/ETA updates
+  instead of piling onto an overloaded loop. The lag monitor only runs
+  while someone is queued or lag is still above the limit; each admission
+  attempt restarts it, so an idle node does not wake up every 100 ms.
 
   Env vars:
-    WS_MAX_CONCURRENT    – hard cap on simultaneous WS sessions (default: 100)
-    WS_QUEUE_MAX_WAIT    – max seconds to wait in queue   (default: 10)
-    WS_QUEUE_SIZE        – max pending queue depth         (default: 200)
+    WS_MAX_CONCURRENT               – hard cap on simultaneous WS sessions (default: 100)
+    WS_QUEUE_MAX_WAIT               – max seconds to wait in queue   (default: 10)
+    WS_QUEUE_SIZE                   – max pending queue depth         (default: 200)
+    WS_ADMISSION_AGING_SEC          – wait per one-class promotion    (default: 5)
+    WS_ADMISSION_MAX_LOOP_LAG_MS    – pause admissions above this lag (default: 250)
+    WS_ADMISSION_MAX_ACTIVE_STREAMS – pause admissions above this many answer streams (default: 0 = off)
+    WS_ADMISSION_UPDATE_INTERVAL    – seconds between queue position updates (default: 1)
+
+  Fleet-wide caps and the node capacity registry live in app.api.ws_capacity
+  (WS_CLUSTER_ADMISSION=true).
 ═══════════════════════════════════════════════════════════════════════
 """
 
@@ -19,92 +38,391 @@ import asyncio
 import logging
 import os
 import time
-from typing import Optional
+from collections import deque
+from typing import Awaitable, Callable, Optional
+
+from app.api.ws_capacity import (
+    CLUSTER_ADMISSION_ENABLED,
+    LEASE_TTL_SEC,
+    NodeCapacityRegistry,
+    RedisAdmissionSemaphore,
+    get_node_id,
+)
+from app.system_metrics import get_metric
+from core.redis_pool import is_redis_enabled
 
 logger = logging.getLogger("ws_admission")
 
 MAX_CONCURRENT = max(10, int(os.getenv("WS_MAX_CONCURRENT", "100")))
 QUEUE_MAX_WAIT_SEC = max(1.0, float(os.getenv("WS_QUEUE_MAX_WAIT", "10")))
 QUEUE_SIZE = max(10, int(os.getenv("WS_QUEUE_SIZE", "200")))
+AGING_SEC = max(0.5, float(os.getenv("WS_ADMISSION_AGING_SEC", "5")))
+MAX_LOOP_LAG_MS = max(0.0, float(os.getenv("WS_ADMISSION_MAX_LOOP_LAG_MS", "250")))
+MAX_ACTIVE_STREAMS = max(0, int(os.getenv("WS_ADMISSION_MAX_ACTIVE_STREAMS", "0")))
+UPDATE_INTERVAL_SEC = max(0.2, float(os.getenv("WS_ADMISSION_UPDATE_INTERVAL", "1")))
+
+PRIORITY_RECONNECT = 0
+PRIORITY_PAID = 1
+PRIORITY_NEW = 2
+PRIORITY_NAMES = {PRIORITY_RECONNECT: "reconnect", PRIORITY_PAID: "paid", PRIORITY_NEW: "new"}
+
+QueueUpdateFn = Callable[[int, Optional[float]], Awaitable[None]]
+
+
+class _Waiter:
+    __slots__ = ("priority", "enqueued_at", "future")
+
+    def __init__(self, priority: int, future: asyncio.Future):
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.future = future
 
 
 class AdmissionController:
-    """Semaphore + waiting queue for WS connections."""
+    """Priority FIFO admission queue gated on slots and live capacity signals."""
 
     def __init__(
         self,
         max_concurrent: int = MAX_CONCURRENT,
         queue_max_wait: float = QUEUE_MAX_WAIT_SEC,
         queue_size: int = QUEUE_SIZE,
+        aging_sec: float = AGING_SEC,
+        max_loop_lag_ms: float = MAX_LOOP_LAG_MS,
+        max_active_streams: int = MAX_ACTIVE_STREAMS,
+        active_streams_fn: Callable[[], float] = lambda: get_metric("answer_streams_active"),
+        cluster_semaphore: RedisAdmissionSemaphore | None = None,
+        capacity_registry: NodeCapacityRegistry | None = None,
     ):
-        self._semaphore = asyncio.Semaphore(max_concurrent)
         self._max_concurrent = max_concurrent
         self._queue_max_wait = queue_max_wait
         self._queue_size = queue_size
+        self._aging_sec = aging_sec
+        self._max_loop_lag_ms = max_loop_lag_ms
+        self._max_active_streams = max_active_streams
+        self._active_streams_fn = active_streams_fn
+        self._queues: dict[int, deque[_Waiter]] = {p: deque() for p in PRIORITY_NAMES}
         self._active = 0
-        self._queued = 0
         self._total_admitted = 0
         self._total_rejected = 0
         self._total_timeout = 0
-        self._lock = asyncio.Lock()
+        self._total_abandoned = 0
+        self._total_evicted = 0
+        self._admitted_by_class = {name: 0 for name in PRIORITY_NAMES.values()}
+        self._admitted_unqueued = 0  # fast-path admissions, never classified
+        self._loop_lag_ms = 0.0
+        self._release_interval_sec = 0.0  # EWMA of time between releases (queue drain rate)
+        self._last_release_at = 0.0
+        self._monitor_task: asyncio.Task | None = None
+        self._cluster = cluster_semaphore
+        self._registry = capacity_registry
+        self._heartbeat_task: asyncio.Task | None = None
+        self._cluster_denied = 0
+        self._cluster_errors = 0
 
     @property
     def active_connections(self) -> int:
         return self._active
 
+    @property
+    def capacity_registry(self) -> NodeCapacityRegistry | None:
+        return self._registry
+
     @property
     def queued_connections(self) -> int:
-        return self._queued
+        return sum(len(q) for q in self._queues.values())
 
     def stats(self) -> dict:
         return {
             "max_concurrent": self._max_concurrent,
             "active": self._active,
-            "queued": self._queued,
+            "queued": self.queued_connections,
+            "queued_by_class": {PRIORITY_NAMES[p]: len(q) for p, q in self._queues.items()},
+            "admitted_by_class": dict(self._admitted_by_class),
+            "admitted_unqueued": self._admitted_unqueued,
             "total_admitted": self._total_admitted,
             "total_rejected": self._total_rejected,
             "total_timeout": self._total_timeout,
+            "total_abandoned": self._total_abandoned,
+            "total_evicted": self._total_evicted,
+            "loop_lag_ms": round(self._loop_lag_ms, 2),
+            "active_streams": int(self._active_streams()),
+            "overloaded": self._overloaded(),
+            "cluster": (
+                {**self._cluster.get_stats(), "denied_waits": self._cluster_denied, "fail_open": self._cluster_errors}
+                if self._cluster is not None else None
+            ),
         }
 
-    async def acquire(self) -> bool:
-        """Try to acquire a slot. Returns True on success, False if rejected/timed out."""
-        async with self._lock:
-            if self._queued >= self._queue_size:
-                self._total_rejected += 1
-                logger.warning(
-                    "WS admission REJECTED: queue full (%d/%d active, %d queued)",
-                    self._active, self._max_concurrent, self._queued,
-                )
-                return False
-            self._queued += 1
+    def load(self) -> dict:
+        """Compact load summary published to the node capacity registry."""
+        return {
+            "active": self._active,
+            "queued": self.queued_connections,
+            "max_concurrent": self._max_concurrent,
+            "loop_lag_ms": round(self._loop_lag_ms, 2),
+            "active_streams": int(self._active_streams()),
+            "overloaded": self._overloaded(),
+        }
+
+    # ─── Capacity signals ────────────────────────────────────
 
+    def _active_streams(self) -> float:
         try:
-            acquired = await asyncio.wait_for(
-                self._semaphore.acquire(),
-                timeout=self._queue_max_wait,
+            return float(self._active_streams_fn())
+        except Exception:
+            return 0.0
+
+    def _lagging(self) -> bool:
+        return self._max_loop_lag_ms > 0 and self._loop_lag_ms > self._max_loop_lag_ms
+
+    def _overloaded(self) -> bool:
+        if self._lagging():
+            return True
+        if self._max_active_streams > 0 and self._active_streams() >= self._max_active_streams:
+            return True
+        return False
+
+    def _has_capacity(self) -> bool:
+        return self._active < self._max_concurrent and not self._overloaded()
+
+    def _ensure_monitor(self) -> None:
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.get_running_loop().create_task(self._monitor_loop())
+        if (self._cluster is not None or self._registry is not None) and (
+            self._heartbeat_task is None or self._heartbeat_task.done()
+        ):
+            self._heartbeat_task = asyncio.get_running_loop().create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        """Renew cluster leases and publish this node's load."""
+        interval = LEASE_TTL_SEC / 3.0
+        if self._registry is not None:
+            interval = min(interval, self._registry.ttl_sec / 3.0)
+        while True:
+            if self._cluster is not None:
+                await self._cluster.heartbeat()
+            if self._registry is not None:
+                try:
+                    await self._registry.publish(self.load())
+                except Exception as exc:
+                    logger.debug("Capacity registry publish failed: %s", exc)
+            await asyncio.sleep(interval)
+
+    async def _monitor_loop(self, interval: float = 0.1) -> None:
+        """Sample event-loop lag and admit waiters once signals recover."""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (loop.time() - started - interval) * 1000.0)
+            self._loop_lag_ms = lag_ms if lag_ms > self._loop_lag_ms else (0.8 * self._loop_lag_ms + 0.2 * lag_ms)
+            self._dispatch()
+            if not self.queued_connections and not self._lagging():
+                return  # idle; the next admission attempt samples again
+
+    # ─── Queue ───────────────────────────────────────────────
+
+    def _effective_priority(self, waiter: _Waiter, now: float) -> float:
+        return waiter.priority - int((now - waiter.enqueued_at) / self._aging_sec)
+
+    def _next_waiter(self) -> Optional[deque[_Waiter]]:
+        now = time.monotonic()
+        best = None
+        best_key = None
+        for queue in self._queues.values():
+            if not queue:
+                continue
+            head = queue[0]
+            key = (self._effective_priority(head, now), head.enqueued_at)
+            if best_key is None or key < best_key:
+                best, best_key = queue, key
+        return best
+
+    def _dispatch(self) -> None:
+        while self._has_capacity():
+            queue = self._next_waiter()
+            if queue is None:
+                return
+            waiter = queue.popleft()
+            if waiter.future.done():
+                continue
+            self._admit(waiter.priority)
+            waiter.future.set_result(True)
+
+    def _admit(self, priority: Optional[int]) -> None:
+        self._active += 1
+        self._total_admitted += 1
+        if priority is None:
+            self._admitted_unqueued += 1
+        else:
+            self._admitted_by_class[PRIORITY_NAMES[priority]] += 1
+
+    def position(self, waiter: _Waiter) -> int:
+        """1-based queue position by current effective priority (approximate under aging)."""
+        now = time.monotonic()
+        mine = (self._effective_priority(waiter, now), waiter.enqueued_at)
+        ahead = 0
+        for queue in self._queues.values():
+            for other in queue:
+                if other is waiter:
+                    continue
+                if (self._effective_priority(other, now), other.enqueued_at) < mine:
+                    ahead += 1
+        return ahead + 1
+
+    def eta_sec(self, position: int) -> Optional[float]:
+        if self._release_interval_sec <= 0:
+            return None
+        return round(position * self._release_interval_sec, 1)
+
+    def retry_after_hint(self) -> int:
+        eta = self.eta_sec(self.queued_connections + 1)
+        return max(1, int(eta if eta is not None else self._queue_max_wait))
+
+    def _evict_for(self, priority: int) -> bool:
+        """Make room for a higher class by dropping the newest waiter of the worst class."""
+        for victim_priority in sorted(self._queues, reverse=True):
+            if victim_priority <= priority:
+                return False
+            queue = self._queues[victim_priority]
+            if queue:
+                victim = queue.pop()
+                if not victim.future.done():
+                    victim.future.set_result(False)
+                self._total_evicted += 1
+                return True
+        return False
+
+    # ─── Public API ──────────────────────────────────────────
+
+    def try_acquire(self, priority: Optional[int] = PRIORITY_NEW) -> bool:
+        """
+        Take a slot immediately if nobody is queued and capacity is healthy.
+        ``priority=None`` admits without classifying (counted as unqueued).
+        """
+        self._ensure_monitor()
+        if self.queued_connections == 0 and self._has_capacity():
+            if priority is not None and priority not in PRIORITY_NAMES:
+                priority = PRIORITY_NEW
+            self._admit(priority)
+            return True
+        return False
+
+    async def acquire(self, priority: int = PRIORITY_NEW, on_update: QueueUpdateFn | None = None) -> bool:
+        """Wait for a slot. Returns True on success, False if rejected/evicted/timed out."""
+        priority = priority if priority in PRIORITY_NAMES else PRIORITY_NEW
+        if self.try_acquire(priority):
+            return True
+
+        if self.queued_connections >= self._queue_size and not self._evict_for(priority):
+            self._total_rejected += 1
+            logger.warning(
+                "WS admission REJECTED: queue full (%d/%d active, %d queued)",
+                self._active, self._max_concurrent, self.queued_connections,
             )
-        except asyncio.TimeoutError:
-            async with self._lock:
-                self._queued -= 1
-                self._total_timeout += 1
+            return False
+
+        waiter = _Waiter(priority, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+        self._dispatch()
+
+        deadline = time.monotonic() + self._queue_max_wait
+        last_position = None
+        abandoned = False
+        try:
+            while not waiter.future.done():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                if on_update is not None:
+                    position = self.position(waiter)
+                    if position != last_position:
+                        last_position = position
+                        try:
+                            await on_update(position, self.eta_sec(position))
+                        except Exception:
+                            abandoned = True  # client went away while queued
+                            break
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), timeout=min(remaining, UPDATE_INTERVAL_SEC))
+                except asyncio.TimeoutError:
+                    continue
+        except BaseException:
+            # Caller cancelled: give back a slot that was granted in the meantime.
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.result():
+                await self.release()
+            else:
+                self._total_abandoned += 1
+            raise
+        finally:
+            if not waiter.future.done():
+                waiter.future.cancel()
+                try:
+                    self._queues[priority].remove(waiter)
+                except ValueError:
+                    pass
+
+        if abandoned:
+            if waiter.future.done() and not waiter.future.cancelled() and waiter.future.result():
+                await self.release()  # admitted just as the client left
+            self._total_abandoned += 1
+            return False
+        if waiter.future.cancelled():
+            self._total_timeout += 1
             logger.warning(
-                "WS admission TIMEOUT after %.1fs (%d/%d active)",
-                self._queue_max_wait, self._active, self._max_concurrent,
+                "WS admission TIMEOUT after %.1fs (%d/%d active, lag=%.0fms)",
+                self._queue_max_wait, self._active, self._max_concurrent, self._loop_lag_ms,
             )
             return False
+        return bool(waiter.future.result())
 
-        async with self._lock:
-            self._queued -= 1
-            self._active += 1
-            self._total_admitted += 1
+    async def acquire_cluster_lease(self, on_update: QueueUpdateFn | None = None) -> Optional[str]:
+        """
+        After local admission, take a fleet-wide lease when cluster admission is on.
 
-        return True
+        Returns "" when there is no cluster semaphore (or Redis is failing —
+        admission fails open to the local cap), a lease id on success, or
+        None if the fleet stayed full for the whole queue wait.
+        """
+        if self._cluster is None:
+            return ""
+        deadline = time.monotonic() + self._queue_max_wait
+        notified = False
+        while True:
+            try:
+                lease_id = await self._cluster.try_acquire()
+            except Exception as exc:
+                self._cluster_errors += 1
+                logger.warning("Cluster admission unavailable, using local cap only: %s", exc)
+                return ""
+            if lease_id is not None:
+                return lease_id
+            self._cluster_denied += 1
+            if on_update is not None and not notified:
+                notified = True
+                try:
+                    await on_update(0, None)  # fleet-wide wait: position unknown
+                except Exception:
+                    return None
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(remaining, 0.25))
 
-    async def release(self) -> None:
-        """Release a slot when a WS connection closes."""
-        async with self._lock:
-            self._active = max(0, self._active - 1)
-        self._semaphore.release()
+    async def release(self, lease_id: str = "") -> None:
+        """Release a slot (and its cluster lease, if any) when a WS connection closes."""
+        if lease_id and self._cluster is not None:
+            await self._cluster.release(lease_id)
+        self._active = max(0, self._active - 1)
+        now = time.monotonic()
+        if self._last_release_at:
+            interval = now - self._last_release_at
+            self._release_interval_sec = (
+                interval if self._release_interval_sec <= 0
+                else 0.8 * self._release_interval_sec + 0.2 * interval
+            )
+        self._last_release_at = now
+        self._dispatch()
 
 
 # ─── Singleton ────────────────────────────────────────────────────────
@@ -114,9 +432,18 @@ _admission: Optional[AdmissionController] = None
 def get_admission_controller() -> AdmissionController:
     global _admission
     if _admission is None:
-        _admission = AdmissionController()
+        cluster_semaphore = None
+        capacity_registry = None
+        if CLUSTER_ADMISSION_ENABLED and is_redis_enabled():
+            node_id = get_node_id()
+            cluster_limit = max(1, int(os.getenv("WS_CLUSTER_MAX_CONCURRENT", str(MAX_CONCURRENT))))
+            cluster_semaphore = RedisAdmissionSemaphore(cluster_limit, node_id)
+            capacity_registry = NodeCapacityRegistry(node_id)
+            logger.info("WS cluster admission: node=%s fleet_max=%d", node_id, cluster_limit)
+        _admission = AdmissionController(cluster_semaphore=cluster_semaphore, capacity_registry=capacity_registry)
         logger.info(
-            "WS Admission Controller: max_concurrent=%d queue_size=%d queue_wait=%.1fs",
+            "WS Admission Controller: max_concurrent=%d queue_size=%d queue_wait=%.1fs max_loop_lag_ms=%.0f",
             _admission._max_concurrent, _admission._queue_size, _admission._queue_max_wait,
+            _admission._max_loop_lag_ms,
         )
     return _admission
@@ -0,0 +1,249 @@
+"""
+═══════════════════════════════════════════════════════════════════════
+  Cluster-wide WebSocket capacity — distributed semaphore + node registry.
+
+  RedisAdmissionSemaphore
+      Fleet-wide slot count in one ZSET (member = lease id, score = expiry).
+      Acquire is a single Lua call that first drops expired leases, so a
+      crashed worker's slots come back after one lease TTL. Live workers
+      renew their leases from a heartbeat; a lease that expired anyway
+      (e.g. during a Redis partition) is re-acquired under the same id as
+      soon as the fleet has room, and counted as unleased until then.
+
+  NodeCapacityRegistry
+      Each worker publishes its load (active / queued / max / loop lag)
+      under a TTL key; ``snapshot()`` lists live nodes least-loaded first,
+      for the LB or a local router to steer new sessions.
+
+  Env vars:
+    WS_CLUSTER_ADMISSION        – enable both (requires REDIS_URL, default: false)
+    WS_CLUSTER_MAX_CONCURRENT   – fleet-wide session cap (default: WS_MAX_CONCURRENT)
+    WS_LEASE_TTL_SEC            – lease expiry without heartbeat (default: 30)
+    WS_NODE_TTL_SEC             – node registry entry expiry (default: 15)
+═══════════════════════════════════════════════════════════════════════
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from typing import Optional
+
+from core.redis_pool import get_redis
+
+logger = logging.getLogger("ws_capacity")
+
+CLUSTER_ADMISSION_ENABLED = str(os.getenv("WS_CLUSTER_ADMISSION", "false")).strip().lower() in {"1", "true", "yes", "on"}
+LEASE_TTL_SEC = max(5.0, float(os.getenv("WS_LEASE_TTL_SEC", "30")))
+NODE_TTL_SEC = max(3.0, float(os.getenv("WS_NODE_TTL_SEC", "15")))
+
+_LEASES_KEY = "ws:admission:leases"
+_NODES_KEY = "ws:nodes"
+
+# KEYS[1] = leases zset; ARGV = limit, lease id, ttl ms. Server clock only.
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[1]) then
+  return 0
+end
+redis.call('ZADD', KEYS[1], now + tonumber(ARGV[3]), ARGV[2])
+return 1
+"""
+
+# KEYS[1] = leases zset; ARGV[1] = ttl ms, ARGV[2..] = lease ids to renew.
+# Returns the ids that still existed and were renewed.
+_RENEW_LUA = """
+local t = redis.call('TIME')
+local expiry = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000) + tonumber(ARGV[1])
+local renewed = {}
+for i = 2, #ARGV do
+  if redis.call('ZSCORE', KEYS[1], ARGV[i]) then
+    redis.call('ZADD', KEYS[1], 'XX', expiry, ARGV[i])
+    renewed[#renewed + 1] = ARGV[i]
+  end
+end
+return renewed
+"""
+
+
+def get_node_id() -> str:
+    base = str(os.getenv("INSTANCE_ID") or socket.gethostname() or "node").strip()
+    return f"{base}:{os.getpid()}"
+
+
+class RedisAdmissionSemaphore:
+    """Fleet-wide counting semaphore with expiring leases."""
+
+    def __init__(self, limit: int, node_id: str, lease_ttl_sec: float = LEASE_TTL_SEC, redis_client=None):
+        self.limit = max(1, int(limit))
+        self.node_id = node_id
+        self.lease_ttl_ms = int(lease_ttl_sec * 1000)
+        self._redis = redis_client
+        self._acquire_script = None
+        self._renew_script = None
+        self._leases: set[str] = set()
+        self._unleased: set[str] = set()  # live sessions whose lease expired
+        self._stats = {"acquired": 0, "denied": 0, "released": 0, "lost": 0, "reacquired": 0, "errors": 0}
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @property
+    def held(self) -> int:
+        return len(self._leases)
+
+    @property
+    def unleased(self) -> int:
+        return len(self._unleased)
+
+    def is_unleased(self, lease_id: str) -> bool:
+        return lease_id in self._unleased
+
+    async def _acquire(self, client, lease_id: str) -> bool:
+        if self._acquire_script is None:
+            self._acquire_script = client.register_script(_ACQUIRE_LUA)
+        granted = await self._acquire_script(keys=[_LEASES_KEY], args=[self.limit, lease_id, self.lease_ttl_ms])
+        return int(granted or 0) == 1
+
+    async def try_acquire(self) -> Optional[str]:
+        """Lease id on success, None when the fleet is at its cap. Raises on Redis errors."""
+        client = self._client()
+        if client is None:
+            raise RuntimeError("Redis not configured")
+        lease_id = f"{self.node_id}:{uuid.uuid4().hex[:12]}"
+        if not await self._acquire(client, lease_id):
+            self._stats["denied"] += 1
+            return None
+        self._leases.add(lease_id)
+        self._stats["acquired"] += 1
+        return lease_id
+
+    async def release(self, lease_id: str) -> None:
+        if not lease_id:
+            return
+        self._leases.discard(lease_id)
+        self._unleased.discard(lease_id)
+        self._stats["released"] += 1
+        try:
+            await self._client().zrem(_LEASES_KEY, lease_id)
+        except Exception as exc:
+            self._stats["errors"] += 1
+            logger.debug("Lease release failed (expires on its own): %s", exc)
+
+    async def heartbeat(self) -> None:
+        """Renew every lease this worker holds in one round-trip, then re-acquire lost ones."""
+        if not self._leases and not self._unleased:
+            return
+        client = self._client()
+        if client is None:
+            return
+        if self._renew_script is None:
+            self._renew_script = client.register_script(_RENEW_LUA)
+        leases = list(self._leases)
+        try:
+            if leases:
+                raw = await self._renew_script(keys=[_LEASES_KEY], args=[self.lease_ttl_ms, *leases])
+                renewed = {item.decode() if isinstance(item, bytes) else str(item) for item in raw or []}
+                for lease_id in leases:
+                    if lease_id not in renewed and lease_id in self._leases:
+                        # Expired while we were partitioned; the connection keeps running uncounted.
+                        self._leases.discard(lease_id)
+                        self._unleased.add(lease_id)
+                        self._stats["lost"] += 1
+            for lease_id in list(self._unleased):
+                if not await self._acquire(client, lease_id):
+                    break  # fleet is full; retry on the next heartbeat
+                if lease_id in self._unleased:
+                    self._unleased.discard(lease_id)
+                    self._leases.add(lease_id)
+                    self._stats["reacquired"] += 1
+                else:
+                    await client.zrem(_LEASES_KEY, lease_id)  # released while we re-acquired
+        except Exception as exc:
+            self._stats["errors"] += 1
+            logger.warning("Lease heartbeat failed: %s", exc)
+            return
+        if self._unleased:
+            logger.warning("%d WS sessions are running without a cluster lease", len(self._unleased))
+
+    async def cluster_active(self) -> int:
+        client = self._client()
+        if client is None:
+            return 0
+        return int(await client.zcount(_LEASES_KEY, int(time.time() * 1000), "+inf"))
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "limit": self.limit, "held": self.held, "unleased": self.unleased}
+
+
+class NodeCapacityRegistry:
+    """Per-node load entries with TTL, readable by routers and the LB."""
+
+    def __init__(self, node_id: str, ttl_sec: float = NODE_TTL_SEC, redis_client=None):
+        self.node_id = node_id
+        self.ttl_sec = max(1, int(ttl_sec))
+        self._redis = redis_client
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @staticmethod
+    def _node_key(node_id: str) -> str:
+        return f"ws:node:{node_id}"
+
+    async def publish(self, load: dict) -> None:
+        client = self._client()
+        if client is None:
+            return
+        entry = {**load, "node_id": self.node_id, "updated_at": time.time()}
+        pipe = client.pipeline(transaction=False)
+        pipe.set(self._node_key(self.node_id), json.dumps(entry), ex=self.ttl_sec)
+        pipe.sadd(_NODES_KEY, self.node_id)
+        await pipe.execute()
+
+    async def withdraw(self) -> None:
+        client = self._client()
+        if client is None:
+            return
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(self._node_key(self.node_id))
+        pipe.srem(_NODES_KEY, self.node_id)
+        await pipe.execute()
+
+    async def snapshot(self) -> list[dict]:
+        """Live nodes sorted by utilisation (least loaded first); prunes expired ones."""
+        client = self._client()
+        if client is None:
+            return []
+        node_ids = sorted(await client.smembers(_NODES_KEY) or [])
+        if not node_ids:
+            return []
+        raw = await client.mget([self._node_key(node_id) for node_id in node_ids])
+        nodes, stale = [], []
+        for node_id, value in zip(node_ids, raw):
+            if not value:
+                stale.append(node_id)
+                continue
+            try:
+                nodes.append(json.loads(value))
+            except Exception:
+                stale.append(node_id)
+        if stale:
+            await client.srem(_NODES_KEY, *stale)
+
+        def _utilisation(node: dict) -> float:
+            capacity = max(1.0, float(node.get("max_concurrent") or 1))
+            return (float(node.get("active") or 0) + float(node.get("queued") or 0)) / capacity
+
+        nodes.sort(key=lambda node: (bool(node.get("overloaded")), _utilisation(node)))
+        return nodes
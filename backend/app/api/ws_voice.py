@@ -9,20 +9,34 @@ from collections import defaultdict
 
 from app.services.deepgram_service import DeepgramService
 from app.services.hybrid_stt import HybridSTTCorrector, STT_MODE
+from app.services.audio_frames import decode_audio_frame, seq_gap
 from app.services.asr_metrics import get_asr_metrics, TriggerType
 from app.services.transcript_smoother import get_transcript_smoother
 from app.services.adaptive_vad import create_adaptive_vad, AdaptiveVADEngine
 from app.services.token_budget import get_token_budget_controller
 from app.services.observability_dashboard import get_observability_dashboard
+from app.services.turn_tracing import get_turn_tracer
 from app.auth import resolve_user_id_from_token_async
 from app.api.ws_voice_components import (
     CoachingEmitter,
     ConnectionLifecycleManager,
+    FrameDispatcher,
     RoomBroadcaster,
+    TokenStreamCoalescer,
     TranscriptRouter,
     TurnDecisionPipeline,
+    decode_text_frame,
+    sniff_control_frame_type,
+    text_frame_exceeds,
 )
-from app.api.ws_admission import get_admission_controller
+from app.api.ws_admission import (
+    PRIORITY_NAMES,
+    PRIORITY_NEW,
+    PRIORITY_PAID,
+    PRIORITY_RECONNECT,
+    get_admission_controller,
+)
+from app.plan_gates import get_plan_for_user, is_paid_plan
 from app.transcript.engine import TranscriptTruthEngine
 from app.transcript.models import TranscriptTurn
 from app.interview_state.engine import InterviewStateEngine
@@ -33,6 +47,7 @@ from app.context.alignment_engine import AlignmentEngine
 from app.context.jd_parser import JDParser
 from app.context.resume_parser import ResumeParser
 from app.session.room_event_bus import LocalRoomEventBus, RoomEventBus, build_room_event_bus
+from app.session.room_fanout import RoomFanout
 from app.session.engine import SessionEngine
 from app.session.registry import session_registry
 from app.session.room_state_store import LocalRoomStateStore, RoomStateStore, build_room_state_store
@@ -56,6 +71,7 @@ from app.system_metrics import (
     decrement_metric,
     increment_metric,
     observe_fanout_delay_ms,
+    observe_first_token_ms,
     observe_latency_ms,
     observe_redis_publish_latency_ms,
     observe_stream_duration,
@@ -84,6 +100,9 @@ HARD_TIMEOUT_SEC = max(10.0, float(os.getenv("WS_TURN_HARD_TIMEOUT_SEC", "24.0")
 PARTIAL_FALLBACK_SEC = max(4.0, float(os.getenv("WS_PARTIAL_FALLBACK_SEC", "6.0")))
 MIN_PARTIAL_WORDS_FOR_FALLBACK = max(6, int(os.getenv("WS_MIN_PARTIAL_WORDS", "8")))
 WS_DEEPGRAM_CONNECT_TIMEOUT_SEC = max(0.5, float(os.getenv("WS_DEEPGRAM_CONNECT_TIMEOUT_SEC", "1.5")))
+WS_STREAM_COALESCE_MS = max(0.0, float(os.getenv("WS_STREAM_COALESCE_MS", "40")))
+WS_STREAM_COALESCE_MAX_CHARS = max(1, int(os.getenv("WS_STREAM_COALESCE_MAX_CHARS", "96")))
+TURN_TRACE_IDLE_SEC = max(1.0, float(os.getenv("TURN_TRACE_IDLE_SEC", "30")))
 
 router = APIRouter()
 room_connections: dict[str, set[WebSocket]] = defaultdict(set)
@@ -92,6 +111,8 @@ room_lock = asyncio.Lock()
 INSTANCE_ID = str(os.getenv("INSTANCE_ID") or f"ws-{uuid.uuid4()}")
 _room_event_listener_task: asyncio.Task | None = None
 _room_event_listener_lock = asyncio.Lock()
+# Room state read during join_room, consumed once by the connection that joined.
+_room_join_snapshots: dict[str, dict] = {}
 
 try:
     room_state_store: RoomStateStore = build_room_state_store()
@@ -113,6 +134,44 @@ except Exception as room_event_exc:
         room_event_exc,
     )
 
+# Session context keys accepted on any inbound frame (desktop setup wizard /
+# IntelligenceTerminal). Order matters: later aliases win.
+_SESSION_CONTEXT_KEYS = (
+    "company", "position", "objective", "industry", "experience", "codingLanguage",
+    "companyResearch", "imageContext", "imageAnalysisContext", "priority_questions",
+    "priorityQuestions", "interview_procedures", "interviewProcedures", "model",
+    "model_id", "coachStyle", "coachIndustry", "mode",
+)
+_SESSION_CONTEXT_KEY_SET = frozenset(_SESSION_CONTEXT_KEYS)
+_SESSION_CONTEXT_ALIASES = {
+    "imageAnalysisContext": "_session_imageAnalysisContext",
+    "priority_questions": "_session_priorityQuestions",
+    "priorityQuestions": "_session_priorityQuestions",
+    "interview_procedures": "_session_interviewProcedures",
+    "interviewProcedures": "_session_interviewProcedures",
+    "model_id": "_session_model",
+}
+
+
+def _apply_session_context(se, payload: dict) -> None:
+    """Copy session context fields from a frame onto the session engine."""
+    present = _SESSION_CONTEXT_KEY_SET.intersection(payload)
+    if not present:
+        return
+    for ctx_key in _SESSION_CONTEXT_KEYS:
+        if ctx_key not in present:
+            continue
+        ctx_val = payload.get(ctx_key)
+        if ctx_val:
+            attr = _SESSION_CONTEXT_ALIASES.get(ctx_key, f"_session_{ctx_key}")
+            setattr(se, attr, str(ctx_val).strip())
+    if payload.get("company") or payload.get("position"):
+        logger.info("Session context updated: company=%s position=%s industry=%s",
+                    getattr(se, "_session_company", ""),
+                    getattr(se, "_session_position", ""),
+                    getattr(se, "_session_industry", ""))
+
+
 EMOTIONAL_MIN_INTERVAL_SEC = max(1.0, float(os.getenv("EMOTIONAL_EVENT_MIN_INTERVAL_SEC", "6")))
 EMOTIONAL_MAX_EVENTS_PER_QUESTION = max(1, int(os.getenv("EMOTIONAL_MAX_EVENTS_PER_QUESTION", "2")))
 
@@ -192,26 +251,45 @@ async def _register_room_connection(room_id: str, websocket: WebSocket, connecti
     if not room_id:
         return
     async with room_lock:
+        first_local_member = not room_connections.get(room_id)
         room_connections[room_id].add(websocket)
         websocket_send_locks.setdefault(websocket, asyncio.Lock())
         set_metric("ws_rooms_active", float(len(room_connections)))
+    room_fanout.attach(room_id, websocket)
+    if first_local_member:
+        try:
+            await room_event_bus.subscribe_room(room_id)
+        except Exception as exc:
+            logger.warning("Room event subscribe failed | room_id=%s err=%s", room_id, exc)
     try:
-        await room_state_store.add_connection(room_id, connection_id)
+        # Membership and the rejoin snapshot share one round-trip.
+        state = await room_state_store.join_room(room_id, connection_id)
+        _room_join_snapshots[connection_id] = _room_state_to_dict(state)
     except Exception as exc:
-        logger.warning("Room store add_connection failed | room_id=%s err=%s", room_id, exc)
+        logger.warning("Room store join_room failed | room_id=%s err=%s", room_id, exc)
 
 
 async def _unregister_room_connection(room_id: str, websocket: WebSocket, connection_id: str) -> None:
     if not room_id:
         return
+    _room_join_snapshots.pop(connection_id, None)
+    last_local_member = False
     async with room_lock:
         members = room_connections.get(room_id)
         if members:
             members.discard(websocket)
             if not members:
                 room_connections.pop(room_id, None)
+                last_local_member = True
         websocket_send_locks.pop(websocket, None)
         set_metric("ws_rooms_active", float(len(room_connections)))
+    await room_fanout.detach(websocket)
+    # Re-check after the await: a new member may have joined in the meantime.
+    if last_local_member and not room_connections.get(room_id):
+        try:
+            await room_event_bus.unsubscribe_room(room_id)
+        except Exception as exc:
+            logger.warning("Room event unsubscribe failed | room_id=%s err=%s", room_id, exc)
     try:
         await room_state_store.remove_connection(room_id, connection_id)
     except Exception as exc:
@@ -219,30 +297,36 @@ async def _unregister_room_connection(room_id: str, websocket: WebSocket, connec
 
 
 async def _send_text_with_lock(websocket: WebSocket, encoded_payload: str) -> None:
-    async with room_lock:
-        send_lock = websocket_send_locks.get(websocket)
+    # Plain dict lookup: no await between get and use, so room_lock is not needed.
+    send_lock = websocket_send_locks.get(websocket)
     if send_lock is None:
         return
     async with send_lock:
         await websocket.send_text(encoded_payload)
 
 
-async def _broadcast_room_local(room_id: str, payload: dict, exclude: WebSocket | None = None) -> None:
-    if not room_id:
+async def _fanout_send(websocket: WebSocket, encoded_payload: str) -> None:
+    if websocket.client_state != WebSocketState.CONNECTED:
         return
+    await _send_text_with_lock(websocket, encoded_payload)
 
-    async with room_lock:
-        targets = list(room_connections.get(room_id, set()))
 
-    for conn in targets:
-        if exclude is not None and conn is exclude:
-            continue
-        if conn.client_state != WebSocketState.CONNECTED:
-            continue
-        try:
-            await _send_text_with_lock(conn, json.dumps(payload))
-        except Exception:
-            continue
+async def _fanout_overflow(websocket: WebSocket) -> None:
+    # The viewer fell a full queue of answer deltas behind; it resyncs on rejoin.
+    increment_metric("ws_room_fanout_overflow_total", 1)
+    try:
+        await websocket.close(code=1013)
+    except Exception:
+        pass
+
+
+room_fanout = RoomFanout(send_fn=_fanout_send, overflow_fn=_fanout_overflow)
+
+
+async def _broadcast_room_local(room_id: str, payload: dict, exclude: WebSocket | None = None) -> None:
+    if not room_id:
+        return
+    room_fanout.broadcast(room_id, payload, exclude=exclude)
 
 
 async def _room_event_handler(room_id: str, payload: dict, source_instance: str) -> None:
@@ -314,12 +398,9 @@ async def _update_room_state(room_id: str, updates: dict) -> None:
         logger.warning("Room store update_state failed | room_id=%s err=%s", room_id, exc)
 
 
-async def _get_room_state(room_id: str) -> dict:
-    if not room_id:
-        return {}
+def _room_state_to_dict(state) -> dict:
     data = {}
-    try:
-        state = await room_state_store.get_state(room_id)
+    if state is not None:
         data = {
             "active_question": state.active_question,
             "partial_answer": state.partial_answer,
@@ -327,8 +408,6 @@ async def _get_room_state(room_id: str) -> dict:
             "assist_intensity": state.assist_intensity,
             "updated_at": state.updated_at,
         }
-    except Exception as exc:
-        logger.warning("Room store get_state failed | room_id=%s err=%s", room_id, exc)
     return {
         "active_question": str(data.get("active_question") or ""),
         "partial_answer": str(data.get("partial_answer") or ""),
@@ -338,6 +417,17 @@ async def _get_room_state(room_id: str) -> dict:
     }
 
 
+async def _get_room_state(room_id: str) -> dict:
+    if not room_id:
+        return {}
+    state = None
+    try:
+        state = await room_state_store.get_state(room_id)
+    except Exception as exc:
+        logger.warning("Room store get_state failed | room_id=%s err=%s", room_id, exc)
+    return _room_state_to_dict(state)
+
+
 def _assist_profile_for_role(role: str) -> str:
     value = str(role or "").strip().lower()
     if value in {"behavioral", "hr", "manager"}:
@@ -594,18 +684,76 @@ def _append_transcript_fragment(buffer: str, fragment: str) -> str:
     return f"{current} {next_text}".strip()
 
 
+ADMISSION_CLASSIFY_TIMEOUT_SEC = max(0.1, float(os.getenv("WS_ADMISSION_CLASSIFY_TIMEOUT_SEC", "1.0")))
+
+
+async def _admission_priority(websocket: WebSocket) -> int:
+    """Queue class for a connection that has to wait: reconnect > paid plan > new."""
+    reconnect_session_id = str(websocket.query_params.get("reconnect_session") or "").strip()
+    if reconnect_session_id:
+        try:
+            snapshot = await asyncio.wait_for(
+                get_snapshot_store().get(reconnect_session_id), timeout=ADMISSION_CLASSIFY_TIMEOUT_SEC,
+            )
+            if snapshot is not None:
+                return PRIORITY_RECONNECT
+        except Exception:
+            pass
+
+    auth_header = str(websocket.headers.get("authorization") or "").strip()
+    token = (
+        (auth_header[7:].strip() if auth_header.lower().startswith("bearer ") else "")
+        or str(websocket.query_params.get("token") or "").strip()
+        or str(websocket.query_params.get("access_token") or "").strip()
+    )
+    if token:
+        try:
+            user_id = await asyncio.wait_for(resolve_user_id_from_token_async(token), timeout=ADMISSION_CLASSIFY_TIMEOUT_SEC)
+            plan_info = await asyncio.wait_for(get_plan_for_user(user_id), timeout=ADMISSION_CLASSIFY_TIMEOUT_SEC)
+            if is_paid_plan(plan_info.get("plan")):
+                return PRIORITY_PAID
+        except Exception:
+            pass
+    return PRIORITY_NEW
+
+
 @router.websocket("/ws/voice")
 async def voice_ws(websocket: WebSocket):
     # ================= ADMISSION CONTROL =================
     admission = get_admission_controller()
-    admitted = await admission.acquire()
+    priority = PRIORITY_NEW
+
+    async def _send_queue_update(position: int, eta_sec: float | None) -> None:
+        # position 0 = waiting on the fleet-wide cap (no local queue position)
+        if websocket.client_state != WebSocketState.CONNECTED:
+            await websocket.accept()
+        await websocket.send_text(json.dumps({
+            "type": "admission_queued",
+            "position": position,
+            "eta_sec": eta_sec,
+            "priority": PRIORITY_NAMES.get(priority, "new"),
+        }))
+
+    admitted = admission.try_acquire(priority=None)
+    if not admitted:
+        # Queued: classify only now (snapshot / JWT / plan lookups), then wait with position updates.
+        priority = await _admission_priority(websocket)
+        admitted = await admission.acquire(priority=priority, on_update=_send_queue_update)
+    lease_id = ""
+    if admitted:
+        lease_id = await admission.acquire_cluster_lease(on_update=_send_queue_update)
+        if lease_id is None:
+            await admission.release()
+            admitted = False
     if not admitted:
         try:
-            await websocket.accept()
+            if websocket.client_state != WebSocketState.CONNECTED:
+                await websocket.accept()
             await websocket.send_text(json.dumps({
                 "type": "error",
                 "code": "server_busy",
                 "message": "Server is at capacity. Please retry in a few seconds.",
+                "retry_after_sec": admission.retry_after_hint(),
             }))
             await websocket.close(code=1013, reason="Server busy")
         except Exception:
@@ -615,7 +763,7 @@ async def voice_ws(websocket: WebSocket):
     try:
         await _voice_ws_inner(websocket)
     finally:
-        await admission.release()
+        await admission.release(lease_id)
 
 
 async def _voice_ws_inner(websocket: WebSocket):
@@ -641,7 +789,8 @@ async def _voice_ws_inner(websocket: WebSocket):
     # ── ACCEPT-FIRST: accept the WebSocket immediately so the client
     # sees a connected socket while we verify the token in parallel.
     # This drops perceived latency from ~6s to <200ms.
-    await websocket.accept()
+    if websocket.client_state != WebSocketState.CONNECTED:  # already accepted if it was queued
+        await websocket.accept()
     _accept_wall_ms = round((time.perf_counter() - connect_started_at) * 1000.0, 2)
 
     # ── AUTH (runs after accept, so client already has an open socket)
@@ -746,6 +895,7 @@ async def _voice_ws_inner(websocket: WebSocket):
 
     # ================= STATE =================
     last_audio_ts = time.time()
+    last_audio_seq = -1
 
     turn_closed = False
     waiting_for_next_turn = False
@@ -783,6 +933,28 @@ async def _voice_ws_inner(websocket: WebSocket):
     )
     browser_fallback_warning_sent = False
     hard_timeout_without_final_count = 0
+    # Stage timing for the turn in flight (STT final → decision → LLM → socket)
+    turn_tracer = get_turn_tracer()
+    turn_trace = None
+
+    def _trace_stt_final():
+        nonlocal turn_trace
+        # A turn that already reached processing (or went stale) gets a fresh trace.
+        if (
+            turn_trace is None
+            or turn_trace.finished
+            or turn_trace.has("turn_completion")
+            or turn_trace.has("llm_start")
+            or turn_trace.age_sec() > TURN_TRACE_IDLE_SEC
+        ):
+            turn_trace = turn_tracer.start(session_id, str(getattr(current_turn, "turn_id", "")))
+        turn_trace.mark("stt_final")
+
+    def _active_turn_trace():
+        nonlocal turn_trace
+        if turn_trace is None or turn_trace.finished:
+            turn_trace = turn_tracer.start(session_id, str(getattr(current_turn, "turn_id", "")))
+        return turn_trace
 
     # ================= ENGINES =================
     tte = dependency_provider.create_transcript_engine()
@@ -936,7 +1108,9 @@ async def _voice_ws_inner(websocket: WebSocket):
         logger.info("[HYBRID_STT] Corrector initialized (mode=%s)", STT_MODE)
 
     # ================= START INTERVIEW =================
-    room_state_before_connect = await _get_room_state(room_id) if room_id else {}
+    room_state_before_connect = _room_join_snapshots.pop(session_id, None)
+    if room_state_before_connect is None:
+        room_state_before_connect = await _get_room_state(room_id) if room_id else {}
     existing_room_question = str(room_state_before_connect.get("active_question") or "").strip()
     if room_id:
         first_question = existing_room_question or "Waiting for interviewer question."
@@ -1299,6 +1473,9 @@ async def _voice_ws_inner(websocket: WebSocket):
             await _broadcast_room(room_id, suggestion_payload, exclude=websocket)
 
         suggestion_started_at = time.perf_counter()
+        trace = _active_turn_trace()
+        trace.mark("llm_start")
+        trace_status = "ok"
         _log_event(
             "llm_call_started",
             stage="answer_suggestion",
@@ -1306,6 +1483,7 @@ async def _voice_ws_inner(websocket: WebSocket):
             model="gpt-4o-mini",
             retry_count=0,
         )
+        increment_metric("answer_streams_active", 1)
         try:
             resume_loaded = bool(getattr(se, "resume_profile", None))
             jd_loaded = bool(getattr(se, "jd_context", None))
@@ -1426,58 +1604,88 @@ async def _voice_ws_inner(websocket: WebSocket):
                 await emit_suggestion_payload(built_answer.strip(), "completed")
                 return
 
-            # Use smoothed question for LLM (cleaner input = better output)
-            async for token in stream_answer_live(
-                question=smoothed_question,  # Use cleaned question
-                user_id=session_id,
-                role=current_role,
-                resume_loaded=resume_loaded,
-                jd_loaded=jd_loaded,
-                answer_language=answer_language,
-                company=getattr(se, "_session_company", ""),
-                position=getattr(se, "_session_position", ""),
-                industry=getattr(se, "_session_industry", ""),
-                experience=getattr(se, "_session_experience", ""),
-                objective=getattr(se, "_session_objective", ""),
-                company_research=getattr(se, "_session_companyResearch", ""),
-                coach_style=getattr(se, "_session_coachStyle", ""),
-                coach_industry=getattr(se, "_session_coachIndustry", ""),
-                voice_signature=voice_signature,
-                model=getattr(se, "_session_model", ""),
-                screenshot_base64=screenshot_for_answer,
-                image_context=getattr(se, "_session_imageAnalysisContext", ""),
-            ):
-                if first_chunk_at is None:
-                    first_chunk_at = time.perf_counter()
-                    logger.info("TRUE_STREAM first token in %.0fms", (first_chunk_at - suggestion_started_at) * 1000)
-                
-                built_answer += token
+            async def emit_stream_chunk(chunk_text: str, token_total: int) -> None:
+                nonlocal chunk_index
                 chunk_payload = {
                     "type": "answer_suggestion_chunk",
                     "session_id": session_id,
                     "question": question_text,
-                    "chunk": token,
+                    "chunk": chunk_text,
                     "index": chunk_index,
                     "room_id": room_id,
                 }
                 chunk_index += 1
-                
                 if websocket.client_state == WebSocketState.CONNECTED:
+                    send_started_at = time.perf_counter()
                     await _safe_send(chunk_payload)
+                    if not trace.has("first_chunk_sent"):
+                        trace.add_span("socket_send", send_started_at)
+                        trace.mark("first_chunk_sent")
                 await _broadcast_room(room_id, chunk_payload, exclude=websocket)
+
+            stream_coalescer = TokenStreamCoalescer(
+                emit_fn=emit_stream_chunk,
+                flush_ms=WS_STREAM_COALESCE_MS,
+                max_chars=WS_STREAM_COALESCE_MAX_CHARS,
+            )
+            token_count = 0
+
+            # Use smoothed question for LLM (cleaner input = better output)
+            try:
+                async for token in stream_answer_live(
+                    question=smoothed_question,  # Use cleaned question
+                    user_id=session_id,
+                    session_id=session_id,
+                    role=current_role,
+                    resume_loaded=resume_loaded,
+                    jd_loaded=jd_loaded,
+                    answer_language=answer_language,
+                    company=getattr(se, "_session_company", ""),
+                    position=getattr(se, "_session_position", ""),
+                    industry=getattr(se, "_session_industry", ""),
+                    experience=getattr(se, "_session_experience", ""),
+                    objective=getattr(se, "_session_objective", ""),
+                    company_research=getattr(se, "_session_companyResearch", ""),
+                    coach_style=getattr(se, "_session_coachStyle", ""),
+                    coach_industry=getattr(se, "_session_coachIndustry", ""),
+                    voice_signature=voice_signature,
+                    model=getattr(se, "_session_model", ""),
+                    screenshot_base64=screenshot_for_answer,
+                    image_context=getattr(se, "_session_imageAnalysisContext", ""),
+                ):
+                    if first_chunk_at is None:
+                        first_chunk_at = time.perf_counter()
+                        logger.info("TRUE_STREAM first token in %.0fms", (first_chunk_at - suggestion_started_at) * 1000)
+                        observe_first_token_ms((first_chunk_at - suggestion_started_at) * 1000.0)
+                        trace.add_span("llm_first_token", suggestion_started_at, first_chunk_at)
+                        trace.mark("first_token")
                 
-                # Update room state periodically (every 10 chunks to reduce overhead)
-                if chunk_index % 10 == 0:
-                    await _update_room_state(
-                        room_id,
-                        {
-                            "active_question": question_text,
-                            "partial_answer": built_answer,
-                            "is_streaming": True,
-                            "assist_intensity": assist_intensity,
-                        },
-                    )
-            
+                    built_answer += token
+                    token_count += 1
+                    await stream_coalescer.add(token)
+                
+                    # Update room state periodically (every 10 tokens to reduce overhead)
+                    if token_count % 10 == 0:
+                        await _update_room_state(
+                            room_id,
+                            {
+                                "active_question": question_text,
+                                "partial_answer": built_answer,
+                                "is_streaming": True,
+                                "assist_intensity": assist_intensity,
+                            },
+                        )
+            except BaseException:
+                # Cancelled or failed mid-stream: never emit a late tail after the done frame.
+                stream_coalescer.cancel()
+                raise
+
+            await stream_coalescer.close()
+            trace.add_span("llm_stream", suggestion_started_at)
+            increment_metric("answer_stream_tokens_total", stream_coalescer.tokens)
+            increment_metric("answer_stream_frames_total", stream_coalescer.frames)
+            increment_metric("answer_stream_frames_saved_total", stream_coalescer.frames_saved)
+
             _log_event(
                 "llm_call_completed",
                 stage="answer_suggestion",
@@ -1527,6 +1735,7 @@ async def _voice_ws_inner(websocket: WebSocket):
                 logger.debug("Follow-up prediction failed (non-fatal): %s", exc)
 
         except asyncio.TimeoutError:
+            trace_status = "timeout"
             logger.warning("Answer suggestion generation timed out")
             _log_event(
                 "llm_call_timeout",
@@ -1539,9 +1748,11 @@ async def _voice_ws_inner(websocket: WebSocket):
             await emit_answer_done(question_text, fallback_text, "timeout_fallback")
             await emit_suggestion_payload(fallback_text, "timeout_fallback")
         except asyncio.CancelledError:
+            trace_status = "cancelled"
             await emit_answer_done(question_text, "", "cancelled")
             raise
         except Exception as suggestion_exc:
+            trace_status = "error"
             print(f"!!! EXCEPTION IN SUGGESTION: {repr(suggestion_exc)}")
             logger.warning("Answer suggestion generation failed: %s", suggestion_exc)
             _log_event(
@@ -1556,10 +1767,12 @@ async def _voice_ws_inner(websocket: WebSocket):
             await emit_answer_done(question_text, fallback_text, "error_fallback")
             await emit_suggestion_payload(fallback_text, "error_fallback")
         finally:
+            decrement_metric("answer_streams_active", 1)
             current_task = asyncio.current_task()
             if active_suggestion_task is current_task:
                 active_suggestion_task = None
             observe_stream_duration(time.time() - stream_started_at)
+            await turn_tracer.finish(trace, trace_status)
 
     async def start_answer_suggestion(question_text: str):
         nonlocal active_suggestion_task, active_suggestion_question_key, last_classification
@@ -1604,21 +1817,95 @@ async def _voice_ws_inner(websocket: WebSocket):
         active_suggestion_question_key = question_key
         active_suggestion_task = asyncio.create_task(emit_answer_suggestion(question_text))
 
+    # ================= INBOUND FRAME HANDLERS =================
+    # Each handler returns True to stop the receive loop. Types without a
+    # handler fall through to the transcript/question branches below.
+    async def _on_ping(payload: dict) -> bool:
+        await _safe_send({
+            "type": "pong",
+            "session_id": session_id,
+            "ts": time.time(),
+        })
+        return False
+
+    async def _on_pong(payload: dict) -> bool:
+        nonlocal last_pong_ts
+        last_pong_ts = time.time()
+        return False
+
+    async def _on_stop(payload: dict) -> bool:
+        await request_stop("stop command")
+        return True
+
+    async def _on_stop_answer_generation(payload: dict) -> bool:
+        # Cancel the active answer generation task
+        await cancel_active_suggestion(reason="user_cancelled")
+        logger.info("User cancelled answer generation")
+        return False
+
+    async def _on_audio_health(payload: dict) -> bool:
+        # Desktop sends audio level/health data — forward to overlay
+        # so the UI can show a VU meter and silence warnings
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await _safe_send(payload)
+        # Log audio warnings
+        if payload.get("type") == "audio_warning":
+            logger.warning("[AUDIO] %s (device=%s type=%s)",
+                         payload.get("message", ""),
+                         payload.get("device", "?"),
+                         payload.get("deviceType", "?"))
+        elif payload.get("status") == "silent":
+            logger.warning("[AUDIO] Silent audio stream — device=%s level=%.4f",
+                         payload.get("device", "?"),
+                         payload.get("level", 0))
+        return False
+
+    async def _on_screen_monitor(payload: dict) -> bool:
+        # Screen monitor frame: desktop sends every ~3s when screen changes
+        # Use GPT-4o vision to detect if a new question appeared
+        monitor_b64 = str(payload.get("base64") or "").strip()
+        if monitor_b64 and not screen_monitor_analyzing:
+            logger.info("screen_monitor frame received (%d KB)", len(monitor_b64) // 1024)
+            asyncio.create_task(_detect_question_from_screen(monitor_b64))
+        return False
+
+    async def _on_sync_state_request(payload: dict) -> bool:
+        state_snapshot = await _get_room_state(room_id)
+        if websocket.client_state == WebSocketState.CONNECTED:
+            await _safe_send({
+                "type": "sync_state",
+                "session_id": session_id,
+                "room_id": room_id,
+                "active_question": state_snapshot.get("active_question") or "",
+                "partial_answer": state_snapshot.get("partial_answer") or "",
+                "is_streaming": bool(state_snapshot.get("is_streaming")),
+                "assist_intensity": int(state_snapshot.get("assist_intensity") or assist_intensity),
+                "updated_at": state_snapshot.get("updated_at") or time.time(),
+            })
+        return False
+
+    # Heartbeats skip role/context extraction entirely.
+    control_frames = FrameDispatcher({
+        "ping": _on_ping,
+        "pong": _on_pong,
+    })
+    frame_handlers = FrameDispatcher({
+        "stop": _on_stop,
+        "stop_answer_generation": _on_stop_answer_generation,
+        "audio_health": _on_audio_health,
+        "audio_warning": _on_audio_health,
+        "screen_monitor": _on_screen_monitor,
+        "sync_state_request": _on_sync_state_request,
+    })
+
     # ================= AUDIO INGEST =================
     async def receive_audio():
-        nonlocal last_audio_ts, last_transcript_activity_ts, transcript_buffer, last_final_ts, last_pong_ts, browser_fallback_warning_sent, last_candidate_question_key, last_candidate_question_ts, last_interviewer_question_key, last_interviewer_question_ts, pending_partial_question, pending_partial_question_ts
+        nonlocal last_audio_ts, last_audio_seq, last_transcript_activity_ts, transcript_buffer, last_final_ts, last_pong_ts, browser_fallback_warning_sent, last_candidate_question_key, last_candidate_question_ts, last_interviewer_question_key, last_interviewer_question_ts, pending_partial_question, pending_partial_question_ts
         try:
             while not stop_event.is_set():
                 msg = await websocket.receive()
                 last_pong_ts = time.time()
 
-                _log_event(
-                    "message_received",
-                    message_type=str(msg.get("type") or "unknown"),
-                    has_text=bool(msg.get("text")),
-                    has_bytes=bool(msg.get("bytes")),
-                )
-
                 if msg["type"] == "websocket.disconnect":
                     _log_event("disconnect", reason="client_disconnect")
                     await request_stop("client disconnect")
@@ -1626,29 +1913,30 @@ async def _voice_ws_inner(websocket: WebSocket):
 
                 if msg.get("text"):
                     text_payload = str(msg.get("text") or "")
-                    if len(text_payload.encode("utf-8")) > MAX_WS_TEXT_BYTES:
-                        logger.warning("WS message too large, dropping | session_id=%s bytes=%s", session_id, len(text_payload.encode("utf-8")))
+
+                    # Fast path: heartbeat frames are sniffed without a JSON decode
+                    control_type = sniff_control_frame_type(text_payload)
+                    if control_type is not None:
+                        await control_frames.get(control_type)({"type": control_type})
+                        continue
+
+                    if text_frame_exceeds(text_payload, MAX_WS_TEXT_BYTES):
+                        logger.warning("WS message too large, dropping | session_id=%s chars=%s", session_id, len(text_payload))
                         continue
                     try:
-                        payload = json.loads(text_payload)
+                        payload = decode_text_frame(text_payload)
 
                         payload_type = str(payload.get("type") or "").strip().lower()
                         _log_event(
                             "message_received",
                             message_type=payload_type or "unknown",
-                            text_bytes=len(text_payload.encode("utf-8")),
+                            text_chars=len(text_payload),
                         )
                         if payload_type in {"candidate_transcript", "qa_transcript"}:
                             await transcript_router.route(payload)
-                        if payload_type == "ping":
-                            await _safe_send({
-                                "type": "pong",
-                                "session_id": session_id,
-                                "ts": time.time(),
-                            })
-                            continue
-                        if payload_type == "pong":
-                            last_pong_ts = time.time()
+                        control_handler = control_frames.get(payload_type)
+                        if control_handler is not None:
+                            await control_handler(payload)
                             continue
 
                         selected_role = (payload.get("role") or "").strip().lower()
@@ -1659,60 +1947,12 @@ async def _voice_ws_inner(websocket: WebSocket):
                             logger.info("Updated role context from payload: %s", se.role)
 
                         # Extract extended session context from desktop setup wizard / IntelligenceTerminal
-                        _ctx_alias_map = {
-                            "imageAnalysisContext":  "_session_imageAnalysisContext",
-                            "priority_questions":    "_session_priorityQuestions",
-                            "priorityQuestions":     "_session_priorityQuestions",
-                            "interview_procedures":  "_session_interviewProcedures",
-                            "interviewProcedures":   "_session_interviewProcedures",
-                            "model_id":              "_session_model",
-                        }
-                        for ctx_key in ("company", "position", "objective", "industry", "experience", "codingLanguage", "companyResearch", "imageContext", "imageAnalysisContext", "priority_questions", "priorityQuestions", "interview_procedures", "interviewProcedures", "model", "model_id", "coachStyle", "coachIndustry", "mode"):
-                            ctx_val = payload.get(ctx_key)
-                            if ctx_val:
-                                attr = _ctx_alias_map.get(ctx_key, f"_session_{ctx_key}")
-                                setattr(se, attr, str(ctx_val).strip())
-                        if payload.get("company") or payload.get("position"):
-                            logger.info("Session context updated: company=%s position=%s industry=%s",
-                                        getattr(se, "_session_company", ""),
-                                        getattr(se, "_session_position", ""),
-                                        getattr(se, "_session_industry", ""))
-
-                        if payload.get("type") == "stop":
-                            await request_stop("stop command")
-                            break
-
-                        if payload.get("type") == "stop_answer_generation":
-                            # Cancel the active answer generation task
-                            await cancel_active_suggestion(reason="user_cancelled")
-                            logger.info("User cancelled answer generation")
-                            continue
+                        _apply_session_context(se, payload)
 
-                        # ── Audio Health Events (forward to overlay) ──
-                        if payload.get("type") in ("audio_health", "audio_warning"):
-                            # Desktop sends audio level/health data — forward to overlay
-                            # so the UI can show a VU meter and silence warnings
-                            if websocket.client_state == WebSocketState.CONNECTED:
-                                await _safe_send(payload)
-                            # Log audio warnings
-                            if payload.get("type") == "audio_warning":
-                                logger.warning("[AUDIO] %s (device=%s type=%s)",
-                                             payload.get("message", ""),
-                                             payload.get("device", "?"),
-                                             payload.get("deviceType", "?"))
-                            elif payload.get("status") == "silent":
-                                logger.warning("[AUDIO] Silent audio stream — device=%s level=%.4f",
-                                             payload.get("device", "?"),
-                                             payload.get("level", 0))
-                            continue
-
-                        if payload.get("type") == "screen_monitor":
-                            # Screen monitor frame: desktop sends every ~3s when screen changes
-                            # Use GPT-4o vision to detect if a new question appeared
-                            monitor_b64 = str(payload.get("base64") or "").strip()
-                            if monitor_b64 and not screen_monitor_analyzing:
-                                logger.info("screen_monitor frame received (%d KB)", len(monitor_b64) // 1024)
-                                asyncio.create_task(_detect_question_from_screen(monitor_b64))
+                        frame_handler = frame_handlers.get(payload_type)
+                        if frame_handler is not None:
+                            if await frame_handler(payload):
+                                break
                             continue
 
                         if payload.get("type") == "screenshot":
@@ -1738,6 +1978,8 @@ async def _voice_ws_inner(websocket: WebSocket):
 
                             if not transcript_text:
                                 continue
+                            if transcript_is_final:
+                                _trace_stt_final()
 
                             # ── Hybrid STT: correct technical terms in text transcripts ──
                             if hybrid_stt and transcript_is_final and transcript_text:
@@ -1918,21 +2160,6 @@ async def _voice_ws_inner(websocket: WebSocket):
                                 await start_answer_suggestion(question_text)
                             continue
 
-                        if payload.get("type") == "sync_state_request":
-                            state_snapshot = await _get_room_state(room_id)
-                            if websocket.client_state == WebSocketState.CONNECTED:
-                                await _safe_send({
-                                    "type": "sync_state",
-                                    "session_id": session_id,
-                                    "room_id": room_id,
-                                    "active_question": state_snapshot.get("active_question") or "",
-                                    "partial_answer": state_snapshot.get("partial_answer") or "",
-                                    "is_streaming": bool(state_snapshot.get("is_streaming")),
-                                    "assist_intensity": int(state_snapshot.get("assist_intensity") or assist_intensity),
-                                    "updated_at": state_snapshot.get("updated_at") or time.time(),
-                                })
-                            continue
-
                         if payload.get("type") == "set_question":
                             question_text = str(payload.get("question") or "").strip()
                             if question_text:
@@ -2092,20 +2319,33 @@ async def _voice_ws_inner(websocket: WebSocket):
                         continue
 
                 if msg.get("bytes"):
+                    _log_event("message_received", message_type="bytes", has_bytes=True)
                     if QA_MODE:
                         continue
-                    if len(msg["bytes"]) < 320:
+                    # Versioned binary frames carry seq/ts/speaker; raw PCM is still accepted.
+                    # `pcm` is a memoryview over the received message — no copies below.
+                    audio_frame = decode_audio_frame(msg["bytes"])
+                    if audio_frame is None:
+                        increment_metric("audio_frames_rejected_total", 1)
+                        continue
+                    pcm = audio_frame.pcm
+                    if len(pcm) < 320:
                         continue
+                    if audio_frame.version:
+                        missing = seq_gap(last_audio_seq, audio_frame.seq)
+                        if missing:
+                            increment_metric("audio_frames_missing_total", missing)
+                        last_audio_seq = audio_frame.seq
 
                     last_audio_ts = time.time()
                     if dg:
                         try:
-                            dg.send_audio(msg["bytes"])
+                            dg.send_audio(pcm)
                         except Exception as dg_send_exc:
                             logger.warning("Deepgram send_audio failed | session_id=%s err=%s", session_id, dg_send_exc)
-                    # Feed audio to hybrid STT corrector for Whisper second-pass
+                    # Feed audio to hybrid STT corrector for Whisper second-pass (stored once in its ring)
                     if hybrid_stt:
-                        hybrid_stt.feed_audio(msg["bytes"])
+                        hybrid_stt.feed_audio(pcm)
 
                 await asyncio.sleep(0)
         except Exception:
@@ -2335,6 +2575,7 @@ async def _voice_ws_inner(websocket: WebSocket):
                         except Exception as assist_exc:
                             logger.warning("Realtime assist hint evaluation failed: %s", assist_exc)
                 else:
+                    _trace_stt_final()
                     # ── Hybrid STT: Whisper + GPT correction on final transcripts ──
                     if hybrid_stt and text:
                         try:
@@ -2635,7 +2876,8 @@ async def _voice_ws_inner(websocket: WebSocket):
         )
 
         snapshot = ise.ingest_turn(completed_turn)
-        return await are.decide(snapshot)
+        with _active_turn_trace().span("decision"):
+            return await are.decide(snapshot)
 
     decision_pipeline = TurnDecisionPipeline(compute_fn=_compute_decision)
     coaching_emitter = CoachingEmitter(send_fn=_safe_send)
@@ -2748,6 +2990,7 @@ async def _voice_ws_inner(websocket: WebSocket):
             completed.text,
             getattr(se, "jd_context", None),
             max_items=3,
+            matcher=getattr(se, "skill_matcher", None),
         )
         if missing_skills:
             prioritized_missing = alignment_engine.prioritize_missing_skills(
@@ -2966,9 +3209,14 @@ async def _voice_ws_inner(websocket: WebSocket):
                 self.text = text
 
         completed = _Completed(turn_id=current_turn.turn_id, text=final_text)
+        trace = _active_turn_trace()
+        trace.mark("turn_completion")
+        trace_status = "ok"
         try:
-            await handle_turn_completion(completed, reason=reason)
+            with trace.span("turn_completion"):
+                await handle_turn_completion(completed, reason=reason)
         except Exception as exc:
+            trace_status = "error"
             logger.exception(
                 "TURN_FINALIZE_FAILED | turn_id=%s reason=%s err=%s",
                 completed.turn_id,
@@ -2991,6 +3239,9 @@ async def _voice_ws_inner(websocket: WebSocket):
                     (time.monotonic() - finalize_started) * 1000.0,
                 )
             is_finalizing_window = False
+            # An answer stream started for this turn owns the trace and finishes it.
+            if not trace.has("llm_start"):
+                await turn_tracer.finish(trace, trace_status)
 
     # ================= SILENCE WATCHER =================
     
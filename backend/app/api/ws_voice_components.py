@@ -1,8 +1,19 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import asyncio
+import json
+import re
+import time
+from dataclasses import dataclass, field
 from typing import Awaitable, Callable
 
+try:
+    import orjson
+
+    _json_loads = orjson.loads  # orjson.JSONDecodeError subclasses json.JSONDecodeError
+except ImportError:  # pragma: no cover - optional speedup
+    _json_loads = json.loads
+
 
 RegisterFn = Callable[[str, object, str], Awaitable[None]]
 UnregisterFn = Callable[[str, object, str], Awaitable[None]]
@@ -60,3 +71,142 @@ class CoachingEmitter:
             "session_id": session_id,
             "tips": tips,
         })
+
+
+# ─── Inbound text frame decoding ─────────────────────────────
+
+CONTROL_FRAME_MAX_CHARS = 256
+_CONTROL_FRAME_RE = re.compile(r'\s*\{\s*"type"\s*:\s*"(ping|pong)"\s*[,}]')
+
+
+def text_frame_exceeds(text: str, limit_bytes: int) -> bool:
+    """True if the UTF-8 size of ``text`` exceeds ``limit_bytes``.
+
+    Each char encodes to 1-4 bytes, so the char count alone decides the
+    common cases and the frame is encoded at most once.
+    """
+    chars = len(text)
+    if chars > limit_bytes:
+        return True
+    if chars * 4 <= limit_bytes:
+        return False
+    return len(text.encode("utf-8")) > limit_bytes
+
+
+def sniff_control_frame_type(text: str) -> str | None:
+    """Return "ping"/"pong" for small heartbeat frames without a JSON parse.
+
+    Only matches when "type" is the first key and the only "type" key, so
+    the answer is identical to a full decode.
+    """
+    if len(text) > CONTROL_FRAME_MAX_CHARS:
+        return None
+    match = _CONTROL_FRAME_RE.match(text)
+    if match is None or text.count('"type"') != 1:
+        return None
+    return match.group(1)
+
+
+def decode_text_frame(text: str):
+    """Decode a JSON text frame (orjson when installed). Raises json.JSONDecodeError."""
+    return _json_loads(text)
+
+
+FrameHandler = Callable[[dict], Awaitable[bool]]
+
+
+@dataclass
+class FrameDispatcher:
+    """Message-type dispatch table. A handler returns True to stop the receive loop."""
+    handlers: dict[str, FrameHandler]
+
+    def get(self, message_type: str) -> FrameHandler | None:
+        return self.handlers.get(message_type)
+
+
+ChunkEmitFn = Callable[[str, int], Awaitable[None]]
+
+
+@dataclass
+class TokenStreamCoalescer:
+    """
+    Batches streamed LLM tokens into fewer answer chunk frames.
+
+    The first token is emitted immediately so first-token latency is
+    unchanged. After that, tokens accumulate and are flushed in order when
+    ``flush_ms`` has elapsed since the previous flush or the pending text
+    reaches ``max_chars``; a timer flushes a quiet tail so nothing waits for
+    the next token. ``emit_fn(text, token_count)`` is never run concurrently.
+    ``flush_ms <= 0`` disables batching (one frame per token).
+    """
+
+    emit_fn: ChunkEmitFn
+    flush_ms: float = 40.0
+    max_chars: int = 96
+    tokens: int = 0
+    frames: int = 0
+    _pending: list[str] = field(default_factory=list)
+    _pending_chars: int = 0
+    _last_flush: float = 0.0
+    _timer: asyncio.TimerHandle | None = None
+    _flush_task: asyncio.Task | None = None
+    _lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    @property
+    def frames_saved(self) -> int:
+        return max(0, self.tokens - self.frames)
+
+    async def add(self, token: str) -> None:
+        if not token:
+            return
+        self.tokens += 1
+        self._pending.append(token)
+        self._pending_chars += len(token)
+        if (
+            self.frames == 0
+            or self.flush_ms <= 0
+            or self._pending_chars >= self.max_chars
+            or (time.perf_counter() - self._last_flush) * 1000.0 >= self.flush_ms
+        ):
+            await self.flush()
+        elif self._timer is None:
+            delay = max(0.0, self.flush_ms / 1000.0 - (time.perf_counter() - self._last_flush))
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        if self._pending:
+            self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        async with self._lock:
+            if not self._pending:
+                return
+            text = "".join(self._pending)
+            count = len(self._pending)
+            self._pending.clear()
+            self._pending_chars = 0
+            self._last_flush = time.perf_counter()
+            self.frames += 1
+            await self.emit_fn(text, count)
+
+    async def close(self) -> None:
+        """Flush whatever is pending; call once the token stream ends."""
+        await self.flush()
+        task = self._flush_task
+        if task is not None and not task.done():
+            await task
+
+    def cancel(self) -> None:
+        """Drop pending tokens without emitting (stream was cancelled)."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        self._pending.clear()
+        self._pending_chars = 0
+        task = self._flush_task
+        if task is not None and not task.done():
+            task.cancel()
@@ -1,35 +1,35 @@
-import re
+from app.context.skill_matcher import SkillMatcher, get_context_skill_matcher, get_skill_matcher, normalize_skill
 
 
 class AlignmentEngine:
     def _skill_present(self, answer_text: str, skill: str) -> bool:
         if not answer_text or not skill:
             return False
+        return get_skill_matcher([skill]).present(answer_text, skill)
 
-        lower_text = answer_text.lower()
-        lower_skill = skill.lower().strip()
-        if not lower_skill:
-            return False
-
-        pattern = r"(?<!\w)" + re.escape(lower_skill) + r"(?!\w)"
-        return re.search(pattern, lower_text) is not None
-
-    def compute_alignment(self, answer_text: str, jd_context: dict, resume_profile: dict = None) -> int:
+    def compute_alignment(
+        self,
+        answer_text: str,
+        jd_context: dict,
+        resume_profile: dict = None,
+        matcher: SkillMatcher | None = None,
+    ) -> int:
         if not jd_context:
             return 0
 
         must_skills = jd_context.get("must_have_skills", [])
         nice_skills = jd_context.get("nice_to_have_skills", [])
 
-        lower = (answer_text or "").lower()
+        matcher = matcher or get_context_skill_matcher(jd_context, resume_profile)
+        present = matcher.find_all(answer_text or "")
         score = 0
 
         for skill in must_skills:
-            if isinstance(skill, str) and self._skill_present(lower, skill):
+            if isinstance(skill, str) and normalize_skill(skill) in present:
                 score += 10
 
         for skill in nice_skills:
-            if isinstance(skill, str) and self._skill_present(lower, skill):
+            if isinstance(skill, str) and normalize_skill(skill) in present:
                 score += 5
 
         if resume_profile:
@@ -42,7 +42,7 @@ class AlignmentEngine:
             for skill in must_skills:
                 if isinstance(skill, str):
                     skill_lower = skill.lower()
-                    if skill_lower in resume_skills and self._skill_present(lower, skill):
+                    if skill_lower in resume_skills and normalize_skill(skill) in present:
                         score += 3
 
         return min(100, score)
@@ -59,17 +59,25 @@ class AlignmentEngine:
             if isinstance(skill, str) and skill.strip()
         }
 
-    def get_missing_must_have_skills(self, answer_text: str, jd_context: dict, max_items: int = 3) -> list[str]:
+    def get_missing_must_have_skills(
+        self,
+        answer_text: str,
+        jd_context: dict,
+        max_items: int = 3,
+        matcher: SkillMatcher | None = None,
+    ) -> list[str]:
         if not jd_context:
             return []
 
         must_skills = jd_context.get("must_have_skills", []) or []
+        matcher = matcher or get_context_skill_matcher(jd_context)
+        present = matcher.find_all(answer_text or "")
         missing = []
 
         for skill in must_skills:
             if not isinstance(skill, str):
                 continue
-            if not self._skill_present(answer_text or "", skill):
+            if normalize_skill(skill) not in present:
                 missing.append(skill)
 
         if max_items and max_items > 0:
@@ -0,0 +1,114 @@
+import re
+from collections import OrderedDict
+from threading import Lock
+from typing import Iterable
+
+
+def normalize_skill(skill: str) -> str:
+    return " ".join(str(skill or "").lower().split())
+
+
+def context_skills(jd_context: dict | None, resume_profile: dict | None = None) -> list[str]:
+    """Every skill named by the JD (must/nice) and resume (primary/secondary)."""
+    jd_context = jd_context or {}
+    resume_profile = resume_profile or {}
+    raw = (
+        list(jd_context.get("must_have_skills", []) or [])
+        + list(jd_context.get("nice_to_have_skills", []) or [])
+        + list(resume_profile.get("primary_skills", []) or [])
+        + list(resume_profile.get("secondary_skills", []) or [])
+    )
+    return [skill for skill in raw if isinstance(skill, str) and skill.strip()]
+
+
+class SkillMatcher:
+    """
+    One compiled regex for a whole skill vocabulary.
+
+    ``find_all`` scans the answer once and returns every skill present with
+    its start offsets, using the same rule as the old per-skill patterns: the
+    skill is not preceded or followed by a word character. Alternatives are
+    tried longest first inside a zero-width lookahead, so the scan checks
+    every start position. A shorter skill that is a word-prefix of a longer
+    match at the same position ("react" in "react native") is implied by the
+    longer match and is added from a precomputed table. The cost per answer
+    depends on the text length, not on the number of skills.
+    """
+
+    def __init__(self, skills: Iterable[str]):
+        vocabulary = sorted({normalize_skill(skill) for skill in skills if normalize_skill(skill)}, key=len, reverse=True)
+        self.skills = frozenset(vocabulary)
+        self._pattern = None
+        if vocabulary:
+            alternatives = "|".join(
+                r"\s+".join(re.escape(part) for part in skill.split(" ")) for skill in vocabulary
+            )
+            self._pattern = re.compile(r"(?<!\w)(?=(" + alternatives + r")(?!\w))")
+
+        # Longest match at a position -> shorter skills that also match there.
+        self._implied: dict[str, tuple[str, ...]] = {}
+        for skill in vocabulary:
+            implied = tuple(
+                shorter for shorter in vocabulary
+                if len(shorter) < len(skill)
+                and skill.startswith(shorter)
+                and not (skill[len(shorter)].isalnum() or skill[len(shorter)] == "_")
+            )
+            if implied:
+                self._implied[skill] = implied
+
+        self._last: tuple[str, dict[str, list[int]]] | None = None
+
+    def find_all(self, text: str) -> dict[str, list[int]]:
+        """Normalized skill -> start offsets of each occurrence in ``text``."""
+        if not text or self._pattern is None:
+            return {}
+        last = self._last
+        if last is not None and last[0] == text:
+            return last[1]
+
+        found: dict[str, list[int]] = {}
+        for match in self._pattern.finditer(text.lower()):
+            skill = normalize_skill(match.group(1))
+            start = match.start()
+            found.setdefault(skill, []).append(start)
+            for shorter in self._implied.get(skill, ()):
+                found.setdefault(shorter, []).append(start)
+
+        # Alignment, skill graph and analytics all score the same answer in one turn.
+        self._last = (text, found)
+        return found
+
+    def present(self, text: str, skill: str) -> bool:
+        key = normalize_skill(skill)
+        if not key:
+            return False
+        if key not in self.skills:
+            return get_skill_matcher([key]).present(text, key)
+        return key in self.find_all(text)
+
+
+_MATCHER_CACHE_MAX = 256
+_matchers: "OrderedDict[tuple[str, ...], SkillMatcher]" = OrderedDict()
+_matchers_lock = Lock()
+
+
+def get_skill_matcher(skills: Iterable[str]) -> SkillMatcher:
+    """Shared compiled matcher for a skill vocabulary (LRU-cached by vocabulary)."""
+    key = tuple(sorted({normalize_skill(skill) for skill in skills if isinstance(skill, str) and normalize_skill(skill)}))
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is not None:
+            _matchers.move_to_end(key)
+            return matcher
+    matcher = SkillMatcher(key)
+    with _matchers_lock:
+        matcher = _matchers.setdefault(key, matcher)
+        _matchers.move_to_end(key)
+        while len(_matchers) > _MATCHER_CACHE_MAX:
+            _matchers.popitem(last=False)
+    return matcher
+
+
+def get_context_skill_matcher(jd_context: dict | None, resume_profile: dict | None = None) -> SkillMatcher:
+    return get_skill_matcher(context_skills(jd_context, resume_profile))
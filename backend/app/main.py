@@ -1,6 +1,6 @@
 from fastapi import FastAPI, UploadFile, File, Form, Request, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, Response, JSONResponse
+from fastapi.responses import StreamingResponse, Response, JSONResponse, PlainTextResponse
 import asyncio
 import logging
 import os
@@ -26,10 +26,15 @@ from app.state import (
     reset_user_context,
     set_assist_intensity,
     set_company_mode,
-    set_job_description,
-    set_resume_text,
+    set_job_description_async,
+    set_resume_text_async,
 )
 from app.services.openai_service import get_ai_reply, stream_ai_reply
+from app.services.turn_tracing import get_turn_tracer
+from app.ai_reasoning.scoring import get_turn_scoring_pool
+from app.services.live_prompt import get_live_prompt_builder
+from app.services.llm_hedging import get_llm_hedger
+from app.services.llm_provider_health import get_llm_provider_registry
 from app.resume.parser import parse_resume
 from app.db.chat_repo import get_chat_history, save_message_async
 from app.auth import get_user_id, get_user_id_async
@@ -42,7 +47,7 @@ from app.analytics.offer_probability_feedback_store import (
     save_offer_probability_feedback,
     get_offer_probability_feedback_summary,
 )
-from app.api.ws_voice import router as voice_ws_router
+from app.api.ws_voice import room_event_bus, room_fanout, room_state_store, router as voice_ws_router
 from app.api.credibility import router as credibility_router
 from app.api.beta_telemetry import router as beta_telemetry_router
 from app.api.auth_routes import router as auth_router, register_me_endpoint
@@ -70,8 +75,9 @@ from app.api.voice_profiler_routes import router as voice_profiler_router
 from app.db.database import init_db
 from app.company_modes import list_company_modes
 from app.scenarios import list_scenarios, list_scenario_categories, get_scenario
-from app.system_metrics import set_metric, get_metrics_snapshot
+from app.system_metrics import set_metric, get_metrics_snapshot, render_prometheus
 from core.config import QA_MODE
+from core.rate_limit import get_rate_limiter
 from app.api.ws_admission import get_admission_controller
 
 app = FastAPI(title="AtluriIn AI – Phase 2")
@@ -114,8 +120,7 @@ SHARE_TOKEN_TTL_SEC = max(60, int(os.getenv("SHARE_TOKEN_TTL_SEC", "86400")))
 RATE_LIMIT_ENABLED = str(os.getenv("RATE_LIMIT_ENABLED", "true")).strip().lower() in {"1", "true", "yes", "on"}
 RATE_LIMIT_WINDOW_SEC = max(10, int(os.getenv("RATE_LIMIT_WINDOW_SEC", "60")))
 RATE_LIMIT_MAX_REQUESTS = max(20, int(os.getenv("RATE_LIMIT_MAX_REQUESTS", "300")))
-_rate_limit_lock = asyncio.Lock()
-_rate_limit_buckets: dict[str, dict[str, float]] = {}
+_rate_limiter = get_rate_limiter("http", RATE_LIMIT_WINDOW_SEC)
 SESSION_CLEANUP_TTL_SEC = max(60, int(os.getenv("SESSION_CLEANUP_TTL_SEC", "1800")))
 SESSION_CLEANUP_INTERVAL_SEC = max(30, int(os.getenv("SESSION_CLEANUP_INTERVAL_SEC", "120")))
 _session_cleanup_task: asyncio.Task | None = None
@@ -205,40 +210,9 @@ def _request_identity(request: Request) -> str:
     return "unknown"
 
 
-async def _is_rate_limited(identity: str, now_ts: float) -> tuple[bool, int]:
-    async with _rate_limit_lock:
-        bucket = _rate_limit_buckets.get(identity)
-        if bucket is None:
-            _rate_limit_buckets[identity] = {
-                "window_start": now_ts,
-                "count": 1,
-            }
-            return False, 0
-
-        window_start = float(bucket.get("window_start") or now_ts)
-        elapsed = now_ts - window_start
-        if elapsed >= RATE_LIMIT_WINDOW_SEC:
-            bucket["window_start"] = now_ts
-            bucket["count"] = 1
-            return False, 0
-
-        count = int(bucket.get("count") or 0)
-        if count >= RATE_LIMIT_MAX_REQUESTS:
-            retry_after = max(1, int(RATE_LIMIT_WINDOW_SEC - elapsed))
-            return True, retry_after
-
-        bucket["count"] = count + 1
-
-        if len(_rate_limit_buckets) > 10000:
-            stale_keys = [
-                key
-                for key, value in _rate_limit_buckets.items()
-                if now_ts - float((value or {}).get("window_start") or now_ts) > (RATE_LIMIT_WINDOW_SEC * 2)
-            ]
-            for key in stale_keys[:3000]:
-                _rate_limit_buckets.pop(key, None)
-
-        return False, 0
+async def _is_rate_limited(identity: str) -> tuple[bool, int]:
+    result = await _rate_limiter.hit(identity, RATE_LIMIT_MAX_REQUESTS)
+    return (not result.allowed), result.retry_after_sec
 
 
 @app.middleware("http")
@@ -251,7 +225,7 @@ async def rate_limit_middleware(request: Request, call_next):
         return await call_next(request)
 
     identity = _request_identity(request)
-    blocked, retry_after = await _is_rate_limited(identity, time.time())
+    blocked, retry_after = await _is_rate_limited(identity)
     if blocked:
         return JSONResponse(
             status_code=429,
@@ -309,6 +283,10 @@ async def startup_banner():
 
     asyncio.create_task(_memory_cleanup_loop())
 
+    # Background LLM provider probes feed the router's circuit breakers
+    if not QA_MODE:
+        get_llm_provider_registry().start_probing()
+
 
 @app.on_event("shutdown")
 async def shutdown_handler():
@@ -321,6 +299,15 @@ async def shutdown_handler():
             pass
         finally:
             _session_cleanup_task = None
+    # Drop this node from the WS capacity registry before Redis goes away
+    registry = get_admission_controller().capacity_registry
+    if registry is not None:
+        try:
+            await registry.withdraw()
+        except Exception:
+            pass
+    get_turn_scoring_pool().shutdown()
+    await get_llm_provider_registry().stop_probing()
     # Close Redis pools
     try:
         from core.redis_pool import close_pools
@@ -373,7 +360,7 @@ async def upload_resume(request: Request, file: UploadFile = File(...)):
     try:
         content = await file.read()
         text = parse_resume(file.filename, content)
-        set_resume_text(user_id, text)
+        await set_resume_text_async(user_id, text)
         return {"status": "resume_loaded", "chars": len(text)}
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc))
@@ -384,7 +371,7 @@ async def upload_resume(request: Request, file: UploadFile = File(...)):
 @app.post("/api/job/set")
 async def set_job_description_route(request: Request, description: str = Form(...)):
     user_id = await get_user_id_async(request)
-    set_job_description(user_id, description)
+    await set_job_description_async(user_id, description)
     return {"status": "job_description_set"}
 
 
@@ -911,10 +898,49 @@ def system_metrics_route(request: Request):
     return get_metrics_snapshot(extra={
         "share_token_ttl_sec": SHARE_TOKEN_TTL_SEC,
         "admission": admission_stats,
+        "room_fanout": room_fanout.get_stats(),
+        "room_event_bus": room_event_bus.get_stats() if hasattr(room_event_bus, "get_stats") else {},
+        "room_state_store": room_state_store.get_stats() if hasattr(room_state_store, "get_stats") else {},
+        "turn_tracing": get_turn_tracer().get_stats(),
+        "turn_scoring": get_turn_scoring_pool().get_stats(),
+        "live_prompt_cache": get_live_prompt_builder().get_stats(),
+        "llm_hedging": get_llm_hedger().get_stats(),
+        "llm_providers": get_llm_provider_registry().get_health_report(),
         "worker_pid": os.getpid(),
     })
 
 
+@app.get("/api/system/metrics/prometheus")
+def system_metrics_prometheus_route(request: Request):
+    get_user_id(request)
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/system/capacity")
+async def system_capacity_route(request: Request):
+    # Polled by the LB / router to steer new WS sessions. Infra callers present the
+    # shared CAPACITY_REGISTRY_TOKEN; without one configured, a user JWT is required.
+    expected = str(os.getenv("CAPACITY_REGISTRY_TOKEN") or "").strip()
+    if expected:
+        if not secrets.compare_digest(str(request.headers.get("x-capacity-token") or ""), expected):
+            raise HTTPException(status_code=401, detail="Unauthorized")
+    else:
+        get_user_id(request)
+    admission = get_admission_controller()
+    registry = admission.capacity_registry
+    nodes = []
+    if registry is not None:
+        try:
+            nodes = await registry.snapshot()
+        except Exception as exc:
+            logger.warning("Capacity registry snapshot failed: %s", exc)
+    return {
+        "node": admission.load(),
+        "nodes": nodes,
+        "least_loaded": nodes[0]["node_id"] if nodes else None,
+    }
+
+
 @app.get("/api/system/pid")
 def system_pid_route(request: Request):
     # Auth-gated: used by QA/load harness to pull coarse host-level RSS/CPU for this backend process.
@@ -64,6 +64,11 @@ async def get_user_plan(request: Request) -> dict:
     Dependency that returns user plan info: {user_id, plan, credits}.
     """
     user_id = get_user_id(request)
+    return await get_plan_for_user(user_id)
+
+
+async def get_plan_for_user(user_id: str) -> dict:
+    """Plan info for an already-resolved user id (non-HTTP callers, e.g. WS admission)."""
     async with AsyncSessionLocal() as session:
         result = await session.execute(
             select(User.plan, User.credits).where(User.id == user_id)
@@ -78,6 +83,10 @@ async def get_user_plan(request: Request) -> dict:
         }
 
 
+def is_paid_plan(plan: str) -> bool:
+    return PLAN_LEVELS.get(str(plan or "free"), 0) >= PLAN_LEVELS["pro"]
+
+
 def require_plan(min_plan: str) -> Callable:
     """
     Returns a FastAPI dependency that blocks users below min_plan.
@@ -4,56 +4,32 @@ ARIA API Rate Limiting & Versioning Middleware.
 Per-user rate limiting for ARIA endpoints:
   - Standard tier: 30 req/min
   - Premium tier: 120 req/min
-  - Burst allowance: 5 extra in any 10-sec window
+  - Burst allowance: 5 extra per sliding minute
 
 API versioning via header: X-ARIA-Version (default: v2)
 """
 
-import asyncio
 import logging
-import time
-from collections import defaultdict
-from typing import Any
 
 from fastapi import Request, Response
 from starlette.middleware.base import BaseHTTPMiddleware
 
+from core.rate_limit import get_rate_limiter
+
 logger = logging.getLogger("aria.middleware")
 
 # ═══════════════════════════════════════════════════════════
-# RATE LIMITER — Token Bucket per user
+# RATE LIMITER — sliding window per user (shared across workers)
 # ═══════════════════════════════════════════════════════════
 
-class _TokenBucket:
-    """Simple token bucket rate limiter."""
-    __slots__ = ("capacity", "tokens", "refill_rate", "last_refill")
-
-    def __init__(self, capacity: int, refill_rate: float):
-        self.capacity = capacity
-        self.tokens = float(capacity)
-        self.refill_rate = refill_rate  # tokens per second
-        self.last_refill = time.monotonic()
-
-    def consume(self, n: int = 1) -> bool:
-        now = time.monotonic()
-        elapsed = now - self.last_refill
-        self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_rate)
-        self.last_refill = now
-
-        if self.tokens >= n:
-            self.tokens -= n
-            return True
-        return False
-
-    @property
-    def remaining(self) -> int:
-        now = time.monotonic()
-        elapsed = now - self.last_refill
-        return int(min(self.capacity, self.tokens + elapsed * self.refill_rate))
+class ARIARateLimiter:
+    """Per-user sliding-window rate limiter for ARIA endpoints.
 
+    Backed by ``core.rate_limit``: Redis when configured (one Lua call per
+    request, enforced across all workers), otherwise in-process.
+    """
 
-class ARIARateLimiter:
-    """Per-user token-bucket rate limiter for ARIA endpoints."""
+    WINDOW_SEC = 60
 
     def __init__(
         self,
@@ -64,31 +40,14 @@ class ARIARateLimiter:
         self.standard_rpm = standard_rpm
         self.premium_rpm = premium_rpm
         self.burst_extra = burst_extra
-        self._buckets: dict[str, _TokenBucket] = {}
-        self._lock = asyncio.Lock()
-
-    def _get_bucket(self, user_id: str, is_premium: bool = False) -> _TokenBucket:
-        if user_id not in self._buckets:
-            capacity = self.premium_rpm if is_premium else self.standard_rpm
-            capacity += self.burst_extra
-            refill_rate = capacity / 60.0  # tokens per second
-            self._buckets[user_id] = _TokenBucket(capacity, refill_rate)
-        return self._buckets[user_id]
+        self._limiter = get_rate_limiter("aria", self.WINDOW_SEC)
 
     async def check(self, user_id: str, is_premium: bool = False) -> tuple[bool, int, int]:
-        """Check and consume a token. Returns (allowed, remaining, limit)."""
-        async with self._lock:
-            bucket = self._get_bucket(user_id, is_premium)
-            allowed = bucket.consume(1)
-            limit = self.premium_rpm if is_premium else self.standard_rpm
-            return allowed, bucket.remaining, limit
-
-    def cleanup(self, max_age_sec: float = 300):
-        """Remove stale buckets."""
-        now = time.monotonic()
-        stale = [uid for uid, b in self._buckets.items() if now - b.last_refill > max_age_sec]
-        for uid in stale:
-            del self._buckets[uid]
+        """Check and consume one request. Returns (allowed, remaining, limit)."""
+        limit = self.premium_rpm if is_premium else self.standard_rpm
+        tier = "premium" if is_premium else "standard"
+        result = await self._limiter.hit(f"{tier}:{user_id}", limit + self.burst_extra)
+        return result.allowed, result.remaining, limit
 
 
 # Global instance
@@ -69,28 +69,88 @@ def resolve_model(model_id: str | None) -> ModelSpec:
     return spec
 
 
+# ─── Provider credentials / OpenAI-compatible endpoints ──────
+PROVIDER_API_KEY_ENV = {
+    PROVIDER_OPENAI: "OPENAI_API_KEY",
+    PROVIDER_ANTHROPIC: "ANTHROPIC_API_KEY",
+    PROVIDER_GEMINI: "GEMINI_API_KEY",
+    PROVIDER_XAI: "XAI_API_KEY",
+    PROVIDER_DEEPSEEK: "DEEPSEEK_API_KEY",
+    PROVIDER_MOONSHOT: "MOONSHOT_API_KEY",
+}
+
+# Providers that speak the OpenAI chat-completions streaming protocol.
+# Each base URL can be overridden with <PROVIDER>_BASE_URL.
+OPENAI_COMPATIBLE_BASE_URLS = {
+    PROVIDER_GEMINI: "https://generativelanguage.googleapis.com/v1beta/openai/",
+    PROVIDER_XAI: "https://api.x.ai/v1",
+    PROVIDER_DEEPSEEK: "https://api.deepseek.com/v1",
+    PROVIDER_MOONSHOT: "https://api.moonshot.cn/v1",
+}
+
+
+def get_provider_api_key(provider: str) -> str:
+    env_var = PROVIDER_API_KEY_ENV.get(provider)
+    return str(os.getenv(env_var) or "").strip() if env_var else ""
+
+
+def get_openai_compatible_base_url(provider: str) -> str | None:
+    """Base URL for an OpenAI-compatible provider, or None if it has none."""
+    default = OPENAI_COMPATIBLE_BASE_URLS.get(provider)
+    if default is None:
+        return None
+    return str(os.getenv(f"{provider.upper()}_BASE_URL") or default).strip()
+
+
 def is_provider_available(provider: str) -> bool:
     """Check if the API key for a given provider is set."""
-    key_map = {
-        PROVIDER_OPENAI: "OPENAI_API_KEY",
-        PROVIDER_ANTHROPIC: "ANTHROPIC_API_KEY",
-        PROVIDER_GEMINI: "GEMINI_API_KEY",
-        PROVIDER_XAI: "XAI_API_KEY",
-        PROVIDER_DEEPSEEK: "DEEPSEEK_API_KEY",
-        PROVIDER_MOONSHOT: "MOONSHOT_API_KEY",
-    }
-    env_var = key_map.get(provider)
+    env_var = PROVIDER_API_KEY_ENV.get(provider)
     if not env_var:
         return provider == PROVIDER_OLLAMA  # Ollama doesn't need a key
     return bool(os.getenv(env_var))
 
 
+# Tried in order after the requested model and DEFAULT_SPEC when their
+# providers are unconfigured or behind an open circuit.
+FALLBACK_MODEL_IDS = [
+    model_id.strip()
+    for model_id in os.getenv("LLM_FALLBACK_MODELS", "claude-4.5-haiku").split(",")
+    if model_id.strip()
+]
+
+
 def get_fallback_spec(spec: ModelSpec) -> ModelSpec:
-    """If a provider isn't available, fall back to OpenAI."""
-    if is_provider_available(spec.provider):
-        return spec
-    logger.warning(
-        "Provider %s not available (missing API key), falling back to OpenAI",
-        spec.provider,
-    )
-    return DEFAULT_SPEC
+    """
+    The requested spec if its provider is configured and its circuit is not
+    open, else the first healthy fallback (OpenAI, then LLM_FALLBACK_MODELS).
+    """
+    from app.services.llm_provider_health import get_llm_provider_registry
+
+    candidates = [spec, DEFAULT_SPEC] + [MODEL_MAP[model_id] for model_id in FALLBACK_MODEL_IDS if model_id in MODEL_MAP]
+    chosen = get_llm_provider_registry().choose(candidates)
+    if chosen is None:
+        logger.warning("No healthy LLM provider for %s, using %s", spec.provider, DEFAULT_SPEC.provider)
+        return DEFAULT_SPEC
+    if chosen is not spec:
+        logger.warning(
+            "Provider %s not available (missing API key or circuit open), falling back to %s/%s",
+            spec.provider, chosen.provider, chosen.api_model,
+        )
+    return chosen
+
+
+def get_hedge_spec(primary: ModelSpec, hedge_model_id: str | None) -> ModelSpec | None:
+    """
+    Spec for a hedged second request, or None when hedging cannot help:
+    the hedge model is unknown, its provider has no key or an open circuit,
+    it is the primary's own provider, or it is local Ollama (no first-token
+    advantage).
+    """
+    from app.services.llm_provider_health import get_llm_provider_registry
+
+    if not hedge_model_id or hedge_model_id not in MODEL_MAP:
+        return None
+    spec = resolve_model(hedge_model_id)
+    if spec.provider in (primary.provider, PROVIDER_OLLAMA) or not get_llm_provider_registry().allow_request(spec.provider):
+        return None
+    return spec
@@ -0,0 +1,244 @@
+"""
+Binary audio frame protocol + shared PCM ring buffer.
+
+Frame format (little-endian), version 1:
+
+    offset  size  field
+    0       4     magic  b"ATAF"
+    4       1     version (1)
+    5       1     flags   bit0: speaker (0 = candidate/mic, 1 = interviewer/system)
+                          bits1-3: channel index
+    6       2     header_len (bytes, >= 20; newer versions may append fields)
+    8       4     seq     (uint32, wraps)
+    12      8     ts_ms   (client capture timestamp, uint64 ms)
+    20      ...   PCM16 mono samples
+
+Frames without the magic prefix are treated as legacy raw PCM16 so older
+desktop/browser clients keep working unchanged.
+
+Decoding never copies PCM: ``AudioFrame.pcm`` is a memoryview slice of the
+received message. ``PCMRingBuffer`` stores each frame exactly once in a
+preallocated bytearray and hands out memoryview slices over it.
+``WavStream`` exposes ring segments as a WAV file object (44-byte header +
+sample views) for uploads without assembling the file in memory.
+"""
+
+import io
+import struct
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Union
+
+AUDIO_FRAME_MAGIC = b"ATAF"
+AUDIO_FRAME_VERSION = 1
+SUPPORTED_AUDIO_FRAME_VERSIONS = frozenset({1})
+
+_HEADER = struct.Struct("<4sBBHIQ")
+AUDIO_FRAME_HEADER_BYTES = _HEADER.size  # 20
+
+FLAG_SPEAKER_INTERVIEWER = 0x01
+_CHANNEL_SHIFT = 1
+_CHANNEL_MASK = 0x07
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+
+@dataclass(frozen=True)
+class AudioFrame:
+    """One decoded inbound audio frame. ``version == 0`` means legacy raw PCM."""
+    pcm: memoryview
+    seq: int = -1
+    ts_ms: int = 0
+    speaker: str = "candidate"
+    channel: int = 0
+    version: int = 0
+
+
+def decode_audio_frame(data: BytesLike) -> Optional[AudioFrame]:
+    """Parse a binary WebSocket message. Returns None for malformed framed messages."""
+    view = memoryview(data)
+    if len(view) < AUDIO_FRAME_HEADER_BYTES or view[:4] != AUDIO_FRAME_MAGIC:
+        return AudioFrame(pcm=view)
+
+    _, version, flags, header_len, seq, ts_ms = _HEADER.unpack_from(view)
+    if version not in SUPPORTED_AUDIO_FRAME_VERSIONS:
+        return None
+    if header_len < AUDIO_FRAME_HEADER_BYTES or header_len > len(view):
+        return None
+    return AudioFrame(
+        pcm=view[header_len:],
+        seq=seq,
+        ts_ms=ts_ms,
+        speaker="interviewer" if flags & FLAG_SPEAKER_INTERVIEWER else "candidate",
+        channel=(flags >> _CHANNEL_SHIFT) & _CHANNEL_MASK,
+        version=version,
+    )
+
+
+def encode_audio_frame(
+    pcm: BytesLike,
+    seq: int,
+    ts_ms: int,
+    speaker: str = "candidate",
+    channel: int = 0,
+) -> bytes:
+    """Build a version-1 frame (used by clients, load tools and tests)."""
+    flags = (FLAG_SPEAKER_INTERVIEWER if speaker == "interviewer" else 0)
+    flags |= (int(channel) & _CHANNEL_MASK) << _CHANNEL_SHIFT
+    header = _HEADER.pack(
+        AUDIO_FRAME_MAGIC,
+        AUDIO_FRAME_VERSION,
+        flags,
+        AUDIO_FRAME_HEADER_BYTES,
+        int(seq) & 0xFFFFFFFF,
+        max(0, int(ts_ms)),
+    )
+    return header + bytes(pcm)
+
+
+def seq_gap(previous_seq: int, seq: int) -> int:
+    """Number of frames missing between two uint32 sequence numbers (0 if contiguous)."""
+    if previous_seq < 0 or seq < 0:
+        return 0
+    return max(0, ((seq - previous_seq) & 0xFFFFFFFF) - 1)
+
+
+class PCMRingBuffer:
+    """
+    Fixed-capacity byte ring addressed by absolute stream position.
+
+    ``append`` copies bytes into the preallocated buffer (the only copy a
+    frame ever gets) and returns the new end position. Readers remember a
+    start position and get back at most two memoryview segments covering
+    [start, end); data older than ``capacity`` bytes is overwritten.
+    """
+
+    def __init__(self, capacity_bytes: int):
+        self.capacity = max(2, int(capacity_bytes))
+        self._buf = bytearray(self.capacity)
+        self._view = memoryview(self._buf)
+        self._written = 0  # absolute number of bytes ever appended
+
+    @property
+    def end(self) -> int:
+        return self._written
+
+    @property
+    def oldest(self) -> int:
+        return max(0, self._written - self.capacity)
+
+    def append(self, data: BytesLike) -> int:
+        src = memoryview(data)
+        size = len(src)
+        if size == 0:
+            return self._written
+        if size > self.capacity:
+            # Only the newest `capacity` bytes can survive anyway.
+            self._written += size - self.capacity
+            src = src[size - self.capacity:]
+            size = self.capacity
+
+        offset = self._written % self.capacity
+        first = min(size, self.capacity - offset)
+        self._view[offset:offset + first] = src[:first]
+        if first < size:
+            self._view[0:size - first] = src[first:]
+        self._written += size
+        return self._written
+
+    def segments(self, start: int, end: Optional[int] = None) -> List[memoryview]:
+        """Zero-copy views over [start, end), clamped to the retained window."""
+        stop = self._written if end is None else min(int(end), self._written)
+        begin = max(int(start), self.oldest)
+        if begin >= stop:
+            return []
+        head = begin % self.capacity
+        length = stop - begin
+        if head + length <= self.capacity:
+            return [self._view[head:head + length]]
+        return [self._view[head:], self._view[:length - (self.capacity - head)]]
+
+
+# ─── WAV view ─────────────────────────────────────────────
+
+WAV_HEADER_BYTES = 44
+_WAV_HEADER = struct.Struct("<4sI4s4sIHHIIHH4sI")
+
+
+def build_wav_header_template(sample_rate: int, channels: int = 1, sample_width: int = 2) -> bytes:
+    """Canonical PCM WAV header with zero sizes; patch with ``wav_header``."""
+    block_align = channels * sample_width
+    return _WAV_HEADER.pack(
+        b"RIFF", 0, b"WAVE",
+        b"fmt ", 16, 1, channels, sample_rate, sample_rate * block_align, block_align, sample_width * 8,
+        b"data", 0,
+    )
+
+
+def wav_header(template: bytes, data_bytes: int) -> bytes:
+    """Fill the RIFF and data chunk sizes into a precomputed header template."""
+    header = bytearray(template)
+    struct.pack_into("<I", header, 4, 36 + data_bytes)
+    struct.pack_into("<I", header, 40, data_bytes)
+    return bytes(header)
+
+
+class WavStream(io.RawIOBase):
+    """
+    Read-only, seekable file object over a WAV header plus PCM memoryviews.
+
+    Nothing is concatenated up front; ``readinto`` copies straight from the
+    sample views into the caller's buffer. ``is_valid`` (optional) is
+    checked on every read so a ring overrun fails the upload instead of
+    sending overwritten samples.
+    """
+
+    def __init__(self, header: bytes, segments: Sequence[memoryview], is_valid=None):
+        super().__init__()
+        self._parts = [memoryview(header)] + [memoryview(seg) for seg in segments if len(seg)]
+        self._size = sum(len(part) for part in self._parts)
+        self._pos = 0
+        self._is_valid = is_valid
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        self._pos = max(0, min(int(pos), self._size))
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        if self._is_valid is not None and not self._is_valid():
+            raise IOError("audio ring overrun: utterance samples were overwritten")
+        out = memoryview(buffer).cast("B")
+        written = 0
+        base = 0
+        for part in self._parts:
+            part_len = len(part)
+            if self._pos < base + part_len and written < len(out):
+                start = self._pos - base
+                take = min(part_len - start, len(out) - written)
+                out[written:written + take] = part[start:start + take]
+                written += take
+                self._pos += take
+            base += part_len
+            if written >= len(out):
+                break
+        return written
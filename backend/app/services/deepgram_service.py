@@ -296,6 +296,7 @@ class DeepgramService:
         self._degraded = False
         self._max_reconnect_attempts = 3
         self._reconnect_attempts = 0
+        self.dropped_frames = 0
 
     def _can_reconnect(self) -> bool:
         return self.enabled and self.active and (not self._closed) and (not self._degraded)
@@ -460,17 +461,19 @@ class DeepgramService:
         logger.info("[DG] Service started")
         logger.info("Deepgram connected (start called)")
 
-    def send_audio(self, audio_bytes: bytes):
+    def send_audio(self, audio_bytes):
+        """Forward PCM to Deepgram. Accepts bytes, bytearray or memoryview without copying."""
         if not self.enabled or not self.active or not self.connection:
             return
 
         if self.guard:
             self.guard.note_audio_activity()
 
-        if isinstance(audio_bytes, bytearray):
-            audio_bytes = bytes(audio_bytes)
-
-        self.connection.send(audio_bytes)
+        if self.connection.send(audio_bytes) is False:
+            # The SDK returns False instead of raising when its socket is gone.
+            self.dropped_frames += 1
+            if self.dropped_frames == 1 or self.dropped_frames % 500 == 0:
+                logger.warning("[DG] Audio frame dropped by SDK (dropped=%d)", self.dropped_frames)
 
     def send_keepalive(self):
         """Send a KeepAlive message to prevent Deepgram from timing out during silence."""
@@ -19,8 +19,6 @@ Config via environment:
 """
 
 import os
-import io
-import wave
 import asyncio
 import logging
 import time
@@ -29,6 +27,13 @@ from collections import deque
 
 import httpx
 
+from app.services.audio_frames import (
+    WavStream,
+    PCMRingBuffer,
+    build_wav_header_template,
+    wav_header,
+)
+
 logger = logging.getLogger("hybrid_stt")
 
 # ─── Config ────────────────────────────────────────────────────────────
@@ -37,11 +42,14 @@ STT_CORRECTION = os.getenv("STT_CORRECTION", "gpt").lower()
 WHISPER_MODEL = os.getenv("WHISPER_MODEL", "whisper-1")
 CORRECTION_MODEL = os.getenv("STT_CORRECTION_MODEL", "gpt-4o-mini")
 
-# Audio buffer: accumulate PCM frames for each utterance so Whisper can re-transcribe
-AUDIO_BUFFER_MAX_SEC = 30  # max seconds of audio to buffer per utterance
+# Audio buffer: keep the most recent PCM of each utterance so Whisper can re-transcribe
+AUDIO_BUFFER_MAX_SEC = max(1, int(os.getenv("STT_BUFFER_MAX_SEC", "30")))  # window kept per utterance
+AUDIO_BUFFER_HEADROOM_SEC = 5  # ring slack so in-flight Whisper uploads aren't overwritten
 SAMPLE_RATE = 16000
 BYTES_PER_SAMPLE = 2  # PCM16
 MAX_BUFFER_BYTES = AUDIO_BUFFER_MAX_SEC * SAMPLE_RATE * BYTES_PER_SAMPLE
+RING_BUFFER_BYTES = (AUDIO_BUFFER_MAX_SEC + AUDIO_BUFFER_HEADROOM_SEC) * SAMPLE_RATE * BYTES_PER_SAMPLE
+_WAV_HEADER_TEMPLATE = build_wav_header_template(SAMPLE_RATE, channels=1, sample_width=BYTES_PER_SAMPLE)
 
 # Technical vocabulary for GPT correction
 TECH_VOCABULARY = [
@@ -100,32 +108,58 @@ TECH_VOCABULARY = [
 
 
 class AudioUtteranceBuffer:
-    """Accumulates PCM16 audio frames for a single utterance (between is_final events)."""
+    """
+    Holds the PCM16 audio of a single utterance (between is_final events).
 
-    def __init__(self):
-        self._chunks: List[bytes] = []
-        self._total_bytes = 0
+    Frames are stored once in a preallocated PCMRingBuffer (optionally
+    shared with other readers of the same session stream); the utterance is
+    a start position over that ring. Long utterances keep their most recent
+    MAX_BUFFER_BYTES instead of dropping the tail.
+    """
 
-    def append(self, pcm_data: bytes):
-        if self._total_bytes + len(pcm_data) > MAX_BUFFER_BYTES:
-            return  # don't overflow
-        self._chunks.append(pcm_data)
-        self._total_bytes += len(pcm_data)
+    def __init__(self, ring: Optional[PCMRingBuffer] = None):
+        self._ring = ring if ring is not None else PCMRingBuffer(RING_BUFFER_BYTES)
+        self._start = self._ring.end
+        self.trimmed_bytes = 0
+
+    def append(self, pcm_data) -> None:
+        self._ring.append(pcm_data)
+
+    def _window(self) -> tuple[int, int]:
+        end = self._ring.end
+        start = max(self._start, self._ring.oldest, end - MAX_BUFFER_BYTES)
+        start -= (start - self._start) % BYTES_PER_SAMPLE  # keep sample alignment
+        start = max(start, self._ring.oldest)
+        return start, end
+
+    def segments(self) -> List[memoryview]:
+        """Zero-copy views over the retained PCM of this utterance."""
+        start, end = self._window()
+        return self._ring.segments(start, end)
+
+    def wav_stream(self) -> WavStream:
+        """WAV file object (precomputed header + sample views) for uploads; no PCM copy."""
+        start, end = self._window()
+        self.trimmed_bytes = start - self._start
+        ring = self._ring
+        return WavStream(
+            wav_header(_WAV_HEADER_TEMPLATE, end - start),
+            ring.segments(start, end),
+            is_valid=lambda: ring.oldest <= start,
+        )
 
     def to_wav_bytes(self) -> bytes:
-        """Convert accumulated PCM16 to a WAV file in memory."""
-        buf = io.BytesIO()
-        with wave.open(buf, "wb") as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(BYTES_PER_SAMPLE)
-            wf.setframerate(SAMPLE_RATE)
-            for chunk in self._chunks:
-                wf.writeframes(chunk)
-        return buf.getvalue()
+        """Materialize the WAV file (prefer wav_stream() for uploads)."""
+        return self.wav_stream().read()
 
     def clear(self):
-        self._chunks.clear()
-        self._total_bytes = 0
+        self._start = self._ring.end
+        self.trimmed_bytes = 0
+
+    @property
+    def _total_bytes(self) -> int:
+        start, end = self._window()
+        return end - start
 
     @property
     def duration_sec(self) -> float:
@@ -133,7 +167,7 @@ class AudioUtteranceBuffer:
 
     @property
     def is_empty(self) -> bool:
-        return self._total_bytes == 0
+        return self._ring.end == self._start
 
 
 class HybridSTTCorrector:
@@ -149,8 +183,8 @@ class HybridSTTCorrector:
         # corrected is the Whisper + GPT refined version
     """
 
-    def __init__(self):
-        self.audio_buffer = AudioUtteranceBuffer()
+    def __init__(self, audio_ring: Optional[PCMRingBuffer] = None):
+        self.audio_buffer = AudioUtteranceBuffer(audio_ring)
         self._openai_key = os.getenv("OPENAI_API_KEY", "")
         self._http: Optional[httpx.AsyncClient] = None
         self._correction_cache: Dict[str, str] = {}
@@ -169,8 +203,8 @@ class HybridSTTCorrector:
             self._http = httpx.AsyncClient(timeout=15.0)
         return self._http
 
-    def feed_audio(self, pcm_data: bytes):
-        """Feed raw PCM16 audio into the utterance buffer. Call on every audio frame."""
+    def feed_audio(self, pcm_data):
+        """Feed raw PCM16 audio (bytes or memoryview) into the utterance buffer. Call on every audio frame."""
         self.audio_buffer.append(pcm_data)
 
     async def correct(self, deepgram_text: str) -> Dict[str, Any]:
@@ -235,9 +269,15 @@ class HybridSTTCorrector:
             logger.warning("[HYBRID] No OPENAI_API_KEY — skipping Whisper pass")
             return None
 
-        wav_bytes = self.audio_buffer.to_wav_bytes()
-        if len(wav_bytes) < 1000:  # too short
+        wav_file = self.audio_buffer.wav_stream()
+        if wav_file.size < 1000:  # too short
             return None
+        if self.audio_buffer.trimmed_bytes:
+            logger.info(
+                "[HYBRID] Long utterance: sending last %.1fs to Whisper (%.1fs trimmed from head)",
+                self.audio_buffer.duration_sec,
+                self.audio_buffer.trimmed_bytes / (SAMPLE_RATE * BYTES_PER_SAMPLE),
+            )
 
         start = time.time()
         try:
@@ -245,7 +285,7 @@ class HybridSTTCorrector:
             resp = await client.post(
                 "https://api.openai.com/v1/audio/transcriptions",
                 headers={"Authorization": f"Bearer {self._openai_key}"},
-                files={"file": ("utterance.wav", wav_bytes, "audio/wav")},
+                files={"file": ("utterance.wav", wav_file, "audio/wav")},
                 data={
                     "model": WHISPER_MODEL,
                     "language": "en",
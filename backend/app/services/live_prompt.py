@@ -0,0 +1,241 @@
+"""
+Live Answer Prompt Cache
+
+Session-scoped assembly of the static prompt prefix used by
+``stream_answer_live``: the system prompt (instructions, language rule,
+session context, coaching style, voice personalization) and the
+resume / JD / company-research block. Those parts change only when the
+session setup or the user's context changes, so they are built once per
+session and reused; each turn appends only the interviewer's question.
+
+Entries are keyed by session id, so two sessions of one user never evict
+each other's prefix. A cached prefix is reused while both hold:
+  • the user's context version (``app.state.get_context_version``, bumped
+    by the resume/JD setters) is unchanged, and
+  • the per-session options (role, language, company, style, …) are equal.
+
+With Redis the context version is shared, so a resume/JD change made
+through any worker invalidates the prefix on the next turn; checking it
+costs one GET per turn instead of a full context fetch.
+
+Reuse keeps the prefix byte-identical across turns, which is what lets
+provider-side prompt caching match it. Nothing time- or turn-dependent may
+be added to the prefix.
+
+Env vars:
+    LIVE_PROMPT_CACHE_MAX     – cached session prefixes (default: 1024)
+    LIVE_PROMPT_CACHE_TTL_SEC – max prefix age before a context refetch (default: 300)
+
+Usage:
+    builder = get_live_prompt_builder()
+    messages = list(await builder.prefix(user_id, LivePromptOptions(role="swe"), session_id=session_id))
+    messages.append({"role": "user", "content": question})
+"""
+
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from app.state import get_context_version_async, get_user_context_async
+
+logger = logging.getLogger("live_prompt")
+
+LIVE_PROMPT_CACHE_MAX = max(1, int(os.getenv("LIVE_PROMPT_CACHE_MAX", "1024")))
+LIVE_PROMPT_CACHE_TTL_SEC = max(0.0, float(os.getenv("LIVE_PROMPT_CACHE_TTL_SEC", "300")))
+
+COACH_STYLE_MAP = {
+    "aggressive": "Be direct, assertive. Emphasize leadership and impact.",
+    "supportive": "Be warm and collaborative. Highlight teamwork.",
+    "behavioral": "Emphasize STAR format. Lead with situation/context.",
+    "technical": "Be precise and technical. Lead with architecture/implementation details.",
+    "coding": "Focus on algorithmic thinking, time/space complexity, trade-offs.",
+}
+
+
+@dataclass(frozen=True)
+class LivePromptOptions:
+    """Everything besides the user's context that shapes the prefix."""
+
+    role: Optional[str] = None
+    resume_loaded: bool = False
+    jd_loaded: bool = False
+    answer_language: str = "english"
+    company: str = ""
+    position: str = ""
+    industry: str = ""
+    experience: str = ""
+    objective: str = ""
+    company_research: str = ""
+    coach_style: str = ""
+    coach_industry: str = ""
+    voice_signature: str = ""
+
+
+def build_system_prompt(options: LivePromptOptions) -> str:
+    if options.answer_language == "detected":
+        language_instruction = (
+            "IMPORTANT: Respond in the SAME language as the question. "
+            "If the question is in Hindi, respond in Hindi. "
+            "If in Tamil, respond in Tamil. If in English, respond in English. "
+            "Match the language exactly.\n\n"
+        )
+    else:
+        language_instruction = "Respond in English only.\n\n"
+
+    system_prompt = (
+        "You are generating a live interview response draft for a candidate. "
+        "Write a high-quality, detailed spoken answer (not coaching tips).\n"
+        f"{language_instruction}"
+        "Requirements:\n"
+        "1) 200-300 words total. Be thorough and substantive.\n"
+        "2) Start with one direct sentence answering the question clearly.\n"
+        "3) Provide 3-5 detailed points with concrete examples, real metrics, specific technologies, and measurable outcomes.\n"
+        "4) For behavioral questions, use the STAR format (Situation, Task, Action, Result) with specific details.\n"
+        "5) For technical questions, explain the architecture, trade-offs, and your reasoning process.\n"
+        "6) End with a strong closing statement that ties back to the role/company.\n"
+        "7) If the question is vague or truncated, assume the most likely intent and state the assumption in the first sentence.\n"
+        "8) Keep language natural, confident, and interview-ready. Avoid generic filler. Use first person.\n\n"
+        f"Role mode: {options.role or 'general'}\n"
+        f"Resume loaded: {options.resume_loaded}\n"
+        f"Job description loaded: {options.jd_loaded}"
+    )
+
+    # Session context from the desktop setup wizard (company, position, industry, etc.)
+    session_context_parts = []
+    if options.company:
+        session_context_parts.append(f"Target Company: {options.company}")
+    if options.position:
+        session_context_parts.append(f"Target Position: {options.position}")
+    if options.industry and options.industry != "default":
+        session_context_parts.append(f"Industry: {options.industry}")
+    if options.experience and options.experience != "mid":
+        session_context_parts.append(f"Experience Level: {options.experience}")
+    if options.objective:
+        session_context_parts.append(f"Interview Objective: {options.objective[:400]}")
+    if options.coach_style and options.coach_style != "balanced":
+        style = COACH_STYLE_MAP.get(options.coach_style, options.coach_style)
+        session_context_parts.append(f"Coaching Style: {style}")
+    if options.coach_industry and options.coach_industry != "default":
+        session_context_parts.append(f"Coaching Industry Lens: {options.coach_industry}")
+
+    if session_context_parts:
+        system_prompt += "\n\n--- SESSION CONTEXT ---\n" + "\n".join(session_context_parts)
+
+    if options.voice_signature:
+        system_prompt += "\n\n--- VOICE PERSONALIZATION ---\n" + options.voice_signature
+
+    return system_prompt
+
+
+def build_context_block(context: Dict[str, Any], company_research: str = "") -> str:
+    context_block = ""
+    if context.get("resume_text"):
+        context_block += f"\nRESUME:\n{context.get('resume_text', '')[:2000]}\n"
+    if context.get("job_description"):
+        context_block += f"\nJOB DESCRIPTION:\n{context.get('job_description', '')[:2000]}\n"
+    if company_research:
+        context_block += f"\nCOMPANY RESEARCH:\n{company_research[:1500]}\n"
+    return context_block
+
+
+def build_prefix(context: Dict[str, Any], options: LivePromptOptions) -> Tuple[Dict[str, str], ...]:
+    messages = [{"role": "system", "content": build_system_prompt(options)}]
+    context_block = build_context_block(context, options.company_research)
+    if context_block:
+        messages.append({"role": "system", "content": context_block})
+    return tuple(messages)
+
+
+class _PrefixEntry:
+    __slots__ = ("version", "options", "messages", "built_at")
+
+    def __init__(self, version: int, options: LivePromptOptions, messages: Tuple[Dict[str, str], ...]):
+        self.version = version
+        self.options = options
+        self.messages = messages
+        self.built_at = time.monotonic()
+
+
+class LivePromptBuilder:
+    """LRU of per-session prompt prefixes, rebuilt on context or option changes."""
+
+    def __init__(self, max_entries: int = LIVE_PROMPT_CACHE_MAX, ttl_sec: float = LIVE_PROMPT_CACHE_TTL_SEC):
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_sec = max(0.0, float(ttl_sec))
+        self._entries: "OrderedDict[str, _PrefixEntry]" = OrderedDict()
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "context_changed": 0,
+            "options_changed": 0,
+            "expired": 0,
+            "context_fetches": 0,
+            "evictions": 0,
+        }
+
+    async def prefix(
+        self,
+        user_id: Optional[str],
+        options: LivePromptOptions,
+        session_id: Optional[str] = None,
+    ) -> Tuple[Dict[str, str], ...]:
+        """
+        Static system messages for this session (keyed by ``session_id``,
+        falling back to ``user_id``). The returned tuple and its dicts are
+        shared between turns and must not be mutated.
+        """
+        key = str(session_id or user_id or "")
+        version = await get_context_version_async(user_id) if user_id else 0
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.version != version:
+                self._stats["context_changed"] += 1
+            elif entry.options != options:
+                self._stats["options_changed"] += 1
+            elif self._ttl_sec and time.monotonic() - entry.built_at > self._ttl_sec:
+                self._stats["expired"] += 1
+            else:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return entry.messages
+
+        self._stats["misses"] += 1
+        if user_id:
+            self._stats["context_fetches"] += 1
+            context = await get_user_context_async(user_id)
+        else:
+            context = {"resume_text": "", "job_description": ""}
+
+        messages = build_prefix(context, options)
+        # ``version`` was read before the fetch: a setter racing with it leaves
+        # the entry one version behind, so the next turn rebuilds.
+        self._entries[key] = _PrefixEntry(version, options, messages)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        return messages
+
+    def invalidate(self, session_id: Optional[str]) -> None:
+        self._entries.pop(str(session_id or ""), None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+_builder: Optional[LivePromptBuilder] = None
+
+
+def get_live_prompt_builder() -> LivePromptBuilder:
+    global _builder
+    if _builder is None:
+        _builder = LivePromptBuilder()
+    return _builder
@@ -0,0 +1,189 @@
+"""
+Hedged LLM Streaming
+
+First-token race between two providers for live answers. The primary
+request starts immediately; if it has not produced a token within the
+first-token deadline, a hedge request starts on a second provider and
+whichever yields a token first is streamed to the caller. The loser is
+cancelled and its stream closed. A primary that fails before its first
+token starts the hedge at once instead of waiting for the deadline.
+
+Only time-to-first-token is raced: once a leg has emitted, the answer
+comes from that leg alone, so tokens from two providers are never mixed.
+
+Env vars:
+    LLM_HEDGE_ENABLED        – opt-in hedging in stream_answer_live (default: false)
+    LLM_HEDGE_MODEL          – desktop model ID for the hedge leg (default: gemini-2.5-flash)
+    LLM_HEDGE_FIRST_TOKEN_MS – primary first-token deadline before hedging (default: 800)
+
+Usage:
+    hedger = get_llm_hedger()
+    async for token in hedger.stream(
+        HedgeLeg("openai", lambda: stream_openai(messages)),
+        HedgeLeg("gemini", lambda: stream_gemini(messages)),
+    ):
+        yield token
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from contextlib import suppress
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger("llm_hedging")
+
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").strip().lower() in ("true", "1", "yes")
+LLM_HEDGE_MODEL = str(os.getenv("LLM_HEDGE_MODEL", "gemini-2.5-flash")).strip()
+LLM_HEDGE_FIRST_TOKEN_MS = max(0.0, float(os.getenv("LLM_HEDGE_FIRST_TOKEN_MS", "800")))
+
+
+@dataclass(frozen=True)
+class HedgeLeg:
+    """One provider request; ``open`` starts it and returns its token stream."""
+
+    provider: str
+    open: Callable[[], AsyncIterator[str]]
+
+
+class _LegState:
+    __slots__ = ("leg", "role", "stream", "first")
+
+    def __init__(self, leg: HedgeLeg, role: str):
+        self.leg = leg
+        self.role = role
+        self.stream = leg.open()
+        self.first: asyncio.Task = asyncio.ensure_future(self.stream.__anext__())
+
+    async def close(self) -> None:
+        if not self.first.done():
+            self.first.cancel()
+        with suppress(BaseException):
+            await self.first
+        aclose = getattr(self.stream, "aclose", None)
+        if aclose is not None:
+            with suppress(Exception):
+                await aclose()
+
+
+class LLMHedger:
+    """Races a hedge leg against a slow primary on time-to-first-token."""
+
+    def __init__(self, first_token_deadline_ms: float = LLM_HEDGE_FIRST_TOKEN_MS):
+        self.first_token_deadline_sec = max(0.0, float(first_token_deadline_ms)) / 1000.0
+        self._first_token_ms: Deque[float] = deque(maxlen=500)
+        self._stats = {
+            "requests": 0,
+            "hedged": 0,
+            "hedged_on_error": 0,
+            "primary_wins": 0,
+            "hedge_wins": 0,
+            "primary_errors": 0,
+            "hedge_errors": 0,
+            "all_failed": 0,
+        }
+        self._wins_by_provider: Dict[str, int] = {}
+
+    async def stream(self, primary: HedgeLeg, hedge: Optional[HedgeLeg] = None) -> AsyncIterator[str]:
+        """
+        Stream tokens from whichever leg produces a first token sooner.
+        Raises the last leg error if no leg produces a token.
+        """
+        self._stats["requests"] += 1
+        started_at = time.perf_counter()
+        legs: List[_LegState] = [_LegState(primary, "primary")]
+        winner: Optional[_LegState] = None
+        first_token: Optional[str] = None
+        last_error: Optional[BaseException] = None
+        hedge_started = False
+        try:
+            deadline = started_at + self.first_token_deadline_sec
+            while winner is None:
+                pending = [state.first for state in legs]
+                if not pending:
+                    break
+                hedge_pending = hedge is not None and not hedge_started
+                timeout = max(0.0, deadline - time.perf_counter()) if hedge_pending else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    # Primary missed the first-token deadline.
+                    self._stats["hedged"] += 1
+                    logger.info(
+                        "LLM hedge: %s silent after %.0fms, starting %s",
+                        primary.provider, self.first_token_deadline_sec * 1000, hedge.provider,
+                    )
+                    legs.append(_LegState(hedge, "hedge"))
+                    hedge_started = True
+                    continue
+
+                for state in [state for state in legs if state.first in done]:
+                    try:
+                        first_token = state.first.result()
+                    except StopAsyncIteration:
+                        # An empty answer is a valid (if useless) result.
+                        first_token = None
+                    except Exception as exc:
+                        last_error = exc
+                        self._stats[f"{state.role}_errors"] += 1
+                        logger.warning("LLM hedge: %s leg (%s) failed before first token: %s", state.role, state.leg.provider, exc)
+                        legs.remove(state)
+                        await state.close()
+                        if state.role == "primary" and hedge_pending:
+                            self._stats["hedged"] += 1
+                            self._stats["hedged_on_error"] += 1
+                            legs.append(_LegState(hedge, "hedge"))
+                            hedge_started = True
+                        continue
+                    winner = state
+                    break
+
+            if winner is None:
+                self._stats["all_failed"] += 1
+                if last_error is not None:
+                    raise last_error
+                return
+
+            for state in legs:
+                if state is not winner:
+                    await state.close()
+            legs = [winner]
+
+            self._stats[f"{winner.role}_wins"] += 1
+            self._wins_by_provider[winner.leg.provider] = self._wins_by_provider.get(winner.leg.provider, 0) + 1
+            self._first_token_ms.append((time.perf_counter() - started_at) * 1000.0)
+
+            if first_token is None:
+                return
+            yield first_token
+            async for token in winner.stream:
+                yield token
+        finally:
+            for state in legs:
+                await state.close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        requests = self._stats["requests"]
+        samples = sorted(self._first_token_ms)
+        return {
+            **self._stats,
+            "hedge_rate": round(self._stats["hedged"] / requests, 4) if requests else 0.0,
+            "hedge_win_rate": round(self._stats["hedge_wins"] / self._stats["hedged"], 4) if self._stats["hedged"] else 0.0,
+            "wins_by_provider": dict(self._wins_by_provider),
+            "first_token_deadline_ms": round(self.first_token_deadline_sec * 1000.0, 1),
+            "first_token_p50_ms": round(samples[len(samples) // 2], 1) if samples else 0.0,
+            "first_token_p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 1) if samples else 0.0,
+        }
+
+
+_hedger: Optional[LLMHedger] = None
+
+
+def get_llm_hedger() -> LLMHedger:
+    global _hedger
+    if _hedger is None:
+        _hedger = LLMHedger()
+    return _hedger
@@ -0,0 +1,365 @@
+"""
+LLM Provider Health Registry
+
+Circuit breaking and health tracking for LLM providers, shared by the
+model router and the streaming answer path. Modeled on the STT
+``ProviderHealth`` in ``stt_failover``:
+
+  CLOSED     – normal operation
+  OPEN       – provider failing; the router skips it
+  HALF_OPEN  – recovery timeout elapsed (or a probe succeeded); live
+               traffic is let through until enough successes close it
+
+Every real request reports its outcome (success latency = time to first
+token, tracked as an EWMA plus a p95 window). A background task probes
+each configured provider's model-listing endpoint, so an outage opens
+the circuit before a user request has to time out on it, and a recovered
+provider is moved to HALF_OPEN without waiting for live traffic.
+
+Env vars:
+    LLM_CB_FAILURE_THRESHOLD       – consecutive failures that open a circuit (default: 3)
+    LLM_CB_RECOVERY_SEC            – open time before half-open (default: 30)
+    LLM_CB_SUCCESS_THRESHOLD       – half-open successes that close it (default: 2)
+    LLM_LATENCY_EWMA_ALPHA         – weight of the newest latency sample (default: 0.2)
+    LLM_HEALTH_PROBE_INTERVAL_SEC  – background probe period, 0 disables (default: 15)
+    LLM_HEALTH_PROBE_TIMEOUT_SEC   – per-probe HTTP timeout (default: 3)
+
+Usage:
+    registry = get_llm_provider_registry()
+    if registry.allow_request("openai"):
+        ...
+        registry.record_success("openai", first_token_ms)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional
+
+from app.router.model_router import (
+    PROVIDER_ANTHROPIC,
+    PROVIDER_API_KEY_ENV,
+    PROVIDER_OLLAMA,
+    PROVIDER_OPENAI,
+    get_openai_compatible_base_url,
+    get_provider_api_key,
+    is_provider_available,
+)
+
+logger = logging.getLogger("llm_provider_health")
+
+LLM_CB_FAILURE_THRESHOLD = max(1, int(os.getenv("LLM_CB_FAILURE_THRESHOLD", "3")))
+LLM_CB_RECOVERY_SEC = max(0.0, float(os.getenv("LLM_CB_RECOVERY_SEC", "30")))
+LLM_CB_SUCCESS_THRESHOLD = max(1, int(os.getenv("LLM_CB_SUCCESS_THRESHOLD", "2")))
+LLM_LATENCY_EWMA_ALPHA = min(1.0, max(0.01, float(os.getenv("LLM_LATENCY_EWMA_ALPHA", "0.2"))))
+LLM_HEALTH_PROBE_INTERVAL_SEC = max(0.0, float(os.getenv("LLM_HEALTH_PROBE_INTERVAL_SEC", "15")))
+LLM_HEALTH_PROBE_TIMEOUT_SEC = max(0.1, float(os.getenv("LLM_HEALTH_PROBE_TIMEOUT_SEC", "3")))
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+
+class CircuitState(Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+@dataclass
+class LLMProviderHealth:
+    """Health status for a single LLM provider"""
+    provider: str
+    state: CircuitState = CircuitState.CLOSED
+
+    # Failure tracking
+    consecutive_failures: int = 0
+    consecutive_successes: int = 0
+    total_failures: int = 0
+    total_requests: int = 0
+
+    # Timing (monotonic clock)
+    last_failure_time: Optional[float] = None
+    last_success_time: Optional[float] = None
+    circuit_opened_at: Optional[float] = None
+    last_error: str = ""
+
+    # Latency: EWMA for routing, sliding window for p95
+    latency_ewma_ms: Optional[float] = None
+    latencies: deque = field(default_factory=lambda: deque(maxlen=100))
+
+    # Background probe
+    last_probe_at: Optional[float] = None
+    last_probe_ok: Optional[bool] = None
+    last_probe_ms: float = 0.0
+
+    # Configuration
+    failure_threshold: int = LLM_CB_FAILURE_THRESHOLD
+    recovery_timeout_sec: float = LLM_CB_RECOVERY_SEC
+    success_threshold: int = LLM_CB_SUCCESS_THRESHOLD
+    ewma_alpha: float = LLM_LATENCY_EWMA_ALPHA
+
+    @property
+    def availability(self) -> float:
+        """Current availability percentage"""
+        if self.total_requests == 0:
+            return 100.0
+        return ((self.total_requests - self.total_failures) / self.total_requests) * 100
+
+    @property
+    def p95_latency_ms(self) -> float:
+        if not self.latencies:
+            return 0.0
+        sorted_latencies = sorted(self.latencies)
+        return sorted_latencies[min(int(len(sorted_latencies) * 0.95), len(sorted_latencies) - 1)]
+
+    def record_success(self, latency_ms: float):
+        self.total_requests += 1
+        self.consecutive_failures = 0
+        self.consecutive_successes += 1
+        self.last_success_time = time.monotonic()
+        self.latencies.append(latency_ms)
+        if self.latency_ewma_ms is None:
+            self.latency_ewma_ms = latency_ms
+        else:
+            self.latency_ewma_ms += self.ewma_alpha * (latency_ms - self.latency_ewma_ms)
+
+        if self.state == CircuitState.HALF_OPEN and self.consecutive_successes >= self.success_threshold:
+            self.state = CircuitState.CLOSED
+            self.circuit_opened_at = None
+            logger.info("[LLM-HEALTH] Circuit CLOSED for %s (recovered)", self.provider)
+        elif self.state == CircuitState.OPEN:
+            # A request that was already in flight when the circuit opened.
+            self.state = CircuitState.HALF_OPEN
+
+    def record_failure(self, error: str, count_request: bool = True):
+        if count_request:
+            self.total_requests += 1
+            self.total_failures += 1
+        self.consecutive_failures += 1
+        self.consecutive_successes = 0
+        self.last_failure_time = time.monotonic()
+        self.last_error = str(error)[:200]
+
+        if self.state == CircuitState.CLOSED:
+            if self.consecutive_failures >= self.failure_threshold:
+                self._open()
+                logger.warning(
+                    "[LLM-HEALTH] Circuit OPEN for %s after %d failures: %s",
+                    self.provider, self.consecutive_failures, error,
+                )
+        elif self.state == CircuitState.HALF_OPEN:
+            self._open()
+            logger.warning("[LLM-HEALTH] Circuit reopened for %s: %s", self.provider, error)
+
+    def record_probe(self, ok: bool, latency_ms: float, error: str = ""):
+        self.last_probe_at = time.monotonic()
+        self.last_probe_ok = ok
+        self.last_probe_ms = latency_ms
+        if not ok:
+            # Probe failures open the circuit but do not count as user requests.
+            self.record_failure(f"probe: {error}", count_request=False)
+        elif self.state == CircuitState.OPEN:
+            self.state = CircuitState.HALF_OPEN
+            self.consecutive_successes = 0
+            logger.info("[LLM-HEALTH] Circuit HALF-OPEN for %s (probe succeeded)", self.provider)
+
+    def should_allow_request(self) -> bool:
+        if self.state == CircuitState.OPEN:
+            if self.circuit_opened_at is not None and time.monotonic() - self.circuit_opened_at >= self.recovery_timeout_sec:
+                self.state = CircuitState.HALF_OPEN
+                self.consecutive_successes = 0
+                logger.info("[LLM-HEALTH] Circuit HALF-OPEN for %s (testing recovery)", self.provider)
+                return True
+            return False
+        return True
+
+    def _open(self):
+        self.state = CircuitState.OPEN
+        self.circuit_opened_at = time.monotonic()
+
+
+ProbeFn = Callable[[str], Awaitable[None]]
+
+
+async def _http_probe(provider: str) -> None:
+    """Cheap authenticated GET against the provider's model list; raises on failure."""
+    import httpx
+
+    api_key = get_provider_api_key(provider)
+    headers: Dict[str, str] = {}
+    if provider == PROVIDER_OLLAMA:
+        url = f"{OLLAMA_BASE_URL.rstrip('/')}/api/tags"
+    elif provider == PROVIDER_ANTHROPIC:
+        url = "https://api.anthropic.com/v1/models"
+        headers = {"x-api-key": api_key, "anthropic-version": "2023-06-01"}
+    else:
+        base_url = OPENAI_BASE_URL if provider == PROVIDER_OPENAI else get_openai_compatible_base_url(provider)
+        if base_url is None:
+            raise RuntimeError(f"no probe endpoint for provider {provider}")
+        url = f"{base_url.rstrip('/')}/models"
+        headers = {"Authorization": f"Bearer {api_key}"}
+
+    async with httpx.AsyncClient(timeout=LLM_HEALTH_PROBE_TIMEOUT_SEC) as http_client:
+        resp = await http_client.get(url, headers=headers)
+        if resp.status_code != 200:
+            raise RuntimeError(f"HTTP {resp.status_code}")
+
+
+class LLMProviderRegistry:
+    """
+    Shared circuit breakers for LLM providers.
+
+    Usage:
+        registry = get_llm_provider_registry()
+        registry.start_probing()
+        spec = registry.choose([primary_spec, fallback_spec])
+    """
+
+    def __init__(
+        self,
+        probe_fn: Optional[ProbeFn] = None,
+        probe_interval_sec: float = LLM_HEALTH_PROBE_INTERVAL_SEC,
+        failure_threshold: int = LLM_CB_FAILURE_THRESHOLD,
+        recovery_timeout_sec: float = LLM_CB_RECOVERY_SEC,
+        success_threshold: int = LLM_CB_SUCCESS_THRESHOLD,
+    ):
+        self._probe_fn = probe_fn or _http_probe
+        self.probe_interval_sec = probe_interval_sec
+        self._failure_threshold = failure_threshold
+        self._recovery_timeout_sec = recovery_timeout_sec
+        self._success_threshold = success_threshold
+        self.health: Dict[str, LLMProviderHealth] = {}
+        self._probe_task: Optional[asyncio.Task] = None
+        self._stats = {"probes": 0, "probe_failures": 0, "skipped_open": 0}
+
+    def get(self, provider: str) -> LLMProviderHealth:
+        health = self.health.get(provider)
+        if health is None:
+            health = LLMProviderHealth(
+                provider=provider,
+                failure_threshold=self._failure_threshold,
+                recovery_timeout_sec=self._recovery_timeout_sec,
+                success_threshold=self._success_threshold,
+            )
+            self.health[provider] = health
+        return health
+
+    def allow_request(self, provider: str) -> bool:
+        """Configured and not behind an open circuit."""
+        if not is_provider_available(provider):
+            return False
+        if self.get(provider).should_allow_request():
+            return True
+        self._stats["skipped_open"] += 1
+        return False
+
+    def record_success(self, provider: str, latency_ms: float) -> None:
+        self.get(provider).record_success(latency_ms)
+
+    def record_failure(self, provider: str, error: str) -> None:
+        self.get(provider).record_failure(error)
+
+    def choose(self, candidates: Iterable[Any]) -> Optional[Any]:
+        """First candidate (anything with ``.provider``) whose provider accepts requests."""
+        for candidate in candidates:
+            if self.allow_request(candidate.provider):
+                return candidate
+        return None
+
+    # ── Background probing ───────────────────────────────────────────
+
+    def probe_targets(self) -> List[str]:
+        return [provider for provider in [*PROVIDER_API_KEY_ENV, PROVIDER_OLLAMA] if is_provider_available(provider)]
+
+    async def probe(self, provider: str) -> bool:
+        health = self.get(provider)
+        started = time.perf_counter()
+        self._stats["probes"] += 1
+        try:
+            await self._probe_fn(provider)
+        except Exception as exc:
+            self._stats["probe_failures"] += 1
+            health.record_probe(False, (time.perf_counter() - started) * 1000.0, str(exc))
+            return False
+        health.record_probe(True, (time.perf_counter() - started) * 1000.0)
+        return True
+
+    async def probe_all(self) -> Dict[str, bool]:
+        targets = self.probe_targets()
+        results = await asyncio.gather(*(self.probe(provider) for provider in targets))
+        return dict(zip(targets, results))
+
+    async def check(self, provider: str, max_age_sec: Optional[float] = None) -> bool:
+        """
+        Health verdict for ``provider`` from the latest probe if it is fresh
+        enough, probing now only when it is not. An open circuit answers
+        False immediately.
+        """
+        health = self.get(provider)
+        if not health.should_allow_request():
+            return False
+        max_age = self.probe_interval_sec * 2 if max_age_sec is None else max_age_sec
+        if health.last_probe_at is not None and time.monotonic() - health.last_probe_at <= max_age:
+            return bool(health.last_probe_ok)
+        return await self.probe(provider)
+
+    def start_probing(self) -> None:
+        if self.probe_interval_sec <= 0 or self._probe_task is not None:
+            return
+        self._probe_task = asyncio.create_task(self._probe_loop())
+
+    async def stop_probing(self) -> None:
+        task, self._probe_task = self._probe_task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as exc:
+                logger.warning("[LLM-HEALTH] probe loop error: %s", exc)
+            await asyncio.sleep(self.probe_interval_sec)
+
+    def get_health_report(self) -> Dict[str, Any]:
+        providers = {}
+        for provider, health in self.health.items():
+            providers[provider] = {
+                "state": health.state.value,
+                "availability": round(health.availability, 2),
+                "latency_ewma_ms": round(health.latency_ewma_ms, 1) if health.latency_ewma_ms is not None else None,
+                "p95_latency_ms": round(health.p95_latency_ms, 1),
+                "total_requests": health.total_requests,
+                "total_failures": health.total_failures,
+                "consecutive_failures": health.consecutive_failures,
+                "last_error": health.last_error,
+                "last_probe_ok": health.last_probe_ok,
+                "last_probe_ms": round(health.last_probe_ms, 1),
+            }
+        return {**self._stats, "probing": self._probe_task is not None, "providers": providers}
+
+    def reset_circuit(self, provider: str) -> None:
+        """Manually reset circuit breaker for a provider"""
+        health = self.get(provider)
+        health.state = CircuitState.CLOSED
+        health.consecutive_failures = 0
+        health.circuit_opened_at = None
+        logger.info("[LLM-HEALTH] Circuit manually reset for %s", provider)
+
+
+_registry: Optional[LLMProviderRegistry] = None
+
+
+def get_llm_provider_registry() -> LLMProviderRegistry:
+    global _registry
+    if _registry is None:
+        _registry = LLMProviderRegistry()
+    return _registry
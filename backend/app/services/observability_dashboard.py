@@ -14,6 +14,7 @@ Provides:
 - Semantic similarity hit rates
 - Concurrent session tracking
 - Event loop health
+- Per-stage turn latency breakdown (fed by app.services.turn_tracing)
 
 Usage:
     # Get dashboard singleton
@@ -36,54 +37,158 @@ API Integration:
 
 import logging
 import asyncio
+import heapq
+from bisect import bisect_left
+import math
 import time
-import statistics
+from array import array
 from dataclasses import dataclass, field
 from typing import Optional, Dict, List, Any
-from collections import defaultdict
+from collections import defaultdict, deque
 from datetime import datetime
 import os
 import json
 
+from app.system_metrics import LATENCY_BUCKETS_MS, quantile_from_counts
+
 logger = logging.getLogger("observability")
 
 
-@dataclass
+class _RingBuffer:
+    """
+    Fixed-capacity float ring over ``array('d')``.
+
+    Keeps a running sum and sum of squares of the values in the window so
+    mean/stdev are O(1); both are recomputed from the ring once per wrap to
+    stop float drift from the subtractions.
+    """
+
+    __slots__ = ("_data", "_capacity", "_next", "_size", "total", "total_sq")
+
+    def __init__(self, capacity: int):
+        self._capacity = max(1, int(capacity))
+        self._data = array("d", bytes(8 * self._capacity))
+        self._next = 0
+        self._size = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, value: float) -> Optional[float]:
+        """Add ``value``; returns the evicted value once the ring is full."""
+        evicted = None
+        if self._size == self._capacity:
+            evicted = self._data[self._next]
+            self.total -= evicted
+            self.total_sq -= evicted * evicted
+        else:
+            self._size += 1
+        self._data[self._next] = value
+        self.total += value
+        self.total_sq += value * value
+        self._next = (self._next + 1) % self._capacity
+        if self._next == 0:
+            window = self._data[:self._size]
+            self.total = math.fsum(window)
+            self.total_sq = math.fsum(v * v for v in window)
+        return evicted
+
+    def values(self) -> List[float]:
+        """Window contents, oldest first."""
+        if self._size < self._capacity:
+            return self._data[:self._size].tolist()
+        return (self._data[self._next:] + self._data[:self._next]).tolist()
+
+    def mean(self) -> float:
+        return self.total / self._size if self._size else 0.0
+
+
+class _WindowedHistogram:
+    """Bucket counts of the values currently inside a ring buffer window."""
+
+    __slots__ = ("counts",)
+
+    BOUNDS = LATENCY_BUCKETS_MS
+
+    def __init__(self):
+        self.counts = array("l", bytes(array("l").itemsize * (len(self.BOUNDS) + 1)))
+
+    @classmethod
+    def bucket(cls, value: float) -> int:
+        return bisect_left(cls.BOUNDS, max(0.0, value))
+
+    def percentiles(self) -> Dict[str, float]:
+        return {
+            "p50": quantile_from_counts(self.counts, self.BOUNDS, 0.50),
+            "p95": quantile_from_counts(self.counts, self.BOUNDS, 0.95),
+            "p99": quantile_from_counts(self.counts, self.BOUNDS, 0.99),
+        }
+
+
 class SessionMetrics:
-    """Metrics for a single session"""
-    session_id: str
-    start_time: float
-    end_time: Optional[float] = None
-    
-    # VAD metrics
-    vad_quality_history: List[str] = field(default_factory=list)
-    quality_changes: int = 0
-    
-    # Confidence metrics
-    confidence_samples: List[float] = field(default_factory=list)
-    
-    # Trigger metrics
-    triggers: List[Dict[str, Any]] = field(default_factory=list)
-    trigger_latencies_ms: List[float] = field(default_factory=list)
-    
-    # Token metrics
-    tokens_spent: int = 0
-    pregen_hits: int = 0
-    pregen_misses: int = 0
-    
-    # Transcript metrics
-    total_utterances: int = 0
-    total_words: int = 0
-    
-    def add_confidence(self, conf: float):
-        self.confidence_samples.append(conf)
-        if len(self.confidence_samples) > 100:
-            self.confidence_samples.pop(0)
-    
-    def add_latency(self, latency_ms: float):
-        self.trigger_latencies_ms.append(latency_ms)
-        if len(self.trigger_latencies_ms) > 50:
-            self.trigger_latencies_ms.pop(0)
+    """
+    Metrics for a single session.
+
+    Memory is fixed per session: samples live in preallocated ring buffers
+    and latency quantiles come from a bucket histogram of the latency
+    window, so nothing is re-sorted on read.
+    """
+
+    __slots__ = (
+        "session_id", "start_time", "end_time",
+        "vad_quality_history", "quality_changes",
+        "confidence_samples",
+        "triggers", "trigger_latencies_ms", "latency_histogram",
+        "tokens_spent", "pregen_hits", "pregen_misses",
+        "total_utterances", "total_words",
+    )
+
+    CONFIDENCE_WINDOW = 100
+    LATENCY_WINDOW = 50
+    TRIGGER_WINDOW = 50
+    QUALITY_WINDOW = 20
+
+    def __init__(self, session_id: str, start_time: float, end_time: Optional[float] = None):
+        self.session_id = session_id
+        self.start_time = start_time
+        self.end_time = end_time
+
+        # VAD metrics
+        self.vad_quality_history: deque = deque(maxlen=self.QUALITY_WINDOW)
+        self.quality_changes = 0
+
+        # Confidence metrics
+        self.confidence_samples = _RingBuffer(self.CONFIDENCE_WINDOW)
+
+        # Trigger metrics
+        self.triggers: deque = deque(maxlen=self.TRIGGER_WINDOW)
+        self.trigger_latencies_ms = _RingBuffer(self.LATENCY_WINDOW)
+        self.latency_histogram = _WindowedHistogram()
+
+        # Token metrics
+        self.tokens_spent = 0
+        self.pregen_hits = 0
+        self.pregen_misses = 0
+
+        # Transcript metrics
+        self.total_utterances = 0
+        self.total_words = 0
+
+    def add_confidence(self, conf: float) -> Optional[float]:
+        return self.confidence_samples.append(conf)
+
+    def add_latency(self, latency_ms: float) -> tuple[int, Optional[int]]:
+        """Record a latency; returns (bucket added, bucket evicted or None)."""
+        added = _WindowedHistogram.bucket(latency_ms)
+        self.latency_histogram.counts[added] += 1
+        evicted = self.trigger_latencies_ms.append(latency_ms)
+        removed = None
+        if evicted is not None:
+            removed = _WindowedHistogram.bucket(evicted)
+            self.latency_histogram.counts[removed] -= 1
+        return added, removed
 
 
 @dataclass
@@ -94,8 +199,8 @@ class GlobalMetrics:
     active_sessions: int = 0
     peak_concurrent_sessions: int = 0
     
-    # Error tracking
-    errors: List[Dict[str, Any]] = field(default_factory=list)
+    # Error tracking (last 100)
+    errors: deque = field(default_factory=lambda: deque(maxlen=100))
     
     # System health
     last_health_check: float = 0.0
@@ -136,15 +241,24 @@ class ObservabilityDashboard:
         self._latency_histogram: Dict[str, int] = defaultdict(int)  # "100-200ms": count
         self._trigger_type_counts: Dict[str, int] = defaultdict(int)
         self._quality_distribution: Dict[str, int] = defaultdict(int)
+
+        # Aggregates over every tracked session's sample windows, kept in step with
+        # the per-session rings so get_snapshot() never walks the samples.
+        self._window_latency_counts = _WindowedHistogram()
+        self._window_confidence_n = 0
+        self._window_confidence_sum = 0.0
+        self._window_confidence_sq = 0.0
+
+        # Turn stage -> (latency histogram, [count, sum_ms]) from turn traces
+        self._turn_stage_histograms: Dict[str, _WindowedHistogram] = {}
+        self._turn_stage_totals: Dict[str, List[float]] = {}
     
     def _get_or_create_session(self, session_id: str) -> SessionMetrics:
         """Get or create session metrics"""
         if session_id not in self._sessions:
-            # Evict oldest if at capacity
+            # Evict oldest if at capacity (dict order is creation order)
             if len(self._sessions) >= self.MAX_SESSIONS_TRACKED:
-                oldest_id = min(self._sessions.keys(),
-                              key=lambda k: self._sessions[k].start_time)
-                del self._sessions[oldest_id]
+                self._drop_session(next(iter(self._sessions)))
             
             self._sessions[session_id] = SessionMetrics(
                 session_id=session_id,
@@ -157,6 +271,34 @@ class ObservabilityDashboard:
                 self._global.active_sessions
             )
         return self._sessions[session_id]
+
+    def _drop_session(self, session_id: str):
+        """Forget a session and take its sample windows out of the aggregates."""
+        session = self._sessions.pop(session_id, None)
+        if session is None:
+            return
+        totals = self._window_latency_counts.counts
+        for index, count in enumerate(session.latency_histogram.counts):
+            if count:
+                totals[index] -= count
+        confidences = session.confidence_samples
+        self._window_confidence_n -= len(confidences)
+        self._window_confidence_sum -= confidences.total
+        self._window_confidence_sq -= confidences.total_sq
+        if self._window_confidence_n <= 0:
+            self._window_confidence_n = 0
+            self._window_confidence_sum = 0.0
+            self._window_confidence_sq = 0.0
+
+    def _window_confidence_stats(self) -> tuple[float, float]:
+        n = self._window_confidence_n
+        if n <= 0:
+            return 0.0, 0.0
+        mean = self._window_confidence_sum / n
+        if n < 2:
+            return mean, 0.0
+        variance = (self._window_confidence_sq - n * mean * mean) / (n - 1)
+        return mean, math.sqrt(max(0.0, variance))
     
     async def record_session_start(self, session_id: str):
         """Record session start"""
@@ -184,8 +326,6 @@ class ObservabilityDashboard:
             
             # Track quality
             session.vad_quality_history.append(quality)
-            if len(session.vad_quality_history) > 20:
-                session.vad_quality_history.pop(0)
             
             self._quality_distribution[quality] += 1
             
@@ -194,7 +334,14 @@ class ObservabilityDashboard:
             
             # Track confidence
             if confidence > 0:
-                session.add_confidence(confidence)
+                evicted = session.add_confidence(confidence)
+                self._window_confidence_sum += confidence
+                self._window_confidence_sq += confidence * confidence
+                if evicted is None:
+                    self._window_confidence_n += 1
+                else:
+                    self._window_confidence_sum -= evicted
+                    self._window_confidence_sq -= evicted * evicted
                 bucket = f"{int(confidence * 10) / 10:.1f}-{int(confidence * 10) / 10 + 0.1:.1f}"
                 self._confidence_histogram[bucket] += 1
     
@@ -221,10 +368,11 @@ class ObservabilityDashboard:
                 "text_preview": text_preview[:50],
             }
             session.triggers.append(trigger)
-            if len(session.triggers) > 50:
-                session.triggers.pop(0)
             
-            session.add_latency(latency_ms)
+            added, removed = session.add_latency(latency_ms)
+            self._window_latency_counts.counts[added] += 1
+            if removed is not None:
+                self._window_latency_counts.counts[removed] -= 1
             
             # Global tracking
             self._global.total_triggers += 1
@@ -281,9 +429,6 @@ class ObservabilityDashboard:
                 "type": error_type,
                 "message": error_msg[:200],
             })
-            # Keep last 100 errors
-            if len(self._global.errors) > 100:
-                self._global.errors.pop(0)
     
     async def record_utterance(self, session_id: str, word_count: int):
         """Record utterance metrics"""
@@ -292,6 +437,33 @@ class ObservabilityDashboard:
             session.total_utterances += 1
             session.total_words += word_count
     
+    async def record_turn_breakdown(self, breakdown: Dict[str, float]):
+        """Record one turn's per-stage latencies (ms), as produced by TurnTrace.breakdown()"""
+        async with self._lock:
+            for stage, latency_ms in breakdown.items():
+                histogram = self._turn_stage_histograms.get(stage)
+                if histogram is None:
+                    histogram = self._turn_stage_histograms[stage] = _WindowedHistogram()
+                    self._turn_stage_totals[stage] = [0, 0.0]
+                histogram.counts[_WindowedHistogram.bucket(latency_ms)] += 1
+                totals = self._turn_stage_totals[stage]
+                totals[0] += 1
+                totals[1] += latency_ms
+
+    def _turn_latency_breakdown(self) -> Dict[str, Dict[str, float]]:
+        breakdown = {}
+        for stage, histogram in sorted(self._turn_stage_histograms.items()):
+            count, total_ms = self._turn_stage_totals[stage]
+            percentiles = histogram.percentiles()
+            breakdown[stage] = {
+                "count": count,
+                "avg_ms": round(total_ms / count, 1) if count else 0,
+                "p50_ms": round(percentiles["p50"], 1),
+                "p95_ms": round(percentiles["p95"], 1),
+                "p99_ms": round(percentiles["p99"], 1),
+            }
+        return breakdown
+
     async def _check_event_loop_health(self):
         """Check event loop lag"""
         while True:
@@ -319,20 +491,6 @@ class ObservabilityDashboard:
         if self._health_task is None or self._health_task.done():
             self._health_task = asyncio.create_task(self._check_event_loop_health())
     
-    def _calculate_percentiles(self, values: List[float]) -> Dict[str, float]:
-        """Calculate p50, p95, p99 percentiles"""
-        if not values:
-            return {"p50": 0, "p95": 0, "p99": 0}
-        
-        sorted_vals = sorted(values)
-        n = len(sorted_vals)
-        
-        return {
-            "p50": sorted_vals[int(n * 0.50)] if n > 0 else 0,
-            "p95": sorted_vals[int(n * 0.95)] if n >= 20 else sorted_vals[-1],
-            "p99": sorted_vals[int(n * 0.99)] if n >= 100 else sorted_vals[-1],
-        }
-    
     async def get_snapshot(self) -> Dict[str, Any]:
         """
         Get complete dashboard snapshot.
@@ -343,22 +501,18 @@ class ObservabilityDashboard:
             now = time.time()
             uptime_sec = now - self._start_time
             
-            # Aggregate latencies from all sessions
-            all_latencies = []
-            for session in self._sessions.values():
-                all_latencies.extend(session.trigger_latencies_ms)
-            
-            # Aggregate confidences
-            all_confidences = []
-            for session in self._sessions.values():
-                all_confidences.extend(session.confidence_samples)
+            # Window aggregates are maintained incrementally on record
+            latency_counts = self._window_latency_counts.counts
+            latency_samples = sum(latency_counts)
+            latency_sum = math.fsum(s.trigger_latencies_ms.total for s in self._sessions.values())
+            confidence_avg, confidence_std = self._window_confidence_stats()
             
             # Pregen hit rate
             total_pregen = self._global.total_pregen_hits + self._global.total_pregen_misses
             pregen_hit_rate = self._global.total_pregen_hits / total_pregen if total_pregen > 0 else 0
             
             # Recent errors (last 10)
-            recent_errors = self._global.errors[-10:] if self._global.errors else []
+            recent_errors = list(self._global.errors)[-10:]
             
             return {
                 "timestamp": datetime.now().isoformat(),
@@ -380,8 +534,8 @@ class ObservabilityDashboard:
                 # Confidence analysis
                 "confidence": {
                     "histogram": dict(sorted(self._confidence_histogram.items())),
-                    "avg": round(statistics.mean(all_confidences), 3) if all_confidences else 0,
-                    "std": round(statistics.stdev(all_confidences), 3) if len(all_confidences) > 1 else 0,
+                    "avg": round(confidence_avg, 3),
+                    "std": round(confidence_std, 3),
                 },
                 
                 # Trigger analysis
@@ -390,11 +544,14 @@ class ObservabilityDashboard:
                     "by_type": dict(self._trigger_type_counts),
                     "latency": {
                         "histogram": dict(self._latency_histogram),
-                        "percentiles": self._calculate_percentiles(all_latencies),
-                        "avg_ms": round(statistics.mean(all_latencies), 1) if all_latencies else 0,
+                        "percentiles": self._window_latency_counts.percentiles(),
+                        "avg_ms": round(latency_sum / latency_samples, 1) if latency_samples else 0,
                     },
                 },
                 
+                # Where time goes inside a turn (STT final → decision → LLM → socket)
+                "turn_latency": self._turn_latency_breakdown(),
+                
                 # Pre-generation metrics
                 "pregen": {
                     "total_attempts": total_pregen,
@@ -433,15 +590,15 @@ class ObservabilityDashboard:
     def _get_active_session_summaries(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get summaries of most active sessions"""
         # Sort by number of triggers (most active first)
-        active = [
-            s for s in self._sessions.values()
-            if s.end_time is None
-        ]
-        active.sort(key=lambda s: len(s.triggers), reverse=True)
+        active = heapq.nlargest(
+            limit,
+            (s for s in self._sessions.values() if s.end_time is None),
+            key=lambda s: len(s.triggers),
+        )
         
         summaries = []
-        for session in active[:limit]:
-            latency_percentiles = self._calculate_percentiles(session.trigger_latencies_ms)
+        for session in active:
+            latency_percentiles = session.latency_histogram.percentiles()
             summaries.append({
                 "session_id": session.session_id,
                 "duration_sec": round(time.time() - session.start_time, 1),
@@ -449,9 +606,7 @@ class ObservabilityDashboard:
                 "triggers": len(session.triggers),
                 "quality_changes": session.quality_changes,
                 "current_quality": session.vad_quality_history[-1] if session.vad_quality_history else "unknown",
-                "avg_confidence": round(
-                    statistics.mean(session.confidence_samples), 3
-                ) if session.confidence_samples else 0,
+                "avg_confidence": round(session.confidence_samples.mean(), 3),
                 "latency_p95_ms": round(latency_percentiles["p95"], 1),
                 "tokens_spent": session.tokens_spent,
                 "pregen_hit_rate": round(
@@ -473,14 +628,12 @@ class ObservabilityDashboard:
                 "start_time": session.start_time,
                 "end_time": session.end_time,
                 "duration_sec": (session.end_time or time.time()) - session.start_time,
-                "vad_quality_history": session.vad_quality_history,
+                "vad_quality_history": list(session.vad_quality_history),
                 "quality_changes": session.quality_changes,
-                "confidence_samples": session.confidence_samples[-20:],  # Last 20
-                "avg_confidence": round(
-                    statistics.mean(session.confidence_samples), 3
-                ) if session.confidence_samples else 0,
-                "triggers": session.triggers[-20:],  # Last 20
-                "latency_percentiles": self._calculate_percentiles(session.trigger_latencies_ms),
+                "confidence_samples": session.confidence_samples.values()[-20:],  # Last 20
+                "avg_confidence": round(session.confidence_samples.mean(), 3),
+                "triggers": list(session.triggers)[-20:],  # Last 20
+                "latency_percentiles": session.latency_histogram.percentiles(),
                 "tokens_spent": session.tokens_spent,
                 "pregen_hits": session.pregen_hits,
                 "pregen_misses": session.pregen_misses,
@@ -500,7 +653,7 @@ class ObservabilityDashboard:
                    (not session.end_time and now - session.start_time > max_age * 2)
             ]
             for sid in stale:
-                del self._sessions[sid]
+                self._drop_session(sid)
             
             if stale:
                 logger.info("OBS cleanup | removed=%d stale sessions", len(stale))
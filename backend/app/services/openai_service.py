@@ -142,10 +142,17 @@
 import asyncio
 import logging
 import os
+import time
+from contextlib import suppress
+import httpx
+import openai
 from openai import AsyncOpenAI
 import re
 from app.prompts import SYSTEM_PROMPT
-from app.state import get_user_context
+from app.state import get_user_context_async
+from app.services.live_prompt import LivePromptOptions, get_live_prompt_builder
+from app.services.llm_hedging import LLM_HEDGE_ENABLED, LLM_HEDGE_MODEL, HedgeLeg, get_llm_hedger
+from app.services.llm_provider_health import get_llm_provider_registry
 from app.company_modes import get_company_mode_prompt
 from app.verification.engine import verify_answer
 from app.router.engine import classify_task, select_model
@@ -268,7 +275,7 @@ async def _create_response_with_retry(messages: list[dict], model: str, timeout_
 
 
 async def get_ai_reply(user_message: str, user_id: str | None = None, company_mode: str | None = None) -> str:
-    context = await asyncio.to_thread(get_user_context, user_id) if user_id else {"resume_text": "", "job_description": ""}
+    context = await get_user_context_async(user_id) if user_id else {"resume_text": "", "job_description": ""}
     context_block = f"""
 RESUME:
 {context.get('resume_text','')}
@@ -318,7 +325,7 @@ JOB DESCRIPTION:
 # ================= STREAMING CHAT =================
 
 async def stream_ai_reply(user_message: str, user_id: str | None = None, company_mode: str | None = None):
-    context = await asyncio.to_thread(get_user_context, user_id) if user_id else {"resume_text": "", "job_description": ""}
+    context = await get_user_context_async(user_id) if user_id else {"resume_text": "", "job_description": ""}
 
     context_block = f"""
 RESUME:
@@ -354,18 +361,13 @@ JOB DESCRIPTION:
 # ================= TRUE STREAMING FOR LIVE INTERVIEW =================
 
 # Ollama fallback configuration  
-OLLAMA_BASE_URL = "http://localhost:11434"
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
 OLLAMA_MODEL = "mistral"  # or "llama3" - use local model when OpenAI unavailable
 
 async def _check_ollama_available() -> bool:
-    """Check if Ollama is running locally."""
-    import httpx
-    try:
-        async with httpx.AsyncClient(timeout=2.0) as http_client:
-            resp = await http_client.get(f"{OLLAMA_BASE_URL}/api/tags")
-            return resp.status_code == 200
-    except:
-        return False
+    """Check if Ollama is running locally (cached background probe, open circuit short-circuits)."""
+    from app.router.model_router import PROVIDER_OLLAMA
+    return await get_llm_provider_registry().check(PROVIDER_OLLAMA)
 
 async def _stream_ollama_fallback(messages: list[dict], model: str = OLLAMA_MODEL):
     """Stream from local Ollama when OpenAI is unavailable."""
@@ -460,6 +462,110 @@ async def _stream_anthropic_fallback(messages: list[dict], model: str):
     for token in re.findall(r"\S+\s*", final_text):
         yield token
 
+_compat_clients: dict[str, AsyncOpenAI] = {}
+
+
+def _get_compat_client(provider: str) -> AsyncOpenAI:
+    """Shared client for an OpenAI-compatible provider (Gemini, xAI, DeepSeek, Moonshot)."""
+    from app.router.model_router import get_openai_compatible_base_url, get_provider_api_key
+    api_client = _compat_clients.get(provider)
+    if api_client is None:
+        base_url = get_openai_compatible_base_url(provider)
+        if base_url is None:
+            raise RuntimeError(f"provider {provider} has no OpenAI-compatible endpoint")
+        api_client = AsyncOpenAI(api_key=get_provider_api_key(provider), base_url=base_url)
+        _compat_clients[provider] = api_client
+    return api_client
+
+
+async def _stream_chat_completion(api_client: AsyncOpenAI, model: str, messages: list[dict], max_tokens: int):
+    response = await api_client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=0.7,
+        max_tokens=max_tokens,
+        stream=True,
+    )
+    try:
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    finally:
+        # A cancelled hedge loser must release its HTTP connection.
+        with suppress(Exception):
+            await response.close()
+
+
+# Errors that say the provider itself is unhealthy. Anything else (bad
+# request, auth, content policy) is a problem with this request and must not
+# push the provider's circuit towards open.
+_TRANSIENT_LLM_ERRORS: tuple = (
+    asyncio.TimeoutError,
+    TimeoutError,
+    ConnectionError,
+    httpx.TransportError,
+    openai.APIConnectionError,
+)
+try:
+    import anthropic  # type: ignore
+    _TRANSIENT_LLM_ERRORS += (anthropic.APIConnectionError,)
+except ImportError:
+    pass
+
+
+def _is_transient_llm_error(exc: BaseException) -> bool:
+    """Transport, timeout, 5xx and 429 errors count against provider health."""
+    if isinstance(exc, _TRANSIENT_LLM_ERRORS):
+        return True
+    status = getattr(exc, "status_code", None)
+    return isinstance(status, int) and (status == 429 or status >= 500)
+
+
+async def _stream_provider(
+    provider: str,
+    model: str,
+    messages: list[dict],
+    max_tokens: int,
+    failed_providers: set[str] | None = None,
+):
+    """
+    Token stream from one provider, raising on failure (no built-in fallback).
+    Time to first token and transient failures are reported to the provider
+    health registry; a cancelled stream (hedge loser) reports nothing. Pass the
+    same ``failed_providers`` set across the retries of one answer so each
+    provider is charged at most one failure per answer.
+    """
+    from app.router.model_router import PROVIDER_OPENAI, PROVIDER_ANTHROPIC
+    if provider == PROVIDER_OPENAI:
+        tokens = _stream_chat_completion(client, model, messages, max_tokens)
+    elif provider == PROVIDER_ANTHROPIC:
+        tokens = _stream_anthropic_fallback(messages, model)
+    else:
+        tokens = _stream_chat_completion(_get_compat_client(provider), model, messages, max_tokens)
+
+    registry = get_llm_provider_registry()
+    started_at = time.perf_counter()
+    first_token = True
+    try:
+        async for token in tokens:
+            if first_token:
+                first_token = False
+                registry.record_success(provider, (time.perf_counter() - started_at) * 1000.0)
+            yield token
+    except Exception as exc:
+        if first_token and _is_transient_llm_error(exc):
+            if failed_providers is None:
+                registry.record_failure(provider, str(exc))
+            elif provider not in failed_providers:
+                failed_providers.add(provider)
+                registry.record_failure(provider, str(exc))
+        raise
+    finally:
+        await tokens.aclose()
+    if first_token:
+        registry.record_success(provider, (time.perf_counter() - started_at) * 1000.0)
+
+
 async def stream_answer_live(
     question: str,
     user_id: str | None = None,
@@ -479,6 +585,7 @@ async def stream_answer_live(
     model: str = "",
     screenshot_base64: str = "",
     image_context: str = "",
+    session_id: str | None = None,
 ):
     """
     TRUE streaming answer generation - yields tokens as OpenAI generates them.
@@ -519,82 +626,24 @@ async def stream_answer_live(
             await asyncio.sleep(0.01)
         return
 
-    context = await asyncio.to_thread(get_user_context, user_id) if user_id else {"resume_text": "", "job_description": ""}
-    
-    # Build language instruction based on preference
-    language_instruction = ""
-    if answer_language == "detected":
-        language_instruction = (
-            "IMPORTANT: Respond in the SAME language as the question. "
-            "If the question is in Hindi, respond in Hindi. "
-            "If in Tamil, respond in Tamil. If in English, respond in English. "
-            "Match the language exactly.\n\n"
-        )
-    else:
-        language_instruction = "Respond in English only.\n\n"
-    
-    system_prompt = (
-        "You are generating a live interview response draft for a candidate. "
-        "Write a high-quality, detailed spoken answer (not coaching tips).\n"
-        f"{language_instruction}"
-        "Requirements:\n"
-        "1) 200-300 words total. Be thorough and substantive.\n"
-        "2) Start with one direct sentence answering the question clearly.\n"
-        "3) Provide 3-5 detailed points with concrete examples, real metrics, specific technologies, and measurable outcomes.\n"
-        "4) For behavioral questions, use the STAR format (Situation, Task, Action, Result) with specific details.\n"
-        "5) For technical questions, explain the architecture, trade-offs, and your reasoning process.\n"
-        "6) End with a strong closing statement that ties back to the role/company.\n"
-        "7) If the question is vague or truncated, assume the most likely intent and state the assumption in the first sentence.\n"
-        "8) Keep language natural, confident, and interview-ready. Avoid generic filler. Use first person.\n\n"
-        f"Role mode: {role or 'general'}\n"
-        f"Resume loaded: {resume_loaded}\n"
-        f"Job description loaded: {jd_loaded}"
+    # Static prefix (system prompt + resume/JD block) is cached per session and
+    # stays byte-identical across turns; only the question is appended here.
+    options = LivePromptOptions(
+        role=role,
+        resume_loaded=resume_loaded,
+        jd_loaded=jd_loaded,
+        answer_language=answer_language,
+        company=company,
+        position=position,
+        industry=industry,
+        experience=experience,
+        objective=objective,
+        company_research=company_research,
+        coach_style=coach_style,
+        coach_industry=coach_industry,
+        voice_signature=voice_signature,
     )
-    
-    # Inject session context from desktop setup wizard (company, position, industry, etc.)
-    session_context_parts = []
-    if company:
-        session_context_parts.append(f"Target Company: {company}")
-    if position:
-        session_context_parts.append(f"Target Position: {position}")
-    if industry and industry != "default":
-        session_context_parts.append(f"Industry: {industry}")
-    if experience and experience != "mid":
-        session_context_parts.append(f"Experience Level: {experience}")
-    if objective:
-        session_context_parts.append(f"Interview Objective: {objective[:400]}")
-    if coach_style and coach_style != "balanced":
-        style_map = {
-            "aggressive": "Be direct, assertive. Emphasize leadership and impact.",
-            "supportive": "Be warm and collaborative. Highlight teamwork.",
-            "behavioral": "Emphasize STAR format. Lead with situation/context.",
-            "technical": "Be precise and technical. Lead with architecture/implementation details.",
-            "coding": "Focus on algorithmic thinking, time/space complexity, trade-offs.",
-        }
-        session_context_parts.append(f"Coaching Style: {style_map.get(coach_style, coach_style)}")
-    if coach_industry and coach_industry != "default":
-        session_context_parts.append(f"Coaching Industry Lens: {coach_industry}")
-    
-    if session_context_parts:
-        system_prompt += "\n\n--- SESSION CONTEXT ---\n" + "\n".join(session_context_parts)
-    
-    # Voice personalization injection
-    if voice_signature:
-        system_prompt += "\n\n--- VOICE PERSONALIZATION ---\n" + voice_signature
-    
-    context_block = ""
-    if context.get('resume_text'):
-        context_block += f"\nRESUME:\n{context.get('resume_text','')[:2000]}\n"
-    if context.get('job_description'):
-        context_block += f"\nJOB DESCRIPTION:\n{context.get('job_description','')[:2000]}\n"
-    if company_research:
-        context_block += f"\nCOMPANY RESEARCH:\n{company_research[:1500]}\n"
-    
-    messages = [
-        {"role": "system", "content": system_prompt},
-    ]
-    if context_block:
-        messages.append({"role": "system", "content": context_block})
+    messages = list(await get_live_prompt_builder().prefix(user_id, options, session_id=session_id))
 
     # ── VISION MODE: When a screenshot is available, use GPT-4o vision ──
     if screenshot_base64:
@@ -634,11 +683,36 @@ async def stream_answer_live(
         logger.info("stream_answer_live: upgraded to gpt-4o for vision")
 
     logger.info("stream_answer_live model=%s → provider=%s api_model=%s", model, spec.provider, resolved_model)
+    max_tokens = 1200 if screenshot_base64 else 800
+    # Providers already charged a health failure during this answer.
+    failed_providers: set[str] = set()
+
+    # Opt-in first-token hedging: if the primary is silent past the deadline,
+    # race a second provider and stream whichever answers first. Text-only,
+    # since the hedge provider may not accept images.
+    if LLM_HEDGE_ENABLED and not screenshot_base64 and spec.provider != PROVIDER_OLLAMA:
+        from app.router.model_router import get_hedge_spec
+        hedge_spec = get_hedge_spec(spec, LLM_HEDGE_MODEL)
+        if hedge_spec is not None:
+            emitted = False
+            try:
+                async for token in get_llm_hedger().stream(
+                    HedgeLeg(spec.provider, lambda: _stream_provider(spec.provider, resolved_model, messages, max_tokens, failed_providers)),
+                    HedgeLeg(hedge_spec.provider, lambda: _stream_provider(hedge_spec.provider, hedge_spec.api_model, messages, max_tokens, failed_providers)),
+                ):
+                    emitted = True
+                    yield token
+                return
+            except Exception as exc:
+                if emitted:
+                    logger.warning("stream_answer_live hedged stream failed mid-answer: %s", exc)
+                    return
+                logger.warning("stream_answer_live hedged providers failed (%s); using serial fallback", exc)
     
     # For non-OpenAI providers, delegate to provider-specific streaming
     if spec.provider == PROVIDER_ANTHROPIC:
         try:
-            async for token in _stream_anthropic_fallback(messages, resolved_model):
+            async for token in _stream_provider(PROVIDER_ANTHROPIC, resolved_model, messages, max_tokens, failed_providers):
                 yield token
             return
         except Exception as exc:
@@ -662,19 +736,15 @@ async def stream_answer_live(
     openai_succeeded = False
     last_error = None
     
+    registry = get_llm_provider_registry()
     for attempt in range(MAX_RETRIES):
+        if attempt and not registry.allow_request(PROVIDER_OPENAI):
+            # Circuit opened during this answer: skip the remaining backoffs.
+            logger.warning("stream_answer_live OpenAI circuit open, skipping retries | err=%s", last_error)
+            break
         try:
-            response = await client.chat.completions.create(
-                model=resolved_model,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=1200 if screenshot_base64 else 800,
-                stream=True,  # TRUE STREAMING
-            )
-            
-            async for chunk in response:
-                if chunk.choices and chunk.choices[0].delta.content:
-                    yield chunk.choices[0].delta.content
+            async for token in _stream_provider(PROVIDER_OPENAI, resolved_model, messages, max_tokens, failed_providers):
+                yield token
             
             openai_succeeded = True
             break  # Success - exit retry loop
@@ -28,6 +28,7 @@ logger = logging.getLogger("response_accelerator")
 
 # Try importing semantic similarity for cache matching
 try:
+    import numpy as np
     from app.services.semantic_similarity import get_semantic_engine
     _SEMANTIC_AVAILABLE = True
 except Exception:
@@ -94,13 +95,105 @@ class HotAnswerCache:
     """
     Pre-computed answer cache for common interview questions.
     Cache hit gives ~100ms response time vs 800ms+ for LLM generation.
+
+    Semantic lookup uses a precomputed, L2-normalized embedding matrix
+    (one row per template). A lookup embeds the question once and scores
+    every template with a single matrix-vector product. New templates are
+    embedded in one batch on the next lookup and appended to the matrix.
     """
 
     SIMILARITY_THRESHOLD = 0.92  # High threshold — only exact matches
+    _INDEX_MIN_CAPACITY = 16
 
     def __init__(self):
         self._cache: dict[str, CachedAnswer] = {}
-        self._stats = {"hits": 0, "misses": 0, "total_lookups": 0}
+        self._stats = {"hits": 0, "misses": 0, "total_lookups": 0, "index_builds": 0}
+        # Embedding index: row i of _index_matrix is the embedding of _index_keys[i]
+        self._index_keys: list[str] = []
+        self._index_matrix = None  # np.ndarray[capacity, dim] float32, rows [0, len(keys)) valid
+        self._pending_keys: list[str] = []
+        self._index_lock: Optional[asyncio.Lock] = None
+
+    def add_template(
+        self,
+        question: str,
+        answer: str,
+        question_type: str = "behavioral",
+        company: str = "",
+    ) -> CachedAnswer:
+        """Add (or replace) a template. Its embedding is indexed lazily on next lookup."""
+        key = question.lower().strip().rstrip("?.!")
+        entry = CachedAnswer(
+            question_template=question,
+            answer_template=answer,
+            question_type=question_type,
+            company=company,
+        )
+        if key not in self._cache:
+            self._pending_keys.append(key)
+        self._cache[key] = entry
+        return entry
+
+    @staticmethod
+    def _normalized_rows(embeddings, count: int):
+        rows = np.asarray(embeddings, dtype=np.float32)
+        if rows.ndim != 2 or rows.shape[0] != count:
+            return None
+        norms = np.linalg.norm(rows, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        rows /= norms
+        return rows
+
+    def _reset_index(self) -> None:
+        """Drop the matrix and queue every indexed template for re-embedding."""
+        self._pending_keys = self._index_keys + self._pending_keys
+        self._index_keys = []
+        self._index_matrix = None
+
+    async def _sync_index(self, engine) -> None:
+        """Embed pending templates in one batch and append them to the matrix."""
+        if not self._pending_keys:
+            return
+        if self._index_lock is None:
+            self._index_lock = asyncio.Lock()
+        async with self._index_lock:
+            pending = self._pending_keys
+            if not pending:
+                return
+            self._pending_keys = []
+            keys = self._index_keys
+            matrix = self._index_matrix
+            try:
+                rows = self._normalized_rows(await engine.embed_batch(pending), len(pending))
+                if rows is not None and matrix is not None and matrix.shape[1] != rows.shape[1]:
+                    # Embedding model changed: re-embed the indexed templates too.
+                    # The old index stays in place until the new batch is in hand.
+                    everything = keys + pending
+                    rows = self._normalized_rows(await engine.embed_batch(everything), len(everything))
+                    if rows is not None:
+                        keys, matrix, pending = [], None, everything
+            except Exception:
+                self._pending_keys = pending + self._pending_keys
+                raise
+            if rows is None:
+                # Unusable batch: keep the templates queued for the next lookup.
+                self._pending_keys = pending + self._pending_keys
+                return
+
+            used = len(keys)
+            needed = used + rows.shape[0]
+            if matrix is None:
+                matrix = np.zeros((max(self._INDEX_MIN_CAPACITY, needed), rows.shape[1]), dtype=np.float32)
+            elif needed > matrix.shape[0]:
+                # Amortized O(1) append: double capacity
+                grown = np.zeros((max(needed, matrix.shape[0] * 2), matrix.shape[1]), dtype=np.float32)
+                grown[:used] = matrix[:used]
+                matrix = grown
+
+            matrix[used:needed] = rows
+            self._index_matrix = matrix
+            self._index_keys = keys + pending
+            self._stats["index_builds"] += 1
 
     def seed_behavioral_templates(self) -> None:
         """Pre-populate cache with top behavioral question templates."""
@@ -152,12 +245,7 @@ class HotAnswerCache:
         }
 
         for question, answer in templates.items():
-            key = question.lower().strip()
-            self._cache[key] = CachedAnswer(
-                question_template=question,
-                answer_template=answer,
-                question_type="behavioral",
-            )
+            self.add_template(question, answer, question_type="behavioral")
 
         logger.info("Hot answer cache seeded with %d templates", len(templates))
 
@@ -180,14 +268,24 @@ class HotAnswerCache:
         if _SEMANTIC_AVAILABLE:
             try:
                 engine = get_semantic_engine()
+                await self._sync_index(engine)
                 best_score = 0.0
                 best_entry = None
 
-                for key, entry in self._cache.items():
-                    score = await engine.similarity(normalized, key)
-                    if score > best_score:
-                        best_score = score
-                        best_entry = entry
+                count = len(self._index_keys)
+                if count and self._index_matrix is not None:
+                    query = np.asarray(await engine.embed(normalized), dtype=np.float32)
+                    if query.shape[0] != self._index_matrix.shape[1]:
+                        # Embedding model changed since the index was built
+                        self._reset_index()
+                        await self._sync_index(engine)
+                        count = len(self._index_keys)
+                    norm = float(np.linalg.norm(query))
+                    if count and norm > 0 and query.shape[0] == self._index_matrix.shape[1]:
+                        scores = self._index_matrix[:count] @ (query / norm)
+                        best_idx = int(np.argmax(scores))
+                        best_score = float(scores[best_idx])
+                        best_entry = self._cache.get(self._index_keys[best_idx])
 
                 if best_score >= self.SIMILARITY_THRESHOLD and best_entry:
                     self._stats["hits"] += 1
@@ -202,7 +300,12 @@ class HotAnswerCache:
         return None
 
     def get_stats(self) -> dict:
-        return {**self._stats, "cache_size": len(self._cache)}
+        return {
+            **self._stats,
+            "cache_size": len(self._cache),
+            "indexed_templates": len(self._index_keys),
+            "pending_templates": len(self._pending_keys),
+        }
 
 
 # ─── Model Selector ──────────────────────────────────────
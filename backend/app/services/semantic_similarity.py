@@ -11,7 +11,8 @@ Why This Matters:
 Architecture:
 - Uses sentence-transformers for fast local embeddings
 - Falls back to OpenAI ada-002 if local model unavailable
-- Caches embeddings per session to reduce compute
+- Caches embeddings per session to reduce compute (in-process LRU)
+- Optional Redis tier shares embeddings across uvicorn workers
 - Configurable similarity threshold (default 0.85)
 
 Usage:
@@ -31,10 +32,13 @@ import asyncio
 import hashlib
 import time
 import os
+from collections import OrderedDict
 from typing import Optional, Dict, List, Tuple
 from dataclasses import dataclass, field
 import numpy as np
 
+from app.system_metrics import LatencyHistogram
+
 logger = logging.getLogger("semantic_similarity")
 
 # Try to import sentence-transformers (preferred for speed)
@@ -55,6 +59,13 @@ try:
 except ImportError:
     pass
 
+# Shared cross-worker cache (optional)
+try:
+    from core.redis_pool import get_redis_binary
+    _REDIS_AVAILABLE = True
+except Exception:
+    _REDIS_AVAILABLE = False
+
 
 @dataclass
 class EmbeddingCacheEntry:
@@ -63,6 +74,232 @@ class EmbeddingCacheEntry:
     embedding: np.ndarray
     created_at: float
     access_count: int = 0
+    nbytes: int = 0
+
+
+class EmbeddingLRUCache:
+    """
+    O(1) LRU cache for embeddings with TTL.
+
+    Bounded both by entry count and by total vector bytes (vectors are
+    stored as float32). Hits move the entry to the MRU end; inserts evict
+    from the LRU end until both bounds hold.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl_sec: float):
+        self.max_entries = max(1, int(max_entries))
+        self.max_bytes = max(0, int(max_bytes))  # 0 = unbounded
+        self.ttl_sec = float(ttl_sec)
+        self._entries: "OrderedDict[str, EmbeddingCacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def total_bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if time.time() - entry.created_at > self.ttl_sec:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.access_count += 1
+        self.hits += 1
+        return entry.embedding
+
+    def put(self, key: str, embedding: np.ndarray) -> None:
+        vector = np.asarray(embedding, dtype=np.float32)
+        if key in self._entries:
+            self._remove(key)
+        entry = EmbeddingCacheEntry(
+            text_hash=key,
+            embedding=vector,
+            created_at=time.time(),
+            nbytes=int(vector.nbytes),
+        )
+        self._entries[key] = entry
+        self._bytes += entry.nbytes
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes and self._bytes > self.max_bytes and len(self._entries) > 1)
+        ):
+            oldest_key = next(iter(self._entries))
+            self._remove(oldest_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.nbytes
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "lru_hits": self.hits,
+            "lru_misses": self.misses,
+            "lru_evictions": self.evictions,
+            "lru_expirations": self.expirations,
+            "lru_hit_rate": round(self.hits / lookups, 3) if lookups else 0,
+            "cache_bytes": self._bytes,
+            "cache_max_entries": self.max_entries,
+            "cache_max_bytes": self.max_bytes,
+        }
+
+
+class EmbeddingMicroBatcher:
+    """
+    Collects concurrent embed requests and encodes them in one model call.
+
+    A batch is dispatched when it reaches ``max_batch_size`` or when the
+    first queued request has waited ``max_wait_ms``. Identical texts in the
+    same batch are encoded once. Each caller awaits its own future.
+    """
+
+    BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128)
+    WAIT_MS_BUCKETS = (0.5, 1, 2, 5, 10, 25, 50, 100)
+
+    def __init__(self, encode_fn, max_batch_size: int = 32, max_wait_ms: float = 5.0):
+        self._encode_fn = encode_fn  # sync: List[str] -> sequence of vectors
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self._pending: List[Tuple[str, asyncio.Future, float]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._inflight: set = set()
+        self._batch_sizes = LatencyHistogram("embedding_batch_size", self.BATCH_SIZE_BUCKETS)
+        self._wait_ms = LatencyHistogram("embedding_batch_wait_ms", self.WAIT_MS_BUCKETS)
+        self._stats = {"requests": 0, "batches": 0, "deduplicated": 0, "errors": 0}
+
+    async def embed(self, text: str) -> np.ndarray:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future, time.perf_counter()))
+        self._stats["requests"] += 1
+
+        if len(self._pending) >= self.max_batch_size:
+            self._dispatch(loop)
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait_ms / 1000.0, self._dispatch, loop)
+        return await future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = loop.create_task(self._run_batch(batch))
+        self._inflight.add(task)
+        task.add_done_callback(self._inflight.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future, float]]) -> None:
+        started = time.perf_counter()
+        for _, _, enqueued_at in batch:
+            self._wait_ms.observe((started - enqueued_at) * 1000.0)
+
+        unique_texts = list(dict.fromkeys(text for text, _, _ in batch))
+        self._stats["batches"] += 1
+        self._stats["deduplicated"] += len(batch) - len(unique_texts)
+        self._batch_sizes.observe(len(unique_texts))
+
+        try:
+            loop = asyncio.get_running_loop()
+            vectors = await loop.run_in_executor(None, self._encode_fn, unique_texts)
+            by_text = {text: np.asarray(vec) for text, vec in zip(unique_texts, vectors)}
+        except Exception as e:
+            self._stats["errors"] += 1
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future, _ in batch:
+            if not future.done():
+                future.set_result(by_text[text])
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait_ms,
+            "batch_size_histogram": self._batch_sizes.to_dict(),
+            "wait_ms_histogram": self._wait_ms.to_dict(),
+        }
+
+
+class RedisEmbeddingStore:
+    """
+    Second-tier embedding cache shared by all workers via Redis.
+
+    Vectors are stored as raw little-endian float16/float32 bytes (no JSON),
+    keyed by model namespace + normalized text hash. Batch reads use MGET,
+    batch writes use one pipeline. All failures degrade to a miss.
+    """
+
+    KEY_PREFIX = "emb"
+
+    def __init__(self, dtype: str = "float16", ttl_sec: int = 86400):
+        self.dtype = np.dtype("<f2") if dtype == "float16" else np.dtype("<f4")
+        self.ttl_sec = max(1, int(ttl_sec))
+        self._stats = {"redis_hits": 0, "redis_misses": 0, "redis_writes": 0, "redis_errors": 0}
+
+    def _key(self, namespace: str, text_hash: str) -> str:
+        return f"{self.KEY_PREFIX}:{namespace}:{self.dtype.name}:{text_hash}"
+
+    def _decode(self, raw) -> Optional[np.ndarray]:
+        if not raw or len(raw) % self.dtype.itemsize:
+            return None
+        return np.frombuffer(raw, dtype=self.dtype).astype(np.float32)
+
+    async def mget(self, namespace: str, text_hashes: List[str]) -> List[Optional[np.ndarray]]:
+        redis = get_redis_binary() if _REDIS_AVAILABLE else None
+        if redis is None or not text_hashes:
+            return [None] * len(text_hashes)
+        try:
+            raws = await redis.mget([self._key(namespace, h) for h in text_hashes])
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.debug("Redis embedding MGET failed (non-fatal): %s", e)
+            return [None] * len(text_hashes)
+        vectors = [self._decode(raw) for raw in raws]
+        hits = sum(1 for v in vectors if v is not None)
+        self._stats["redis_hits"] += hits
+        self._stats["redis_misses"] += len(vectors) - hits
+        return vectors
+
+    async def set_many(self, namespace: str, items: List[Tuple[str, np.ndarray]]) -> None:
+        redis = get_redis_binary() if _REDIS_AVAILABLE else None
+        if redis is None or not items:
+            return
+        try:
+            pipe = redis.pipeline(transaction=False)
+            for text_hash, vector in items:
+                payload = np.asarray(vector).astype(self.dtype, copy=False).tobytes()
+                pipe.set(self._key(namespace, text_hash), payload, ex=self.ttl_sec)
+            await pipe.execute()
+            self._stats["redis_writes"] += len(items)
+        except Exception as e:
+            self._stats["redis_errors"] += 1
+            logger.debug("Redis embedding write failed (non-fatal): %s", e)
+
+    def get_stats(self) -> dict:
+        return {**self._stats, "redis_dtype": self.dtype.name}
 
 
 class SemanticSimilarityEngine:
@@ -79,13 +316,31 @@ class SemanticSimilarityEngine:
     # Configuration
     DEFAULT_THRESHOLD = float(os.getenv("SEMANTIC_SIM_THRESHOLD", "0.85"))
     CACHE_MAX_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "100"))
+    CACHE_MAX_BYTES = int(os.getenv("SEMANTIC_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))  # 0 = unbounded
     CACHE_TTL_SEC = float(os.getenv("SEMANTIC_CACHE_TTL", "300"))  # 5 min
     LOCAL_MODEL = os.getenv("SEMANTIC_MODEL", "all-MiniLM-L6-v2")  # Fast & good
     USE_LOCAL = os.getenv("SEMANTIC_USE_LOCAL", "true").lower() in {"1", "true", "yes"}
+    MICROBATCH_ENABLED = os.getenv("SEMANTIC_MICROBATCH", "true").lower() in {"1", "true", "yes"}
+    MICROBATCH_MAX_SIZE = int(os.getenv("SEMANTIC_MICROBATCH_MAX_SIZE", "32"))
+    MICROBATCH_MAX_WAIT_MS = float(os.getenv("SEMANTIC_MICROBATCH_MAX_WAIT_MS", "5"))
+    REDIS_CACHE_ENABLED = os.getenv("SEMANTIC_REDIS_CACHE", "true").lower() in {"1", "true", "yes"}
+    REDIS_CACHE_DTYPE = os.getenv("SEMANTIC_REDIS_DTYPE", "float16").strip().lower()
+    REDIS_CACHE_TTL_SEC = int(os.getenv("SEMANTIC_REDIS_TTL", "86400"))  # 24h
     
     def __init__(self):
-        self._cache: Dict[str, EmbeddingCacheEntry] = {}
+        self._cache = EmbeddingLRUCache(
+            max_entries=self.CACHE_MAX_SIZE,
+            max_bytes=self.CACHE_MAX_BYTES,
+            ttl_sec=self.CACHE_TTL_SEC,
+        )
         self._model = None
+        self._batcher: Optional[EmbeddingMicroBatcher] = None
+        self._shared: Optional[RedisEmbeddingStore] = (
+            RedisEmbeddingStore(self.REDIS_CACHE_DTYPE, self.REDIS_CACHE_TTL_SEC)
+            if self.REDIS_CACHE_ENABLED and _REDIS_AVAILABLE
+            else None
+        )
+        self._pending_writes: set = set()
         self._model_lock = asyncio.Lock()
         self._initialized = False
         self._use_openai = False
@@ -95,6 +350,8 @@ class SemanticSimilarityEngine:
             "embeddings_computed": 0,
             "similarity_checks": 0,
             "openai_fallbacks": 0,
+            "shared_cache_hits": 0,
+            "fallback_embeddings": 0,
         }
     
     async def _ensure_initialized(self):
@@ -139,39 +396,64 @@ class SemanticSimilarityEngine:
     
     def _get_cached(self, text: str) -> Optional[np.ndarray]:
         """Get cached embedding if available and fresh"""
-        text_hash = self._text_hash(text)
-        entry = self._cache.get(text_hash)
-        
-        if entry is None:
+        embedding = self._cache.get(self._text_hash(text))
+        if embedding is None:
             return None
-        
-        # Check TTL
-        if time.time() - entry.created_at > self.CACHE_TTL_SEC:
-            del self._cache[text_hash]
-            return None
-        
-        entry.access_count += 1
         self._stats["cache_hits"] += 1
-        return entry.embedding
+        return embedding
     
     def _set_cached(self, text: str, embedding: np.ndarray):
-        """Cache embedding with LRU eviction"""
-        # Evict oldest if at capacity
-        if len(self._cache) >= self.CACHE_MAX_SIZE:
-            oldest_key = min(self._cache.keys(), 
-                           key=lambda k: self._cache[k].created_at)
-            del self._cache[oldest_key]
-        
-        text_hash = self._text_hash(text)
-        self._cache[text_hash] = EmbeddingCacheEntry(
-            text_hash=text_hash,
-            embedding=embedding,
-            created_at=time.time(),
-        )
+        """Cache embedding with O(1) LRU eviction"""
+        self._cache.put(self._text_hash(text), embedding)
         self._stats["cache_misses"] += 1
+
+    def _model_namespace(self) -> str:
+        """Shared-cache namespace; vectors from different models must never mix."""
+        if self._model is not None:
+            return self.LOCAL_MODEL
+        if self._use_openai:
+            return "ada-002"
+        return "charfreq"
+
+    def _shared_enabled(self) -> bool:
+        # Character-frequency vectors are cheaper to recompute than to fetch.
+        return self._shared is not None and self._model_namespace() != "charfreq"
+
+    async def _get_shared(self, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """Read-through from the Redis tier (one MGET); hits are promoted to L1."""
+        if not self._shared_enabled():
+            return [None] * len(texts)
+        vectors = await self._shared.mget(self._model_namespace(), [self._text_hash(t) for t in texts])
+        for text, vector in zip(texts, vectors):
+            if vector is not None:
+                self._cache.put(self._text_hash(text), vector)
+                self._stats["shared_cache_hits"] += 1
+        return vectors
+
+    def _put_shared(self, items: List[Tuple[str, np.ndarray]]) -> None:
+        """
+        Write-behind to the Redis tier so the caller never waits on it.
+        Only vectors produced by the namespace's own model may be written.
+        """
+        if not self._shared_enabled() or not items:
+            return
+        payload = [(self._text_hash(text), vector) for text, vector in items]
+        task = asyncio.ensure_future(self._shared.set_many(self._model_namespace(), payload))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._pending_writes.discard)
     
     async def _compute_embedding_local(self, text: str) -> np.ndarray:
-        """Compute embedding using local model"""
+        """Compute embedding using local model (micro-batched across callers)"""
+        if self.MICROBATCH_ENABLED:
+            if self._batcher is None:
+                model = self._model
+                self._batcher = EmbeddingMicroBatcher(
+                    lambda texts: model.encode(texts, normalize_embeddings=True),
+                    max_batch_size=self.MICROBATCH_MAX_SIZE,
+                    max_wait_ms=self.MICROBATCH_MAX_WAIT_MS,
+                )
+            return await self._batcher.embed(text)
+
         loop = asyncio.get_event_loop()
         embedding = await loop.run_in_executor(
             None,
@@ -179,19 +461,24 @@ class SemanticSimilarityEngine:
         )
         return np.array(embedding)
     
-    async def _compute_embedding_openai(self, text: str) -> np.ndarray:
-        """Compute embedding using OpenAI ada-002"""
+    async def _compute_embedding_openai(self, text: str) -> Tuple[np.ndarray, bool]:
+        """
+        Compute embedding using OpenAI ada-002.
+        Returns (vector, from_model); from_model is False for the
+        character-level fallback, which must not be cached as ada-002.
+        """
         self._stats["openai_fallbacks"] += 1
         try:
             response = await _openai_client.embeddings.create(
                 model="text-embedding-ada-002",
                 input=text,
             )
-            return np.array(response.data[0].embedding)
+            return np.array(response.data[0].embedding), True
         except Exception as e:
             logger.error("OpenAI embedding failed: %s", e)
             # Ultimate fallback: character-level hash
-            return self._char_level_embedding(text)
+            self._stats["fallback_embeddings"] += 1
+            return self._char_level_embedding(text), False
     
     def _char_level_embedding(self, text: str, dim: int = 384) -> np.ndarray:
         """
@@ -220,6 +507,11 @@ class SemanticSimilarityEngine:
         cached = self._get_cached(text)
         if cached is not None:
             return cached
+
+        # Check shared (cross-worker) cache
+        shared = (await self._get_shared([text]))[0]
+        if shared is not None:
+            return shared
         
         # Compute
         self._stats["embeddings_computed"] += 1
@@ -227,12 +519,16 @@ class SemanticSimilarityEngine:
         if self._model is not None:
             embedding = await self._compute_embedding_local(text)
         elif self._use_openai:
-            embedding = await self._compute_embedding_openai(text)
+            embedding, from_model = await self._compute_embedding_openai(text)
+            if not from_model:
+                # Wrong model and dimension for this namespace: use once, cache nowhere.
+                return embedding
         else:
             embedding = self._char_level_embedding(text)
         
         # Cache
         self._set_cached(text, embedding)
+        self._put_shared([(text, embedding)])
         return embedding
     
     async def embed_batch(self, texts: List[str]) -> List[np.ndarray]:
@@ -251,6 +547,18 @@ class SemanticSimilarityEngine:
             else:
                 to_compute.append(text)
                 to_compute_indices.append(i)
+
+        # Shared cache: one MGET for every L1 miss
+        if to_compute and self._shared_enabled():
+            shared = await self._get_shared(to_compute)
+            remaining, remaining_indices = [], []
+            for idx, text, vector in zip(to_compute_indices, to_compute, shared):
+                if vector is not None:
+                    results.append((idx, vector))
+                else:
+                    remaining.append(text)
+                    remaining_indices.append(idx)
+            to_compute, to_compute_indices = remaining, remaining_indices
         
         # Batch compute remaining
         if to_compute:
@@ -260,11 +568,14 @@ class SemanticSimilarityEngine:
                     None,
                     lambda: self._model.encode(to_compute, normalize_embeddings=True)
                 )
+                computed = []
                 for idx, text, emb in zip(to_compute_indices, to_compute, embeddings):
                     emb_arr = np.array(emb)
                     self._set_cached(text, emb_arr)
                     results.append((idx, emb_arr))
+                    computed.append((text, emb_arr))
                     self._stats["embeddings_computed"] += 1
+                self._put_shared(computed)
             else:
                 # Fall back to individual compute
                 for idx, text in zip(to_compute_indices, to_compute):
@@ -364,13 +675,18 @@ class SemanticSimilarityEngine:
     
     def get_stats(self) -> dict:
         """Get engine statistics"""
-        total_checks = self._stats["cache_hits"] + self._stats["cache_misses"]
-        cache_hit_rate = self._stats["cache_hits"] / total_checks if total_checks > 0 else 0
+        total_checks = self._stats["cache_hits"] + self._stats["cache_misses"] + self._stats["shared_cache_hits"]
+        cache_hit_rate = (
+            (self._stats["cache_hits"] + self._stats["shared_cache_hits"]) / total_checks if total_checks > 0 else 0
+        )
         
         return {
             **self._stats,
             "cache_size": len(self._cache),
             "cache_hit_rate": round(cache_hit_rate, 3),
+            **self._cache.get_stats(),
+            "microbatch": self._batcher.get_stats() if self._batcher else None,
+            "shared_cache": self._shared.get_stats() if self._shared else None,
             "model_type": "local" if self._model else ("openai" if self._use_openai else "fallback"),
             "model_name": self.LOCAL_MODEL if self._model else "ada-002",
         }
@@ -0,0 +1,279 @@
+"""
+Turn Latency Tracing
+
+Monotonic span timing for one conversational turn through the voice
+pipeline:
+
+    stt_final → turn_completion → decision → llm_first_token → first_chunk_sent
+
+Every turn is timed (a few ``perf_counter`` calls) and its per-stage
+breakdown is fed to the observability dashboard. A sampled subset is
+exported, one line per turn, to a local file sink as plain JSONL or as
+OTLP/JSON ``resourceSpans`` that an OpenTelemetry collector can ingest.
+The sink writes from a background thread; a full queue drops traces
+instead of blocking the event loop.
+
+Env vars:
+    TURN_TRACE_SAMPLE_RATE – fraction of turns exported (default: 0.1)
+    TURN_TRACE_SINK        – output file path; empty disables export (default: "")
+    TURN_TRACE_FORMAT      – jsonl | otlp (default: jsonl)
+    TURN_TRACE_QUEUE_MAX   – pending export lines before dropping (default: 1000)
+
+Usage:
+    tracer = get_turn_tracer()
+    trace = tracer.start(session_id, turn_id)
+    trace.mark("stt_final")
+    with trace.span("decision"):
+        decision = await engine.decide(snapshot)
+    await tracer.finish(trace)
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger("turn_tracing")
+
+TURN_TRACE_SAMPLE_RATE = min(1.0, max(0.0, float(os.getenv("TURN_TRACE_SAMPLE_RATE", "0.1"))))
+TURN_TRACE_SINK = str(os.getenv("TURN_TRACE_SINK", "")).strip()
+TURN_TRACE_FORMAT = str(os.getenv("TURN_TRACE_FORMAT", "jsonl")).strip().lower()
+TURN_TRACE_QUEUE_MAX = max(1, int(os.getenv("TURN_TRACE_QUEUE_MAX", "1000")))
+
+
+class TurnTrace:
+    """Spans and point marks for one turn, all on the monotonic clock."""
+
+    __slots__ = (
+        "trace_id", "session_id", "turn_id", "sampled", "finished",
+        "wall_start", "mono_start", "marks", "spans",
+    )
+
+    def __init__(self, session_id: str, turn_id: str, sampled: bool):
+        self.trace_id = uuid.uuid4().hex
+        self.session_id = str(session_id or "")
+        self.turn_id = str(turn_id or "")
+        self.sampled = sampled
+        self.finished = False
+        self.wall_start = time.time()
+        self.mono_start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.spans: List[Tuple[str, float, float]] = []
+
+    def mark(self, name: str) -> None:
+        """Record a point in time; a repeated mark keeps the latest occurrence."""
+        self.marks[name] = time.perf_counter()
+
+    def mark_once(self, name: str) -> None:
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter()
+
+    def has(self, name: str) -> bool:
+        return name in self.marks or any(span[0] == name for span in self.spans)
+
+    def add_span(self, name: str, start: float, end: Optional[float] = None) -> None:
+        self.spans.append((name, start, time.perf_counter() if end is None else end))
+
+    @contextmanager
+    def span(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.spans.append((name, start, time.perf_counter()))
+
+    def age_sec(self) -> float:
+        return time.perf_counter() - self.mono_start
+
+    def breakdown(self) -> Dict[str, float]:
+        """
+        Stage durations in ms: each span's duration, plus every mark's
+        offset from the STT final (``stt_final_to_<mark>``).
+        """
+        result: Dict[str, float] = {}
+        for name, start, end in self.spans:
+            result.setdefault(name, round((end - start) * 1000.0, 3))
+        anchor = self.marks.get("stt_final")
+        if anchor is not None:
+            for name, ts in self.marks.items():
+                if name != "stt_final" and ts >= anchor:
+                    result[f"stt_final_to_{name}"] = round((ts - anchor) * 1000.0, 3)
+        return result
+
+    def _wall_ns(self, mono_ts: float) -> int:
+        return int((self.wall_start + (mono_ts - self.mono_start)) * 1e9)
+
+    def to_record(self, status: str) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "session_id": self.session_id,
+            "turn_id": self.turn_id,
+            "status": status,
+            "start_ts": self.wall_start,
+            "marks_ms": {
+                name: round((ts - self.mono_start) * 1000.0, 3) for name, ts in self.marks.items()
+            },
+            "spans": [
+                {
+                    "name": name,
+                    "start_ms": round((start - self.mono_start) * 1000.0, 3),
+                    "duration_ms": round((end - start) * 1000.0, 3),
+                }
+                for name, start, end in self.spans
+            ],
+            "breakdown_ms": self.breakdown(),
+        }
+
+    def to_otlp(self, status: str) -> Dict[str, Any]:
+        end = max([self.mono_start, *self.marks.values(), *(span[2] for span in self.spans)])
+        root_id = uuid.uuid4().hex[:16]
+
+        def _attrs(**values: Any) -> List[Dict[str, Any]]:
+            return [{"key": key, "value": {"stringValue": str(value)}} for key, value in values.items()]
+
+        spans = [{
+            "traceId": self.trace_id,
+            "spanId": root_id,
+            "name": "voice.turn",
+            "kind": 1,
+            "startTimeUnixNano": str(self._wall_ns(self.mono_start)),
+            "endTimeUnixNano": str(self._wall_ns(end)),
+            "attributes": _attrs(session_id=self.session_id, turn_id=self.turn_id),
+            "events": [
+                {"name": name, "timeUnixNano": str(self._wall_ns(ts))} for name, ts in self.marks.items()
+            ],
+            "status": {"code": 1 if status == "ok" else 2},
+        }]
+        for name, start, span_end in self.spans:
+            spans.append({
+                "traceId": self.trace_id,
+                "spanId": uuid.uuid4().hex[:16],
+                "parentSpanId": root_id,
+                "name": name,
+                "kind": 1,
+                "startTimeUnixNano": str(self._wall_ns(start)),
+                "endTimeUnixNano": str(self._wall_ns(span_end)),
+            })
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _attrs(**{"service.name": "voice-pipeline"})},
+                "scopeSpans": [{"scope": {"name": "turn_tracing"}, "spans": spans}],
+            }]
+        }
+
+
+class _FileSink:
+    """Appends lines to a file from a daemon thread; never blocks the caller."""
+
+    def __init__(self, path: str, queue_max: int = TURN_TRACE_QUEUE_MAX):
+        self.path = path
+        self._queue: "queue.Queue[str]" = queue.Queue(maxsize=queue_max)
+        self._thread = threading.Thread(target=self._run, name="turn-trace-sink", daemon=True)
+        self._thread.start()
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def submit(self, line: str) -> bool:
+        try:
+            self._queue.put_nowait(line)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def _run(self) -> None:
+        while True:
+            lines = [self._queue.get()]
+            while True:
+                try:
+                    lines.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as handle:
+                    handle.write("".join(line + "\n" for line in lines))
+                self.written += len(lines)
+            except Exception as exc:
+                self.errors += 1
+                logger.warning("Turn trace sink write failed | path=%s err=%s", self.path, exc)
+            for _ in lines:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        self._queue.join()
+
+
+class TurnTracer:
+    """Starts turn traces, records breakdowns, exports the sampled ones."""
+
+    def __init__(
+        self,
+        sample_rate: float = TURN_TRACE_SAMPLE_RATE,
+        sink_path: str = TURN_TRACE_SINK,
+        sink_format: str = TURN_TRACE_FORMAT,
+        dashboard=None,
+    ):
+        self.sample_rate = min(1.0, max(0.0, float(sample_rate)))
+        self.sink_format = "otlp" if sink_format == "otlp" else "jsonl"
+        self._sink = _FileSink(sink_path) if sink_path else None
+        self._dashboard = dashboard
+        self._stats = {"started": 0, "finished": 0, "sampled": 0, "exported": 0}
+
+    def _get_dashboard(self):
+        if self._dashboard is None:
+            from app.services.observability_dashboard import get_observability_dashboard
+            self._dashboard = get_observability_dashboard()
+        return self._dashboard
+
+    def start(self, session_id: str, turn_id: str = "") -> TurnTrace:
+        sampled = self._sink is not None and random.random() < self.sample_rate
+        self._stats["started"] += 1
+        if sampled:
+            self._stats["sampled"] += 1
+        return TurnTrace(session_id, turn_id, sampled)
+
+    async def finish(self, trace: Optional[TurnTrace], status: str = "ok") -> None:
+        if trace is None or trace.finished:
+            return
+        trace.finished = True
+        self._stats["finished"] += 1
+        try:
+            await self._get_dashboard().record_turn_breakdown(trace.breakdown())
+        except Exception as exc:
+            logger.debug("Turn breakdown not recorded: %s", exc)
+        if trace.sampled and self._sink is not None:
+            body = trace.to_otlp(status) if self.sink_format == "otlp" else trace.to_record(status)
+            if self._sink.submit(json.dumps(body, separators=(",", ":"))):
+                self._stats["exported"] += 1
+
+    def flush(self) -> None:
+        if self._sink is not None:
+            self._sink.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats: Dict[str, Any] = {**self._stats, "sample_rate": self.sample_rate, "format": self.sink_format}
+        if self._sink is not None:
+            stats.update(sink_written=self._sink.written, sink_dropped=self._sink.dropped, sink_errors=self._sink.errors)
+        return stats
+
+
+# Singleton
+_tracer: Optional[TurnTracer] = None
+
+
+def get_turn_tracer() -> TurnTracer:
+    """Get singleton turn tracer"""
+    global _tracer
+    if _tracer is None:
+        _tracer = TurnTracer()
+    return _tracer
@@ -1,5 +1,6 @@
 # app/session/engine.py
 
+from app.context.skill_matcher import get_context_skill_matcher
 from app.skillgraph.engine import SkillGraph
 from app.mce.store import MemoryStore
 from app.realtime_assist import AssistConfig, RealtimeAssistEngine
@@ -23,6 +24,7 @@ class SessionEngine:
         self.analytics_snapshot = {}
         self.skill_graph = None
         self.skill_graph_metrics = {}
+        self.skill_matcher = get_context_skill_matcher(None, None)
         self.memory_store = MemoryStore()
         self.realtime_assist = None
 
@@ -31,9 +33,11 @@ class SessionEngine:
 
     def set_jd_context(self, context: dict):
         self.jd_context = context
+        self.skill_matcher = get_context_skill_matcher(self.jd_context, self.resume_profile)
 
     def set_resume_profile(self, profile: dict):
         self.resume_profile = profile
+        self.skill_matcher = get_context_skill_matcher(self.jd_context, self.resume_profile)
 
     def set_difficulty_state(self, level: str, history: list[float], trend: str):
         self.difficulty_level = level
@@ -3,7 +3,8 @@
   Redis-backed User Context Store — replaces the JSON file store
   in state.py when REDIS_URL is configured.
 
-  Keys:  user:{user_id}:context   (hash with 24h TTL)
+  Keys:  user:{user_id}:context          (hash with 24h TTL)
+         user:{user_id}:context_version  (resume/JD change counter, 24h TTL)
 ═══════════════════════════════════════════════════════════════════════
 """
 
@@ -29,6 +30,10 @@ class RedisUserContextStore:
     def _key(user_id: str) -> str:
         return f"user:{user_id}:context"
 
+    @staticmethod
+    def _version_key(user_id: str) -> str:
+        return f"user:{user_id}:context_version"
+
     def get(self, user_id: str) -> Optional[Dict[str, Any]]:
         try:
             raw = self._r.get(self._key(user_id))
@@ -49,6 +54,31 @@ class RedisUserContextStore:
         except Exception as exc:
             logger.warning("Redis put context failed for %s: %s", user_id, exc)
 
+    def put_raw(self, user_id: str, payload: str) -> None:
+        """Store an already-serialized context (lets callers serialize under their own lock)."""
+        try:
+            self._r.setex(self._key(user_id), USER_CONTEXT_TTL_SEC, payload)
+        except Exception as exc:
+            logger.warning("Redis put context failed for %s: %s", user_id, exc)
+
+    def incr_version(self, user_id: str) -> None:
+        key = self._version_key(user_id)
+        try:
+            pipe = self._r.pipeline(transaction=False)
+            pipe.incr(key)
+            pipe.expire(key, USER_CONTEXT_TTL_SEC)
+            pipe.execute()
+        except Exception as exc:
+            logger.warning("Redis context version bump failed for %s: %s", user_id, exc)
+
+    def get_version(self, user_id: str) -> Optional[int]:
+        """Shared context version (0 if never bumped), or None if Redis failed."""
+        try:
+            return int(self._r.get(self._version_key(user_id)) or 0)
+        except Exception as exc:
+            logger.warning("Redis get context version failed for %s: %s", user_id, exc)
+            return None
+
     def delete(self, user_id: str) -> None:
         try:
             self._r.delete(self._key(user_id))
@@ -17,17 +17,39 @@ class RoomEventBus(Protocol):
     async def listen(self, handler: RoomEventHandler) -> None:
         ...
 
+    async def subscribe_room(self, room_id: str) -> None:
+        ...
+
+    async def unsubscribe_room(self, room_id: str) -> None:
+        ...
+
 
 class LocalRoomEventBus:
     async def publish(self, room_id: str, payload: dict) -> None:
         return
 
+    async def subscribe_room(self, room_id: str) -> None:
+        return
+
+    async def unsubscribe_room(self, room_id: str) -> None:
+        return
+
     async def listen(self, handler: RoomEventHandler) -> None:
         while True:
             await asyncio.sleep(3600)
 
 
 class RedisRoomEventBus:
+    """
+    Room event bus over Redis pub/sub with per-room channel subscriptions.
+
+    Only rooms that have local members are subscribed, all on one shared
+    pubsub connection, so an instance never receives or decodes events for
+    rooms it does not host. ``subscribe_room``/``unsubscribe_room`` record
+    the desired set and reconcile it with the live subscription; ``listen``
+    resubscribes the desired set whenever it (re)creates the connection.
+    """
+
     def __init__(self, redis_url: str, instance_id: str):
         try:
             import redis.asyncio as redis_async  # type: ignore
@@ -36,7 +58,17 @@ class RedisRoomEventBus:
 
         self._redis = redis_async.from_url(redis_url, decode_responses=True)
         self._instance_id = str(instance_id or "instance-unknown")
-        self._pattern = "room:*:events"
+        self._pubsub = None
+        self._rooms: set[str] = set()
+        self._subscribed: set[str] = set()
+        self._sub_lock = asyncio.Lock()
+        self._rooms_changed = asyncio.Event()
+        self._stats = {
+            "subscribes": 0,
+            "unsubscribes": 0,
+            "messages": 0,
+            "dropped_unsubscribed": 0,
+        }
 
     @staticmethod
     def _channel(room_id: str) -> str:
@@ -52,15 +84,59 @@ class RedisRoomEventBus:
         }
         await self._redis.publish(self._channel(room_id), json.dumps(envelope))
 
+    async def subscribe_room(self, room_id: str) -> None:
+        if not room_id:
+            return
+        self._rooms.add(room_id)
+        self._rooms_changed.set()
+        await self._reconcile(room_id)
+
+    async def unsubscribe_room(self, room_id: str) -> None:
+        if not room_id:
+            return
+        self._rooms.discard(room_id)
+        await self._reconcile(room_id)
+
+    async def _reconcile(self, room_id: str) -> None:
+        # Register/unregister for the same room can interleave; re-check the
+        # desired state under the lock so the last call always wins.
+        async with self._sub_lock:
+            pubsub = self._pubsub
+            if pubsub is None:
+                return  # listen() subscribes the desired set once connected
+            wanted = room_id in self._rooms
+            if wanted and room_id not in self._subscribed:
+                await pubsub.subscribe(self._channel(room_id))
+                self._subscribed.add(room_id)
+                self._stats["subscribes"] += 1
+            elif not wanted and room_id in self._subscribed:
+                await pubsub.unsubscribe(self._channel(room_id))
+                self._subscribed.discard(room_id)
+                self._stats["unsubscribes"] += 1
+
     async def listen(self, handler: RoomEventHandler) -> None:
         pubsub = self._redis.pubsub()
-        await pubsub.psubscribe(self._pattern)
+        async with self._sub_lock:
+            self._pubsub = pubsub
+            self._subscribed.clear()
+            if self._rooms:
+                await pubsub.subscribe(*[self._channel(room_id) for room_id in self._rooms])
+                self._subscribed.update(self._rooms)
+                self._stats["subscribes"] += len(self._rooms)
         try:
             while True:
+                if not self._subscribed:
+                    # Nothing to read until the first local room appears.
+                    self._rooms_changed.clear()
+                    try:
+                        await asyncio.wait_for(self._rooms_changed.wait(), timeout=1.0)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
                 message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
                 if not message:
                     continue
-                if str(message.get("type") or "") not in {"message", "pmessage"}:
+                if str(message.get("type") or "") != "message":
                     continue
 
                 raw_channel = str(message.get("channel") or "")
@@ -68,6 +144,10 @@ class RedisRoomEventBus:
                 if len(parts) < 3:
                     continue
                 room_id = parts[1]
+                if room_id not in self._rooms:
+                    # In flight while the last local member left; skip the decode.
+                    self._stats["dropped_unsubscribed"] += 1
+                    continue
 
                 raw_data = message.get("data")
                 try:
@@ -75,13 +155,25 @@ class RedisRoomEventBus:
                 except Exception:
                     continue
 
+                self._stats["messages"] += 1
                 source_instance = str(data.get("source_instance") or "")
                 payload = data.get("payload") if isinstance(data.get("payload"), dict) else {}
                 payload["__bus_published_at"] = float(data.get("published_at") or 0.0)
                 await handler(room_id, payload, source_instance)
         finally:
+            async with self._sub_lock:
+                if self._pubsub is pubsub:
+                    self._pubsub = None
+                    self._subscribed.clear()
             await pubsub.close()
 
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "rooms_local": len(self._rooms),
+            "rooms_subscribed": len(self._subscribed),
+        }
+
 
 def build_room_event_bus(instance_id: str) -> RoomEventBus:
     enabled = str(os.getenv("ROOM_EVENT_BUS_ENABLED", "false")).strip().lower() in {"1", "true", "yes", "on"}
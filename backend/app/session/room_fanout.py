@@ -0,0 +1,281 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+logger = logging.getLogger("room_fanout")
+
+ROOM_FANOUT_QUEUE_MAX = max(4, int(os.getenv("ROOM_FANOUT_QUEUE_MAX", "256")))
+ROOM_FANOUT_LATENCY_WINDOW = max(16, int(os.getenv("ROOM_FANOUT_LATENCY_WINDOW", "512")))
+ROOM_FANOUT_COALESCE_TYPES = frozenset(
+    item.strip()
+    for item in str(
+        os.getenv(
+            "ROOM_FANOUT_COALESCE_TYPES",
+            "partial_transcript,speech_coaching,silence_coaching,waiting_for_interviewer,audio_health,sync_state",
+        )
+    ).split(",")
+    if item.strip()
+)
+
+FanoutSendFn = Callable[[Any, str], Awaitable[None]]
+FanoutOverflowFn = Callable[[Any], Awaitable[None]]
+
+
+def _percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round((pct / 100.0) * (len(sorted_values) - 1)))))
+    return sorted_values[index]
+
+
+class _OutboundChannel:
+    """Bounded, ordered outbound queue for one connection, drained by one writer task."""
+
+    __slots__ = ("conn", "room_id", "queue", "pending_by_type", "wakeup", "task", "closed")
+
+    def __init__(self, conn: Any, room_id: str):
+        self.conn = conn
+        self.room_id = room_id
+        # Entries are mutable [message_type, encoded, enqueued_at] so coalescing can rewrite in place.
+        self.queue: deque[list] = deque()
+        self.pending_by_type: dict[str, list] = {}
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task | None = None
+        self.closed = False
+
+
+class _RoomStats:
+    __slots__ = ("latencies_ms", "messages", "sent", "dropped", "coalesced", "failed", "overflows")
+
+    def __init__(self, window: int):
+        self.latencies_ms: deque[float] = deque(maxlen=window)
+        self.messages = 0
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.failed = 0
+        self.overflows = 0
+
+
+class RoomFanout:
+    """
+    Encode-once, concurrent fan-out of room payloads.
+
+    ``broadcast`` serializes the payload once and appends it to every member's
+    outbound queue without awaiting any socket, so one slow viewer never
+    delays the others (or the producer). Each connection has its own writer
+    task that drains its queue in order through ``send_fn``.
+
+    Queues are bounded. Message types in ``coalesce_types`` are latest-wins:
+    a newer payload replaces a still-queued one of the same type. When a
+    queue is full the oldest coalescable entry is dropped. Other types
+    (answer chunks, done markers) are deltas that are never dropped: if the
+    queue holds nothing coalescable, the consumer cannot keep up, so its
+    channel is closed and ``overflow_fn`` disconnects it; it resyncs from the
+    room snapshot on rejoin. Latency is measured per room from enqueue to
+    send completion and reported as p50/p95/p99 over a sliding window.
+    """
+
+    def __init__(
+        self,
+        send_fn: FanoutSendFn,
+        queue_max: int = ROOM_FANOUT_QUEUE_MAX,
+        coalesce_types: frozenset[str] = ROOM_FANOUT_COALESCE_TYPES,
+        latency_window: int = ROOM_FANOUT_LATENCY_WINDOW,
+        overflow_fn: FanoutOverflowFn | None = None,
+    ):
+        self._send_fn = send_fn
+        self._overflow_fn = overflow_fn
+        self._overflow_tasks: set[asyncio.Task] = set()
+        self._queue_max = max(1, int(queue_max))
+        self._coalesce_types = frozenset(coalesce_types)
+        self._latency_window = max(1, int(latency_window))
+        self._channels: dict[Any, _OutboundChannel] = {}
+        self._rooms: dict[str, dict[Any, _OutboundChannel]] = {}
+        self._room_stats: dict[str, _RoomStats] = {}
+        self._stats = {
+            "broadcasts": 0,
+            "encode_failures": 0,
+            "enqueued": 0,
+            "sent": 0,
+            "dropped": 0,
+            "coalesced": 0,
+            "send_failures": 0,
+            "overflows": 0,
+        }
+
+    # ─── Membership ──────────────────────────────────────────
+
+    def attach(self, room_id: str, conn: Any) -> None:
+        if not room_id or conn in self._channels:
+            return
+        channel = _OutboundChannel(conn, room_id)
+        channel.task = asyncio.get_running_loop().create_task(self._writer(channel))
+        self._channels[conn] = channel
+        self._rooms.setdefault(room_id, {})[conn] = channel
+        self._room_stats.setdefault(room_id, _RoomStats(self._latency_window))
+
+    async def detach(self, conn: Any) -> None:
+        channel = self._channels.pop(conn, None)
+        if channel is None:
+            return
+        channel.closed = True
+        members = self._rooms.get(channel.room_id)
+        if members is not None:
+            members.pop(conn, None)
+            if not members:
+                self._rooms.pop(channel.room_id, None)
+                self._room_stats.pop(channel.room_id, None)
+        task = channel.task
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+
+    # ─── Fan-out ─────────────────────────────────────────────
+
+    def broadcast(self, room_id: str, payload: dict, exclude: Any | None = None) -> int:
+        """Queue ``payload`` for every member except ``exclude``; returns targets queued."""
+        members = self._rooms.get(room_id)
+        if not members:
+            return 0
+        targets = [channel for conn, channel in members.items() if conn is not exclude and not channel.closed]
+        if not targets:
+            return 0
+        try:
+            encoded = json.dumps(payload)
+        except Exception as exc:
+            self._stats["encode_failures"] += 1
+            logger.warning("Room fanout encode failed | room_id=%s err=%s", room_id, exc)
+            return 0
+
+        message_type = str((payload or {}).get("type") or "")
+        coalescable = message_type in self._coalesce_types
+        now = time.perf_counter()
+        room_stats = self._room_stats.get(room_id)
+        if room_stats is not None:
+            room_stats.messages += 1
+        self._stats["broadcasts"] += 1
+
+        for channel in targets:
+            if coalescable:
+                queued = channel.pending_by_type.get(message_type)
+                if queued is not None:
+                    queued[1] = encoded
+                    self._count(room_stats, "coalesced")
+                    continue
+            if len(channel.queue) >= self._queue_max and not self._drop_one(channel, room_stats):
+                self._overflow(channel, room_stats)
+                continue
+            entry = [message_type, encoded, now]
+            channel.queue.append(entry)
+            if coalescable:
+                channel.pending_by_type[message_type] = entry
+            self._stats["enqueued"] += 1
+            channel.wakeup.set()
+        return len(targets)
+
+    def _drop_one(self, channel: _OutboundChannel, room_stats: _RoomStats | None) -> bool:
+        """Drop the oldest coalescable entry; False if there is none."""
+        victim = None
+        for entry in channel.queue:
+            if entry[0] in self._coalesce_types:
+                victim = entry
+                break
+        if victim is None:
+            return False
+        channel.queue.remove(victim)
+        if channel.pending_by_type.get(victim[0]) is victim:
+            channel.pending_by_type.pop(victim[0], None)
+        self._count(room_stats, "dropped")
+        return True
+
+    def _overflow(self, channel: _OutboundChannel, room_stats: _RoomStats | None) -> None:
+        # Dropping a delta would corrupt the consumer's answer; cut it off instead.
+        channel.closed = True
+        channel.queue.clear()
+        channel.pending_by_type.clear()
+        channel.wakeup.set()
+        self._count(room_stats, "overflows")
+        logger.warning("Room fanout overflow; disconnecting slow consumer | room_id=%s", channel.room_id)
+        if self._overflow_fn is not None:
+            task = asyncio.get_running_loop().create_task(self._overflow_fn(channel.conn))
+            self._overflow_tasks.add(task)
+            task.add_done_callback(self._overflow_tasks.discard)
+
+    def _count(self, room_stats: _RoomStats | None, field: str) -> None:
+        self._stats[field] += 1
+        if room_stats is not None:
+            setattr(room_stats, field, getattr(room_stats, field) + 1)
+
+    async def _writer(self, channel: _OutboundChannel) -> None:
+        queue = channel.queue
+        while not channel.closed:
+            if not queue:
+                channel.wakeup.clear()
+                await channel.wakeup.wait()
+                continue
+            entry = queue.popleft()
+            if channel.pending_by_type.get(entry[0]) is entry:
+                channel.pending_by_type.pop(entry[0], None)
+            room_stats = self._room_stats.get(channel.room_id)
+            try:
+                await self._send_fn(channel.conn, entry[1])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Socket is gone; stop writing and let unregister clean up.
+                self._stats["send_failures"] += 1
+                if room_stats is not None:
+                    room_stats.failed += 1
+                channel.closed = True
+                queue.clear()
+                channel.pending_by_type.clear()
+                return
+            self._stats["sent"] += 1
+            if room_stats is not None:
+                room_stats.sent += 1
+                room_stats.latencies_ms.append((time.perf_counter() - entry[2]) * 1000.0)
+
+    # ─── Stats ───────────────────────────────────────────────
+
+    def get_room_stats(self, room_id: str) -> dict[str, Any]:
+        room_stats = self._room_stats.get(room_id)
+        if room_stats is None:
+            return {}
+        ordered = sorted(room_stats.latencies_ms)
+        members = self._rooms.get(room_id) or {}
+        return {
+            "members": len(members),
+            "queued": sum(len(channel.queue) for channel in members.values()),
+            "messages": room_stats.messages,
+            "sent": room_stats.sent,
+            "dropped": room_stats.dropped,
+            "coalesced": room_stats.coalesced,
+            "send_failures": room_stats.failed,
+            "overflows": room_stats.overflows,
+            "latency_samples": len(ordered),
+            "p50_ms": round(_percentile(ordered, 50), 2),
+            "p95_ms": round(_percentile(ordered, 95), 2),
+            "p99_ms": round(_percentile(ordered, 99), 2),
+        }
+
+    def get_stats(self, top_rooms: int = 10) -> dict[str, Any]:
+        rooms = {room_id: self.get_room_stats(room_id) for room_id in self._room_stats}
+        slowest = sorted(rooms.items(), key=lambda item: item[1].get("p99_ms", 0.0), reverse=True)[:top_rooms]
+        return {
+            **self._stats,
+            "connections": len(self._channels),
+            "rooms": len(self._rooms),
+            "queue_max": self._queue_max,
+            "slowest_rooms": dict(slowest),
+        }
@@ -8,6 +8,9 @@ import time
 from typing import Protocol
 
 
+ROOM_STATE_PARTIAL_COALESCE_MS = max(0.0, float(os.getenv("ROOM_STATE_PARTIAL_COALESCE_MS", "250")))
+
+
 @dataclass
 class RoomState:
     active_question: str = ""
@@ -27,6 +30,9 @@ class RoomStateStore(Protocol):
     async def add_connection(self, room_id: str, connection_id: str) -> None:
         ...
 
+    async def join_room(self, room_id: str, connection_id: str) -> RoomState:
+        ...
+
     async def remove_connection(self, room_id: str, connection_id: str) -> None:
         ...
 
@@ -80,6 +86,10 @@ class LocalRoomStateStore:
             members = self._members.setdefault(room_id, set())
             members.add(connection_id)
 
+    async def join_room(self, room_id: str, connection_id: str) -> RoomState:
+        await self.add_connection(room_id, connection_id)
+        return await self.get_state(room_id)
+
     async def remove_connection(self, room_id: str, connection_id: str) -> None:
         if not room_id or not connection_id:
             return
@@ -98,15 +108,34 @@ class RedisRoomStateStore:
     Keys:
     - room:{room_id}:state (hash)
     - room:{room_id}:members (set)
+
+    Updates HSET only the fields they carry and read the merged hash back in
+    the same MULTI/EXEC, so concurrent writers on different instances never
+    overwrite each other's fields and each update is one round-trip.
+    Streaming ``partial_answer`` updates are coalesced to at most one write
+    per ``partial_coalesce_ms`` per room; the latest text always lands.
+    A deferred partial flush is tracked per room and every later write
+    awaits it first, so a stale partial can never land after the final
+    update and leave the room marked as streaming.
     """
 
-    def __init__(self, redis_url: str):
+    def __init__(self, redis_url: str, partial_coalesce_ms: float = ROOM_STATE_PARTIAL_COALESCE_MS):
         try:
             import redis.asyncio as redis_async  # type: ignore
         except Exception as exc:
             raise RuntimeError("redis package not installed; install 'redis' to enable distributed room state") from exc
 
         self._redis = redis_async.from_url(redis_url, decode_responses=True)
+        self._partial_coalesce_sec = max(0.0, float(partial_coalesce_ms) / 1000.0)
+        self._last_partial_write: dict[str, float] = {}
+        self._pending_partial: dict[str, dict] = {}
+        self._partial_timers: dict[str, asyncio.TimerHandle] = {}
+        self._partial_flushes: dict[str, asyncio.Task] = {}
+        self._stats = {
+            "updates": 0,
+            "writes": 0,
+            "partial_coalesced": 0,
+        }
 
     @staticmethod
     def _state_key(room_id: str) -> str:
@@ -116,10 +145,8 @@ class RedisRoomStateStore:
     def _members_key(room_id: str) -> str:
         return f"room:{room_id}:members"
 
-    async def get_state(self, room_id: str) -> RoomState:
-        if not room_id:
-            return RoomState()
-        data = await self._redis.hgetall(self._state_key(room_id))
+    @staticmethod
+    def _from_hash(data: dict) -> RoomState:
         if not data:
             return RoomState()
         return RoomState(
@@ -130,40 +157,130 @@ class RedisRoomStateStore:
             updated_at=float(data.get("updated_at") or 0.0),
         )
 
+    @staticmethod
+    def _to_fields(updates: dict) -> dict[str, str]:
+        """Normalize only the fields present in ``updates`` to their hash encoding."""
+        fields: dict[str, str] = {}
+        if "active_question" in updates:
+            fields["active_question"] = str(updates.get("active_question") or "")
+        if "partial_answer" in updates:
+            fields["partial_answer"] = str(updates.get("partial_answer") or "")
+        if "is_streaming" in updates:
+            fields["is_streaming"] = json.dumps(bool(updates.get("is_streaming")))
+        if "assist_intensity" in updates:
+            fields["assist_intensity"] = str(max(1, int(updates.get("assist_intensity") or 2)))
+        fields["updated_at"] = str(float(updates.get("updated_at") or time.time()))
+        return fields
+
+    async def get_state(self, room_id: str) -> RoomState:
+        if not room_id:
+            return RoomState()
+        return self._from_hash(await self._redis.hgetall(self._state_key(room_id)))
+
     async def update_state(self, room_id: str, updates: dict) -> RoomState:
         if not room_id:
             return RoomState()
+        updates = dict(updates or {})
+        self._stats["updates"] += 1
 
-        current = await self.get_state(room_id)
-        merged = RoomState(
-            active_question=str(updates.get("active_question", current.active_question) or ""),
-            partial_answer=str(updates.get("partial_answer", current.partial_answer) or ""),
-            is_streaming=bool(updates.get("is_streaming", current.is_streaming)),
-            assist_intensity=max(1, int(updates.get("assist_intensity", current.assist_intensity or 2))),
-            updated_at=float(updates.get("updated_at") or time.time()),
-        )
+        if self._is_streaming_partial(updates) and self._partial_coalesce_sec > 0:
+            loop = asyncio.get_running_loop()
+            since_last = loop.time() - self._last_partial_write.get(room_id, 0.0)
+            if since_last < self._partial_coalesce_sec:
+                self._pending_partial[room_id] = updates
+                self._stats["partial_coalesced"] += 1
+                if room_id not in self._partial_timers:
+                    self._partial_timers[room_id] = loop.call_later(
+                        self._partial_coalesce_sec - since_last,
+                        self._flush_partial_soon,
+                        room_id,
+                    )
+                return self._from_hash(self._to_fields(updates))
 
-        await self._redis.hset(
-            self._state_key(room_id),
-            mapping={
-                "active_question": merged.active_question,
-                "partial_answer": merged.partial_answer,
-                "is_streaming": json.dumps(merged.is_streaming),
-                "assist_intensity": str(merged.assist_intensity),
-                "updated_at": str(merged.updated_at),
-            },
-        )
-        return merged
+        # Anything queued for this room is older than this update: merge it underneath.
+        pending = self._take_pending(room_id)
+        if pending:
+            updates = {**pending, **updates}
+        flush = self._partial_flushes.get(room_id)
+        if flush is not None:
+            # Let an already-started flush land first; it carries older text.
+            await asyncio.shield(flush)
+        return await self._write(room_id, updates)
+
+    @staticmethod
+    def _is_streaming_partial(updates: dict) -> bool:
+        return "partial_answer" in updates and bool(updates.get("is_streaming"))
+
+    def _take_pending(self, room_id: str) -> dict | None:
+        timer = self._partial_timers.pop(room_id, None)
+        if timer is not None:
+            timer.cancel()
+        return self._pending_partial.pop(room_id, None)
+
+    def _flush_partial_soon(self, room_id: str) -> None:
+        self._partial_timers.pop(room_id, None)
+        pending = self._pending_partial.pop(room_id, None)
+        if pending:
+            previous = self._partial_flushes.get(room_id)
+            self._partial_flushes[room_id] = asyncio.ensure_future(self._write_quietly(room_id, pending, previous))
+
+    async def _write_quietly(self, room_id: str, updates: dict, previous: asyncio.Task | None = None) -> None:
+        try:
+            if previous is not None:
+                await asyncio.shield(previous)
+            await self._write(room_id, updates)
+        except Exception:
+            pass  # next streaming update or the final update rewrites the state
+        finally:
+            if self._partial_flushes.get(room_id) is asyncio.current_task():
+                self._partial_flushes.pop(room_id, None)
+
+    async def _write(self, room_id: str, updates: dict) -> RoomState:
+        fields = self._to_fields(updates)
+        if self._is_streaming_partial(updates):
+            self._last_partial_write[room_id] = asyncio.get_running_loop().time()
+        elif "is_streaming" in updates:
+            self._last_partial_write.pop(room_id, None)
+        key = self._state_key(room_id)
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(key, mapping=fields)
+        pipe.hgetall(key)
+        _, data = await pipe.execute()
+        self._stats["writes"] += 1
+        return self._from_hash(data)
 
     async def add_connection(self, room_id: str, connection_id: str) -> None:
         if not room_id or not connection_id:
             return
         await self._redis.sadd(self._members_key(room_id), connection_id)
 
+    async def join_room(self, room_id: str, connection_id: str) -> RoomState:
+        """Add the member and read the room state in one round-trip."""
+        if not room_id:
+            return RoomState()
+        pipe = self._redis.pipeline(transaction=False)
+        if connection_id:
+            pipe.sadd(self._members_key(room_id), connection_id)
+        pipe.hgetall(self._state_key(room_id))
+        results = await pipe.execute()
+        return self._from_hash(results[-1])
+
     async def remove_connection(self, room_id: str, connection_id: str) -> None:
         if not room_id or not connection_id:
             return
-        await self._redis.srem(self._members_key(room_id), connection_id)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.srem(self._members_key(room_id), connection_id)
+        pipe.scard(self._members_key(room_id))
+        _, remaining = await pipe.execute()
+        if not remaining and room_id not in self._pending_partial:
+            # Room closed: its coalescing window no longer matters.
+            self._last_partial_write.pop(room_id, None)
+
+    def get_stats(self) -> dict:
+        return {
+            **self._stats,
+            "partial_pending": len(self._pending_partial),
+        }
 
 
 def build_room_state_store() -> RoomStateStore:
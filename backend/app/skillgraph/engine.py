@@ -1,8 +1,8 @@
 from __future__ import annotations
 
-import re
 from threading import Lock
 
+from app.context.skill_matcher import SkillMatcher, get_skill_matcher
 from app.skillgraph.models import SkillNode, SkillTarget
 
 
@@ -18,6 +18,7 @@ class SkillGraph:
     def __init__(self, skills: dict[str, SkillNode] | None = None):
         self.skills: dict[str, SkillNode] = skills or {}
         self._lock = Lock()
+        self._matcher: SkillMatcher | None = None
 
     @classmethod
     def from_contexts(
@@ -97,9 +98,16 @@ class SkillGraph:
             return 2
         return 3
 
+    def _get_matcher(self) -> SkillMatcher:
+        # Nodes are keyed by normalized name, so the matcher's vocabulary is the key set.
+        matcher = self._matcher
+        if matcher is None:
+            with self._lock:
+                matcher = self._matcher = get_skill_matcher(self.skills.keys())
+        return matcher
+
     def _skill_present(self, answer_text: str, skill_name: str) -> bool:
-        pattern = r"(?<!\\w)" + re.escape(skill_name.lower().strip()) + r"(?!\\w)"
-        return re.search(pattern, (answer_text or "").lower()) is not None
+        return self._get_matcher().present(answer_text or "", skill_name)
 
     def _compute_coverage(self, node: SkillNode) -> float:
         if node.jd_required:
@@ -172,6 +180,7 @@ class SkillGraph:
             if node is None:
                 node = SkillNode(name=skill_name)
                 self.skills[key] = node
+                self._matcher = None
 
             node.evidence_count += 1
             count = node.evidence_count
@@ -183,12 +192,13 @@ class SkillGraph:
 
     def update_from_answer(self, answer_text: str, confidence: float, depth_signal: float, turn_index: int) -> list[str]:
         matched: list[str] = []
+        present = self._get_matcher().find_all(answer_text or "")
         with self._lock:
-            keys = list(self.skills.keys())
+            keys = [key for key in self.skills.keys() if key in present]
 
         for key in keys:
             node = self.skills.get(key)
-            if node and self._skill_present(answer_text, node.name):
+            if node:
                 self.update_evidence(node.name, confidence=confidence, depth_signal=depth_signal, turn_index=turn_index)
                 matched.append(node.name)
 
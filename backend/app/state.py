@@ -1,10 +1,15 @@
+import asyncio
+import itertools
 import json
 import logging
 import math
+import os
+import threading
 import time
+import zlib
 from pathlib import Path
 from threading import Lock
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from app.company_modes import normalize_company_mode
 
 logger = logging.getLogger("app.state")
@@ -42,10 +47,41 @@ def _empty_context() -> Dict[str, Any]:
     }
 
 
-_state_lock = Lock()
+# Lock striping: a user's context is only ever mutated under its shard lock,
+# so requests for different users do not serialize behind each other.
+# Redis I/O happens after the shard lock is released; a separate striped
+# I/O lock plus a write sequence keeps Redis writes in order. Per-user
+# bookkeeping exists only while that user has writes in flight.
+_SHARD_COUNT = max(1, int(os.getenv("USER_CONTEXT_SHARDS", "64")))
+_shard_locks = [Lock() for _ in range(_SHARD_COUNT)]
+_io_locks = [Lock() for _ in range(_SHARD_COUNT)]
+_redis_write_seq = itertools.count(1)
+_pending_writes_by_user_id: Dict[str, int] = {}
+_written_seq_by_user_id: Dict[str, int] = {}
+_wal_lock = Lock()
 _store_path = Path(__file__).resolve().parents[1] / "data" / "user_context_store.json"
 user_context_by_user_id: Dict[str, Dict[str, Any]] = {}
 
+# Bumped whenever a user's resume or job description changes, so prompt
+# caches can tell a stale prefix without refetching context. With Redis the
+# version lives there (shared by all workers); this map is the local store.
+_context_version_by_user_id: Dict[str, int] = {}
+
+# ─── Local persistence: snapshot + write-ahead append log ────────────
+# Without Redis, each mutation appends one per-user delta line to the WAL
+# instead of rewriting the whole snapshot. A background thread folds the
+# WAL into the snapshot every _WAL_COMPACT_EVERY records; startup loads
+# the snapshot and replays any WAL records newer than its sequence number.
+_wal_path = _store_path.with_suffix(".wal")
+_wal_compacting_path = _store_path.with_suffix(".wal.compacting")
+_WAL_SEQ_KEY = "__wal_seq__"
+_WAL_COMPACT_EVERY = max(1, int(os.getenv("USER_CONTEXT_WAL_COMPACT_EVERY", "1000")))
+_WAL_FSYNC = os.getenv("USER_CONTEXT_WAL_FSYNC", "false").lower() in {"1", "true", "yes"}
+_wal_file = None
+_wal_seq = 0
+_wal_records_since_compact = 0
+_wal_compacting = False
+
 # ─── Redis integration (lazy init) ───────────────────────────────────
 _redis_ctx_store = None
 _redis_ctx_checked = False
@@ -73,6 +109,14 @@ def _get_redis_ctx_store():
     return _redis_ctx_store
 
 
+def _shard_index(user_id: str) -> int:
+    return zlib.crc32(str(user_id).encode("utf-8")) % _SHARD_COUNT
+
+
+def _user_lock(user_id: str) -> Lock:
+    return _shard_locks[_shard_index(user_id)]
+
+
 def _sanitize_context(raw: Any) -> Dict[str, Any]:
     base = _empty_context()
     if not isinstance(raw, dict):
@@ -117,73 +161,299 @@ def _sanitize_context(raw: Any) -> Dict[str, Any]:
     return base
 
 
-def _load_store() -> None:
-    global user_context_by_user_id
-    if not _store_path.exists():
-        user_context_by_user_id = {}
-        return
+def _read_snapshot(path: Path) -> tuple[Dict[str, Dict[str, Any]], int]:
+    """Load a snapshot file. Returns (store, last WAL sequence folded into it)."""
+    if not path.exists():
+        return {}, 0
+    try:
+        payload = json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}, 0
+    if not isinstance(payload, dict):
+        return {}, 0
 
     try:
-        payload = json.loads(_store_path.read_text(encoding="utf-8"))
-        if not isinstance(payload, dict):
-            user_context_by_user_id = {}
-            return
-
-        loaded: Dict[str, Dict[str, Any]] = {}
-        for key, value in payload.items():
-            if isinstance(key, str) and key.strip():
-                loaded[key] = _sanitize_context(value)
-        user_context_by_user_id = loaded
+        seq = int(payload.get(_WAL_SEQ_KEY) or 0)
     except Exception:
-        user_context_by_user_id = {}
+        seq = 0
+    loaded: Dict[str, Dict[str, Any]] = {}
+    for key, value in payload.items():
+        if isinstance(key, str) and key.strip() and key != _WAL_SEQ_KEY:
+            loaded[key] = _sanitize_context(value)
+    return loaded, seq
+
+
+def _write_snapshot(path: Path, store: Dict[str, Dict[str, Any]], seq: int) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix(".tmp")
+    payload = {**store, _WAL_SEQ_KEY: seq}
+    temp_path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+    temp_path.replace(path)
+
+
+def _apply_wal_record(store: Dict[str, Dict[str, Any]], record: Any) -> Optional[str]:
+    """Apply one delta record to ``store``. Returns the touched user id."""
+    if not isinstance(record, dict):
+        return None
+    user_id = record.get("u")
+    if not isinstance(user_id, str) or not user_id.strip():
+        return None
+
+    if "ctx" in record:
+        store[user_id] = _sanitize_context(record.get("ctx"))
+        return user_id
+
+    context = store.setdefault(user_id, _empty_context())
+    changes = record.get("set")
+    if isinstance(changes, dict):
+        context.update(changes)
+    push = record.get("push")
+    if isinstance(push, list) and len(push) == 3 and isinstance(push[0], str):
+        key, item, cap = push
+        history = context.get(key) if isinstance(context.get(key), list) else []
+        history.append(item)
+        context[key] = history[-max(1, int(cap or 1)):]
+    return user_id
+
+
+def _replay_wal(store: Dict[str, Dict[str, Any]], path: Path, after_seq: int) -> tuple[int, int]:
+    """Replay WAL records with seq > after_seq. Returns (last seq seen, records applied)."""
+    if not path.exists():
+        return after_seq, 0
+    last_seq = after_seq
+    applied = 0
+    touched: set[str] = set()
+    with path.open("r", encoding="utf-8") as handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                seq = int(record.get("s") or 0)
+            except Exception:
+                # Torn tail write from a crash; everything after it is suspect.
+                break
+            if seq <= after_seq:
+                continue
+            user_id = _apply_wal_record(store, record)
+            if user_id:
+                touched.add(user_id)
+            last_seq = max(last_seq, seq)
+            applied += 1
+    for user_id in touched:
+        store[user_id] = _sanitize_context(store[user_id])
+    return last_seq, applied
 
 
-def _persist_store(user_id: str = "") -> None:
-    """Persist to Redis if available, otherwise JSON file."""
+def _load_store() -> None:
+    global user_context_by_user_id, _wal_seq, _wal_records_since_compact
+    loaded, seq = _read_snapshot(_store_path)
+    applied_total = 0
+    for path in (_wal_compacting_path, _wal_path):
+        try:
+            seq, applied = _replay_wal(loaded, path, seq)
+            applied_total += applied
+        except Exception as exc:
+            logger.warning("User context WAL replay failed for %s: %s", path.name, exc)
+    user_context_by_user_id = loaded
+    _wal_seq = seq
+    _wal_records_since_compact = applied_total
+
+
+def _wal_append(record: Dict[str, Any]) -> None:
+    """Append one delta record. Caller must hold the user's shard lock."""
+    global _wal_file, _wal_seq, _wal_records_since_compact
+    line_body = json.dumps(record, ensure_ascii=False)
+    with _wal_lock:
+        _wal_seq += 1
+        if _wal_file is None:
+            _wal_path.parent.mkdir(parents=True, exist_ok=True)
+            _wal_file = _wal_path.open("a", encoding="utf-8")
+        # Sequence number is spliced in so serialization stays outside _wal_lock.
+        _wal_file.write('{"s": %d, %s\n' % (_wal_seq, line_body[1:]))
+        _wal_file.flush()
+        if _WAL_FSYNC:
+            os.fsync(_wal_file.fileno())
+        _wal_records_since_compact += 1
+        if _wal_records_since_compact >= _WAL_COMPACT_EVERY:
+            _start_compaction()
+
+
+def _start_compaction() -> None:
+    """Kick off background compaction. Caller must hold _wal_lock."""
+    global _wal_compacting
+    if _wal_compacting:
+        return
+    _wal_compacting = True
+    threading.Thread(target=_compact_wal, name="user-context-wal-compact", daemon=True).start()
+
+
+def _compact_wal() -> None:
+    """Fold the WAL into the snapshot without touching live in-memory state."""
+    global _wal_file, _wal_records_since_compact, _wal_compacting
+    try:
+        with _wal_lock:
+            if _wal_file is not None:
+                _wal_file.close()
+                _wal_file = None
+            if _wal_path.exists():
+                if _wal_compacting_path.exists():
+                    # Leftover from an interrupted compaction: merge, keeping order.
+                    with _wal_compacting_path.open("a", encoding="utf-8") as dst:
+                        dst.write(_wal_path.read_text(encoding="utf-8"))
+                    _wal_path.unlink()
+                else:
+                    _wal_path.replace(_wal_compacting_path)
+            _wal_records_since_compact = 0
+
+        # Slow part runs outside the lock: rebuild from files, not from live dicts.
+        store, seq = _read_snapshot(_store_path)
+        seq, _ = _replay_wal(store, _wal_compacting_path, seq)
+        _write_snapshot(_store_path, store, seq)
+        _wal_compacting_path.unlink(missing_ok=True)
+    except Exception as exc:
+        logger.warning("User context WAL compaction failed: %s", exc)
+    finally:
+        _wal_compacting = False
+
+
+def _persist_store(
+    user_id: str = "",
+    changes: Optional[Dict[str, Any]] = None,
+    push: Optional[tuple[str, dict, int]] = None,
+) -> Optional[tuple[int, str]]:
+    """Persist a user's change. Caller must hold the user's shard lock.
+
+    Locally, appends a delta to the WAL: ``changes`` maps top-level context
+    keys to their new values; ``push`` is (history_key, item, cap) for
+    bounded history appends; with neither, the full context is logged.
+
+    With Redis, the context is only serialized here. The returned
+    (sequence, payload) must be passed to ``_flush_redis`` after the shard
+    lock is released.
+    """
     rstore = _get_redis_ctx_store()
     if rstore is not None and user_id:
-        rstore.put(user_id, user_context_by_user_id.get(user_id, _empty_context()))
+        seq = next(_redis_write_seq)
+        _pending_writes_by_user_id[user_id] = _pending_writes_by_user_id.get(user_id, 0) + 1
+        payload = json.dumps(user_context_by_user_id.get(user_id, _empty_context()), ensure_ascii=False, default=str)
+        return seq, payload
+    if not user_id:
+        with _wal_lock:
+            _write_snapshot(_store_path, user_context_by_user_id, _wal_seq)
+        return None
+
+    if changes is None and push is None:
+        record: Dict[str, Any] = {"u": user_id, "ctx": user_context_by_user_id.get(user_id, _empty_context())}
+    else:
+        record = {"u": user_id}
+        if changes:
+            record["set"] = changes
+        if push is not None:
+            record["push"] = list(push)
+    try:
+        _wal_append(record)
+    except Exception as exc:
+        logger.warning("User context WAL append failed: %s", exc)
+    return None
+
+
+def _flush_redis(user_id: str, pending: Optional[tuple[int, str]]) -> None:
+    """Write a serialized context to Redis outside the shard lock, dropping stale writes."""
+    if pending is None:
         return
-    # Fallback: JSON file
-    _store_path.parent.mkdir(parents=True, exist_ok=True)
-    temp_path = _store_path.with_suffix(".tmp")
-    temp_path.write_text(json.dumps(user_context_by_user_id, ensure_ascii=False), encoding="utf-8")
-    temp_path.replace(_store_path)
+    rstore = _get_redis_ctx_store()
+    if rstore is None:
+        return
+    seq, payload = pending
+    shard = _shard_index(user_id)
+    with _io_locks[shard]:
+        try:
+            # A newer snapshot of this user may already have landed.
+            if seq > _written_seq_by_user_id.get(user_id, 0):
+                rstore.put_raw(user_id, payload)
+                _written_seq_by_user_id[user_id] = seq
+        finally:
+            with _shard_locks[shard]:
+                remaining = _pending_writes_by_user_id.get(user_id, 1) - 1
+                if remaining > 0:
+                    _pending_writes_by_user_id[user_id] = remaining
+                else:
+                    # Nothing in flight: later writes get higher sequences anyway.
+                    _pending_writes_by_user_id.pop(user_id, None)
+                    _written_seq_by_user_id.pop(user_id, None)
+
+
+def _bump_context_version(user_id: str) -> None:
+    """Caller holds the user's shard lock."""
+    _context_version_by_user_id[user_id] = _context_version_by_user_id.get(user_id, 0) + 1
+
+
+def _publish_context_version(user_id: str) -> None:
+    """Bump the shared version after the new context has been flushed to Redis."""
+    rstore = _get_redis_ctx_store()
+    if rstore is not None:
+        rstore.incr_version(user_id)
+
+
+def get_context_version(user_id: str) -> int:
+    """Version of the user's resume/JD: one Redis GET when shared, else in-process."""
+    rstore = _get_redis_ctx_store()
+    if rstore is not None:
+        version = rstore.get_version(user_id)
+        if version is not None:
+            return version
+    return _context_version_by_user_id.get(user_id, 0)
 
 
 def get_user_context(user_id: str) -> Dict[str, Any]:
-    with _state_lock:
-        # Try Redis first
-        rstore = _get_redis_ctx_store()
-        if rstore is not None:
-            cached = rstore.get(user_id)
-            if cached is not None:
-                ctx = _sanitize_context(cached)
+    rstore = _get_redis_ctx_store()
+    if rstore is not None:
+        cached = rstore.get(user_id)  # network round-trip, no lock held
+        if cached is not None:
+            ctx = _sanitize_context(cached)
+            with _user_lock(user_id):
+                previous = user_context_by_user_id.get(user_id)
+                if previous is not None and _pending_writes_by_user_id.get(user_id):
+                    # The read raced a local write that has not reached Redis yet.
+                    return previous
                 user_context_by_user_id[user_id] = ctx
-                return ctx
+            return ctx
 
-        if user_id not in user_context_by_user_id:
-            user_context_by_user_id[user_id] = _empty_context()
-            _persist_store(user_id)
-        return user_context_by_user_id[user_id]
+    pending = None
+    with _user_lock(user_id):
+        context = user_context_by_user_id.get(user_id)
+        if context is None:
+            context = _empty_context()
+            user_context_by_user_id[user_id] = context
+            pending = _persist_store(user_id)
+    _flush_redis(user_id, pending)
+    return context
 
 
 def set_resume_text(user_id: str, text: str) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         context["resume_text"] = text
-        _persist_store(user_id)
+        _bump_context_version(user_id)
+        pending = _persist_store(user_id, {"resume_text": text})
+    _flush_redis(user_id, pending)
+    _publish_context_version(user_id)
 
 
 def set_job_description(user_id: str, description: str) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         context["job_description"] = description
-        _persist_store(user_id)
+        _bump_context_version(user_id)
+        pending = _persist_store(user_id, {"job_description": description})
+    _flush_redis(user_id, pending)
+    _publish_context_version(user_id)
 
 
 def mark_interview_started(user_id: str, session_id: str, role: str, question: str) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         context["interview"] = {
             "session_id": session_id,
@@ -194,11 +464,12 @@ def mark_interview_started(user_id: str, session_id: str, role: str, question: s
             "last_payload": None,
             "updated_at": time.time(),
         }
-        _persist_store(user_id)
+        pending = _persist_store(user_id, {"interview": context["interview"]})
+    _flush_redis(user_id, pending)
 
 
 def mark_interview_update(user_id: str, session_id: str, payload: dict) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         interview = context.get("interview") if isinstance(context.get("interview"), dict) else {}
         interview["session_id"] = session_id
@@ -210,23 +481,27 @@ def mark_interview_update(user_id: str, session_id: str, payload: dict) -> None:
         interview["updated_at"] = time.time()
         context["interview"] = interview
 
+        history_push = None
         if interview["done"]:
             history = context.get("interview_history") if isinstance(context.get("interview_history"), list) else []
-            history.append({
+            item = {
                 "session_id": session_id,
                 "role": str(interview.get("role") or ""),
                 "score": payload.get("score"),
                 "decision": payload.get("decision"),
                 "evaluations_count": len(payload.get("evaluations") or []),
                 "finished_at": interview["updated_at"],
-            })
+            }
+            history.append(item)
             context["interview_history"] = history[-50:]
+            history_push = ("interview_history", item, 50)
 
-        _persist_store(user_id)
+        pending = _persist_store(user_id, {"interview": interview}, history_push)
+    _flush_redis(user_id, pending)
 
 
 def mark_credibility_snapshot(user_id: str, snapshot: dict) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         now = time.time()
         context["credibility"] = {
@@ -235,7 +510,7 @@ def mark_credibility_snapshot(user_id: str, snapshot: dict) -> None:
         }
 
         history = context.get("credibility_history") if isinstance(context.get("credibility_history"), list) else []
-        history.append({
+        item = {
             "session_id": str(snapshot.get("session_id") or ""),
             "consistency_score": float(snapshot.get("consistency_score") or 0.0),
             "leadership_credibility": float(snapshot.get("leadership_credibility") or 0.0),
@@ -243,17 +518,20 @@ def mark_credibility_snapshot(user_id: str, snapshot: dict) -> None:
             "blind_spot_index": float(snapshot.get("blind_spot_index") or 0.0),
             "risk_count": len(snapshot.get("high_risk_skills") or []),
             "captured_at": now,
-        })
+        }
+        history.append(item)
         context["credibility_history"] = history[-100:]
-        _persist_store(user_id)
+        pending = _persist_store(user_id, {"credibility": context["credibility"]}, ("credibility_history", item, 100))
+    _flush_redis(user_id, pending)
 
 
 def set_company_mode(user_id: str, company_mode: str) -> str:
     normalized = normalize_company_mode(company_mode)
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         context["company_mode"] = normalized
-        _persist_store(user_id)
+        pending = _persist_store(user_id, {"company_mode": normalized})
+    _flush_redis(user_id, pending)
     return normalized
 
 
@@ -377,12 +655,13 @@ def get_user_snapshot(user_id: str) -> Dict[str, Any]:
 
 def set_assist_intensity(user_id: str, level: int) -> int:
     normalized = max(1, min(int(level or 2), 3))
-    with _state_lock:
+    with _user_lock(user_id):
         context = user_context_by_user_id.setdefault(user_id, _empty_context())
         assist = context.get("assist") if isinstance(context.get("assist"), dict) else {}
         assist["intensity"] = normalized
         context["assist"] = assist
-        _persist_store(user_id)
+        pending = _persist_store(user_id, {"assist": assist})
+    _flush_redis(user_id, pending)
     return normalized
 
 
@@ -597,9 +876,45 @@ def compute_offer_probability(sessions: list[dict[str, Any]], company_mode: str)
 
 
 def reset_user_context(user_id: str) -> None:
-    with _state_lock:
+    with _user_lock(user_id):
         user_context_by_user_id[user_id] = _empty_context()
-        _persist_store(user_id)
+        _bump_context_version(user_id)
+        pending = _persist_store(user_id)
+    _flush_redis(user_id, pending)
+    _publish_context_version(user_id)
+
+
+
+# ─── Async API ───────────────────────────────────────────────────────
+# Thin wrappers for event-loop callers: the sync functions may block on
+# Redis or file I/O, so they run in the default thread pool.
+
+async def get_context_version_async(user_id: str) -> int:
+    return await asyncio.to_thread(get_context_version, user_id)
+
+
+async def get_user_context_async(user_id: str) -> Dict[str, Any]:
+    return await asyncio.to_thread(get_user_context, user_id)
+
+
+async def set_resume_text_async(user_id: str, text: str) -> None:
+    await asyncio.to_thread(set_resume_text, user_id, text)
+
+
+async def set_job_description_async(user_id: str, description: str) -> None:
+    await asyncio.to_thread(set_job_description, user_id, description)
+
+
+async def mark_interview_update_async(user_id: str, session_id: str, payload: dict) -> None:
+    await asyncio.to_thread(mark_interview_update, user_id, session_id, payload)
+
+
+async def mark_credibility_snapshot_async(user_id: str, snapshot: dict) -> None:
+    await asyncio.to_thread(mark_credibility_snapshot, user_id, snapshot)
+
+
+async def get_dashboard_overview_async(user_id: str) -> dict:
+    return await asyncio.to_thread(get_dashboard_overview, user_id)
 
 
 _load_store()
@@ -1,5 +1,7 @@
+import math
 import threading
 import time
+from bisect import bisect_left
 from typing import Any
 
 
@@ -17,21 +19,142 @@ _metrics: dict[str, float] = {
     "ws_disconnect_other": 0.0,
     "answer_streams_started": 0.0,
     "answer_streams_cancelled": 0.0,
+    "answer_streams_active": 0.0,
+    "answer_stream_tokens_total": 0.0,
+    "answer_stream_frames_total": 0.0,
+    "answer_stream_frames_saved_total": 0.0,
     "emotional_events_emitted": 0.0,
     "assist_hints_emitted": 0.0,
     "share_tokens_active": 0.0,
     "share_tokens_revoked": 0.0,
-    "stream_duration_total_sec": 0.0,
-    "stream_duration_samples": 0.0,
-    "latency_total_ms": 0.0,
-    "latency_samples": 0.0,
-    "redis_publish_total_ms": 0.0,
-    "redis_publish_samples": 0.0,
-    "fanout_delay_total_ms": 0.0,
-    "fanout_delay_samples": 0.0,
 }
 
 
+def _geometric_bounds(lowest: float, highest: float, factor: float) -> tuple[float, ...]:
+    bounds = []
+    value = lowest
+    while value < highest:
+        bounds.append(round(value, 4))
+        value *= factor
+    bounds.append(highest)
+    return tuple(bounds)
+
+
+# 0.25 ms .. 120 s, 25% relative bucket width (interpolated quantiles land well inside that).
+LATENCY_BUCKETS_MS = _geometric_bounds(0.25, 120_000.0, 1.25)
+
+
+def quantile_from_counts(counts, bounds: tuple[float, ...], q: float) -> float:
+    """Quantile ``q`` of a bucketed distribution, interpolated within the bucket."""
+    observed = sum(counts)
+    if observed <= 0:
+        return 0.0
+    rank = q * observed
+    cumulative = 0
+    for index, bucket_count in enumerate(counts):
+        if bucket_count and cumulative + bucket_count >= rank:
+            lower = bounds[index - 1] if index > 0 else 0.0
+            upper = bounds[index] if index < len(bounds) else bounds[-1]
+            fraction = (rank - cumulative) / bucket_count
+            return lower + (upper - lower) * fraction
+        cumulative += bucket_count
+    return bounds[-1]
+
+
+class _HistogramShard:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size
+        self.total = 0.0
+        self.count = 0
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket histogram with per-thread shards.
+
+    ``observe`` only touches the calling thread's shard, so the hot path
+    takes no lock; the lock is held only when a thread creates its shard
+    and when a snapshot merges them. Values above the last bound land in
+    an overflow bucket.
+    """
+
+    def __init__(self, name: str, bounds: tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.name = name
+        self.bounds = bounds
+        self._local = threading.local()
+        self._shards: list[_HistogramShard] = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> _HistogramShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _HistogramShard(len(self.bounds) + 1)
+            with self._shards_lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def observe(self, value: float) -> None:
+        value = max(0.0, float(value or 0.0))
+        shard = self._shard()
+        shard.counts[bisect_left(self.bounds, value)] += 1
+        shard.total += value
+        shard.count += 1
+
+    def merged(self) -> tuple[list[int], float, int]:
+        counts = [0] * (len(self.bounds) + 1)
+        total = 0.0
+        count = 0
+        with self._shards_lock:
+            shards = list(self._shards)
+        for shard in shards:
+            for index, value in enumerate(shard.counts):
+                counts[index] += value
+            total += shard.total
+            count += shard.count
+        return counts, total, count
+
+    def quantile(self, q: float, counts: list[int] | None = None) -> float:
+        if counts is None:
+            counts = self.merged()[0]
+        return quantile_from_counts(counts, self.bounds, q)
+
+    def summary(self, merged: tuple[list[int], float, int] | None = None) -> dict[str, float]:
+        counts, total, count = merged or self.merged()
+        return {
+            "count": count,
+            "mean": round(total / count, 3) if count else 0.0,
+            "p50": round(self.quantile(0.50, counts), 3),
+            "p95": round(self.quantile(0.95, counts), 3),
+            "p99": round(self.quantile(0.99, counts), 3),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        """Summary plus per-bucket counts keyed by inclusive upper bound."""
+        merged = self.merged()
+        labels = [str(bound) for bound in self.bounds] + ["+Inf"]
+        return {"buckets": dict(zip(labels, merged[0])), **self.summary(merged)}
+
+
+_histograms: dict[str, LatencyHistogram] = {
+    "latency_ms": LatencyHistogram("latency_ms"),
+    "redis_publish_ms": LatencyHistogram("redis_publish_ms"),
+    "fanout_delay_ms": LatencyHistogram("fanout_delay_ms"),
+    "stream_duration_ms": LatencyHistogram("stream_duration_ms"),
+    "time_to_first_token_ms": LatencyHistogram("time_to_first_token_ms"),
+}
+
+
+def get_histogram(name: str) -> LatencyHistogram:
+    histogram = _histograms.get(name)
+    if histogram is None:
+        with _lock:
+            histogram = _histograms.setdefault(name, LatencyHistogram(name))
+    return histogram
+
+
 def increment_metric(name: str, amount: float = 1.0) -> None:
     key = str(name or "").strip()
     if not key:
@@ -57,32 +180,29 @@ def set_metric(name: str, value: float) -> None:
         _metrics[key] = max(0.0, float(value))
 
 
-def observe_stream_duration(seconds: float) -> None:
-    duration = max(0.0, float(seconds or 0.0))
+def get_metric(name: str) -> float:
     with _lock:
-        _metrics["stream_duration_total_sec"] = float(_metrics.get("stream_duration_total_sec", 0.0)) + duration
-        _metrics["stream_duration_samples"] = float(_metrics.get("stream_duration_samples", 0.0)) + 1.0
+        return float(_metrics.get(str(name or "").strip(), 0.0))
+
+
+def observe_stream_duration(seconds: float) -> None:
+    _histograms["stream_duration_ms"].observe(max(0.0, float(seconds or 0.0)) * 1000.0)
 
 
 def observe_latency_ms(value_ms: float) -> None:
-    latency = max(0.0, float(value_ms or 0.0))
-    with _lock:
-        _metrics["latency_total_ms"] = float(_metrics.get("latency_total_ms", 0.0)) + latency
-        _metrics["latency_samples"] = float(_metrics.get("latency_samples", 0.0)) + 1.0
+    _histograms["latency_ms"].observe(value_ms)
 
 
 def observe_redis_publish_latency_ms(value_ms: float) -> None:
-    latency = max(0.0, float(value_ms or 0.0))
-    with _lock:
-        _metrics["redis_publish_total_ms"] = float(_metrics.get("redis_publish_total_ms", 0.0)) + latency
-        _metrics["redis_publish_samples"] = float(_metrics.get("redis_publish_samples", 0.0)) + 1.0
+    _histograms["redis_publish_ms"].observe(value_ms)
 
 
 def observe_fanout_delay_ms(value_ms: float) -> None:
-    delay = max(0.0, float(value_ms or 0.0))
-    with _lock:
-        _metrics["fanout_delay_total_ms"] = float(_metrics.get("fanout_delay_total_ms", 0.0)) + delay
-        _metrics["fanout_delay_samples"] = float(_metrics.get("fanout_delay_samples", 0.0)) + 1.0
+    _histograms["fanout_delay_ms"].observe(value_ms)
+
+
+def observe_first_token_ms(value_ms: float) -> None:
+    _histograms["time_to_first_token_ms"].observe(value_ms)
 
 
 def record_ws_disconnect(reason: str) -> None:
@@ -105,6 +225,17 @@ def get_metrics_snapshot(extra: dict[str, Any] | None = None) -> dict[str, Any]:
     with _lock:
         data = dict(_metrics)
 
+    summaries = {name: histogram.summary() for name, histogram in list(_histograms.items())}
+    for name, total_key, samples_key, scale in (
+        ("stream_duration_ms", "stream_duration_total_sec", "stream_duration_samples", 0.001),
+        ("latency_ms", "latency_total_ms", "latency_samples", 1.0),
+        ("redis_publish_ms", "redis_publish_total_ms", "redis_publish_samples", 1.0),
+        ("fanout_delay_ms", "fanout_delay_total_ms", "fanout_delay_samples", 1.0),
+    ):
+        _, total, count = _histograms[name].merged()
+        data[total_key] = total * scale
+        data[samples_key] = float(count)
+
     stream_samples = max(1.0, float(data.get("stream_duration_samples") or 0.0))
     latency_samples = max(1.0, float(data.get("latency_samples") or 0.0))
     redis_publish_samples = max(1.0, float(data.get("redis_publish_samples") or 0.0))
@@ -133,6 +264,10 @@ def get_metrics_snapshot(extra: dict[str, Any] | None = None) -> dict[str, Any]:
         "ws_disconnect_other": int(data.get("ws_disconnect_other") or 0.0),
         "answer_streams_started": int(data.get("answer_streams_started") or 0.0),
         "answer_streams_cancelled": int(data.get("answer_streams_cancelled") or 0.0),
+        "answer_streams_active": int(data.get("answer_streams_active") or 0.0),
+        "answer_stream_tokens_total": int(data.get("answer_stream_tokens_total") or 0.0),
+        "answer_stream_frames_total": int(data.get("answer_stream_frames_total") or 0.0),
+        "answer_stream_frames_saved_total": int(data.get("answer_stream_frames_saved_total") or 0.0),
         "emotional_events_emitted": int(data.get("emotional_events_emitted") or 0.0),
         "assist_hints_emitted": int(data.get("assist_hints_emitted") or 0.0),
         "share_tokens_active": int(data.get("share_tokens_active") or 0.0),
@@ -141,8 +276,45 @@ def get_metrics_snapshot(extra: dict[str, Any] | None = None) -> dict[str, Any]:
         "avg_latency_ms": round(float(data.get("latency_total_ms") or 0.0) / latency_samples, 2),
         "avg_redis_publish_latency_ms": round(float(data.get("redis_publish_total_ms") or 0.0) / redis_publish_samples, 2),
         "avg_fanout_delay_ms": round(float(data.get("fanout_delay_total_ms") or 0.0) / fanout_delay_samples, 2),
+        # Tail latency (p50/p95/p99) per histogram; SLOs are on these, not the averages.
+        "histograms": summaries,
     }
 
     if extra:
         payload.update(extra)
     return payload
+
+
+def _prometheus_name(name: str) -> str:
+    return "atluri_" + "".join(ch if ch.isalnum() or ch == "_" else "_" for ch in name)
+
+
+def _prometheus_float(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf"
+    return repr(float(value))
+
+
+def render_prometheus() -> str:
+    """Prometheus text exposition (format 0.0.4) of all counters, gauges and histograms."""
+    with _lock:
+        data = dict(_metrics)
+    lines: list[str] = []
+    for key in sorted(data):
+        metric = _prometheus_name(key)
+        kind = "counter" if key.endswith("_total") or key.startswith("ws_disconnect") else "gauge"
+        lines.append(f"# TYPE {metric} {kind}")
+        lines.append(f"{metric} {_prometheus_float(data[key])}")
+
+    for name, histogram in sorted(_histograms.items()):
+        metric = _prometheus_name(name)
+        counts, total, count = histogram.merged()
+        lines.append(f"# TYPE {metric} histogram")
+        cumulative = 0
+        for bound, bucket_count in zip(histogram.bounds, counts):
+            cumulative += bucket_count
+            lines.append(f'{metric}_bucket{{le="{_prometheus_float(bound)}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{le="+Inf"}} {count}')
+        lines.append(f"{metric}_sum {_prometheus_float(total)}")
+        lines.append(f"{metric}_count {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,225 @@
+"""
+═══════════════════════════════════════════════════════════════════════
+  Pluggable sliding-window rate limiter.
+
+  Both implementations use the sliding-window counter: the current fixed
+  window's count plus the previous window's count weighted by how much of
+  it still overlaps the sliding window. Each decision is O(1).
+
+    LocalRateLimiter  – per-process; idle keys expire through a time wheel
+                        (one slot per window) instead of dict scans.
+    RedisRateLimiter  – one Lua call per decision, shared by every worker
+                        and instance; falls back to local on Redis errors.
+
+  Env vars:
+    RATE_LIMIT_BACKEND – auto (Redis when REDIS_URL is set) | redis | local
+═══════════════════════════════════════════════════════════════════════
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional, Protocol
+
+from core.redis_pool import get_redis, is_redis_enabled
+
+logger = logging.getLogger("rate_limit")
+
+
+@dataclass(frozen=True)
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after_sec: int = 0
+
+
+class RateLimiter(Protocol):
+    async def hit(self, key: str, limit: int, cost: int = 1) -> RateLimitResult:
+        ...
+
+
+def _window_position(now_ts: float, window_sec: int) -> tuple[int, float]:
+    """(current window index, weight of the previous window still in the sliding window)."""
+    index = int(now_ts // window_sec)
+    elapsed = now_ts - index * window_sec
+    return index, max(0.0, 1.0 - elapsed / window_sec)
+
+
+def _decide(
+    current: int,
+    previous: int,
+    prev_weight: float,
+    limit: int,
+    cost: int,
+    window_sec: int,
+) -> RateLimitResult:
+    estimate = previous * prev_weight + current
+    if estimate + cost <= limit:
+        return RateLimitResult(True, limit, max(0, int(limit - estimate - cost)), 0)
+    # Blocked: wait until enough of the previous window has slid out, or for the next window.
+    if previous > 0 and current + cost <= limit:
+        wait = (estimate + cost - limit) / previous * window_sec
+    else:
+        wait = prev_weight * window_sec + (window_sec if current + cost > limit else 0)
+    return RateLimitResult(False, limit, 0, max(1, int(math.ceil(wait))))
+
+
+class LocalRateLimiter:
+    """
+    In-process sliding-window limiter.
+
+    ``_wheel`` maps a window index to the keys last touched in it. Advancing
+    past a slot deletes keys that have been idle for two full windows, so
+    memory stays proportional to active keys with no O(n) sweeps.
+    """
+
+    def __init__(self, window_sec: int):
+        self.window_sec = max(1, int(window_sec))
+        # key -> [window_index, current_count, previous_count]
+        self._entries: dict[str, list[int]] = {}
+        self._wheel: dict[int, set[str]] = {}
+        self._expired_upto: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _advance(self, index: int) -> None:
+        if self._expired_upto is None:
+            self._expired_upto = index - 2
+            return
+        # Keys whose last window is <= index-2 have no weight left.
+        while self._expired_upto < index - 2:
+            self._expired_upto += 1
+            for key in self._wheel.pop(self._expired_upto, ()):
+                self._entries.pop(key, None)
+            if not self._wheel:
+                self._expired_upto = index - 2
+                break
+
+    def check(self, key: str, limit: int, cost: int = 1, now_ts: Optional[float] = None) -> RateLimitResult:
+        now_ts = time.time() if now_ts is None else now_ts
+        index, prev_weight = _window_position(now_ts, self.window_sec)
+        self._advance(index)
+
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = [index, 0, 0]
+            self._wheel.setdefault(index, set()).add(key)
+        elif entry[0] != index:
+            slot = self._wheel.get(entry[0])
+            if slot is not None:
+                slot.discard(key)
+                if not slot:
+                    self._wheel.pop(entry[0], None)
+            entry[2] = entry[1] if entry[0] == index - 1 else 0
+            entry[1] = 0
+            entry[0] = index
+            self._wheel.setdefault(index, set()).add(key)
+
+        result = _decide(entry[1], entry[2], prev_weight, int(limit), int(cost), self.window_sec)
+        if result.allowed:
+            entry[1] += int(cost)
+        return result
+
+    async def hit(self, key: str, limit: int, cost: int = 1) -> RateLimitResult:
+        return self.check(key, limit, cost)
+
+
+# KEYS[1] = current window counter, KEYS[2] = previous window counter
+# ARGV = limit, cost, previous-window weight, counter ttl (sec)
+_SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local limit = tonumber(ARGV[1])
+local cost = tonumber(ARGV[2])
+local weight = tonumber(ARGV[3])
+if previous * weight + current + cost <= limit then
+  current = redis.call('INCRBY', KEYS[1], cost)
+  if current == cost then
+    redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+  end
+  return {1, current - cost, previous}
+end
+return {0, current, previous}
+"""
+
+
+class RedisRateLimiter:
+    """
+    Cluster-wide sliding-window limiter: one EVALSHA per decision.
+
+    Counters live at ``rl:{namespace}:{{key}}:{window_index}`` (hash tag keeps
+    both windows of a key in one cluster slot) and expire after two windows.
+    """
+
+    def __init__(self, namespace: str, window_sec: int, redis_client=None):
+        self.namespace = namespace
+        self.window_sec = max(1, int(window_sec))
+        self._redis = redis_client
+        self._script = None
+        self._fallback = LocalRateLimiter(self.window_sec)
+        self._stats = {"redis_decisions": 0, "fallback_decisions": 0, "redis_errors": 0}
+
+    def _client(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    def _counter_key(self, key: str, index: int) -> str:
+        return f"rl:{self.namespace}:{{{key}}}:{index}"
+
+    async def hit(self, key: str, limit: int, cost: int = 1) -> RateLimitResult:
+        client = self._client()
+        if client is None:
+            self._stats["fallback_decisions"] += 1
+            return self._fallback.check(key, limit, cost)
+
+        index, prev_weight = _window_position(time.time(), self.window_sec)
+        try:
+            if self._script is None:
+                self._script = client.register_script(_SLIDING_WINDOW_LUA)
+            allowed, current, previous = await self._script(
+                keys=[self._counter_key(key, index), self._counter_key(key, index - 1)],
+                args=[int(limit), int(cost), repr(prev_weight), self.window_sec * 2],
+            )
+        except Exception as exc:
+            self._stats["redis_errors"] += 1
+            logger.debug("Redis rate limit failed, using local fallback: %s", exc)
+            return self._fallback.check(key, limit, cost)
+
+        self._stats["redis_decisions"] += 1
+        result = _decide(int(current), int(previous), prev_weight, int(limit), int(cost), self.window_sec)
+        if bool(int(allowed)) != result.allowed:
+            # Lua is authoritative; recompute remaining/retry from its view.
+            if int(allowed):
+                result = RateLimitResult(True, int(limit), 0, 0)
+            else:
+                result = RateLimitResult(False, int(limit), 0, max(1, result.retry_after_sec))
+        return result
+
+    def get_stats(self) -> dict:
+        return dict(self._stats)
+
+
+_limiters: dict[tuple[str, int], RateLimiter] = {}
+
+
+def get_rate_limiter(namespace: str, window_sec: int) -> RateLimiter:
+    """Shared limiter for a namespace/window, Redis-backed when configured."""
+    cache_key = (namespace, int(window_sec))
+    limiter = _limiters.get(cache_key)
+    if limiter is not None:
+        return limiter
+    backend = str(os.getenv("RATE_LIMIT_BACKEND", "auto")).strip().lower()
+    if backend == "redis" or (backend == "auto" and is_redis_enabled()):
+        limiter = RedisRateLimiter(namespace, window_sec)
+    else:
+        limiter = LocalRateLimiter(window_sec)
+    _limiters[cache_key] = limiter
+    logger.info("Rate limiter %s (window=%ss): %s", namespace, window_sec, limiter.__class__.__name__)
+    return limiter
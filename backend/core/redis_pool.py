@@ -20,6 +20,7 @@ logger = logging.getLogger("redis_pool")
 
 _pool: Optional[object] = None   # redis.asyncio.Redis
 _sync_pool: Optional[object] = None  # redis.Redis
+_binary_pool: Optional[object] = None  # redis.asyncio.Redis (decode_responses=False)
 
 
 def _redis_url() -> str:
@@ -57,6 +58,33 @@ def get_redis():
         return None
 
 
+def get_redis_binary():
+    """Return an async Redis client that does not decode responses.
+    Use for raw byte payloads (e.g. packed vectors). Returns None if REDIS_URL is not set."""
+    global _binary_pool
+    if _binary_pool is not None:
+        return _binary_pool
+    url = _redis_url()
+    if not url:
+        return None
+    try:
+        import redis.asyncio as aioredis
+        max_conn = max(10, int(os.getenv("REDIS_MAX_CONNECTIONS", "50")))
+        socket_timeout = max(0.5, float(os.getenv("REDIS_SOCKET_TIMEOUT", "2")))
+        _binary_pool = aioredis.from_url(
+            url,
+            decode_responses=False,
+            max_connections=max_conn,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_timeout,
+        )
+        logger.info("Redis binary pool created: %s (max_conn=%d)", url.split("@")[-1], max_conn)
+        return _binary_pool
+    except Exception as exc:
+        logger.warning("Redis binary pool creation failed: %s", exc)
+        return None
+
+
 def get_redis_sync():
     """Return a sync Redis client (for thread-locked code paths).
     Returns None if REDIS_URL is not set."""
@@ -86,13 +114,19 @@ def get_redis_sync():
 
 async def close_pools():
     """Graceful shutdown — call from lifespan."""
-    global _pool, _sync_pool
+    global _pool, _sync_pool, _binary_pool
     if _pool is not None:
         try:
             await _pool.close()
         except Exception:
             pass
         _pool = None
+    if _binary_pool is not None:
+        try:
+            await _binary_pool.close()
+        except Exception:
+            pass
+        _binary_pool = None
     if _sync_pool is not None:
         try:
             _sync_pool.close()
@@ -11,6 +11,10 @@ ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
 
+# Modules that build an OpenAI client at import time are imported during
+# collection, before the autouse env fixture runs.
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+
 
 @pytest.fixture(autouse=True)
 def _test_env(monkeypatch: pytest.MonkeyPatch):
@@ -20,6 +24,29 @@ def _test_env(monkeypatch: pytest.MonkeyPatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test-key")
 
 
+@pytest.fixture
+def user_context_store(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Point app.state at an empty snapshot/WAL under tmp_path, with no Redis."""
+    import app.state as state
+
+    store_path = tmp_path / "user_context_store.json"
+    monkeypatch.setattr(state, "_store_path", store_path)
+    monkeypatch.setattr(state, "_wal_path", store_path.with_suffix(".wal"))
+    monkeypatch.setattr(state, "_wal_compacting_path", store_path.with_suffix(".wal.compacting"))
+    monkeypatch.setattr(state, "_wal_file", None)
+    monkeypatch.setattr(state, "_wal_seq", 0)
+    monkeypatch.setattr(state, "_wal_records_since_compact", 0)
+    monkeypatch.setattr(state, "_get_redis_ctx_store", lambda: None)
+    monkeypatch.setattr(state, "user_context_by_user_id", {})
+    monkeypatch.setattr(state, "_context_version_by_user_id", {})
+    monkeypatch.setattr(state, "_pending_writes_by_user_id", {})
+    monkeypatch.setattr(state, "_written_seq_by_user_id", {})
+    yield store_path
+    if state._wal_file is not None:
+        state._wal_file.close()
+        state._wal_file = None
+
+
 @pytest.fixture
 def dev_jwt_token() -> str:
     def _enc(obj: dict) -> str:
@@ -0,0 +1,109 @@
+from app.services.audio_frames import (
+    AUDIO_FRAME_HEADER_BYTES,
+    PCMRingBuffer,
+    decode_audio_frame,
+    encode_audio_frame,
+    seq_gap,
+)
+
+
+def test_audio_frame_roundtrip_is_zero_copy():
+    pcm = bytes(range(200)) * 4
+    raw = encode_audio_frame(pcm, seq=7, ts_ms=1234, speaker="interviewer", channel=2)
+
+    frame = decode_audio_frame(raw)
+
+    assert frame.version == 1
+    assert (frame.seq, frame.ts_ms, frame.speaker, frame.channel) == (7, 1234, "interviewer", 2)
+    assert frame.pcm == pcm
+    assert frame.pcm.obj is raw  # slice of the received message, not a copy
+    assert len(raw) == AUDIO_FRAME_HEADER_BYTES + len(pcm)
+
+
+def test_legacy_raw_pcm_and_malformed_frames():
+    legacy = decode_audio_frame(b"\x01\x02" * 400)
+    assert legacy.version == 0
+    assert len(legacy.pcm) == 800
+
+    bad_version = bytearray(encode_audio_frame(b"\x00" * 400, seq=1, ts_ms=0))
+    bad_version[4] = 99
+    assert decode_audio_frame(bytes(bad_version)) is None
+
+
+def test_seq_gap_handles_wraparound():
+    assert seq_gap(-1, 5) == 0
+    assert seq_gap(4, 5) == 0
+    assert seq_gap(4, 8) == 3
+    assert seq_gap(0xFFFFFFFF, 0) == 0
+
+
+def test_pcm_ring_buffer_segments_wrap_and_clamp():
+    ring = PCMRingBuffer(8)
+    ring.append(b"abcdef")
+    start = ring.end
+    ring.append(b"ghij")  # wraps
+
+    assert b"".join(bytes(s) for s in ring.segments(start)) == b"ghij"
+    assert b"".join(bytes(s) for s in ring.segments(0)) == b"cdefghij"  # clamped to retained window
+
+    ring.append(b"0123456789AB")  # larger than capacity keeps the tail
+    assert b"".join(bytes(s) for s in ring.segments(0)) == b"456789AB"
+
+
+def test_wav_stream_over_ring_segments_is_a_valid_wav():
+    import io
+    import wave
+
+    from app.services.audio_frames import WavStream, build_wav_header_template, wav_header
+
+    ring = PCMRingBuffer(16)
+    ring.append(b"\x00" * 10)
+    start = ring.end
+    ring.append(bytes(range(12)))  # wraps around the ring
+
+    template = build_wav_header_template(16000)
+    assert len(template) == 44
+    stream = WavStream(wav_header(template, ring.end - start), ring.segments(start))
+    assert stream.size == 44 + 12
+
+    with wave.open(io.BytesIO(stream.read()), "rb") as wf:
+        assert wf.getframerate() == 16000
+        assert wf.getsampwidth() == 2
+        assert wf.readframes(6) == bytes(range(12))
+
+
+def test_wav_stream_fails_when_ring_overruns():
+    import pytest
+
+    from app.services.audio_frames import WavStream
+
+    stream = WavStream(b"h" * 44, [memoryview(b"data")], is_valid=lambda: False)
+    with pytest.raises(IOError):
+        stream.read()
+
+
+def test_deepgram_send_audio_forwards_views_and_counts_dropped_frames():
+    from app.services.deepgram_service import DeepgramService
+
+    class FakeConnection:
+        def __init__(self):
+            self.sent = []
+            self.connected = True
+
+        def send(self, data):
+            self.sent.append(data)
+            return self.connected
+
+    service = DeepgramService(enabled=False)
+    service.enabled = service.active = True
+    service.connection = FakeConnection()
+
+    frame = memoryview(bytearray(b"\x01\x02" * 160))
+    service.send_audio(frame)
+    assert service.connection.sent[-1] is frame
+    assert service.dropped_frames == 0
+
+    service.connection.connected = False
+    service.send_audio(frame)
+    service.send_audio(frame)
+    assert service.dropped_frames == 2
@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+import app.state as state
+from app.services import live_prompt
+from app.services.live_prompt import LivePromptBuilder, LivePromptOptions
+from app.state import set_job_description, set_resume_text
+
+# Setters below write context; keep them off the real user_context_store.json.
+pytestmark = pytest.mark.usefixtures("user_context_store")
+
+
+async def test_prefix_is_reused_until_context_or_options_change(monkeypatch):
+    user_id = "live-prompt-test-user"
+    set_resume_text(user_id, "Ten years of Java and Kubernetes.")
+
+    fetches = []
+    original = live_prompt.get_user_context_async
+
+    async def counting_get_user_context(uid):
+        fetches.append(uid)
+        return await original(uid)
+
+    monkeypatch.setattr(live_prompt, "get_user_context_async", counting_get_user_context)
+
+    builder = LivePromptBuilder(max_entries=8, ttl_sec=0)
+    options = LivePromptOptions(role="swe", resume_loaded=True, company="Acme", coach_style="technical")
+
+    first = await builder.prefix(user_id, options)
+    second = await builder.prefix(user_id, LivePromptOptions(role="swe", resume_loaded=True, company="Acme", coach_style="technical"))
+    assert second is first
+    assert len(fetches) == 1
+    assert "Target Company: Acme" in first[0]["content"]
+    assert "Be precise and technical." in first[0]["content"]
+    assert "RESUME:\nTen years of Java and Kubernetes." in first[1]["content"]
+
+    set_job_description(user_id, "Senior platform engineer.")
+    third = await builder.prefix(user_id, options)
+    assert len(fetches) == 2
+    assert "JOB DESCRIPTION:\nSenior platform engineer." in third[1]["content"]
+    # Unchanged parts of the prefix stay byte-identical.
+    assert third[0]["content"] == first[0]["content"]
+
+    await builder.prefix(user_id, LivePromptOptions(role="swe", resume_loaded=True, company="Globex"))
+    stats = builder.get_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 3
+    assert stats["context_changed"] == 1
+    assert stats["options_changed"] == 1
+    assert stats["entries"] == 1
+
+
+async def test_lru_bound_and_anonymous_prefix():
+    builder = LivePromptBuilder(max_entries=1, ttl_sec=0)
+    options = LivePromptOptions(answer_language="detected")
+    anonymous = await builder.prefix(None, options)
+    assert len(anonymous) == 1
+    assert "SAME language as the question" in anonymous[0]["content"]
+    assert await builder.prefix(None, options) is anonymous
+    assert builder.get_stats()["context_fetches"] == 0
+
+    await builder.prefix("other-user", options)
+    assert builder.get_stats()["evictions"] == 1
+    assert await builder.prefix(None, options) is not anonymous
+
+
+async def test_sessions_of_one_user_keep_separate_prefixes():
+    builder = LivePromptBuilder(max_entries=8, ttl_sec=0)
+    acme = LivePromptOptions(company="Acme")
+    globex = LivePromptOptions(company="Globex")
+
+    first = await builder.prefix(None, acme, session_id="session-a")
+    await builder.prefix(None, globex, session_id="session-b")
+    assert await builder.prefix(None, acme, session_id="session-a") is first
+    stats = builder.get_stats()
+    assert stats["hits"] == 1
+    assert stats["options_changed"] == 0
+    assert stats["entries"] == 2
+
+
+class _SharedContextStore:
+    """Redis user context store shared by every worker in the test."""
+
+    def __init__(self):
+        self.data = {}
+        self.versions = {}
+
+    def get(self, user_id):
+        raw = self.data.get(user_id)
+        return None if raw is None else json.loads(raw)
+
+    def put_raw(self, user_id, payload):
+        self.data[user_id] = payload
+
+    def incr_version(self, user_id):
+        self.versions[user_id] = self.versions.get(user_id, 0) + 1
+
+    def get_version(self, user_id):
+        return self.versions.get(user_id, 0)
+
+
+async def test_context_change_on_another_worker_invalidates_prefix(monkeypatch):
+    shared = _SharedContextStore()
+    monkeypatch.setattr(state, "_get_redis_ctx_store", lambda: shared)
+    set_resume_text("u-shared", "Go and Postgres.")
+
+    builder = LivePromptBuilder(max_entries=8, ttl_sec=0)
+    first = await builder.prefix("u-shared", LivePromptOptions(), session_id="s1")
+    assert "Go and Postgres." in first[1]["content"]
+
+    # Another worker updates the resume: only Redis changes, not this process.
+    other = state._empty_context()
+    other["resume_text"] = "Rust and Kafka."
+    shared.put_raw("u-shared", json.dumps(other))
+    shared.incr_version("u-shared")
+
+    second = await builder.prefix("u-shared", LivePromptOptions(), session_id="s1")
+    assert "Rust and Kafka." in second[1]["content"]
+    assert builder.get_stats()["context_changed"] == 1
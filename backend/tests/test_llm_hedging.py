@@ -0,0 +1,175 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.router.model_router import MODEL_MAP, get_hedge_spec
+from app.services.llm_hedging import HedgeLeg, LLMHedger
+
+
+class FakeProvider:
+    """Stand-in for a streaming provider: optional first-token delay or failure."""
+
+    def __init__(self, name, tokens, first_token_delay=0.0, fail=False):
+        self.name = name
+        self.tokens = tokens
+        self.first_token_delay = first_token_delay
+        self.fail = fail
+        self.closed = False
+
+    async def stream(self):
+        try:
+            await asyncio.sleep(self.first_token_delay)
+            if self.fail:
+                raise ConnectionError(f"{self.name} unavailable")
+            for token in self.tokens:
+                yield token
+                await asyncio.sleep(0)
+        finally:
+            self.closed = True
+
+    def leg(self):
+        return HedgeLeg(self.name, self.stream)
+
+
+async def _collect(hedger, primary, hedge):
+    return [token async for token in hedger.stream(primary.leg(), hedge.leg())]
+
+
+async def test_fast_primary_is_not_hedged():
+    hedger = LLMHedger(first_token_deadline_ms=200)
+    primary = FakeProvider("openai", ["a ", "b"])
+    hedge = FakeProvider("gemini", ["x"])
+    assert await _collect(hedger, primary, hedge) == ["a ", "b"]
+    stats = hedger.get_stats()
+    assert stats["hedged"] == 0
+    assert stats["primary_wins"] == 1
+    assert stats["wins_by_provider"] == {"openai": 1}
+
+
+async def test_slow_primary_loses_race_and_is_cancelled():
+    hedger = LLMHedger(first_token_deadline_ms=20)
+    primary = FakeProvider("openai", ["slow"], first_token_delay=5.0)
+    hedge = FakeProvider("gemini", ["fast ", "answer"], first_token_delay=0.01)
+    started = asyncio.get_running_loop().time()
+    assert await _collect(hedger, primary, hedge) == ["fast ", "answer"]
+    assert asyncio.get_running_loop().time() - started < 1.0
+    assert primary.closed and hedge.closed
+
+    stats = hedger.get_stats()
+    assert stats["hedged"] == 1
+    assert stats["hedge_wins"] == 1
+    assert stats["hedge_rate"] == 1.0
+    assert stats["hedge_win_rate"] == 1.0
+
+
+async def test_primary_error_hedges_immediately_and_total_failure_raises():
+    hedger = LLMHedger(first_token_deadline_ms=5000)
+    primary = FakeProvider("openai", [], fail=True)
+    hedge = FakeProvider("anthropic", ["ok"])
+    assert await _collect(hedger, primary, hedge) == ["ok"]
+    assert hedger.get_stats()["hedged_on_error"] == 1
+
+    with pytest.raises(ConnectionError):
+        await _collect(hedger, FakeProvider("openai", [], fail=True), FakeProvider("anthropic", [], fail=True))
+    stats = hedger.get_stats()
+    assert stats["all_failed"] == 1
+    assert stats["primary_errors"] == 2
+    assert stats["hedge_errors"] == 1
+
+
+async def test_consumer_abort_closes_both_legs():
+    hedger = LLMHedger(first_token_deadline_ms=10)
+    primary = FakeProvider("openai", ["late"], first_token_delay=5.0)
+    hedge = FakeProvider("gemini", ["one ", "two ", "three"], first_token_delay=0.02)
+    stream = hedger.stream(primary.leg(), hedge.leg())
+    assert await stream.__anext__() == "one "
+    await stream.aclose()
+    assert primary.closed and hedge.closed
+
+
+def test_hedge_spec_requires_another_available_provider(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.delenv("XAI_API_KEY", raising=False)
+    primary = MODEL_MAP["general"]
+    assert get_hedge_spec(primary, "gemini-2.5-flash").provider == "gemini"
+    assert get_hedge_spec(primary, "gpt-4o") is None
+    assert get_hedge_spec(primary, "grok-4") is None
+    assert get_hedge_spec(primary, "ollama-local") is None
+    assert get_hedge_spec(primary, "not-a-model") is None
+
+
+class _SSEBody(httpx.AsyncByteStream):
+    """Chat-completions SSE body; ``delay`` holds back the first chunk."""
+
+    def __init__(self, tokens, delay=0.0):
+        self.tokens = tokens
+        self.delay = delay
+        self.closed = False
+
+    async def __aiter__(self):
+        await asyncio.sleep(self.delay)
+        for token in self.tokens:
+            chunk = {
+                "id": "chatcmpl-test",
+                "object": "chat.completion.chunk",
+                "created": 0,
+                "model": "test",
+                "choices": [{"index": 0, "delta": {"content": token}, "finish_reason": None}],
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode()
+        yield b"data: [DONE]\n\n"
+
+    async def aclose(self):
+        self.closed = True
+
+
+async def test_stream_answer_live_hedges_across_openai_compatible_endpoints(monkeypatch):
+    from app.services import llm_hedging, llm_provider_health, openai_service
+    from app.services.llm_provider_health import LLMProviderRegistry
+
+    bodies = {
+        "openai.test": _SSEBody(["slow"], delay=5.0),
+        "gemini.test": _SSEBody(["fast ", "answer"]),
+    }
+    requests = []
+
+    def handler(request):
+        requests.append((request.url.host, request.url.path, json.loads(request.content)["model"]))
+        return httpx.Response(200, headers={"content-type": "text/event-stream"}, stream=bodies[request.url.host])
+
+    real_async_openai = openai_service.AsyncOpenAI
+
+    def local_async_openai(**kwargs):
+        return real_async_openai(http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+
+    monkeypatch.setenv("GEMINI_API_KEY", "test")
+    monkeypatch.setenv("GEMINI_BASE_URL", "http://gemini.test/v1")
+    monkeypatch.setattr("core.config.QA_MODE", False)
+    monkeypatch.setattr(openai_service, "LLM_HEDGE_ENABLED", True)
+    monkeypatch.setattr(openai_service, "LLM_HEDGE_MODEL", "gemini-2.5-flash")
+    monkeypatch.setattr(openai_service, "AsyncOpenAI", local_async_openai)
+    monkeypatch.setattr(openai_service, "_compat_clients", {})
+    monkeypatch.setattr(openai_service, "client", local_async_openai(api_key="test", base_url="http://openai.test/v1"))
+    hedger = LLMHedger(first_token_deadline_ms=20)
+    monkeypatch.setattr(llm_hedging, "_hedger", hedger)
+    registry = LLMProviderRegistry()
+    monkeypatch.setattr(llm_provider_health, "_registry", registry)
+
+    started = asyncio.get_running_loop().time()
+    tokens = [t async for t in openai_service.stream_answer_live("What is a B-tree?", model="gpt-4o-mini")]
+
+    assert tokens == ["fast ", "answer"]
+    assert asyncio.get_running_loop().time() - started < 2.0
+    assert requests == [
+        ("openai.test", "/v1/chat/completions", "gpt-4o-mini"),
+        ("gemini.test", "/v1/chat/completions", "gemini-2.0-flash"),
+    ]
+    # The losing primary was cancelled and its HTTP response closed.
+    assert bodies["openai.test"].closed
+    assert bodies["gemini.test"].closed
+    assert hedger.get_stats()["hedge_wins"] == 1
+    assert registry.get("gemini").total_requests == 1
+    assert registry.get("gemini").consecutive_failures == 0
+    assert registry.get("openai").total_requests == 0  # a cancelled leg reports nothing
@@ -0,0 +1,118 @@
+import asyncio
+
+import httpx
+import openai
+import pytest
+
+from app.router.model_router import MODEL_MAP, get_fallback_spec, get_hedge_spec
+from app.services import llm_provider_health
+from app.services.llm_provider_health import CircuitState, LLMProviderRegistry
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    for env_var in ("OPENAI_API_KEY", "ANTHROPIC_API_KEY", "GEMINI_API_KEY"):
+        monkeypatch.setenv(env_var, "test")
+    fresh = LLMProviderRegistry(failure_threshold=2, recovery_timeout_sec=60, success_threshold=2)
+    monkeypatch.setattr(llm_provider_health, "_registry", fresh)
+    return fresh
+
+
+def test_router_skips_open_circuit_and_recovers_through_half_open(registry):
+    claude = MODEL_MAP["claude-4.5-sonnet"]
+    assert get_fallback_spec(claude) is claude
+
+    registry.record_failure("anthropic", "overloaded")
+    assert get_fallback_spec(claude) is claude
+    registry.record_failure("anthropic", "overloaded")
+    health = registry.get("anthropic")
+    assert health.state is CircuitState.OPEN
+    assert get_fallback_spec(claude).provider == "openai"
+
+    registry.record_failure("openai", "timeout")
+    registry.record_failure("openai", "timeout")
+    assert get_fallback_spec(claude).provider == "openai"  # nothing healthy: default
+    assert registry.get_health_report()["skipped_open"] >= 3
+
+    health.record_probe(True, 12.0)
+    assert health.state is CircuitState.HALF_OPEN
+    assert get_fallback_spec(claude) is claude
+    registry.record_success("anthropic", 400.0)
+    assert health.state is CircuitState.HALF_OPEN
+    registry.record_success("anthropic", 200.0)
+    assert health.state is CircuitState.CLOSED
+    assert health.latency_ewma_ms == pytest.approx(400.0 + 0.2 * (200.0 - 400.0))
+
+    registry.record_failure("anthropic", "a")
+    registry.record_failure("anthropic", "b")
+    registry.get("anthropic").circuit_opened_at -= 61
+    assert registry.allow_request("anthropic")
+    assert health.state is CircuitState.HALF_OPEN
+    registry.record_failure("anthropic", "still down")
+    assert health.state is CircuitState.OPEN
+
+
+async def test_background_probes_open_circuits_before_user_traffic(registry, monkeypatch):
+    calls = []
+
+    async def fake_probe(provider):
+        calls.append(provider)
+        if provider == "gemini":
+            raise ConnectionError("503")
+
+    registry._probe_fn = fake_probe
+    registry.probe_interval_sec = 0.01
+
+    registry.start_probing()
+    await asyncio.sleep(0.05)
+    await registry.stop_probing()
+
+    gemini = registry.get("gemini")
+    assert gemini.state is CircuitState.OPEN
+    assert gemini.total_requests == 0  # probes are not user requests
+    assert registry.get("openai").state is CircuitState.CLOSED
+    assert get_hedge_spec(MODEL_MAP["general"], "gemini-2.5-flash") is None
+
+    # A fresh probe result answers without another HTTP round-trip.
+    probes_before = len(calls)
+    assert await registry.check("ollama", max_age_sec=60) is True
+    assert len(calls) == probes_before
+    assert await registry.check("gemini") is False
+    assert len(calls) == probes_before
+    assert {"openai", "anthropic", "gemini", "ollama"} <= set(calls)
+
+
+@pytest.mark.parametrize("make_error", [
+    lambda request: openai.APITimeoutError(request=request),
+    lambda request: openai.BadRequestError(
+        "image too large", response=httpx.Response(400, request=request), body=None
+    ),
+])
+async def test_one_answer_retries_do_not_open_the_circuit(registry, monkeypatch, make_error):
+    from app.services import openai_service
+
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    attempts = []
+
+    async def failing_stream(client, model, messages, max_tokens):
+        attempts.append(model)
+        raise make_error(request)
+        yield  # pragma: no cover
+
+    async def ollama_down():
+        return False
+
+    monkeypatch.setattr(openai_service, "_stream_chat_completion", failing_stream)
+    monkeypatch.setattr(openai_service, "_check_ollama_available", ollama_down)
+    monkeypatch.setattr(openai_service, "LLM_HEDGE_ENABLED", False)
+    monkeypatch.setattr("core.config.QA_MODE", False)
+
+    tokens = [t async for t in openai_service.stream_answer_live("Tell me about yourself", model="gpt-4o-mini")]
+
+    assert len(attempts) == 3
+    assert tokens  # static fallback answer
+    health = registry.get("openai")
+    assert health.state is CircuitState.CLOSED
+    # A timeout is charged once per answer; a bad request is never charged.
+    expected = 1 if isinstance(make_error(request), openai.APITimeoutError) else 0
+    assert health.consecutive_failures == expected
@@ -0,0 +1,53 @@
+import statistics
+
+from app.services.observability_dashboard import ObservabilityDashboard, SessionMetrics, _RingBuffer
+
+
+def test_ring_buffer_is_fixed_size_and_tracks_window_sums():
+    ring = _RingBuffer(4)
+    evicted = [ring.append(float(v)) for v in range(1, 8)]
+    assert evicted == [None, None, None, None, 1.0, 2.0, 3.0]
+    assert ring.values() == [4.0, 5.0, 6.0, 7.0]
+    assert len(ring) == 4
+    assert ring.mean() == statistics.mean([4.0, 5.0, 6.0, 7.0])
+    assert not hasattr(SessionMetrics("s", 0.0), "__dict__")
+
+
+async def test_snapshot_aggregates_match_sample_windows():
+    dashboard = ObservabilityDashboard()
+    confidences = {}
+    latencies = {}
+    for session_index in range(3):
+        session_id = f"s{session_index}"
+        await dashboard.record_session_start(session_id)
+        for i in range(130):
+            confidence = 0.5 + ((i * 7 + session_index) % 40) / 100.0
+            latency = 100.0 + ((i * 37 + session_index * 11) % 900)
+            await dashboard.record_vad_event(session_id, quality="good", confidence=confidence)
+            await dashboard.record_trigger(session_id, trigger_type="VAD_TRIGGER", latency_ms=latency)
+            confidences.setdefault(session_id, []).append(confidence)
+            latencies.setdefault(session_id, []).append(latency)
+
+    window_conf = [c for values in confidences.values() for c in values[-SessionMetrics.CONFIDENCE_WINDOW:]]
+    window_lat = [v for values in latencies.values() for v in values[-SessionMetrics.LATENCY_WINDOW:]]
+
+    snapshot = await dashboard.get_snapshot()
+    assert snapshot["confidence"]["avg"] == round(statistics.mean(window_conf), 3)
+    assert snapshot["confidence"]["std"] == round(statistics.stdev(window_conf), 3)
+    latency = snapshot["triggers"]["latency"]
+    assert latency["avg_ms"] == round(statistics.mean(window_lat), 1)
+    exact_p95 = sorted(window_lat)[int(len(window_lat) * 0.95)]
+    assert abs(latency["percentiles"]["p95"] - exact_p95) <= exact_p95 * 0.25
+
+    # Dropping a session removes its windows from the aggregates.
+    await dashboard.record_session_end("s0")
+    dashboard._sessions["s0"].end_time -= 120.0
+    await dashboard.cleanup_stale_sessions(max_age_sec=60)
+    remaining = [v for sid in ("s1", "s2") for v in latencies[sid][-SessionMetrics.LATENCY_WINDOW:]]
+    snapshot = await dashboard.get_snapshot()
+    assert sum(dashboard._window_latency_counts.counts) == len(remaining)
+    assert snapshot["triggers"]["latency"]["avg_ms"] == round(statistics.mean(remaining), 1)
+
+    detail = await dashboard.get_session_detail("s1")
+    assert len(detail["triggers"]) == 20
+    assert detail["confidence_samples"] == confidences["s1"][-20:]
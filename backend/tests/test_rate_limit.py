@@ -0,0 +1,61 @@
+from core.rate_limit import LocalRateLimiter, RedisRateLimiter
+
+
+def test_local_sliding_window_blocks_and_recovers():
+    limiter = LocalRateLimiter(window_sec=60)
+    base = 6000.0  # aligned to a window boundary
+
+    for i in range(5):
+        assert limiter.check("ip-1", limit=5, now_ts=base + i).allowed
+    blocked = limiter.check("ip-1", limit=5, now_ts=base + 10)
+    assert not blocked.allowed
+    assert blocked.retry_after_sec >= 1
+    assert limiter.check("ip-2", limit=5, now_ts=base + 10).allowed
+
+    # Half-way into the next window, half of the previous 5 still count.
+    assert limiter.check("ip-1", limit=5, now_ts=base + 90).allowed
+    assert limiter.check("ip-1", limit=5, now_ts=base + 90).allowed
+    assert not limiter.check("ip-1", limit=5, now_ts=base + 90).allowed
+
+
+def test_local_time_wheel_expires_idle_keys():
+    limiter = LocalRateLimiter(window_sec=10)
+    for i in range(100):
+        limiter.check(f"k{i}", limit=3, now_ts=1000.0)
+    assert len(limiter) == 100
+    limiter.check("k0", limit=3, now_ts=1011.0)  # previous window: still weighted
+    assert len(limiter) == 100
+    limiter.check("fresh", limit=3, now_ts=1025.0)
+    assert len(limiter) == 2  # "k0" (touched in 101) and "fresh"
+
+
+class _FakeScriptRedis:
+    def __init__(self):
+        self.values: dict[str, int] = {}
+        self.calls = 0
+
+    def register_script(self, _source):
+        async def _run(keys, args):
+            self.calls += 1
+            current = self.values.get(keys[0], 0)
+            previous = self.values.get(keys[1], 0)
+            limit, cost, weight = int(args[0]), int(args[1]), float(args[2])
+            if previous * weight + current + cost <= limit:
+                self.values[keys[0]] = current + cost
+                return [1, current, previous]
+            return [0, current, previous]
+
+        return _run
+
+
+async def test_redis_limiter_shares_counters_and_uses_one_call_per_decision():
+    fake = _FakeScriptRedis()
+    worker_a = RedisRateLimiter("http", 60, redis_client=fake)
+    worker_b = RedisRateLimiter("http", 60, redis_client=fake)
+    results = []
+    for i in range(6):
+        limiter = worker_a if i % 2 == 0 else worker_b
+        results.append((await limiter.hit("ip-1", limit=4)).allowed)
+    assert results.count(True) <= 4
+    assert results[-1] is False
+    assert fake.calls == 6
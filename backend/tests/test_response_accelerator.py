@@ -0,0 +1,151 @@
+import hashlib
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services import response_accelerator
+from app.services.response_accelerator import HotAnswerCache
+
+
+class FakeSemanticEngine:
+    """Deterministic bag-of-words embeddings; ``dim`` can change mid-test."""
+
+    def __init__(self, dim: int = 32):
+        self.dim = dim
+        self.batches = []
+
+    def _vector(self, text: str):
+        vec = np.zeros(self.dim, dtype=np.float32)
+        for word in text.lower().split():
+            vec[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dim] += 1.0
+        return vec
+
+    async def embed(self, text: str):
+        return self._vector(text)
+
+    async def embed_batch(self, texts):
+        self.batches.append(list(texts))
+        return [self._vector(text) for text in texts]
+
+    async def similarity(self, a: str, b: str) -> float:
+        va, vb = self._vector(a), self._vector(b)
+        denom = float(np.linalg.norm(va) * np.linalg.norm(vb))
+        return float(va @ vb) / denom if denom else 0.0
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    fake = FakeSemanticEngine()
+    monkeypatch.setattr(response_accelerator, "get_semantic_engine", lambda: fake, raising=False)
+    monkeypatch.setattr(response_accelerator, "_SEMANTIC_AVAILABLE", True)
+    return fake
+
+
+async def _loop_best(cache: HotAnswerCache, engine: FakeSemanticEngine, question: str):
+    """The pre-index lookup: one similarity() call per template."""
+    normalized = question.lower().strip().rstrip("?.!")
+    best_score, best_entry = 0.0, None
+    for key, entry in cache._cache.items():
+        score = await engine.similarity(normalized, key)
+        if score > best_score:
+            best_score, best_entry = score, entry
+    return best_entry
+
+
+async def test_vectorized_lookup_matches_per_template_loop(engine):
+    cache = HotAnswerCache()
+    cache.seed_behavioral_templates()
+    cache.SIMILARITY_THRESHOLD = 0.0
+
+    for question in (
+        "tell me about a time you failed badly",
+        "how do you handle conflict with your manager",
+        "what is your biggest weakness",
+        "describe your leadership style",
+    ):
+        expected = await _loop_best(cache, engine, question)
+        assert await cache.lookup(question) is expected
+
+    # All seeded templates were embedded in a single batch.
+    assert len(engine.batches) == 1
+    assert cache.get_stats()["indexed_templates"] == 7
+
+
+async def test_template_keys_drop_trailing_punctuation(engine):
+    cache = HotAnswerCache()
+    entry = cache.add_template("Why should we hire you?", "Because ...")
+    assert "why should we hire you" in cache._cache
+
+    assert await cache.lookup("Why should we hire you") is entry
+    assert await cache.lookup("why should we hire you!") is entry
+    assert engine.batches == []  # exact hits never touch the embedding index
+
+    # Re-adding the same question replaces the entry without re-indexing it.
+    replaced = cache.add_template("why should we hire you.", "Updated")
+    assert cache.get_stats()["pending_templates"] == 1
+    assert await cache.lookup("WHY SHOULD WE HIRE YOU?") is replaced
+
+
+async def test_index_rebuilds_when_embedding_dimension_changes(engine):
+    cache = HotAnswerCache()
+    cache.seed_behavioral_templates()
+    cache.SIMILARITY_THRESHOLD = 0.0
+    await cache.lookup("tell me about your background")
+    assert cache._index_matrix.shape[1] == 32
+
+    # New model: a new template triggers a full re-embed at the new size.
+    engine.dim = 48
+    cache.add_template("Where do you see yourself in five years", "In five years ...")
+    hit = await cache.lookup("where do you see yourself in 5 years")
+    assert hit is cache._cache["where do you see yourself in five years"]
+    assert cache._index_matrix.shape[1] == 48
+    assert sorted(cache._index_keys) == sorted(cache._cache)
+    assert engine.batches[-1] == cache._index_keys
+
+    # Model change with nothing pending is detected from the query vector.
+    engine.dim = 16
+    expected = await _loop_best(cache, engine, "how do you deal with conflict")
+    assert await cache.lookup("how do you deal with conflict") is expected
+    assert cache._index_matrix.shape[1] == 16
+    assert len(cache._index_keys) == 8
+
+
+async def test_unusable_embedding_batch_keeps_templates_queued(engine):
+    cache = HotAnswerCache()
+    cache.seed_behavioral_templates()
+    cache.SIMILARITY_THRESHOLD = 0.0
+    await cache.lookup("tell me about your background")
+    indexed = list(cache._index_keys)
+    matrix = cache._index_matrix
+
+    real_embed_batch = engine.embed_batch
+    fails = {"min_batch": 1}
+
+    async def flaky_embed_batch(texts):
+        if len(texts) >= fails["min_batch"]:
+            engine.batches.append(list(texts))
+            return None
+        return await real_embed_batch(texts)
+
+    engine.embed_batch = flaky_embed_batch
+
+    # New template while the embedder is returning nothing usable.
+    cache.add_template("Where do you see yourself in five years", "In five years ...")
+    await cache.lookup("what is your biggest weakness")
+    assert cache._pending_keys == ["where do you see yourself in five years"]
+    assert cache._index_keys == indexed and cache._index_matrix is matrix
+
+    # Model change whose full re-embed fails: the old index is left untouched.
+    engine.dim = 48
+    fails["min_batch"] = 2
+    await cache._sync_index(engine)
+    assert cache._pending_keys == ["where do you see yourself in five years"]
+    assert cache._index_keys == indexed and cache._index_matrix is matrix
+
+    fails["min_batch"] = 100
+    hit = await cache.lookup("where do you see yourself in 5 years")
+    assert hit is cache._cache["where do you see yourself in five years"]
+    assert cache._pending_keys == []
+    assert cache._index_matrix.shape[1] == 48
+    assert sorted(cache._index_keys) == sorted(cache._cache)
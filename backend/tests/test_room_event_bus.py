@@ -0,0 +1,69 @@
+import asyncio
+import json
+
+import pytest
+
+pytest.importorskip("redis.asyncio")
+
+from app.session.room_event_bus import RedisRoomEventBus
+
+
+class _FakePubSub:
+    def __init__(self):
+        self.channels: set[str] = set()
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def subscribe(self, *channels):
+        self.channels.update(channels)
+
+    async def unsubscribe(self, *channels):
+        self.channels.difference_update(channels)
+
+    async def get_message(self, ignore_subscribe_messages=True, timeout=1.0):
+        try:
+            return await asyncio.wait_for(self.inbox.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self):
+        self.closed = True
+
+
+class _FakeRedis:
+    def __init__(self, pubsub: _FakePubSub):
+        self._pubsub = pubsub
+
+    def pubsub(self):
+        return self._pubsub
+
+
+async def test_bus_subscribes_only_local_rooms():
+    pubsub = _FakePubSub()
+    bus = RedisRoomEventBus("redis://localhost:6379/0", instance_id="node-a")
+    bus._redis = _FakeRedis(pubsub)
+    received = []
+
+    async def handler(room_id, payload, source):
+        received.append((room_id, payload.get("n"), source))
+
+    await bus.subscribe_room("r1")  # before listen: applied on connect
+    task = asyncio.create_task(bus.listen(handler))
+    await asyncio.sleep(0.01)
+    assert pubsub.channels == {"room:r1:events"}
+
+    await bus.subscribe_room("r2")
+    await bus.unsubscribe_room("r1")
+    assert pubsub.channels == {"room:r2:events"}
+
+    envelope = {"source_instance": "node-b", "published_at": 1.0, "payload": {"n": 1}}
+    await pubsub.inbox.put({"type": "message", "channel": "room:r1:events", "data": json.dumps(envelope)})
+    await pubsub.inbox.put({"type": "message", "channel": "room:r2:events", "data": json.dumps(envelope)})
+    await asyncio.sleep(0.01)
+
+    assert received == [("r2", 1, "node-b")]
+    assert bus.get_stats()["dropped_unsubscribed"] == 1
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    assert pubsub.closed
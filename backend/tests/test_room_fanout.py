@@ -0,0 +1,114 @@
+import asyncio
+import json
+
+from app.session.room_fanout import RoomFanout
+
+
+class _Conn:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.received: list[dict] = []
+        self.gate = asyncio.Event()
+        self.gate.set()
+
+
+async def _send(conn: _Conn, text: str) -> None:
+    await conn.gate.wait()
+    if conn.delay:
+        await asyncio.sleep(conn.delay)
+    conn.received.append(json.loads(text))
+
+
+async def test_fanout_encodes_once_and_slow_viewer_does_not_block_others(monkeypatch):
+    encodes = []
+    real_dumps = json.dumps
+
+    def counting_dumps(obj, *args, **kwargs):
+        encodes.append(obj)
+        return real_dumps(obj, *args, **kwargs)
+
+    monkeypatch.setattr("app.session.room_fanout.json.dumps", counting_dumps)
+    fanout = RoomFanout(send_fn=_send, queue_max=8, coalesce_types=frozenset())
+    sender, fast, slow = _Conn(), _Conn(), _Conn()
+    slow.gate.clear()
+    for conn in (sender, fast, slow):
+        fanout.attach("room-1", conn)
+
+    for i in range(3):
+        assert fanout.broadcast("room-1", {"type": "answer_suggestion_chunk", "i": i}, exclude=sender) == 2
+    await asyncio.sleep(0.01)
+
+    assert len(encodes) == 3
+    assert [m["i"] for m in fast.received] == [0, 1, 2]
+    assert slow.received == []
+    assert sender.received == []
+
+    slow.gate.set()
+    await asyncio.sleep(0.01)
+    assert [m["i"] for m in slow.received] == [0, 1, 2]
+
+    stats = fanout.get_room_stats("room-1")
+    assert stats["sent"] == 6
+    assert stats["latency_samples"] == 6
+    assert stats["p99_ms"] >= stats["p50_ms"] >= 0.0
+    for conn in (sender, fast, slow):
+        await fanout.detach(conn)
+    assert fanout.get_stats()["connections"] == 0
+
+
+async def test_fanout_coalesces_and_drops_only_coalescable_entries():
+    fanout = RoomFanout(send_fn=_send, queue_max=3, coalesce_types=frozenset({"partial_transcript"}))
+    slow = _Conn()
+    slow.gate.clear()
+    fanout.attach("room-2", slow)
+
+    fanout.broadcast("room-2", {"type": "partial_transcript", "text": "a"})
+    fanout.broadcast("room-2", {"type": "partial_transcript", "text": "ab"})
+    for i in range(3):
+        fanout.broadcast("room-2", {"type": "answer_suggestion_chunk", "i": i})
+
+    slow.gate.set()
+    await asyncio.sleep(0.01)
+
+    # The partial was coalesced, then dropped to make room; every chunk arrived.
+    assert [m["i"] for m in slow.received] == [0, 1, 2]
+    stats = fanout.get_room_stats("room-2")
+    assert stats["coalesced"] == 1
+    assert stats["dropped"] == 1
+    assert stats["overflows"] == 0
+    await fanout.detach(slow)
+
+
+async def test_fanout_disconnects_consumer_whose_queue_is_full_of_chunks():
+    overflowed = []
+
+    async def on_overflow(conn):
+        overflowed.append(conn)
+
+    fanout = RoomFanout(send_fn=_send, queue_max=4, coalesce_types=frozenset({"partial_transcript"}), overflow_fn=on_overflow)
+    slow, fast = _Conn(), _Conn()
+    slow.gate.clear()
+    fanout.attach("room-3", slow)
+    fanout.attach("room-3", fast)
+
+    for i in range(6):
+        fanout.broadcast("room-3", {"type": "answer_suggestion_chunk", "i": i})
+        await asyncio.sleep(0)  # the fast viewer keeps up between chunks
+    fanout.broadcast("room-3", {"type": "answer_suggestion_done"})
+    await asyncio.sleep(0.01)
+
+    assert overflowed == [slow]
+    assert [m.get("i") for m in fast.received] == [0, 1, 2, 3, 4, 5, None]
+    stats = fanout.get_room_stats("room-3")
+    assert stats["dropped"] == 0
+    assert stats["overflows"] == 1
+    assert stats["queued"] == 0
+
+    # Nothing reaches the cut-off consumer afterwards, not even a partial prefix.
+    slow.gate.set()
+    fanout.broadcast("room-3", {"type": "answer_suggestion_chunk", "i": 6})
+    await asyncio.sleep(0.01)
+    assert all(m.get("i") != 4 for m in slow.received)
+    assert [m["i"] for m in fast.received if "i" in m][-1] == 6
+    for conn in (slow, fast):
+        await fanout.detach(conn)
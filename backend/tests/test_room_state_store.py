@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from app.session.room_state_store import LocalRoomStateStore
+
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self._redis = redis
+        self._ops = []
+
+    def hset(self, key, mapping):
+        self._ops.append(("hset", key, mapping))
+
+    def hgetall(self, key):
+        self._ops.append(("hgetall", key, None))
+
+    def sadd(self, key, member):
+        self._ops.append(("sadd", key, member))
+
+    def srem(self, key, member):
+        self._ops.append(("srem", key, member))
+
+    def scard(self, key):
+        self._ops.append(("scard", key, None))
+
+    async def execute(self):
+        self._redis.round_trips += 1
+        if self._redis.partial_delay and any(
+            op == "hset" and arg.get("is_streaming") == "true" for op, _, arg in self._ops
+        ):
+            await asyncio.sleep(self._redis.partial_delay)
+        out = []
+        for op, key, arg in self._ops:
+            if op == "hset":
+                self._redis.hashes.setdefault(key, {}).update(arg)
+                self._redis.hset_calls.append(dict(arg))
+                out.append(len(arg))
+            elif op == "hgetall":
+                out.append(dict(self._redis.hashes.get(key, {})))
+            elif op == "srem":
+                self._redis.sets.get(key, set()).discard(arg)
+                out.append(1)
+            elif op == "scard":
+                out.append(len(self._redis.sets.get(key, set())))
+            else:
+                self._redis.sets.setdefault(key, set()).add(arg)
+                out.append(1)
+        return out
+
+
+class _FakeRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict] = {}
+        self.sets: dict[str, set] = {}
+        self.hset_calls: list[dict] = []
+        self.round_trips = 0
+        self.partial_delay = 0.0
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+    async def hgetall(self, key):
+        self.round_trips += 1
+        return dict(self.hashes.get(key, {}))
+
+
+def _redis_store(coalesce_ms: float):
+    pytest.importorskip("redis.asyncio")
+    from app.session.room_state_store import RedisRoomStateStore
+
+    store = RedisRoomStateStore("redis://localhost:6379/0", partial_coalesce_ms=coalesce_ms)
+    store._redis = _FakeRedis()
+    return store
+
+
+async def test_local_join_room_returns_current_state():
+    store = LocalRoomStateStore()
+    await store.update_state("r1", {"active_question": "Why us?", "is_streaming": True})
+    state = await store.join_room("r1", "conn-1")
+    assert state.active_question == "Why us?"
+    assert state.is_streaming is True
+
+
+async def test_redis_update_writes_only_changed_fields_in_one_round_trip():
+    store = _redis_store(coalesce_ms=0)
+    await store.update_state("r1", {"active_question": "Q1", "assist_intensity": 3})
+    before = store._redis.round_trips
+    state = await store.update_state("r1", {"is_streaming": True})
+
+    assert store._redis.round_trips - before == 1
+    assert set(store._redis.hset_calls[-1]) == {"is_streaming", "updated_at"}
+    assert state.active_question == "Q1"
+    assert state.assist_intensity == 3
+    assert state.is_streaming is True
+
+    joined = await store.join_room("r1", "conn-1")
+    assert joined.active_question == "Q1"
+    assert store._redis.sets["room:r1:members"] == {"conn-1"}
+
+
+async def test_redis_streaming_partial_answers_are_coalesced():
+    store = _redis_store(coalesce_ms=30)
+    for text in ["a", "ab", "abc", "abcd"]:
+        await store.update_state("r1", {"partial_answer": text, "is_streaming": True})
+    assert len(store._redis.hset_calls) == 1
+
+    await asyncio.sleep(0.06)
+    assert store._redis.hashes["room:r1:state"]["partial_answer"] == "abcd"
+    assert len(store._redis.hset_calls) == 2
+
+    await store.update_state("r1", {"partial_answer": "abcde", "is_streaming": True})
+    await store.update_state("r1", {"partial_answer": "final", "is_streaming": False})
+    await asyncio.sleep(0.06)
+    assert store._redis.hashes["room:r1:state"]["partial_answer"] == "final"
+    assert store._redis.hashes["room:r1:state"]["is_streaming"] == "false"
+
+
+async def test_redis_final_update_waits_for_in_flight_partial_flush():
+    store = _redis_store(coalesce_ms=50)
+    store._redis.partial_delay = 0.03
+    await store.update_state("r1", {"partial_answer": "a", "is_streaming": True})
+    await store.update_state("r1", {"partial_answer": "ab", "is_streaming": True})
+    await asyncio.sleep(0.03)  # the deferred flush has started and is slow
+    assert "r1" in store._partial_flushes
+
+    state = await store.update_state("r1", {"partial_answer": "done", "is_streaming": False})
+    await asyncio.sleep(0.08)
+
+    assert state.is_streaming is False
+    assert store._redis.hashes["room:r1:state"]["partial_answer"] == "done"
+    assert store._redis.hashes["room:r1:state"]["is_streaming"] == "false"
+    assert store._partial_flushes == {}
+
+
+async def test_redis_remove_last_connection_prunes_partial_bookkeeping():
+    store = _redis_store(coalesce_ms=30)
+    await store.join_room("r1", "conn-1")
+    await store.update_state("r1", {"partial_answer": "a", "is_streaming": True})
+    assert "r1" in store._last_partial_write
+
+    await store.remove_connection("r1", "conn-1")
+    assert "r1" not in store._last_partial_write
+    assert store._redis.sets["room:r1:members"] == set()
@@ -0,0 +1,178 @@
+import asyncio
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from app.services.semantic_similarity import EmbeddingLRUCache
+
+
+def test_embedding_lru_evicts_least_recently_used():
+    cache = EmbeddingLRUCache(max_entries=2, max_bytes=0, ttl_sec=300)
+    cache.put("a", np.ones(4))
+    cache.put("b", np.ones(4))
+    assert cache.get("a") is not None  # "a" becomes most recently used
+
+    cache.put("c", np.ones(4))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert cache.evictions == 1
+
+
+def test_embedding_lru_respects_byte_bound_and_ttl():
+    cache = EmbeddingLRUCache(max_entries=100, max_bytes=64, ttl_sec=300)
+    for key in ("a", "b", "c"):
+        cache.put(key, np.ones(8))  # 8 x float32 = 32 bytes
+
+    assert len(cache) == 2
+    assert cache.total_bytes == 64
+
+    cache.ttl_sec = -1
+    assert cache.get("c") is None
+    assert cache.expirations == 1
+    assert cache.get_stats()["lru_misses"] == 1
+
+
+async def test_micro_batcher_encodes_concurrent_requests_once():
+    from app.services.semantic_similarity import EmbeddingMicroBatcher
+
+    calls = []
+
+    def _encode(texts):
+        calls.append(list(texts))
+        return [np.full(3, len(t), dtype=np.float32) for t in texts]
+
+    batcher = EmbeddingMicroBatcher(_encode, max_batch_size=8, max_wait_ms=5)
+    results = await asyncio.gather(
+        batcher.embed("a"), batcher.embed("bb"), batcher.embed("a")
+    )
+
+    assert calls == [["a", "bb"]]
+    assert [float(r[0]) for r in results] == [1.0, 2.0, 1.0]
+    stats = batcher.get_stats()
+    assert stats["batches"] == 1
+    assert stats["deduplicated"] == 1
+    assert stats["batch_size_histogram"]["buckets"]["2"] == 1
+    assert stats["wait_ms_histogram"]["count"] == 3
+
+
+class FakeBinaryRedis:
+    """Dict-backed stand-in for the decode_responses=False client."""
+
+    def __init__(self, fail=False):
+        self.data = {}
+        self.ttls = {}
+        self.fail = fail
+        self.calls = []
+
+    async def mget(self, keys):
+        self.calls.append(("mget", list(keys)))
+        if self.fail:
+            raise ConnectionError("redis down")
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        redis = self
+
+        class _Pipe:
+            def __init__(self):
+                self.ops = []
+
+            def set(self, key, value, ex=None):
+                self.ops.append((key, value, ex))
+
+            async def execute(self):
+                redis.calls.append(("pipeline", len(self.ops)))
+                for key, value, ex in self.ops:
+                    redis.data[key] = value
+                    redis.ttls[key] = ex
+
+        return _Pipe()
+
+
+async def test_redis_embedding_store_round_trips_packed_vectors(monkeypatch):
+    from app.services import semantic_similarity
+    from app.services.semantic_similarity import RedisEmbeddingStore
+
+    fake = FakeBinaryRedis()
+    monkeypatch.setattr(semantic_similarity, "_REDIS_AVAILABLE", True)
+    monkeypatch.setattr(semantic_similarity, "get_redis_binary", lambda: fake, raising=False)
+
+    store = RedisEmbeddingStore(dtype="float16", ttl_sec=60)
+    vector = np.array([0.5, -0.25, 1.0], dtype=np.float32)
+    await store.set_many("mini", [("h1", vector)])
+
+    key = "emb:mini:float16:h1"
+    assert fake.data[key] == vector.astype("<f2").tobytes()
+    assert fake.ttls[key] == 60
+
+    hit, miss = await store.mget("mini", ["h1", "h2"])
+    assert miss is None
+    assert hit.dtype == np.float32
+    np.testing.assert_allclose(hit, vector)
+    # Namespaces never mix.
+    assert (await store.mget("ada-002", ["h1"])) == [None]
+
+    fake.fail = True
+    assert (await store.mget("mini", ["h1"])) == [None]
+    stats = store.get_stats()
+    assert (stats["redis_hits"], stats["redis_misses"], stats["redis_writes"], stats["redis_errors"]) == (1, 2, 1, 1)
+
+
+async def test_fallback_vectors_never_reach_the_shared_tier(monkeypatch):
+    from app.services import semantic_similarity
+    from app.services.semantic_similarity import RedisEmbeddingStore, SemanticSimilarityEngine
+
+    class FailingEmbeddings:
+        async def create(self, **kwargs):
+            raise RuntimeError("openai down")
+
+    class FailingClient:
+        embeddings = FailingEmbeddings()
+
+    fake = FakeBinaryRedis()
+    monkeypatch.setattr(semantic_similarity, "_REDIS_AVAILABLE", True)
+    monkeypatch.setattr(semantic_similarity, "get_redis_binary", lambda: fake, raising=False)
+    monkeypatch.setattr(semantic_similarity, "_openai_client", FailingClient())
+
+    engine = SemanticSimilarityEngine()
+    engine._shared = RedisEmbeddingStore()
+    engine._initialized = True
+    engine._use_openai = True
+
+    vector = await engine.embed("what is kafka")
+    assert vector.shape == (384,)
+    await asyncio.sleep(0)
+    assert fake.data == {}
+    assert len(engine._cache) == 0
+    assert engine.get_stats()["fallback_embeddings"] == 1
+
+    # A shared hit from a real ada-002 writer is served and counted.
+    real = np.ones(1536, dtype=np.float32) / np.sqrt(1536)
+    fake.data[f"emb:ada-002:float16:{engine._text_hash('what is kafka')}"] = real.astype("<f2").tobytes()
+    assert (await engine.embed("what is kafka")).shape == (1536,)
+    assert engine.get_stats()["shared_cache_hits"] == 1
+
+    # Character-frequency mode never talks to Redis.
+    engine._use_openai = False
+    calls_before = len(fake.calls)
+    await engine.embed("brand new text")
+    await engine.embed_batch(["another", "brand new text"])
+    await asyncio.sleep(0)
+    assert len(fake.calls) == calls_before
+
+
+def test_get_redis_binary_is_optional_and_undecoded(monkeypatch):
+    from core import redis_pool
+
+    monkeypatch.setattr(redis_pool, "_binary_pool", None)
+    monkeypatch.delenv("REDIS_URL", raising=False)
+    assert redis_pool.get_redis_binary() is None
+
+    monkeypatch.setenv("REDIS_URL", "redis://localhost:6399/0")
+    client = redis_pool.get_redis_binary()
+    assert client is not None
+    assert client.connection_pool.connection_kwargs["decode_responses"] is False
+    assert redis_pool.get_redis_binary() is client
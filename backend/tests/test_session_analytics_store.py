@@ -0,0 +1,73 @@
+from app.analytics.session_analytics_store import SessionAnalyticsSegmentStore
+
+
+def test_segment_store_indexes_users_and_reloads_lazily(tmp_path):
+    store = SessionAnalyticsSegmentStore(tmp_path, segment_max_bytes=256, hot_cache_size=2)
+    for idx in range(6):
+        uid = "u1" if idx % 2 == 0 else "u2"
+        store.save(f"s{idx}", {"user_id": uid, "generated_at": float(idx), "score": idx})
+    store.save("s0", {"user_id": "u1", "generated_at": 10.0, "score": 99})
+    store.close()
+
+    assert len(list(tmp_path.glob("segment-*.log"))) > 1
+
+    reloaded = SessionAnalyticsSegmentStore(tmp_path, segment_max_bytes=256, hot_cache_size=2)
+    reloaded.load()
+
+    assert reloaded.user_ids() == ["u1", "u2"]
+    rows = reloaded.list_user("u1", limit=2)
+    assert [sid for sid, _ in rows] == ["s4", "s0"]
+    assert rows[-1][1]["score"] == 99
+    assert reloaded.get("s3")["user_id"] == "u2"
+
+
+def test_segment_store_compaction_drops_dead_versions(tmp_path):
+    store = SessionAnalyticsSegmentStore(tmp_path)
+    for version in range(5):
+        store.save("s1", {"user_id": "u1", "generated_at": float(version), "v": version})
+    assert store.dead_ratio() > 0.5
+
+    store.compact()
+    store.close()
+
+    reloaded = SessionAnalyticsSegmentStore(tmp_path)
+    reloaded.load()
+    assert reloaded.dead_ratio() == 0.0
+    assert reloaded.get("s1")["v"] == 4
+    assert [sid for sid, _ in reloaded.list_user("u1", limit=10)] == ["s1"]
+
+
+def test_segment_store_load_truncates_torn_tail(tmp_path):
+    store = SessionAnalyticsSegmentStore(tmp_path)
+    store.save("s1", {"user_id": "u1", "generated_at": 1.0})
+    store.close()
+    segment = next(tmp_path.glob("segment-*.log"))
+    intact = segment.stat().st_size
+    with segment.open("ab") as handle:
+        handle.write(b'{"sid": "s2", "uid": "u1", "ts": 2.0}\t{"user_id": "u1", "gen')
+
+    reloaded = SessionAnalyticsSegmentStore(tmp_path)
+    reloaded.load()
+    assert segment.stat().st_size == intact
+    assert len(reloaded) == 1
+
+    reloaded.save("s3", {"user_id": "u1", "generated_at": 3.0})
+    reloaded.close()
+    again = SessionAnalyticsSegmentStore(tmp_path)
+    again.load()
+    assert [sid for sid, _ in again.list_user("u1", limit=10)] == ["s1", "s3"]
+    assert again.get("s3")["generated_at"] == 3.0
+
+
+def test_segment_store_resave_moves_session_in_user_index(tmp_path):
+    store = SessionAnalyticsSegmentStore(tmp_path)
+    for idx in range(4):
+        store.save(f"s{idx}", {"user_id": "u1", "generated_at": float(idx)})
+    store.save("s1", {"user_id": "u1", "generated_at": 9.0})
+    store.save("s2", {"user_id": "u2", "generated_at": 2.0})
+
+    assert store._user_index["u1"] == [(0.0, "s0"), (3.0, "s3"), (9.0, "s1")]
+    assert [sid for sid, _ in store.list_user("u1", limit=2)] == ["s3", "s1"]
+    assert [sid for sid, _ in store.list_user("u2", limit=5)] == ["s2"]
+    assert store.list_user("u1", limit=0) == []
+    store.close()
@@ -0,0 +1,59 @@
+import re
+
+from app.analytics.performance_engine import SkillCoverageTracker
+from app.context.alignment_engine import AlignmentEngine
+from app.context.skill_matcher import SkillMatcher, get_context_skill_matcher
+from app.skillgraph.engine import SkillGraph
+
+
+SKILLS = ["Java", "JavaScript", "React", "React Native", "C++", ".NET", "Node.js", "CI/CD", "machine learning", "go"]
+
+
+def _reference_present(text: str, skill: str) -> bool:
+    pattern = r"(?<!\w)" + re.escape(skill.lower().strip()) + r"(?!\w)"
+    return re.search(pattern, text.lower()) is not None
+
+
+def test_single_pass_matches_per_skill_patterns():
+    matcher = SkillMatcher(SKILLS)
+    answers = [
+        "I shipped React Native apps and some React web code in JavaScript.",
+        "Mostly Java and C++ on .NET, plus Node.js services behind CI/CD.",
+        "We used javascript only; no java at all. Let's go!",
+        "machine learning pipelines, golang, reactive streams",
+        "",
+    ]
+    for answer in answers:
+        found = matcher.find_all(answer)
+        for skill in SKILLS:
+            assert (skill.lower() in found) == _reference_present(answer, skill), (answer, skill)
+
+    found = matcher.find_all("react native and react")
+    assert found["react native"] == [0]
+    assert found["react"] == [0, 17]
+    # Whitespace inside a multi-word skill is normalized.
+    assert "machine learning" in matcher.find_all("Machine\n  Learning")
+
+
+def test_modules_share_one_matcher_and_agree():
+    jd = {"must_have_skills": ["Java", "Kubernetes", "SQL"], "nice_to_have_skills": ["React"]}
+    resume = {"primary_skills": ["Java"], "secondary_skills": ["React Native"]}
+    answer = "I ran Java services on Kubernetes and built the React Native client."
+
+    matcher = get_context_skill_matcher(jd, resume)
+    assert get_context_skill_matcher(jd, resume) is matcher
+
+    alignment = AlignmentEngine()
+    assert alignment.compute_alignment(answer, jd, resume, matcher=matcher) == 10 + 10 + 5 + 3
+    assert alignment.compute_alignment(answer, jd, resume) == 28
+    assert alignment.get_missing_must_have_skills(answer, jd, matcher=matcher) == ["SQL"]
+
+    _, covered, missing, _ = SkillCoverageTracker().coverage(jd, answer, 60.0, {}, matcher=matcher)
+    assert covered == ["Java", "Kubernetes"]
+    assert missing == ["SQL"]
+
+    graph = SkillGraph.from_contexts(jd, resume)
+    assert graph._get_matcher() is matcher
+    assert sorted(graph.update_from_answer(answer, 0.8, 0.6, 1)) == ["Java", "Kubernetes", "React", "React Native"]
+    # Word boundaries hold: "Java" is not evidence from "JavaScript".
+    assert graph.update_from_answer("Only JavaScript here", 0.8, 0.6, 2) == []
@@ -0,0 +1,113 @@
+import app.state as state
+
+
+def _close_wal():
+    if state._wal_file is not None:
+        state._wal_file.close()
+        state._wal_file = None
+
+
+def test_user_context_wal_appends_deltas_and_replays(user_context_store):
+    store_path = user_context_store
+
+    state.set_resume_text("u1", "resume body")
+    state.set_company_mode("u1", "amazon")
+    state.mark_credibility_snapshot("u1", {"session_id": "s1", "consistency_score": 0.7})
+    _close_wal()
+
+    assert not store_path.exists()
+    assert len(state._wal_path.read_text(encoding="utf-8").splitlines()) == 3
+
+    state._load_store()
+    context = state.user_context_by_user_id["u1"]
+    assert context["resume_text"] == "resume body"
+    assert context["company_mode"] == "amazon"
+    assert [item["session_id"] for item in context["credibility_history"]] == ["s1"]
+    assert state._wal_seq == 3
+
+
+def test_user_context_wal_compaction_folds_into_snapshot(user_context_store):
+    store_path = user_context_store
+
+    state.set_resume_text("u1", "v1")
+    state.set_resume_text("u2", "other")
+    state.set_resume_text("u1", "v2")
+    state._compact_wal()
+
+    assert store_path.exists()
+    assert not state._wal_path.exists()
+    assert not state._wal_compacting_path.exists()
+
+    state.set_job_description("u1", "jd")
+    _close_wal()
+
+    state._load_store()
+    assert state.user_context_by_user_id["u1"]["resume_text"] == "v2"
+    assert state.user_context_by_user_id["u1"]["job_description"] == "jd"
+    assert state.user_context_by_user_id["u2"]["resume_text"] == "other"
+    assert state._wal_seq == 4
+
+
+class _FakeRedisContextStore:
+    def __init__(self):
+        self.data = {}
+        self.puts = 0
+
+    def get(self, user_id):
+        raw = self.data.get(user_id)
+        return None if raw is None else __import__("json").loads(raw)
+
+    def put_raw(self, user_id, payload):
+        self.puts += 1
+        self.data[user_id] = payload
+
+
+def test_user_context_redis_writes_drop_stale_snapshots(monkeypatch, user_context_store):
+    fake = _FakeRedisContextStore()
+    monkeypatch.setattr(state, "_get_redis_ctx_store", lambda: fake)
+
+    with state._user_lock("u1"):
+        state.user_context_by_user_id["u1"] = state._empty_context()
+        state.user_context_by_user_id["u1"]["resume_text"] = "old"
+        older = state._persist_store("u1", {"resume_text": "old"})
+        state.user_context_by_user_id["u1"]["resume_text"] = "new"
+        newer = state._persist_store("u1", {"resume_text": "new"})
+
+    state._flush_redis("u1", newer)
+    state._flush_redis("u1", older)  # arrives late; must not clobber
+
+    assert fake.puts == 1
+    assert state.get_user_context("u1")["resume_text"] == "new"
+    # Bookkeeping is dropped once nothing is in flight.
+    assert state._pending_writes_by_user_id == {}
+    assert state._written_seq_by_user_id == {}
+
+
+def test_user_context_redis_read_keeps_unflushed_local_write(monkeypatch, user_context_store):
+    fake = _FakeRedisContextStore()
+    fake.data["u1"] = '{"resume_text": "stale"}'
+    monkeypatch.setattr(state, "_get_redis_ctx_store", lambda: fake)
+
+    # A setter has updated memory but its Redis write has not landed yet.
+    with state._user_lock("u1"):
+        state.user_context_by_user_id["u1"] = state._empty_context()
+        state.user_context_by_user_id["u1"]["resume_text"] = "fresh"
+        pending = state._persist_store("u1", {"resume_text": "fresh"})
+
+    assert state.get_user_context("u1")["resume_text"] == "fresh"
+    assert state.user_context_by_user_id["u1"]["resume_text"] == "fresh"
+
+    state._flush_redis("u1", pending)
+    assert state.get_user_context("u1")["resume_text"] == "fresh"
+    assert state._pending_writes_by_user_id == {}
+
+
+async def test_user_context_async_api_runs_the_sharded_store(user_context_store):
+    assert await state.get_context_version_async("u1") == 0
+    await state.set_resume_text_async("u1", "async resume")
+    await state.set_job_description_async("u1", "async jd")
+
+    context = await state.get_user_context_async("u1")
+    assert context["resume_text"] == "async resume"
+    assert context["job_description"] == "async jd"
+    assert await state.get_context_version_async("u1") == 2
@@ -0,0 +1,51 @@
+import threading
+
+from app.system_metrics import LatencyHistogram, get_metrics_snapshot, observe_latency_ms, render_prometheus
+
+
+def test_histogram_merges_per_thread_shards_and_reports_tail():
+    histogram = LatencyHistogram("test_ms")
+
+    def worker():
+        for value in range(1, 1001):
+            histogram.observe(float(value))
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    counts, total, count = histogram.merged()
+    assert count == 4000
+    assert sum(counts) == 4000
+    assert total == 4 * sum(range(1, 1001))
+
+    summary = histogram.summary()
+    # Buckets are ~25% wide, so interpolated quantiles stay within one bucket of the exact value.
+    assert 400 <= summary["p50"] <= 625
+    assert 760 <= summary["p95"] <= 1200
+    assert summary["p99"] >= summary["p95"] >= summary["p50"]
+
+
+def test_empty_histogram_and_overflow_bucket():
+    histogram = LatencyHistogram("empty_ms", bounds=(1.0, 10.0))
+    assert histogram.summary()["p99"] == 0.0
+    histogram.observe(50.0)
+    counts, _, _ = histogram.merged()
+    assert counts == [0, 0, 1]
+    assert histogram.quantile(0.99) == 10.0
+
+
+def test_snapshot_keeps_average_keys_and_prometheus_exposes_histograms():
+    before = get_metrics_snapshot()["latency_samples"]
+    observe_latency_ms(12.0)
+    snapshot = get_metrics_snapshot()
+    assert snapshot["latency_samples"] == before + 1
+    assert "avg_latency_ms" in snapshot
+    assert set(snapshot["histograms"]["time_to_first_token_ms"]) >= {"count", "p50", "p95", "p99"}
+
+    text = render_prometheus()
+    assert "# TYPE atluri_latency_ms histogram" in text
+    assert 'atluri_latency_ms_bucket{le="+Inf"}' in text
+    assert "atluri_time_to_first_token_ms_count" in text
@@ -1,6 +1,15 @@
+import asyncio
+
 import pytest
 
-from app.api.ws_voice_components import CoachingEmitter, TranscriptRouter, TurnDecisionPipeline
+from app.api.ws_voice_components import (
+    CoachingEmitter,
+    TokenStreamCoalescer,
+    TranscriptRouter,
+    TurnDecisionPipeline,
+    sniff_control_frame_type,
+    text_frame_exceeds,
+)
 
 
 @pytest.mark.asyncio
@@ -40,3 +49,57 @@ async def test_transcript_router_invokes_handler():
     await router.route({"type": "candidate_transcript", "text": "hello"})
 
     assert observed == [{"type": "candidate_transcript", "text": "hello"}]
+
+
+def test_control_frame_sniff_matches_only_unambiguous_heartbeats():
+    assert sniff_control_frame_type('{"type":"ping"}') == "ping"
+    assert sniff_control_frame_type(' { "type" : "pong", "ts": 1 }') == "pong"
+    assert sniff_control_frame_type('{"type":"pinger"}') is None
+    assert sniff_control_frame_type('{"ts": 1, "type":"ping"}') is None
+    assert sniff_control_frame_type('{"type":"ping","type":"stop"}') is None
+
+
+def test_text_frame_size_check_counts_utf8_bytes():
+    assert not text_frame_exceeds("a" * 10, 40)
+    assert text_frame_exceeds("a" * 41, 40)
+    assert text_frame_exceeds("é" * 15, 20)  # 15 chars, 30 bytes
+    assert not text_frame_exceeds("é" * 10, 20)
+
+
+@pytest.mark.asyncio
+async def test_token_stream_coalescer_batches_after_first_token():
+    frames = []
+
+    async def _emit(text: str, count: int):
+        frames.append((text, count))
+
+    coalescer = TokenStreamCoalescer(emit_fn=_emit, flush_ms=30.0, max_chars=12)
+    for token in ["Hi", " there", ",", " I", " led", " the", " migration"]:
+        await coalescer.add(token)
+    await coalescer.close()
+
+    assert frames[0] == ("Hi", 1)  # first token is never delayed
+    assert "".join(text for text, _ in frames) == "Hi there, I led the migration"
+    assert sum(count for _, count in frames) == 7
+    assert len(frames) < 7
+    assert coalescer.frames_saved == 7 - len(frames)
+
+
+@pytest.mark.asyncio
+async def test_token_stream_coalescer_timer_flushes_quiet_tail():
+    frames = []
+
+    async def _emit(text: str, count: int):
+        frames.append(text)
+
+    coalescer = TokenStreamCoalescer(emit_fn=_emit, flush_ms=10.0, max_chars=1000)
+    await coalescer.add("a")
+    await coalescer.add("b")
+    await asyncio.sleep(0.05)
+    assert frames == ["a", "b"]
+
+    await coalescer.add("c")  # window already elapsed: sent at once
+    await coalescer.add("d")
+    coalescer.cancel()
+    await asyncio.sleep(0.03)
+    assert frames == ["a", "b", "c"]
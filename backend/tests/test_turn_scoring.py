@@ -0,0 +1,107 @@
+import asyncio
+import pickle
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.thread import BrokenThreadPool
+
+import pytest
+
+from app.ai_reasoning.scoring import SCORING_STAGES, TurnScoringInput, TurnScoringPool, score_turn
+
+
+ANSWER = (
+    "In that situation the goal was to cut checkout latency. I designed a Kubernetes rollout, "
+    "migrated the Java services and reduced p95 latency by 40% because retries were piling up."
+)
+
+
+def _turn(**overrides) -> TurnScoringInput:
+    values = dict(
+        summary=ANSWER,
+        role_ctx={"skill_keywords": ["kubernetes"], "weights": {"clarity": 0.3}},
+        jd_context={"must_have_skills": ["Java", "Kubernetes"], "seniority_level": "senior"},
+        resume_profile={"primary_skills": ["Java"]},
+        analytics_state={"overall_scores": [55.0]},
+        difficulty_level="L2",
+        performance_history=[55.0],
+    )
+    values.update(overrides)
+    return TurnScoringInput.build(**values)
+
+
+def test_score_turn_is_pure_and_picklable():
+    session_state = {"overall_scores": [55.0]}
+    turn = _turn(analytics_state=session_state)
+    first = score_turn(turn)
+    second = score_turn(pickle.loads(pickle.dumps(turn)))
+
+    assert session_state == {"overall_scores": [55.0]}
+    assert first.alignment_score == second.alignment_score == 23
+    assert first.overall == second.overall
+    assert first.analytics_state == second.analytics_state
+    assert first.difficulty_result["history"] == [55.0, first.overall]
+    assert set(SCORING_STAGES) | {"total"} == set(first.stage_ms)
+
+
+async def test_pool_scores_off_loop_and_falls_back_inline_when_saturated(monkeypatch):
+    from app.ai_reasoning import scoring
+
+    threads = []
+    original = scoring.compute_structure
+
+    def recording_structure(text):
+        threads.append(threading.current_thread().name)
+        return original(text)
+
+    monkeypatch.setattr(scoring, "compute_structure", recording_structure)
+
+    pool = TurnScoringPool(mode="thread", workers=1, max_pending=1)
+    try:
+        results = await asyncio.gather(pool.score(_turn()), pool.score(_turn()))
+    finally:
+        pool.shutdown()
+
+    assert results[0].overall == results[1].overall
+    assert any(name.startswith("turn-scoring") for name in threads)
+    stats = pool.get_stats()
+    assert stats["pooled"] == 1
+    assert stats["inline"] == 1
+    assert stats["saturated"] == 1
+    assert stats["avg_stage_ms"]["total"] > 0
+
+
+class _BrokenPool(ThreadPoolExecutor):
+    def __init__(self):
+        super().__init__(max_workers=1)
+        self.shutdown_calls = []
+
+    def submit(self, fn, /, *args, **kwargs):
+        raise BrokenThreadPool("worker died")
+
+    def shutdown(self, wait=True, **kwargs):
+        self.shutdown_calls.append(wait)
+        super().shutdown(wait=wait, **kwargs)
+
+
+async def test_pool_replaces_broken_executor_but_propagates_scoring_errors(monkeypatch):
+    from app.ai_reasoning import scoring
+
+    pool = TurnScoringPool(mode="thread", workers=1, max_pending=4)
+    broken = pool._executor = _BrokenPool()
+    scores = await pool.score(_turn())
+    assert scores.overall == score_turn(_turn()).overall
+    assert pool.get_stats()["pool_errors"] == 1
+    assert broken.shutdown_calls == [False]
+    assert pool._executor is None
+
+    def failing_structure(text):
+        raise ValueError("bad transcript")
+
+    monkeypatch.setattr(scoring, "compute_structure", failing_structure)
+    try:
+        with pytest.raises(ValueError):
+            await pool.score(_turn())
+    finally:
+        pool.shutdown()
+    assert pool.get_stats()["pool_errors"] == 1
+    assert pool.get_stats()["inline"] == 1
@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+
+from app.services.observability_dashboard import ObservabilityDashboard
+from app.services.turn_tracing import TurnTracer
+
+
+async def _run_turn(tracer: TurnTracer):
+    trace = tracer.start("session-1", "turn-1")
+    trace.mark("stt_final")
+    with trace.span("decision"):
+        await asyncio.sleep(0.01)
+    llm_started = time.perf_counter()
+    await asyncio.sleep(0.01)
+    trace.add_span("llm_first_token", llm_started)
+    trace.mark("first_chunk_sent")
+    await tracer.finish(trace)
+    await tracer.finish(trace)  # idempotent
+    return trace
+
+
+async def test_breakdown_reaches_dashboard_without_sink():
+    dashboard = ObservabilityDashboard()
+    tracer = TurnTracer(sample_rate=1.0, sink_path="", dashboard=dashboard)
+    trace = await _run_turn(tracer)
+
+    breakdown = trace.breakdown()
+    assert breakdown["decision"] >= 5.0
+    assert breakdown["stt_final_to_first_chunk_sent"] >= breakdown["llm_first_token"]
+    assert not trace.sampled
+
+    snapshot = await dashboard.get_snapshot()
+    stages = snapshot["turn_latency"]
+    assert stages["decision"]["count"] == 1
+    assert stages["stt_final_to_first_chunk_sent"]["p95_ms"] > 0
+    assert tracer.get_stats()["finished"] == 1
+
+
+async def test_sampled_traces_export_jsonl_and_otlp(tmp_path):
+    jsonl_path = tmp_path / "traces.jsonl"
+    tracer = TurnTracer(sample_rate=1.0, sink_path=str(jsonl_path), dashboard=ObservabilityDashboard())
+    await _run_turn(tracer)
+    tracer.flush()
+    record = json.loads(jsonl_path.read_text().strip())
+    assert record["turn_id"] == "turn-1"
+    assert [span["name"] for span in record["spans"]] == ["decision", "llm_first_token"]
+    assert "stt_final_to_first_chunk_sent" in record["breakdown_ms"]
+
+    otlp_path = tmp_path / "traces.otlp.jsonl"
+    tracer = TurnTracer(sample_rate=1.0, sink_path=str(otlp_path), sink_format="otlp", dashboard=ObservabilityDashboard())
+    await _run_turn(tracer)
+    tracer.flush()
+    spans = json.loads(otlp_path.read_text().strip())["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, children = spans[0], spans[1:]
+    assert root["name"] == "voice.turn"
+    assert {span["parentSpanId"] for span in children} == {root["spanId"]}
+    assert all(int(span["endTimeUnixNano"]) >= int(span["startTimeUnixNano"]) for span in spans)
+
+    unsampled = TurnTracer(sample_rate=0.0, sink_path=str(tmp_path / "none.jsonl"), dashboard=ObservabilityDashboard())
+    await _run_turn(unsampled)
+    unsampled.flush()
+    assert not (tmp_path / "none.jsonl").exists()
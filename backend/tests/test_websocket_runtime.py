@@ -45,13 +45,22 @@ async def test_broadcast_room_local_uses_per_connection_locks():
         ws_voice.room_connections[room_id].add(ws_b)
         ws_voice.websocket_send_locks[ws_a] = asyncio.Lock()
         ws_voice.websocket_send_locks[ws_b] = asyncio.Lock()
+    ws_voice.room_fanout.attach(room_id, ws_a)
+    ws_voice.room_fanout.attach(room_id, ws_b)
 
     await ws_voice._broadcast_room_local(room_id, {"type": "event", "v": 1}, exclude=None)
+    # Sends are queued per connection and drained by each connection's writer.
+    for _ in range(20):
+        if ws_a.sent and ws_b.sent:
+            break
+        await asyncio.sleep(0)
 
     assert len(ws_a.sent) == 1
     assert len(ws_b.sent) == 1
     assert json.loads(ws_a.sent[0])["type"] == "event"
 
+    await ws_voice.room_fanout.detach(ws_a)
+    await ws_voice.room_fanout.detach(ws_b)
     async with ws_voice.room_lock:
         ws_voice.room_connections[room_id].discard(ws_a)
         ws_voice.room_connections[room_id].discard(ws_b)
@@ -0,0 +1,237 @@
+import asyncio
+
+import pytest
+
+from app.api.ws_admission import (
+    PRIORITY_NEW,
+    PRIORITY_PAID,
+    PRIORITY_RECONNECT,
+    AdmissionController,
+)
+
+
+@pytest.fixture
+async def make_controller():
+    controllers = []
+
+    def _make(**overrides):
+        options = dict(
+            max_concurrent=1,
+            queue_max_wait=2.0,
+            queue_size=10,
+            aging_sec=60.0,
+            max_loop_lag_ms=0,
+            max_active_streams=0,
+            active_streams_fn=lambda: 0,
+        )
+        options.update(overrides)
+        controllers.append(AdmissionController(**options))
+        return controllers[-1]
+
+    yield _make
+    for controller in controllers:
+        for task in (controller._monitor_task, controller._heartbeat_task):
+            if task is not None:
+                task.cancel()
+
+
+async def test_admission_serves_reconnect_then_paid_then_new_in_fifo_order(make_controller):
+    controller = make_controller()
+    assert controller.try_acquire()
+    order = []
+
+    async def wait(name, priority):
+        if await controller.acquire(priority=priority):
+            order.append(name)
+
+    tasks = [
+        asyncio.create_task(wait("new-1", PRIORITY_NEW)),
+        asyncio.create_task(wait("paid-1", PRIORITY_PAID)),
+        asyncio.create_task(wait("new-2", PRIORITY_NEW)),
+        asyncio.create_task(wait("reconnect-1", PRIORITY_RECONNECT)),
+    ]
+    await asyncio.sleep(0.01)
+    assert controller.stats()["queued_by_class"] == {"reconnect": 1, "paid": 1, "new": 2}
+
+    for _ in range(4):
+        await controller.release()
+        await asyncio.sleep(0.01)
+    await asyncio.gather(*tasks)
+    assert order == ["reconnect-1", "paid-1", "new-1", "new-2"]
+
+
+async def test_admission_sends_position_updates_and_respects_capacity_signals(make_controller):
+    streams = {"active": 5}
+    controller = make_controller(max_concurrent=5, max_active_streams=3, active_streams_fn=lambda: streams["active"])
+    assert not controller.try_acquire()  # healthy slots, but too many answer streams in flight
+
+    updates = []
+
+    async def on_update(position, eta):
+        updates.append(position)
+
+    task = asyncio.create_task(controller.acquire(priority=PRIORITY_NEW, on_update=on_update))
+    await asyncio.sleep(0.05)
+    assert updates == [1]
+    assert not task.done()
+
+    streams["active"] = 0
+    assert await asyncio.wait_for(task, timeout=1.0)
+    assert controller.active_connections == 1
+
+
+async def test_admission_full_queue_evicts_newest_new_for_reconnect(make_controller):
+    controller = make_controller(queue_size=2)
+    assert controller.try_acquire()
+    first = asyncio.create_task(controller.acquire(priority=PRIORITY_NEW))
+    second = asyncio.create_task(controller.acquire(priority=PRIORITY_NEW))
+    await asyncio.sleep(0.01)
+    reconnect = asyncio.create_task(controller.acquire(priority=PRIORITY_RECONNECT))
+    await asyncio.sleep(0.01)
+
+    assert second.done() and second.result() is False
+    await controller.release()
+    assert await reconnect is True
+    await controller.release()
+    assert await first is True
+    assert controller.stats()["total_evicted"] == 1
+
+
+class _FakeLeaseRedis:
+    """Evaluates the lease scripts' semantics against an in-memory zset."""
+
+    def __init__(self):
+        self.leases: dict[str, float] = {}
+        self.now_ms = 1_000_000
+
+    def register_script(self, source):
+        async def _acquire(keys, args):
+            limit, lease_id, ttl_ms = int(args[0]), args[1], int(args[2])
+            self.leases = {k: v for k, v in self.leases.items() if v > self.now_ms}
+            if len(self.leases) >= limit:
+                return 0
+            self.leases[lease_id] = self.now_ms + ttl_ms
+            return 1
+
+        async def _renew(keys, args):
+            ttl_ms, renewed = int(args[0]), []
+            for lease_id in args[1:]:
+                if lease_id in self.leases:
+                    self.leases[lease_id] = self.now_ms + ttl_ms
+                    renewed.append(lease_id)
+            return renewed
+
+        return _acquire if "ZCARD" in source else _renew
+
+    async def zrem(self, key, member):
+        self.leases.pop(member, None)
+
+
+async def test_cluster_semaphore_caps_fleet_and_reclaims_crashed_leases():
+    from app.api.ws_capacity import RedisAdmissionSemaphore
+
+    redis = _FakeLeaseRedis()
+    worker_a = RedisAdmissionSemaphore(2, "node-a:1", lease_ttl_sec=30, redis_client=redis)
+    worker_b = RedisAdmissionSemaphore(2, "node-b:1", lease_ttl_sec=30, redis_client=redis)
+
+    crashed = await worker_a.try_acquire()
+    held = await worker_b.try_acquire()
+    assert crashed and held
+    assert await worker_b.try_acquire() is None  # fleet cap of 2 reached
+
+    redis.now_ms += 20_000
+    await worker_b.heartbeat()  # node-b renews; node-a has "crashed"
+    redis.now_ms += 15_000
+    assert await worker_b.try_acquire() is not None  # node-a's lease expired
+
+    await worker_b.release(held)
+    assert held not in redis.leases
+
+
+async def test_cluster_heartbeat_reacquires_lost_leases_once_fleet_has_room():
+    from app.api.ws_capacity import RedisAdmissionSemaphore
+
+    redis = _FakeLeaseRedis()
+    worker_a = RedisAdmissionSemaphore(1, "node-a:1", lease_ttl_sec=30, redis_client=redis)
+    worker_b = RedisAdmissionSemaphore(1, "node-b:1", lease_ttl_sec=30, redis_client=redis)
+    lease = await worker_a.try_acquire()
+
+    redis.now_ms += 31_000  # node-a was partitioned past its lease TTL
+    other = await worker_b.try_acquire()
+    assert other is not None
+
+    await worker_a.heartbeat()
+    await worker_a.heartbeat()  # still full: stays flagged, not re-counted as lost
+    assert worker_a.is_unleased(lease)
+    assert worker_a.get_stats()["lost"] == 1
+    assert worker_a.get_stats()["unleased"] == 1
+
+    await worker_b.release(other)
+    await worker_a.heartbeat()
+    assert lease in redis.leases
+    assert not worker_a.is_unleased(lease)
+    assert worker_a.get_stats()["reacquired"] == 1
+    assert worker_a.held == 1
+
+    await worker_a.release(lease)
+    assert redis.leases == {}
+
+
+async def test_controller_takes_and_returns_cluster_lease(make_controller):
+    from app.api.ws_capacity import RedisAdmissionSemaphore
+
+    redis = _FakeLeaseRedis()
+    semaphore = RedisAdmissionSemaphore(1, "node-a:1", redis_client=redis)
+    controller = make_controller(max_concurrent=5, queue_max_wait=0.3, cluster_semaphore=semaphore)
+
+    assert controller.try_acquire()
+    lease = await controller.acquire_cluster_lease()
+    assert lease
+
+    assert controller.try_acquire()
+    assert await controller.acquire_cluster_lease() is None  # fleet full for the whole wait
+    await controller.release()
+
+    await controller.release(lease)
+    assert redis.leases == {}
+    assert controller.active_connections == 0
+
+
+async def test_admission_counts_client_that_leaves_while_queued_as_abandoned(make_controller):
+    controller = make_controller(queue_max_wait=0.2)
+    assert controller.try_acquire()
+
+    async def gone(position, eta):
+        raise ConnectionError("client disconnected")
+
+    assert await controller.acquire(priority=PRIORITY_NEW, on_update=gone) is False
+    assert await controller.acquire(priority=PRIORITY_NEW) is False  # plain timeout
+
+    stats = controller.stats()
+    assert stats["total_abandoned"] == 1
+    assert stats["total_timeout"] == 1
+    assert stats["queued"] == 0
+
+
+async def test_admission_lag_monitor_stops_once_queue_is_empty(make_controller):
+    controller = make_controller(max_loop_lag_ms=250)
+    assert controller.try_acquire()
+    waiter = asyncio.create_task(controller.acquire(priority=PRIORITY_PAID))
+    await asyncio.sleep(0.15)
+    assert not controller._monitor_task.done()  # someone is queued
+
+    await controller.release()
+    assert await waiter is True
+    await asyncio.sleep(0.25)
+    assert controller._monitor_task.done()
+    assert controller.stats()["admitted_by_class"]["paid"] == 1
+
+
+async def test_unclassified_fast_path_admission_is_counted_separately(make_controller):
+    controller = make_controller(max_concurrent=2)
+    assert controller.try_acquire(priority=None)
+    assert await controller.acquire(priority=PRIORITY_PAID)
+
+    stats = controller.stats()
+    assert stats["admitted_unqueued"] == 1
+    assert stats["admitted_by_class"] == {"reconnect": 0, "paid": 1, "new": 0}